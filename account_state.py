@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+💼 ACCOUNT STATE - FASE 1.6
+Caché de balances y equity: snapshot inicial por REST (/api/v3/account) y después
+actualización incremental con eventos del user-data stream (outboundAccountPosition,
+balanceUpdate). El equity se mantiene incrementalmente: lectura O(1) sin llamadas REST.
+"""
+
+import time
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Callable
+
+class AccountState:
+    """Balances por activo con equity valorado en el activo de cotización"""
+
+    def __init__(self, quote_asset: str = 'USDT', time_fn: Callable[[], float] = time.time):
+        self.logger = logging.getLogger(__name__)
+        self.quote_asset = quote_asset
+        self.time_fn = time_fn
+        self.lock = threading.Lock()
+
+        # activo → {'free', 'locked'}; marks: activo → precio en quote
+        self.balances: Dict[str, Dict[str, float]] = {}
+        self.marks: Dict[str, float] = {quote_asset: 1.0}
+        self.last_update_ms: Dict[str, int] = {}
+        self.equity = 0.0
+
+        # Eventos recibidos antes del snapshot (se aplican después si son más nuevos)
+        self.bootstrapped = False
+        self.snapshot_time_ms = 0
+        self.pending_events: List[Dict[str, Any]] = []
+
+        self.source = None
+        self.events_applied = 0
+        self.stale_events_skipped = 0
+
+    # === BOOTSTRAP ===
+
+    def bootstrap(self, rest_client: Any) -> bool:
+        """Snapshot de balances vía GET /api/v3/account (firmado)"""
+        response = rest_client.request('GET', '/api/v3/account', {'omitZeroBalances': 'true'}, signed=True)
+        if not response['ok'] or not isinstance(response['data'], dict):
+            self.logger.error(f"❌ Error obteniendo cuenta ({response['status']}): {response.get('msg')}")
+            return False
+        self.load_snapshot(response['data'], source='rest')
+        return True
+
+    def bootstrap_simulated(self, initial_capital: float) -> None:
+        """Cuenta simulada: todo el capital en el activo de cotización"""
+        self.load_snapshot({
+            'updateTime': int(self.time_fn() * 1000),
+            'balances': [{'asset': self.quote_asset, 'free': str(initial_capital), 'locked': '0'}]
+        }, source='simulated')
+
+    def load_snapshot(self, account: Dict[str, Any], source: str = 'snapshot') -> None:
+        """Cargar snapshot y aplicar eventos pendientes posteriores a él"""
+        with self.lock:
+            self.balances = {}
+            self.last_update_ms = {}
+            snapshot_ms = int(account.get('updateTime', 0))
+            for entry in account.get('balances', []):
+                free, locked = float(entry['free']), float(entry['locked'])
+                if free or locked:
+                    self.balances[entry['asset']] = {'free': free, 'locked': locked}
+                    self.last_update_ms[entry['asset']] = snapshot_ms
+            self.snapshot_time_ms = snapshot_ms
+            self._recompute_equity()
+            self.bootstrapped = True
+            self.source = source
+
+            pending, self.pending_events = self.pending_events, []
+            for event in pending:
+                self._apply(event)
+
+        self.logger.info(f"💼 Cuenta cargada ({source}): {len(self.balances)} activos, equity ${self.equity:.2f}")
+
+    # === USER-DATA STREAM ===
+
+    def on_user_data(self, event: Dict[str, Any]) -> None:
+        """Consumidor de eventos user-data (suscribir a UserDataStream)"""
+        event_type = event.get('e')
+        if event_type not in ('outboundAccountPosition', 'balanceUpdate'):
+            return
+        with self.lock:
+            if not self.bootstrapped:
+                self.pending_events.append(event)
+                return
+            self._apply(event)
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        if event['e'] == 'outboundAccountPosition':
+            update_ms = int(event.get('u', event.get('E', 0)))
+            for entry in event.get('B', []):
+                asset = entry['a']
+                if update_ms < self.last_update_ms.get(asset, self.snapshot_time_ms):
+                    self.stale_events_skipped += 1
+                    continue
+                self._set_balance(asset, float(entry['f']), float(entry['l']))
+                self.last_update_ms[asset] = update_ms
+        else:
+            # balanceUpdate: delta sobre 'free' (depósitos, retiros, transferencias)
+            clear_ms = int(event.get('T', event.get('E', 0)))
+            if clear_ms <= self.snapshot_time_ms:
+                self.stale_events_skipped += 1
+                return
+            asset = event['a']
+            current = self.balances.get(asset, {'free': 0.0, 'locked': 0.0})
+            self._set_balance(asset, current['free'] + float(event['d']), current['locked'])
+        self.events_applied += 1
+
+    # === EQUITY INCREMENTAL ===
+
+    def _set_balance(self, asset: str, free: float, locked: float) -> None:
+        previous = self.balances.get(asset)
+        previous_total = (previous['free'] + previous['locked']) if previous else 0.0
+        mark = self.marks.get(asset)
+        if mark is not None:
+            self.equity += (free + locked - previous_total) * mark
+        if free or locked:
+            self.balances[asset] = {'free': free, 'locked': locked}
+        else:
+            self.balances.pop(asset, None)
+
+    def _recompute_equity(self) -> None:
+        self.equity = sum((b['free'] + b['locked']) * self.marks[asset]
+                          for asset, b in self.balances.items() if asset in self.marks)
+
+    def update_mark(self, symbol: str, price: float) -> None:
+        """Actualizar precio de valoración del activo base de un símbolo (p. ej. BTCUSDT)"""
+        if not symbol.endswith(self.quote_asset) or price <= 0:
+            return
+        asset = symbol[:-len(self.quote_asset)]
+        with self.lock:
+            previous = self.marks.get(asset)
+            self.marks[asset] = price
+            balance = self.balances.get(asset)
+            if balance:
+                self.equity += (balance['free'] + balance['locked']) * (price - (previous or 0.0))
+
+    def mark_symbols(self) -> List[str]:
+        """Símbolos de valoración (activo + quote) de todos los activos con saldo"""
+        with self.lock:
+            return [f"{asset}{self.quote_asset}" for asset in self.balances if asset != self.quote_asset]
+
+    def update_marks(self, prices: Dict[str, float]) -> List[str]:
+        """Valorar desde precios por símbolo (p. ej. bookTicker bulk); devuelve los activos sin precio"""
+        for symbol, price in prices.items():
+            self.update_mark(symbol, price)
+        with self.lock:
+            return [asset for asset in self.balances if asset not in self.marks]
+
+    def apply_realized_pnl(self, pnl: float) -> None:
+        """Cuenta simulada: liquidar P&L realizado en el activo de cotización"""
+        with self.lock:
+            current = self.balances.get(self.quote_asset, {'free': 0.0, 'locked': 0.0})
+            self._set_balance(self.quote_asset, current['free'] + pnl, current['locked'])
+
+    # === LECTURAS O(1) ===
+
+    def get_equity(self) -> float:
+        return self.equity
+
+    def get_free(self, asset: str = None) -> float:
+        balance = self.balances.get(asset or self.quote_asset)
+        return balance['free'] if balance else 0.0
+
+    def get_total(self, asset: str) -> float:
+        """Saldo libre + bloqueado del activo"""
+        balance = self.balances.get(asset)
+        return balance['free'] + balance['locked'] if balance else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estado de la cuenta para telemetría"""
+        return {
+            'equity': self.equity,
+            'quote_free': self.get_free(),
+            'assets': len(self.balances),
+            'unpriced_assets': [asset for asset in self.balances if asset not in self.marks],
+            'source': self.source,
+            'events_applied': self.events_applied,
+            'stale_events_skipped': self.stale_events_skipped
+        }
+
+class AccountReplaySource:
+    """Fuente local de eventos de cuenta (sustituye al WebSocket en tests y replays)"""
+
+    def __init__(self, events: List[Dict[str, Any]] = None):
+        self.events = list(events or [])
+        self.callbacks: List[Callable[[Dict[str, Any]], None]] = []
+
+    def start_user_socket(self, callback: Callable[[Dict[str, Any]], None]) -> str:
+        """Compatible con UserDataStream.start(source=...)"""
+        self.callbacks.append(callback)
+        return 'replay'
+
+    def push(self, event: Dict[str, Any]) -> None:
+        for callback in self.callbacks:
+            callback(event)
+
+    def replay(self) -> int:
+        """Emitir en orden todos los eventos grabados"""
+        for event in self.events:
+            self.push(event)
+        return len(self.events)
+
+    def stop(self) -> None:
+        self.callbacks = []
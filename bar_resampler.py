@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+🕯️ BAR RESAMPLER - FASE 1.6
+Una única serie base de velas de 1m por símbolo; 5m/15m/1h/4h se derivan en
+memoria de forma incremental (cada vela de 1m actualiza la vela en curso de cada
+timeframe). Una sola suscripción/fetch por símbolo alimenta todos los timeframes
+y todos son coherentes entre sí. Los buckets se alinean a epoch UTC como Binance.
+"""
+
+import time
+import logging
+import pandas as pd
+from collections import deque
+from typing import Dict, List, Any, Optional, Callable, Tuple, Iterable
+
+TIMEFRAME_SECONDS = {
+    '1m': 60,
+    '5m': 300,
+    '15m': 900,
+    '1h': 3600,
+    '4h': 14400,
+    '1d': 86400
+}
+
+DEFAULT_TIMEFRAMES = ('5m', '15m', '1h', '4h')
+BAR_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+KLINES_PAGE_LIMIT = 1000  # máximo de Binance por petición
+
+# Vela: (open_time_sec, open, high, low, close, volume)
+Bar = Tuple[int, float, float, float, float, float]
+
+class TimeframeView:
+    """Velas de un timeframe derivadas incrementalmente de la serie de 1m"""
+
+    __slots__ = ('timeframe', 'seconds', 'closed', 'current')
+
+    def __init__(self, timeframe: str, capacity: int):
+        self.timeframe = timeframe
+        self.seconds = TIMEFRAME_SECONDS[timeframe]
+        self.closed: deque = deque(maxlen=capacity)
+        self.current: Optional[List[float]] = None  # vela en curso (mutable)
+
+    def push(self, bar: Bar) -> List[Bar]:
+        """Agregar una vela de 1m; devuelve las velas de este timeframe que quedan cerradas"""
+        open_time, o, h, l, c, v = bar
+        bucket = open_time - open_time % self.seconds
+        completed = []
+        current = self.current
+        if current is not None and current[0] != bucket:
+            # Hueco sin la última vela de 1m del bucket: se cierra al llegar el siguiente
+            completed.append(tuple(current))
+            current = None
+        if current is None:
+            current = [bucket, o, h, l, c, v]
+        else:
+            if h > current[2]:
+                current[2] = h
+            if l < current[3]:
+                current[3] = l
+            current[4] = c
+            current[5] += v
+        if open_time + 60 >= bucket + self.seconds:
+            completed.append(tuple(current))
+            current = None
+        self.current = current
+        self.closed.extend(completed)
+        return completed
+
+class SymbolSeries:
+    """Serie base de 1m de un símbolo y sus vistas por timeframe"""
+
+    __slots__ = ('base', 'views', 'last_open_time')
+
+    def __init__(self, timeframes: Iterable[str], base_minutes: int, view_capacity: int):
+        self.base: deque = deque(maxlen=base_minutes)
+        self.views = {tf: TimeframeView(tf, view_capacity) for tf in timeframes}
+        self.last_open_time = None
+
+def resample_base(base: Iterable[Bar], timeframe: str) -> List[Bar]:
+    """Re-agregar desde cero una serie de 1m (referencia para backfill y verificación)"""
+    view = TimeframeView(timeframe, capacity=None)
+    for bar in base:
+        view.push(bar)
+    return list(view.closed)
+
+class BarResampler:
+    """Series de 1m por símbolo con timeframes superiores derivados en memoria"""
+
+    def __init__(self, timeframes: Iterable[str] = DEFAULT_TIMEFRAMES, base_minutes: int = 2880,
+                 view_capacity: int = 500, time_fn: Callable[[], float] = time.time):
+        self.logger = logging.getLogger(__name__)
+        self.timeframes = tuple(tf for tf in timeframes if tf != '1m')
+        self.base_minutes = base_minutes
+        self.view_capacity = view_capacity
+        self.time_fn = time_fn
+        self.series: Dict[str, SymbolSeries] = {}
+        self.listeners: Dict[str, List[Callable[[str, str, Bar], None]]] = {}
+        self.bars_pushed = 0
+        self.stale_dropped = 0
+        self.fetches = 0
+
+    # === ENTRADA ===
+
+    def subscribe(self, timeframe: str, callback: Callable[[str, str, Bar], None]) -> None:
+        """callback(symbol, timeframe, bar) al cerrar cada vela del timeframe"""
+        self.listeners.setdefault(timeframe, []).append(callback)
+
+    def push(self, symbol: str, open_time: int, o: float, h: float, l: float, c: float, v: float) -> bool:
+        """Añadir una vela de 1m cerrada (open_time en segundos); se ignoran duplicadas y atrasadas"""
+        series = self.series.get(symbol)
+        if series is None:
+            series = self.series[symbol] = SymbolSeries(self.timeframes, self.base_minutes, self.view_capacity)
+        if series.last_open_time is not None and open_time <= series.last_open_time:
+            self.stale_dropped += 1
+            return False
+        bar = (open_time, o, h, l, c, v)
+        series.base.append(bar)
+        series.last_open_time = open_time
+        self.bars_pushed += 1
+        for tf, view in series.views.items():
+            for closed in view.push(bar):
+                for callback in self.listeners.get(tf, ()):
+                    callback(symbol, tf, closed)
+        return True
+
+    def push_kline(self, symbol: str, kline: List[Any]) -> bool:
+        """Vela de 1m en formato Binance (open_time ms, precios en texto, volumen en quote)"""
+        return self.push(symbol, int(kline[0]) // 1000, float(kline[1]), float(kline[2]), float(kline[3]),
+                         float(kline[4]), float(kline[7]))
+
+    def sync(self, rest_client: Any, symbols: Iterable[str]) -> int:
+        """
+        Traer de REST las velas de 1m cerradas que faltan por símbolo (una petición por
+        símbolo en régimen; el backfill inicial pagina de KLINES_PAGE_LIMIT en KLINES_PAGE_LIMIT
+        y se adelanta hasta la frontera del timeframe mayor, sin buckets parciales).
+        """
+        now = int(self.time_fn())
+        last_closed = now - now % 60 - 60
+        # El backfill empieza en frontera del timeframe mayor: la primera vela de cada vista es completa
+        largest = max((TIMEFRAME_SECONDS[tf] for tf in self.timeframes), default=60)
+        backfill_start = last_closed - (self.base_minutes - 1) * 60
+        backfill_start -= backfill_start % largest
+        added = 0
+        for symbol in symbols:
+            series = self.series.get(symbol)
+            backfill = series is None or series.last_open_time is None
+            start = backfill_start if backfill else series.last_open_time + 60
+            while start <= last_closed:
+                limit = min((last_closed - start) // 60 + 1, KLINES_PAGE_LIMIT)
+                # Backfill (páginas de 1000 velas): sin hedge y con el deadline largo del cliente
+                response = rest_client.request('GET', '/api/v3/klines', {
+                    'symbol': symbol, 'interval': '1m', 'startTime': start * 1000, 'limit': limit
+                }, backfill=backfill)
+                self.fetches += 1
+                if not response['ok'] or not response['data']:
+                    self.logger.warning("⚠️ Velas 1m no disponibles para %s (status %s)", symbol, response['status'])
+                    break
+                for kline in response['data']:
+                    if int(kline[0]) // 1000 <= last_closed and self.push_kline(symbol, kline):
+                        added += 1
+                start += limit * 60
+        return added
+
+    # === CONSULTA ===
+
+    def count(self, symbol: str, timeframe: str) -> int:
+        series = self.series.get(symbol)
+        if series is None:
+            return 0
+        return len(series.base) if timeframe == '1m' else len(series.views[timeframe].closed)
+
+    def get_bars(self, symbol: str, timeframe: str, limit: int = None, include_partial: bool = False) -> List[Bar]:
+        """Últimas velas cerradas (y opcionalmente la vela en curso) como tuplas"""
+        series = self.series.get(symbol)
+        if series is None:
+            return []
+        if timeframe == '1m':
+            bars = list(series.base)
+        else:
+            view = series.views[timeframe]
+            bars = list(view.closed)
+            if include_partial and view.current is not None:
+                bars.append(tuple(view.current))
+        return bars[-limit:] if limit else bars
+
+    def bars(self, symbol: str, timeframe: str, limit: int = None, include_partial: bool = False) -> pd.DataFrame:
+        """Velas como DataFrame con las columnas que usan selector y filtros"""
+        df = pd.DataFrame(self.get_bars(symbol, timeframe, limit, include_partial), columns=BAR_COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
+        return df
+
+    def closed_since(self, symbol: str, timeframe: str, after_open_time: int) -> List[Bar]:
+        """Velas cerradas con open_time posterior a after_open_time"""
+        series = self.series.get(symbol)
+        if series is None:
+            return []
+        view = series.views[timeframe]
+        newer = []
+        for bar in reversed(view.closed):
+            if bar[0] <= after_open_time:
+                break
+            newer.append(bar)
+        newer.reverse()
+        return newer
+
+    def drop(self, symbol: str) -> None:
+        """Dejar de mantener un símbolo (p. ej. fuera del universo)"""
+        self.series.pop(symbol, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'symbols': len(self.series),
+            'timeframes': list(self.timeframes),
+            'bars_pushed': self.bars_pushed,
+            'stale_dropped': self.stale_dropped,
+            'fetches': self.fetches
+        }
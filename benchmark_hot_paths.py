@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+⏱️ BENCHMARK HOT PATHS - FASE 1.6
+Micro-benchmarks de las rutas calientes del bot con baseline en JSON.
+
+Uso:
+    python benchmark_hot_paths.py run [--output benchmarks/baseline.json] [--filter selector] [--quick]
+    python benchmark_hot_paths.py compare [--baseline benchmarks/baseline.json] [--current otro.json] [--threshold 0.20]
+
+`compare` ejecuta la suite (o lee --current) y marca como regresión cualquier benchmark
+cuya mediana supere la del baseline en más del umbral; en ese caso sale con código 1.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import statistics
+import tempfile
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+DEFAULT_BASELINE = os.path.join('benchmarks', 'baseline.json')
+DEFAULT_THRESHOLD = 0.20
+
+# Datos de mercado que pasan todos los filtros pre-trade
+PASSING_MARKET_DATA = {
+    'price': 100.0, 'high': 100.5, 'low': 99.5, 'close': 100.0, 'best_ask': 100.005, 'best_bid': 99.995,
+    'volume_usd': 10_000_000, 'ws_latency_ms': 100, 'rest_latency_ms': 100
+}
+
+def measure(fn: Callable[[], Any], repeat: int = 5, min_time: float = 0.05) -> Dict[str, Any]:
+    """Calibrar iteraciones hasta min_time por repetición y devolver mediana/mínimo por operación"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+
+    return {
+        'median_us': statistics.median(samples) * 1e6,
+        'min_us': min(samples) * 1e6,
+        'iterations': number,
+        'repeats': repeat
+    }
+
+# === CONSTRUCTORES: preparan el estado y devuelven la función a medir ===
+
+def bench_select_active_pairs(candidates: int) -> Callable[[], Any]:
+    from config_fase_1_6 import config
+    from pair_selector import AutoPairSelector
+
+    selector = AutoPairSelector(config)
+    selector.auto_pair_selector = True
+    base = selector.pairs_candidates
+    selector.pairs_candidates = [base[i] if i < len(base) else f"SYN{i}USDT" for i in range(candidates)]
+    return selector.select_active_pairs
+
+def bench_calculate_pair_score() -> Callable[[], Any]:
+    from config_fase_1_6 import config
+    from pair_selector import AutoPairSelector
+
+    selector = AutoPairSelector(config)
+    df = selector.get_market_data('BTCUSDT', '1h', selector.lookback_hours)
+    return lambda: selector.calculate_pair_score('BTCUSDT', df)
+
+def bench_pre_trade_filters() -> Callable[[], Any]:
+    from minimal_working_bot import SafetyManager
+
+    safety = SafetyManager()
+    return lambda: safety.pre_trade_filters(PASSING_MARKET_DATA)
+
+def bench_compute_trade_targets() -> Callable[[], Any]:
+    from minimal_working_bot import SafetyManager
+
+    safety = SafetyManager()
+    return lambda: safety.compute_trade_targets(100.0, 0.35)
+
+def bench_calculate_net_pnl() -> Callable[[], Any]:
+    from minimal_working_bot import SafetyManager
+
+    safety = SafetyManager()
+    trade = {'notional': 5.0, 'intended_price': 100.0, 'executed_price': 100.01, 'realized_pnl': 0.012}
+    return lambda: safety.calculate_net_pnl(trade)
+
+def bench_metrics_summary(operations: int) -> Callable[[], Any]:
+    from minimal_working_bot import MetricsTracker
+
+    tracker = MetricsTracker(max_operations=operations, initial_capital=50.0)
+    rng = random.Random(7)
+    capital = 50.0
+    for _ in range(operations):
+        net = rng.uniform(-0.05, 0.06)
+        capital += net
+        tracker.add_operation({'symbol': 'BTCUSDT', 'net_pnl': net, 'pnl_net': net, 'capital_net': capital,
+                               'result': 'GANANCIA' if net > 0 else 'PÉRDIDA', 'notional': 5.0})
+    return tracker.get_metrics_summary
+
+def bench_log_operation(day_trades: int) -> Callable[[], Any]:
+    from minimal_working_bot import LocalLogger
+
+    local_logger = LocalLogger()  # trading_data/ dentro del directorio temporal de run_suite
+    trade = {'timestamp': datetime.now().isoformat(), 'symbol': 'BTCUSDT', 'side': 'BUY', 'price': 100.0,
+             'amount': 0.05, 'result': 'GANANCIA', 'pnl': 0.01, 'capital': 50.01}
+    for _ in range(day_trades):
+        local_logger.log_operation(trade)
+    return lambda: local_logger.log_operation(trade)
+
+def bench_simulate_trade() -> Callable[[], Any]:
+    """simulate_trade completo (sizing, fill simulado, P&L, métricas) con los sinks anulados"""
+    from minimal_working_bot import ProfessionalTradingBot
+
+    bot = ProfessionalTradingBot()
+    bot.sheets_logger.log_trade = lambda trade_data, metrics=None: True
+    bot.local_logger.log_operation = lambda trade_data: True
+    bot.send_telegram_message = lambda message: None
+    bot.telemetry_manager.send_telemetry = lambda metrics, safety_status: None
+
+    signal = None
+    for _ in range(500):
+        bot.safety_manager.last_trade_time = None
+        candidate = bot.simulate_trading_signal()
+        if candidate and candidate['signal'] not in ('REJECTED', 'ERROR'):
+            signal = candidate
+            break
+    if signal is None:
+        raise RuntimeError("no se pudo generar una señal válida")
+    return lambda: bot.simulate_trade(dict(signal))
+
+def bench_synthetic_generate(symbols: int, bars: int) -> Callable[[], Any]:
+    from synthetic_market import SyntheticMarket
+
+    market = SyntheticMarket(bar_seconds=60)
+    names = [f"SYN{i}USDT" for i in range(symbols)]
+    return lambda: market.generate(names, bars)
+
+BENCHMARKS: List[Tuple[str, Callable[[], Callable[[], Any]]]] = [
+    ('selector.select_active_pairs[15]', lambda: bench_select_active_pairs(15)),
+    ('selector.select_active_pairs[150]', lambda: bench_select_active_pairs(150)),
+    ('selector.select_active_pairs[500]', lambda: bench_select_active_pairs(500)),
+    ('selector.calculate_pair_score', bench_calculate_pair_score),
+    ('safety.pre_trade_filters', bench_pre_trade_filters),
+    ('safety.compute_trade_targets', bench_compute_trade_targets),
+    ('safety.calculate_net_pnl', bench_calculate_net_pnl),
+    ('metrics.get_metrics_summary[50]', lambda: bench_metrics_summary(50)),
+    ('metrics.get_metrics_summary[10000]', lambda: bench_metrics_summary(10_000)),
+    ('local_logger.log_operation[1000]', lambda: bench_log_operation(1000)),
+    ('bot.simulate_trade', bench_simulate_trade),
+    ('synthetic.generate[100x10000]', lambda: bench_synthetic_generate(100, 10_000))
+]
+
+def run_suite(name_filter: Optional[str] = None, repeat: int = 5, min_time: float = 0.05) -> Dict[str, Any]:
+    """Ejecutar los benchmarks (opcionalmente filtrados por subcadena)"""
+    logging.disable(logging.WARNING)  # los logs del bot no deben entrar en la medida
+    results = {}
+    workdir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='bench_') as tmp:
+        os.chdir(tmp)  # trading_data/ y demás ficheros del bot quedan fuera del repo
+        try:
+            for name, build in BENCHMARKS:
+                if name_filter and name_filter not in name:
+                    continue
+                random.seed(42)
+                results[name] = measure(build(), repeat=repeat, min_time=min_time)
+                print(f"⏱️ {name:<40} {results[name]['median_us']:>14.2f} µs")
+        finally:
+            os.chdir(workdir)
+            logging.disable(logging.NOTSET)
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': repeat
+        },
+        'results': results
+    }
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """Comparar medianas; regresión si current > baseline * (1 + threshold)"""
+    rows = []
+    for name, base in baseline.get('results', {}).items():
+        now = current.get('results', {}).get(name)
+        if not now:
+            continue
+        ratio = now['median_us'] / base['median_us'] if base['median_us'] > 0 else 1.0
+        rows.append({
+            'name': name,
+            'baseline_us': base['median_us'],
+            'current_us': now['median_us'],
+            'ratio': ratio,
+            'regression': ratio > 1 + threshold
+        })
+    return rows
+
+def load_json(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_json(path: str, data: Dict[str, Any]) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+
+def main(argv: List[str] = None) -> int:
+    """Función principal"""
+    parser = argparse.ArgumentParser(description='Benchmarks de rutas calientes FASE 1.6')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help='Ejecutar la suite y guardar resultados')
+    run_parser.add_argument('--output', default=DEFAULT_BASELINE)
+    run_parser.add_argument('--filter', default=None)
+    run_parser.add_argument('--quick', action='store_true', help='1 repetición (para CI/smoke)')
+
+    cmp_parser = sub.add_parser('compare', help='Comparar contra un baseline')
+    cmp_parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    cmp_parser.add_argument('--current', default=None, help='Resultados ya guardados (si no, se ejecuta la suite)')
+    cmp_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    cmp_parser.add_argument('--filter', default=None)
+    cmp_parser.add_argument('--quick', action='store_true')
+
+    args = parser.parse_args(argv)
+    repeat = 1 if args.quick else 5
+
+    if args.command == 'run':
+        results = run_suite(args.filter, repeat=repeat)
+        save_json(args.output, results)
+        print(f"💾 Resultados guardados en {args.output}")
+        return 0
+
+    baseline = load_json(args.baseline)
+    current = load_json(args.current) if args.current else run_suite(args.filter, repeat=repeat)
+    rows = compare_results(baseline, current, args.threshold)
+
+    print("=" * 80)
+    for row in rows:
+        flag = "❌ REGRESIÓN" if row['regression'] else "✅"
+        print(f"{flag:<13} {row['name']:<40} {row['baseline_us']:>12.2f} → {row['current_us']:>12.2f} µs "
+              f"(x{row['ratio']:.2f})")
+    regressions = [row for row in rows if row['regression']]
+    print("=" * 80)
+    print(f"📊 {len(rows)} comparados, {len(regressions)} regresiones (umbral +{args.threshold * 100:.0f}%)")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
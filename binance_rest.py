@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+🔌 CLIENTE REST BINANCE - FASE 1.6
+Sesión HTTP reutilizable (pool de conexiones) con firma HMAC para endpoints firmados.
+Con presupuesto de peso (request_budget) cada petición reserva su peso según prioridad
+y las de baja prioridad se aplazan en vez de arriesgar un 429/418. Los GET (idempotentes)
+admiten deadline total y hedging: duplicado tras el p95 observado, gana el primero.
+Cribado (SCAN) y backfills no se duplican y usan su propio deadline, más largo.
+Con circuito del exchange (circuit_breaker) los errores de red, timeouts y 5xx lo abren
+y, mientras está abierto, todo salvo las órdenes se omite sin llegar a la red.
+"""
+
+import os
+import time
+import hmac
+import hashlib
+import logging
+import threading
+from collections import deque
+from urllib.parse import urlencode
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from request_budget import (RequestBudget, request_weight, classify_request, PRIORITY_ORDER, PRIORITY_MARKET,
+                            PRIORITY_SCAN)
+from circuit_breaker import CircuitBreaker
+
+LATENCY_WINDOW = 200      # muestras por endpoint para el p95
+HEDGE_MIN_SAMPLES = 20    # con menos muestras se usa hedge_default_ms
+MAX_HEDGE_RATIO = 0.1     # como mucho 1 duplicado por cada 10 peticiones acotadas
+
+BINANCE_BASE_URLS = {
+    'production': 'https://api.binance.com',
+    'testnet': 'https://testnet.binance.vision'
+}
+
+def format_decimal(value: float, decimals: int = 8) -> str:
+    """Formatear número para la API sin notación científica"""
+    text = f"{value:.{decimals}f}"
+    if '.' in text:
+        text = text.rstrip('0').rstrip('.')
+    return text or '0'
+
+class BinanceRestClient:
+    """Cliente REST de Binance con sesión persistente y firma de peticiones"""
+
+    def __init__(self, base_url: str = None, api_key: str = None, api_secret: str = None,
+                 session: Any = None, timeout: float = 10.0, pool_size: int = 10,
+                 recv_window_ms: int = 5000, budget: RequestBudget = None, hedge_gets: bool = False,
+                 deadline_ms: float = None, hedge_min_ms: float = 50.0, hedge_default_ms: float = 300.0,
+                 max_hedge_ratio: float = MAX_HEDGE_RATIO, breaker: CircuitBreaker = None,
+                 scan_deadline_ms: float = None):
+        self.logger = logging.getLogger(__name__)
+        mode = os.getenv('MODE', 'testnet')
+        self.base_url = (base_url or os.getenv('BINANCE_BASE_URL') or
+                         BINANCE_BASE_URLS.get(mode, BINANCE_BASE_URLS['testnet'])).rstrip('/')
+        self.api_key = api_key if api_key is not None else os.getenv('BINANCE_API_KEY', '')
+        self.api_secret = api_secret if api_secret is not None else os.getenv('BINANCE_SECRET_KEY', '')
+        self.timeout = timeout
+        self.recv_window_ms = recv_window_ms
+        self.time_offset_ms = 0
+        self.budget = budget
+        self.breaker = breaker
+        self.pool_size = pool_size
+
+        # Hedging/deadlines de GET: p95 por endpoint y pool de hilos perezoso
+        self.hedge_gets = hedge_gets
+        self.deadline_ms = deadline_ms
+        self.scan_deadline_ms = scan_deadline_ms  # cribado/backfill: respuestas grandes (24hr bulk, 1000 velas)
+        self.hedge_min_ms = hedge_min_ms
+        self.hedge_default_ms = hedge_default_ms
+        self.max_hedge_ratio = max_hedge_ratio
+        self.latency_samples: Dict[str, deque] = {}
+        self.latency_lock = threading.Lock()
+        self.executor = None
+
+        # Sesión compartida: reutiliza conexiones TCP/TLS entre peticiones
+        self.session = session if session is not None else self._build_session(pool_size)
+
+        self.last_latency_ms = 0.0
+        self.last_get_latency_ms = 0.0  # solo cotizaciones del camino de órdenes (quote=True)
+        self.request_count = 0
+        self.error_count = 0
+        self.deferred_count = 0
+        self.circuit_skipped = 0
+        self.bounded_count = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self.deadline_exceeded = 0
+
+    @classmethod
+    def from_config(cls, config, budget: RequestBudget = None, breaker: CircuitBreaker = None) -> 'BinanceRestClient':
+        """Cliente con hedging/deadline de GET según la configuración"""
+        return cls(budget=budget, hedge_gets=config.REST_HEDGE_ENABLED, breaker=breaker,
+                   deadline_ms=config.REST_DEADLINE_MS or None, hedge_min_ms=config.REST_HEDGE_MIN_MS,
+                   scan_deadline_ms=config.REST_SCAN_DEADLINE_MS or None)
+
+    def _build_session(self, pool_size: int) -> requests.Session:
+        """Crear sesión HTTP con pool de conexiones"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if self.api_key:
+            session.headers.update({'X-MBX-APIKEY': self.api_key})
+        return session
+
+    def sign_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Añadir timestamp, recvWindow y firma HMAC-SHA256"""
+        signed = dict(params)
+        signed['timestamp'] = int(time.time() * 1000) + self.time_offset_ms
+        signed['recvWindow'] = self.recv_window_ms
+        query = urlencode(signed)
+        signed['signature'] = hmac.new(self.api_secret.encode('utf-8'), query.encode('utf-8'),
+                                       hashlib.sha256).hexdigest()
+        return signed
+
+    def sync_time(self) -> bool:
+        """Sincronizar offset con el reloj del servidor"""
+        response = self.request('GET', '/api/v3/time')
+        if response['ok'] and isinstance(response['data'], dict) and 'serverTime' in response['data']:
+            self.time_offset_ms = int(response['data']['serverTime']) - int(time.time() * 1000)
+            self.logger.info(f"⏱️ Offset de reloj Binance: {self.time_offset_ms}ms")
+            return True
+        return False
+
+    def request(self, method: str, path: str, params: Dict[str, Any] = None,
+                signed: bool = False, timeout: float = None, priority: int = None,
+                deadline_ms: float = None, hedge: bool = None, backfill: bool = False,
+                quote: bool = False) -> Dict[str, Any]:
+        """
+        Ejecutar petición REST y normalizar la respuesta (priority: ver request_budget).
+        Solo GET: deadline_ms acota la latencia total y hedge lanza un duplicado si la
+        respuesta tarda más que el p95 observado del endpoint (gana la primera). Los valores
+        por defecto del cliente solo se aplican a datos de mercado (velas, libro); cribado
+        (SCAN) y backfill=True van sin hedge y con scan_deadline_ms. quote=True marca la
+        cotización que precede a una orden: solo ella actualiza last_get_latency_ms.
+        """
+        params = dict(params or {})
+
+        url = f"{self.base_url}{path}"
+        headers = {'X-MBX-APIKEY': self.api_key} if self.api_key else {}
+
+        if priority is None:
+            priority = classify_request(method, path, params)
+
+        # Exchange caído: omitir sin gastar peso ni esperar timeouts. Las órdenes siempre
+        # salen (cancelar/cerrar no debe depender del circuito) y su resultado también cuenta
+        guarded = self.breaker is not None and priority != PRIORITY_ORDER
+        if guarded and not self.breaker.allow():
+            self.circuit_skipped += 1
+            result = self._empty_result()
+            result['circuit_open'] = True
+            result['msg'] = 'Omitida: circuito del exchange abierto'
+            return result
+
+        if self.budget is not None:
+            is_order = method == 'POST' and path == '/api/v3/order'
+            if not self.budget.acquire(request_weight(method, path, params), priority, is_order):
+                if guarded:
+                    self.breaker.release()
+                self.deferred_count += 1
+                result = self._empty_result()
+                result['deferred'] = True
+                result['msg'] = 'Aplazada: presupuesto de peso REST agotado'
+                self.logger.debug("🚦 %s %s aplazada (prioridad %d)", method, path, priority)
+                return result
+
+        if signed:
+            params = self.sign_params(params)  # timestamp tras la posible espera del presupuesto
+
+        # Duplicar o abandonar solo peticiones idempotentes: una orden nunca se repite ni se corta.
+        # Por defecto solo datos de mercado; cuenta y consultas de órdenes esperan a su timeout
+        if method == 'GET':
+            market_data = priority >= PRIORITY_MARKET
+            bulk = backfill or priority >= PRIORITY_SCAN
+            hedge = (self.hedge_gets and market_data and not bulk) if hedge is None else hedge
+            if deadline_ms is None:
+                deadline_ms = self.scan_deadline_ms if bulk else (self.deadline_ms if market_data else None)
+        else:
+            hedge, deadline_ms = False, None
+
+        if hedge or deadline_ms:
+            result = self._request_bounded(method, path, url, params, headers, timeout, deadline_ms, hedge)
+        else:
+            result = self._send(method, path, url, params, headers, timeout or self.timeout)
+
+        if self.breaker is not None:
+            # Sin respuesta HTTP o 5xx = exchange caído; un 4xx es un error nuestro
+            if result['status'] == 0 or result['status'] >= 500:
+                self.breaker.record_failure(result['msg'] or result['status'])
+            else:
+                self.breaker.record_success()
+
+        self.last_latency_ms = result['latency_ms']
+        if quote and method == 'GET':
+            self.last_get_latency_ms = result['latency_ms']
+        return result
+
+    @staticmethod
+    def _empty_result() -> Dict[str, Any]:
+        return {
+            'ok': False,
+            'status': 0,
+            'data': None,
+            'code': None,
+            'msg': '',
+            'headers': {},
+            'latency_ms': 0.0,
+            'deferred': False,
+            'timed_out': False,
+            'circuit_open': False
+        }
+
+    def _send(self, method: str, path: str, url: str, params: Dict[str, Any], headers: Dict[str, str],
+              timeout: float) -> Dict[str, Any]:
+        """Un intento HTTP (puede correr en un hilo del pool si hay hedge/deadline)"""
+        result = self._empty_result()
+        start = time.perf_counter()
+        try:
+            self.request_count += 1
+            response = self.session.request(method, url, params=params, headers=headers, timeout=timeout)
+            result['latency_ms'] = (time.perf_counter() - start) * 1000
+            result['status'] = response.status_code
+            result['headers'] = dict(response.headers or {})
+            if self.budget is not None:
+                self.budget.record_response(response.status_code, result['headers'])
+
+            try:
+                data = response.json()
+            except ValueError:
+                data = None
+            result['data'] = data
+
+            if 200 <= response.status_code < 300:
+                result['ok'] = True
+            else:
+                self.error_count += 1
+                if isinstance(data, dict):
+                    result['code'] = data.get('code')
+                    result['msg'] = data.get('msg', '')
+                self.logger.warning(f"⚠️ Binance {method} {path} → {response.status_code} "
+                                    f"(code={result['code']}, msg={result['msg']})")
+            if method == 'GET':
+                self._observe_latency(path, result['latency_ms'])
+        except Exception as e:
+            result['latency_ms'] = (time.perf_counter() - start) * 1000
+            result['msg'] = str(e)
+            self.error_count += 1
+            self.logger.error(f"❌ Error de red en Binance {method} {path}: {e}")
+        return result
+
+    # === HEDGING Y DEADLINES (GET idempotentes) ===
+
+    def _observe_latency(self, path: str, latency_ms: float) -> None:
+        with self.latency_lock:
+            window = self.latency_samples.get(path)
+            if window is None:
+                window = self.latency_samples[path] = deque(maxlen=LATENCY_WINDOW)
+            window.append(latency_ms)
+
+    def latency_percentile(self, path: str, pct: float = 95.0) -> Optional[float]:
+        """Percentil de latencia observado del endpoint (None con pocas muestras)"""
+        with self.latency_lock:
+            window = self.latency_samples.get(path)
+            if window is None or len(window) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(window)
+        return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+    def hedge_delay_ms(self, path: str) -> float:
+        p95 = self.latency_percentile(path)
+        return self.hedge_default_ms if p95 is None else max(self.hedge_min_ms, p95)
+
+    def _hedge_allowed(self, method: str, path: str, params: Dict[str, Any]) -> bool:
+        """El duplicado es tráfico opcional: tope de ratio y solo con holgura de cribado en el presupuesto"""
+        if self.hedges_sent >= self.max_hedge_ratio * max(1, self.bounded_count):
+            return False
+        if self.budget is not None:
+            return self.budget.acquire(request_weight(method, path, params), PRIORITY_SCAN)
+        return True
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix='rest-hedge')
+        return self.executor
+
+    def _request_bounded(self, method: str, path: str, url: str, params: Dict[str, Any],
+                         headers: Dict[str, str], timeout: Optional[float], deadline_ms: Optional[float],
+                         hedge: bool) -> Dict[str, Any]:
+        started = time.perf_counter()
+        deadline = started + deadline_ms / 1000 if deadline_ms else None
+        attempt_timeout = timeout or self.timeout
+        if deadline_ms:
+            attempt_timeout = min(attempt_timeout, deadline_ms / 1000)
+        self.bounded_count += 1
+
+        pool = self._executor()
+        primary = pool.submit(self._send, method, path, url, params, headers, attempt_timeout)
+        attempts = [primary]
+        if hedge:
+            delay = self.hedge_delay_ms(path) / 1000
+            if deadline is None or started + delay < deadline:
+                done, _ = wait(attempts, timeout=delay)
+                if not done and self._hedge_allowed(method, path, params):
+                    self.hedges_sent += 1
+                    attempts.append(pool.submit(self._send, method, path, url, params, headers, attempt_timeout))
+
+        # Gana la primera respuesta HTTP; un error de red solo gana si no queda otro intento
+        result, winner, pending = None, None, set(attempts)
+        while pending:
+            remaining = None if deadline is None else deadline - time.perf_counter()
+            if remaining is not None and remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                candidate = future.result()
+                if result is None or (candidate['status'] and not result['status']):
+                    result, winner = candidate, future
+            if result is not None and (result['status'] or not pending):
+                break
+
+        if result is None:
+            self.deadline_exceeded += 1
+            result = self._empty_result()
+            result['timed_out'] = True
+            result['msg'] = f'Deadline de {deadline_ms:.0f}ms superado'
+            self.logger.warning("⏱️ Binance %s %s sin respuesta en %.0fms", method, path, deadline_ms)
+        elif winner is not primary:
+            self.hedges_won += 1
+        result = dict(result)
+        result['latency_ms'] = (time.perf_counter() - started) * 1000  # latencia vista por el llamador
+        return result
+
+    def close(self) -> None:
+        """Liberar el pool de hilos de hedging (los intentos en vuelo terminan solos)"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'requests': self.request_count,
+            'errors': self.error_count,
+            'deferred': self.deferred_count,
+            'circuit_skipped': self.circuit_skipped,
+            'bounded': self.bounded_count,
+            'hedges_sent': self.hedges_sent,
+            'hedges_won': self.hedges_won,
+            'deadline_exceeded': self.deadline_exceeded,
+            'p95_ms': {path: self.latency_percentile(path) for path in list(self.latency_samples)}
+        }
+
+# Instancia global
+rest_client = None
+
+def init_rest_client(**kwargs) -> BinanceRestClient:
+    """Inicializar cliente REST compartido"""
+    global rest_client
+    rest_client = BinanceRestClient(**kwargs)
+    return rest_client
+
+def get_rest_client() -> Optional[BinanceRestClient]:
+    """Obtener cliente REST compartido"""
+    return rest_client
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+🔌 CIRCUIT BREAKERS - FASE 1.6
+Un circuito por dependencia externa (Google Sheets, Telegram, exchange) para que una
+caída se detecte una vez y después se omita sin coste, en lugar de pagar un timeout
+en cada evento.
+
+- closed: las llamadas pasan; se guarda el resultado de las últimas N en una ventana
+- open: tras MAX_RETRY_ATTEMPTS fallos seguidos o una tasa de fallo ≥ umbral en la
+  ventana (con un mínimo de llamadas) se omiten todas durante open_seconds
+- half_open: pasado ese tiempo se deja pasar una prueba; si va bien se cierra,
+  si falla se vuelve a abrir otro periodo completo
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, Optional, Callable
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+class CircuitBreaker:
+    """Circuito closed/open/half-open con ventana de tasa de fallo"""
+
+    def __init__(self, name: str, consecutive_failures: int = 2, failure_rate_pct: float = 50.0,
+                 window_size: int = 20, min_calls: int = 10, open_seconds: float = 900.0,
+                 half_open_max_calls: int = 1, time_fn: Callable[[], float] = time.time):
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.consecutive_threshold = max(1, consecutive_failures)
+        self.failure_rate = failure_rate_pct / 100
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.time_fn = time_fn
+        self.lock = threading.Lock()
+
+        self.state = STATE_CLOSED
+        self.window = deque(maxlen=window_size)  # True = fallo
+        self.consecutive = 0
+        self.opened_at = 0.0
+        self.half_open_calls = 0
+        self.last_error = ''
+
+        self.calls = 0
+        self.failures = 0
+        self.skipped = 0
+        self.opened_count = 0
+
+    def allow(self) -> bool:
+        """¿Se puede llamar ahora a la dependencia? (open: no, sin coste)"""
+        with self.lock:
+            if self.state == STATE_OPEN:
+                if self.time_fn() - self.opened_at < self.open_seconds:
+                    self.skipped += 1
+                    return False
+                self.state = STATE_HALF_OPEN
+                self.half_open_calls = 0
+                self.logger.info("🔌 Circuito %s semiabierto: probando la dependencia", self.name)
+            if self.state == STATE_HALF_OPEN:
+                if self.half_open_calls >= self.half_open_max_calls:
+                    self.skipped += 1
+                    return False
+                self.half_open_calls += 1
+            self.calls += 1
+            return True
+
+    def release(self) -> None:
+        """Devolver un permiso de allow() que no llegó a usarse (p. ej. petición aplazada)"""
+        with self.lock:
+            self.calls -= 1
+            if self.state == STATE_HALF_OPEN and self.half_open_calls > 0:
+                self.half_open_calls -= 1
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.consecutive = 0
+            if self.state == STATE_HALF_OPEN:
+                self.state = STATE_CLOSED
+                self.window.clear()
+                self.logger.info("✅ Circuito %s cerrado: dependencia recuperada", self.name)
+            self.window.append(False)
+
+    def record_failure(self, error: Any = None) -> None:
+        with self.lock:
+            self.failures += 1
+            self.consecutive += 1
+            self.last_error = str(error or '')[:200]
+            self.window.append(True)
+            if self.state == STATE_HALF_OPEN:
+                self._open("prueba fallida")
+            elif self.state == STATE_CLOSED:
+                if self.consecutive >= self.consecutive_threshold:
+                    self._open(f"{self.consecutive} fallos seguidos")
+                elif len(self.window) >= self.min_calls and self.failure_ratio() >= self.failure_rate:
+                    self._open(f"tasa de fallo {self.failure_ratio():.0%}")
+
+    def _open(self, reason: str) -> None:
+        """Bajo lock: abrir el circuito un periodo completo"""
+        self.state = STATE_OPEN
+        self.opened_at = self.time_fn()
+        self.opened_count += 1
+        self.logger.warning("🔌 Circuito %s abierto %.0fs (%s): %s", self.name, self.open_seconds, reason,
+                            self.last_error)
+
+    def failure_ratio(self) -> float:
+        return sum(self.window) / len(self.window) if self.window else 0.0
+
+    def get_state(self) -> str:
+        """Estado actual (open pasa a half_open al vencer aunque aún no haya llamadas)"""
+        with self.lock:
+            if self.state == STATE_OPEN and self.time_fn() - self.opened_at >= self.open_seconds:
+                return STATE_HALF_OPEN
+            return self.state
+
+    def get_stats(self) -> Dict[str, Any]:
+        state = self.get_state()
+        with self.lock:
+            return {
+                'state': state,
+                'calls': self.calls,
+                'failures': self.failures,
+                'skipped': self.skipped,
+                'opened': self.opened_count,
+                'failure_ratio': self.failure_ratio(),
+                'open_remaining_sec': (max(0.0, self.open_seconds - (self.time_fn() - self.opened_at))
+                                       if state == STATE_OPEN else 0.0),
+                'last_error': self.last_error
+            }
+
+# Instancias globales (una por dependencia)
+circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+def init_circuit_breakers(config) -> Dict[str, CircuitBreaker]:
+    """Circuitos de Sheets y Telegram (pausa PAUSE_AFTER_FAILURE_MIN) y del exchange (pausa corta)"""
+    circuit_breakers.clear()
+    common = {
+        'failure_rate_pct': config.CIRCUIT_FAILURE_RATE_PCT,
+        'window_size': config.CIRCUIT_WINDOW_SIZE,
+        'min_calls': config.CIRCUIT_MIN_CALLS
+    }
+    for name in ('sheets', 'telegram'):
+        circuit_breakers[name] = CircuitBreaker(name, consecutive_failures=config.MAX_RETRY_ATTEMPTS,
+                                                open_seconds=config.PAUSE_AFTER_FAILURE_MIN * 60, **common)
+    circuit_breakers['exchange'] = CircuitBreaker('exchange',
+                                                  consecutive_failures=config.CIRCUIT_EXCHANGE_FAILURES,
+                                                  open_seconds=config.CIRCUIT_EXCHANGE_OPEN_SEC, **common)
+    return circuit_breakers
+
+def get_circuit_breaker(name: str) -> Optional[CircuitBreaker]:
+    """Obtener circuito de una dependencia (None si no se inicializaron)"""
+    return circuit_breakers.get(name)
+
+def get_breaker_states() -> Dict[str, str]:
+    """Estado de cada circuito para telemetría"""
+    return {name: breaker.get_state() for name, breaker in circuit_breakers.items()}
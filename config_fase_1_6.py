@@ -51,7 +51,9 @@ class Fase16Config:
         # === FASE 1.6: RIESGO (V1 BLOQUEADA) ===
         self.POSITION_SIZING_MODE = os.getenv('POSITION_SIZING_MODE', 'percent_of_equity')
         self.POSITION_PERCENT = float(os.getenv('POSITION_PERCENT', '0.10'))  # 0.10% bloqueado
+        self.INITIAL_CAPITAL = float(os.getenv('INITIAL_CAPITAL', '50'))
         self.MIN_NOTIONAL_USD = float(os.getenv('MIN_NOTIONAL_USD', '5'))
+        self.EXCHANGE_INFO_TTL_HOURS = float(os.getenv('EXCHANGE_INFO_TTL_HOURS', '24'))
         self.DAILY_MAX_DRAWDOWN_PCT = float(os.getenv('DAILY_MAX_DRAWDOWN_PCT', '0.50'))  # 0.5% bloqueado
         self.WEEKLY_MAX_DRAWDOWN_PCT = float(os.getenv('WEEKLY_MAX_DRAWDOWN_PCT', '1.50'))
         self.MAX_CONSECUTIVE_LOSSES = int(os.getenv('MAX_CONSECUTIVE_LOSSES', '2'))
@@ -81,6 +83,7 @@ class Fase16Config:
         self.MAX_WS_LATENCY_MS = float(os.getenv('MAX_WS_LATENCY_MS', '1500'))  # 1500ms bloqueado
         self.MAX_REST_LATENCY_MS = float(os.getenv('MAX_REST_LATENCY_MS', '800'))  # 800ms bloqueado
         self.RETRY_ORDER = int(os.getenv('RETRY_ORDER', '2'))
+        self.ORDER_FILL_TIMEOUT_SEC = float(os.getenv('ORDER_FILL_TIMEOUT_SEC', '30'))
         
         # === FASE 1.6: KILL-SWITCH ===
         self.KILL_SWITCH_TRIGGERED = os.getenv('KILL_SWITCH_TRIGGERED', 'false').lower() == 'true'
@@ -96,6 +99,74 @@ class Fase16Config:
         self.MAX_RETRY_ATTEMPTS = int(os.getenv('MAX_RETRY_ATTEMPTS', '2'))
         self.PAUSE_AFTER_FAILURE_MIN = int(os.getenv('PAUSE_AFTER_FAILURE_MIN', '15'))
         
+        # === FASE 1.6: LOGGING ===
+        self.LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+        self.LOG_FILE = os.getenv('LOG_FILE', 'trading_bot.log')
+        self.LOG_FORMAT = os.getenv('LOG_FORMAT', 'text').lower()  # text | json
+        self.LOG_ROTATION = os.getenv('LOG_ROTATION', 'size').lower()  # size | time
+        self.LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+        self.LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', '5'))
+        self.LOG_ROTATION_WHEN = os.getenv('LOG_ROTATION_WHEN', 'midnight')
+        self.LOG_COMPRESS = os.getenv('LOG_COMPRESS', 'true').lower() == 'true'
+        self.LOG_RATE_LIMIT_BURST = int(os.getenv('LOG_RATE_LIMIT_BURST', '10'))
+        self.LOG_RATE_LIMIT_INTERVAL_SEC = float(os.getenv('LOG_RATE_LIMIT_INTERVAL_SEC', '60'))
+        self.LOG_SAMPLE_EVERY = int(os.getenv('LOG_SAMPLE_EVERY', '0'))
+        
+        # === FASE 1.6: VELAS MULTI-TIMEFRAME (serie base 1m) ===
+        self.BAR_RESAMPLER_ENABLED = os.getenv('BAR_RESAMPLER_ENABLED', 'true').lower() == 'true'
+        self.BAR_BASE_MINUTES = int(os.getenv('BAR_BASE_MINUTES', '2880'))  # 2 días de velas de 1m
+        
+        # === FASE 1.6: SELECTOR EN PROCESO APARTE ===
+        self.PAIR_SELECTOR_MODE = os.getenv('PAIR_SELECTOR_MODE', 'inline').lower()  # inline | process
+        self.PAIR_SELECTOR_POLL_SEC = float(os.getenv('PAIR_SELECTOR_POLL_SEC', '30'))
+        
+        # === FASE 1.6: MERCADO SINTÉTICO (simulación, soak y backtests) ===
+        self.SYNTHETIC_SEED = int(os.getenv('SYNTHETIC_SEED', '0'))
+        
+        # === FASE 1.6: PRESUPUESTO DE PESO REST (compartido por todos los clientes) ===
+        self.REQUEST_WEIGHT_LIMIT_1M = int(os.getenv('REQUEST_WEIGHT_LIMIT_1M', '6000'))
+        self.REQUEST_ORDER_LIMIT_10S = int(os.getenv('REQUEST_ORDER_LIMIT_10S', '50'))
+        self.REQUEST_MARKET_RESERVE_PCT = float(os.getenv('REQUEST_MARKET_RESERVE_PCT', '15'))  # peso libre que dejan las velas
+        self.REQUEST_SCAN_RESERVE_PCT = float(os.getenv('REQUEST_SCAN_RESERVE_PCT', '40'))  # peso libre que deja el selector
+        self.REQUEST_FEED_WEIGHT_PCT = float(os.getenv('REQUEST_FEED_WEIGHT_PCT', '30'))  # parte de la IP del feed-handler (con MARKET_BUS_NAME)
+        
+        # === FASE 1.6: HEDGING Y DEADLINE DE GET REST (datos de mercado) ===
+        self.REST_HEDGE_ENABLED = os.getenv('REST_HEDGE_ENABLED', 'true').lower() == 'true'
+        self.REST_HEDGE_MIN_MS = float(os.getenv('REST_HEDGE_MIN_MS', '50'))  # duplicado tras max(p95, mínimo)
+        self.REST_DEADLINE_MS = float(os.getenv('REST_DEADLINE_MS', str(self.MAX_REST_LATENCY_MS)))  # 0 = sin deadline
+        self.REST_SCAN_DEADLINE_MS = float(os.getenv('REST_SCAN_DEADLINE_MS', '10000'))  # cribado y backfills (sin hedge); 0 = sin deadline
+        
+        # === FASE 1.6: CIRCUIT BREAKERS (Sheets/Telegram con MAX_RETRY_ATTEMPTS y PAUSE_AFTER_FAILURE_MIN) ===
+        self.CIRCUIT_FAILURE_RATE_PCT = float(os.getenv('CIRCUIT_FAILURE_RATE_PCT', '50'))  # tasa de fallo que abre
+        self.CIRCUIT_WINDOW_SIZE = int(os.getenv('CIRCUIT_WINDOW_SIZE', '20'))  # últimas llamadas por dependencia
+        self.CIRCUIT_MIN_CALLS = int(os.getenv('CIRCUIT_MIN_CALLS', '10'))  # mínimo en ventana para usar la tasa
+        self.CIRCUIT_EXCHANGE_FAILURES = int(os.getenv('CIRCUIT_EXCHANGE_FAILURES', '5'))  # fallos seguidos
+        self.CIRCUIT_EXCHANGE_OPEN_SEC = float(os.getenv('CIRCUIT_EXCHANGE_OPEN_SEC', '30'))
+        
+        # === FASE 1.6: WATCHDOG DEL CICLO (deadline, bloqueos y reinicio controlado) ===
+        self.WATCHDOG_ENABLED = os.getenv('WATCHDOG_ENABLED', 'true').lower() == 'true'
+        self.CYCLE_BUDGET_SEC = float(os.getenv('CYCLE_BUDGET_SEC', '15'))  # duración objetivo del ciclo
+        self.CYCLE_STALL_SEC = float(os.getenv('CYCLE_STALL_SEC', '120'))  # ciclo abierto más tiempo = bloqueo (+ cota de sus esperas de órdenes)
+        self.WATCHDOG_RESTART_ON_STALL = os.getenv('WATCHDOG_RESTART_ON_STALL', 'false').lower() == 'true'
+        self.WATCHDOG_RESTART_GRACE_SEC = float(os.getenv('WATCHDOG_RESTART_GRACE_SEC', '60'))  # luego salida forzada
+        
+        # === FASE 1.6: TRAZA POR CICLO (Chrome trace-event para Perfetto / chrome://tracing) ===
+        self.TRACE_ENABLED = os.getenv('TRACE_ENABLED', 'false').lower() == 'true'
+        self.TRACE_FILE = os.getenv('TRACE_FILE', 'trading_data/cycle_trace.json')
+        self.TRACE_MAX_BYTES = int(os.getenv('TRACE_MAX_BYTES', str(50 * 1024 * 1024)))  # rota al superarlo
+        self.TRACE_BACKUP_COUNT = int(os.getenv('TRACE_BACKUP_COUNT', '3'))
+        self.TRACE_MIN_CYCLE_MS = float(os.getenv('TRACE_MIN_CYCLE_MS', '0'))  # solo ciclos más lentos (0 = todos)
+        
+        # === FASE 1.6: BUS DE MERCADO EN MEMORIA COMPARTIDA (feed-handler local) ===
+        self.MARKET_BUS_NAME = os.getenv('MARKET_BUS_NAME', '')  # vacío = sin bus (REST/simulado)
+        self.MARKET_BUS_MAX_BOOK_AGE_SEC = float(os.getenv('MARKET_BUS_MAX_BOOK_AGE_SEC', '5'))
+        
+        # === FASE 1.6: PROFILING BAJO DEMANDA (SIGUSR1/SIGUSR2) ===
+        self.PROFILE_MODE = os.getenv('PROFILE_MODE', 'sampling').lower()  # sampling | cprofile
+        self.PROFILE_DURATION_SEC = float(os.getenv('PROFILE_DURATION_SEC', '60'))
+        self.PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', '5'))
+        self.PROFILE_TOP_N = int(os.getenv('PROFILE_TOP_N', '25'))
+        
         # === FASE 1.6: VALIDACIONES ===
         self.DAILY_REPORT_ENABLED = os.getenv('DAILY_REPORT_ENABLED', 'true').lower() == 'true'
         self.READY_TO_SCALE_THRESHOLD_PF = float(os.getenv('READY_TO_SCALE_THRESHOLD_PF', '1.5'))
@@ -213,6 +284,10 @@ class Fase16Config:
                 if self.REBALANCE_MINUTES <= 0:
                     print(f"❌ REBALANCE_MINUTES debe ser > 0")
                     return False
+                
+                if self.PAIR_SELECTOR_MODE not in ('inline', 'process'):
+                    print(f"❌ PAIR_SELECTOR_MODE debe ser 'inline' o 'process'")
+                    return False
             
             print("✅ Configuración FASE 1.6 + AUTO PAIR SELECTOR válida")
             print(f"📊 TP mínimo: {self.TP_MIN_BPS} bps")
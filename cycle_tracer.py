@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+🧵 CYCLE TRACER - FASE 1.6
+Traza por ciclo en formato Chrome trace-event (JSON), para abrir un ciclo lento
+concreto en Perfetto (ui.perfetto.dev) o chrome://tracing en lugar de mirar solo
+tiempos agregados.
+
+- Spans anidados por run_trading_cycle: etapas del ciclo (mark), cada filtro del
+  pipeline de entrada, loaders (datos de mercado, targets), sizing, orden, cada
+  escritura a sinks y cada envío a Telegram, con atributos symbol/outcome
+- Un evento 'X' (complete) por span; el fichero se escribe por ciclo en formato
+  JSON array sin ']' final (válido para Perfetto/Chrome) y rota por tamaño
+- Desactivado (TRACE_ENABLED=false) cada llamada sale en la primera comprobación
+  y los spans son un único objeto nulo compartido: sin asignaciones por ciclo
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Callable
+
+from cycle_watchdog import CycleWatchdog, get_cycle_watchdog, cycle_stage as watchdog_stage
+
+class NullSpan:
+    """Span vacío del camino desactivado (una sola instancia compartida)"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> 'NullSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+    def set(self, **attrs) -> None:
+        pass
+
+NULL_SPAN = NullSpan()
+
+class WatchdogSpan(NullSpan):
+    """Subetapa solo para el watchdog (traza desactivada): etiqueta sin generador y span vacío"""
+
+    __slots__ = ('watchdog', 'name')
+
+    def __init__(self, watchdog: CycleWatchdog, name: str):
+        self.watchdog = watchdog
+        self.name = name
+
+    def __enter__(self) -> 'WatchdogSpan':
+        self.watchdog.push_stage(self.name)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.watchdog.pop_stage()
+        return False
+
+class Span:
+    """Span abierto de la traza; al cerrarse se convierte en un evento 'X'"""
+
+    __slots__ = ('tracer', 'name', 'cat', 'args', 'start')
+
+    def __init__(self, tracer: 'CycleTracer', name: str, cat: str, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self) -> 'Span':
+        self.start = self.tracer.clock()
+        self.tracer.stack.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        tracer = self.tracer
+        if tracer.stack and tracer.stack[-1] is self:
+            tracer.stack.pop()
+        if exc_type is not None:
+            self.args.setdefault('outcome', 'error')
+            self.args['error'] = f"{exc_type.__name__}: {exc}"
+        tracer.add_span(self.name, self.start, tracer.clock() - self.start, self.cat, **self.args)
+        return False
+
+    def set(self, **attrs) -> None:
+        self.args.update(attrs)
+
+class CycleTracer:
+    """Spans anidados por ciclo volcados a un fichero Chrome trace-event con rotación"""
+
+    def __init__(self, enabled: bool = False, path: str = 'trading_data/cycle_trace.json',
+                 max_bytes: int = 50 * 1024 * 1024, backup_count: int = 3, min_cycle_ms: float = 0.0,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.logger = logging.getLogger(__name__)
+        self.enabled = enabled
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.min_cycle_ms = min_cycle_ms
+        self.clock = clock
+        self.wall_offset = time.time() - clock()  # ts en µs de época: trazas de reinicios alineadas
+        self.pid = os.getpid()
+        self.tid = threading.get_native_id()
+
+        self.events: List[Dict[str, Any]] = []
+        self.stack: List[Span] = []
+        self.cycle_span: Optional[Span] = None
+        self.stage_span: Optional[Span] = None
+        self.file = None
+
+        self.cycles_written = 0
+        self.cycles_skipped = 0
+        self.events_written = 0
+        self.rotations = 0
+
+    # === SPANS ===
+
+    def span(self, name: str, cat: str = 'stage', **attrs) -> Any:
+        """Span anidado bajo el span abierto actual (NULL_SPAN si está desactivado o fuera de ciclo)"""
+        if not self.enabled or self.cycle_span is None:
+            return NULL_SPAN
+        return Span(self, name, cat, attrs)
+
+    def add_span(self, name: str, start: float, duration: float, cat: str = 'stage', **attrs) -> None:
+        """Span ya medido (start/duration con el mismo reloj que el tracer, p. ej. filtros del pipeline)"""
+        if not self.enabled or self.cycle_span is None:
+            return
+        self.events.append({
+            'name': name,
+            'cat': cat,
+            'ph': 'X',
+            'ts': round((start + self.wall_offset) * 1e6, 1),
+            'dur': round(duration * 1e6, 1),
+            'pid': self.pid,
+            'tid': self.tid,
+            'args': attrs
+        })
+
+    def set(self, **attrs) -> None:
+        """Atributos del span abierto más interno (p. ej. symbol/outcome de la etapa)"""
+        if self.enabled and self.stack:
+            self.stack[-1].args.update(attrs)
+
+    def wrap_loader(self, name: str, loader: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        """Loader de FilterContext con span por símbolo (solo se instala con el tracer activo)"""
+        def traced(ctx):
+            with self.span(name, cat='loader', symbol=ctx.symbol):
+                return loader(ctx)
+        return traced
+
+    # === CICLO ===
+
+    def begin_cycle(self, cycle_id: Any = None) -> None:
+        if not self.enabled:
+            return
+        self.events = []
+        self.stack = []
+        self.stage_span = None
+        self.cycle_span = Span(self, 'cycle', 'cycle', {'cycle': cycle_id})
+        self.cycle_span.__enter__()
+
+    def mark(self, stage: str) -> None:
+        """Cerrar la etapa anterior del ciclo y abrir otra (mismo corte que el watchdog)"""
+        if not self.enabled or self.cycle_span is None:
+            return
+        self._close_stage()
+        self.stage_span = Span(self, stage, 'stage', {})
+        self.stage_span.__enter__()
+
+    def _close_stage(self) -> None:
+        if self.stage_span is not None:
+            while self.stack and self.stack[-1] is not self.stage_span:
+                self.stack.pop()  # subspans sin cerrar (no debería ocurrir)
+            self.stage_span.__exit__(None, None, None)
+            self.stage_span = None
+
+    def end_cycle(self, **attrs) -> Optional[float]:
+        """Cerrar el ciclo y escribir sus eventos; devuelve la duración en ms"""
+        if not self.enabled or self.cycle_span is None:
+            return None
+        self._close_stage()
+        cycle = self.cycle_span
+        cycle.set(**attrs)
+        self.stack = [cycle]
+        cycle.__exit__(None, None, None)
+        self.cycle_span = None
+        duration_ms = self.events[-1]['dur'] / 1000
+        if duration_ms >= self.min_cycle_ms:
+            self._write(self.events)
+        else:
+            self.cycles_skipped += 1
+        self.events = []
+        return duration_ms
+
+    # === FICHERO ===
+
+    def _open(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fresh = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self.file = open(self.path, 'a', encoding='utf-8')
+        if fresh:
+            self.file.write('[\n')
+            for meta in ({'name': 'process_name', 'ph': 'M', 'pid': self.pid, 'args': {'name': 'trading-bot'}},
+                         {'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': self.tid,
+                          'args': {'name': 'run_trading_cycle'}}):
+                self.file.write(json.dumps(meta) + ',\n')
+
+    def _rotate(self) -> None:
+        self.file.close()
+        self.file = None
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.rotations += 1
+
+    def _write(self, events: List[Dict[str, Any]]) -> None:
+        try:
+            if self.file is not None and self.file.tell() >= self.max_bytes:
+                self._rotate()
+            if self.file is None:
+                self._open()
+            # El span del ciclo (último en cerrarse) primero: el visor lo anida mejor
+            ordered = sorted(events, key=lambda event: (event['ts'], -event['dur']))
+            self.file.write(''.join(json.dumps(event, default=str) + ',\n' for event in ordered))
+            self.file.flush()
+            self.cycles_written += 1
+            self.events_written += len(events)
+        except Exception as e:
+            self.logger.error(f"❌ Error escribiendo traza del ciclo: {e}")
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'path': self.path,
+            'cycles_written': self.cycles_written,
+            'cycles_skipped': self.cycles_skipped,
+            'events_written': self.events_written,
+            'rotations': self.rotations
+        }
+
+def read_trace_events(path: str) -> List[Dict[str, Any]]:
+    """Eventos de un fichero de traza (completa el ']' que falta al formato en streaming)"""
+    with open(path, encoding='utf-8') as f:
+        text = f.read().rstrip().rstrip(',')
+    if not text.endswith(']'):
+        text += ']'
+    return json.loads(text)
+
+# Instancia global
+cycle_tracer = None
+
+def init_cycle_tracer(config) -> CycleTracer:
+    """Inicializar el tracer de ciclos a partir de la configuración"""
+    global cycle_tracer
+    cycle_tracer = CycleTracer(
+        enabled=config.TRACE_ENABLED,
+        path=config.TRACE_FILE,
+        max_bytes=config.TRACE_MAX_BYTES,
+        backup_count=config.TRACE_BACKUP_COUNT,
+        min_cycle_ms=config.TRACE_MIN_CYCLE_MS
+    )
+    return cycle_tracer
+
+def get_cycle_tracer() -> Optional[CycleTracer]:
+    """Obtener tracer de ciclos"""
+    return cycle_tracer
+
+def trace_span(name: str, **attrs) -> Any:
+    """Span del ciclo en curso en el tracer global (NULL_SPAN si no hay o está desactivado)"""
+    tracer = cycle_tracer
+    if tracer is None or not tracer.enabled:
+        return NULL_SPAN
+    return tracer.span(name, **attrs)
+
+def cycle_stage(name: str, **attrs) -> Any:
+    """
+    Subetapa del ciclo: etiqueta para el watchdog y span para el tracer (symbol/outcome).
+    Sin traza solo se etiqueta si el vigilante está en marcha; sin ninguno de los dos
+    devuelve NULL_SPAN (ni generadores ni objetos por llamada en el camino caliente).
+    """
+    tracer = cycle_tracer
+    if tracer is not None and tracer.enabled:
+        return _traced_stage(name, attrs)
+    watchdog = get_cycle_watchdog()
+    if watchdog is None or not watchdog.is_running():
+        return NULL_SPAN
+    return WatchdogSpan(watchdog, name)
+
+@contextmanager
+def _traced_stage(name: str, attrs: Dict[str, Any]):
+    with watchdog_stage(name), trace_span(name, **attrs) as span:
+        yield span
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+⏱️ CYCLE WATCHDOG - FASE 1.6
+Hilo vigilante del ciclo de trading: si una llamada síncrona (gspread, requests,
+exchange) se cuelga dentro de run_trading_cycle, el bucle se para en silencio y
+sleep_responsive nunca llega a ejecutarse.
+
+- Latido por ciclo (begin_cycle/end_cycle) con marcas de etapa (mark) y subetapas
+  anidadas (cycle_stage('sheets')) para saber dónde se fue el tiempo
+- Ciclo más largo que el presupuesto (CYCLE_BUDGET_SEC) → overrun registrado con
+  la etapa que más tardó
+- Ciclo abierto más de CYCLE_STALL_SEC → bloqueo: pilas de todos los hilos a
+  trading_data/watchdog_stalls.log con la etapa en curso. Las esperas acotadas del
+  ciclo (fill de órdenes, bounded_wait) suman su máximo al umbral de ese ciclo
+- Opcional (WATCHDOG_RESTART_ON_STALL): apagado limpio y, si el ciclo sigue colgado
+  tras WATCHDOG_RESTART_GRACE_SEC, salida forzada con código 75 para que el
+  supervisor (Render o run_sharded) reinicie el proceso
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable
+
+WATCHDOG_RESTART_EXIT_CODE = 75  # EX_TEMPFAIL: reinicio pedido por el watchdog
+DURATION_WINDOW = 200            # ciclos para el p95 de duración
+OVERRUN_HISTORY = 50
+
+class CycleWatchdog:
+    """Latido y deadline por ciclo con detección de bloqueos desde un hilo aparte"""
+
+    def __init__(self, budget_sec: float = 15.0, stall_sec: float = 120.0, restart_on_stall: bool = False,
+                 restart_grace_sec: float = 60.0, check_interval_sec: float = 1.0,
+                 output_dir: str = 'trading_data', on_restart: Callable[[], None] = None,
+                 exit_fn: Callable[[int], None] = os._exit, time_fn: Callable[[], float] = time.perf_counter):
+        self.logger = logging.getLogger(__name__)
+        self.budget_sec = budget_sec
+        self.stall_sec = stall_sec
+        self.restart_on_stall = restart_on_stall
+        self.restart_grace_sec = restart_grace_sec
+        self.check_interval_sec = check_interval_sec
+        self.output_dir = output_dir
+        self.on_restart = on_restart
+        self.exit_fn = exit_fn
+        self.time_fn = time_fn
+
+        # Ciclo en curso (escrito por el hilo del bot, leído por el vigilante)
+        self.cycle_id = None
+        self.cycle_started = None
+        self.stage_name = None
+        self.stage_started = 0.0
+        self.substages = []
+        self.stage_times: Dict[str, float] = {}
+        self.stall_allowance_sec = 0.0  # esperas acotadas del ciclo en curso
+        self.stall_reported = False
+
+        self.cycles = 0
+        self.last_duration_sec = 0.0
+        self.durations = deque(maxlen=DURATION_WINDOW)
+        self.overruns = 0
+        self.overruns_by_stage: Dict[str, int] = {}
+        self.recent_overruns = deque(maxlen=OVERRUN_HISTORY)
+        self.stalls = 0
+        self.stalls_by_stage: Dict[str, int] = {}
+        self.last_stall_file = None
+        self.restart_requested = False
+        self.restart_deadline = None
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    # === LATIDO (hilo del bot) ===
+
+    def begin_cycle(self, cycle_id: Any = None) -> None:
+        now = self.time_fn()
+        self.stage_times = {}
+        self.substages = []
+        self.stage_name = None
+        self.stall_allowance_sec = 0.0
+        self.stall_reported = False
+        self.cycle_id = cycle_id
+        self.cycle_started = now
+
+    def mark(self, stage: str) -> None:
+        """Cerrar la etapa anterior del ciclo y empezar otra"""
+        now = self.time_fn()
+        if self.stage_name is not None:
+            self.stage_times[self.stage_name] = self.stage_times.get(self.stage_name, 0.0) + now - self.stage_started
+        self.stage_name = stage
+        self.stage_started = now
+        self.substages = []
+
+    @contextmanager
+    def stage(self, name: str):
+        """Subetapa anidada dentro de la etapa actual (solo etiqueta para bloqueos)"""
+        self.push_stage(name)
+        try:
+            yield
+        finally:
+            self.pop_stage()
+
+    def push_stage(self, name: str) -> None:
+        self.substages.append(name)
+
+    def pop_stage(self) -> None:
+        self.substages.pop()
+
+    @contextmanager
+    def bounded_wait(self, name: str, max_sec: float):
+        """Espera legítima con máximo conocido: amplía el umbral de bloqueo del ciclo en max_sec"""
+        self.stall_allowance_sec += max(0.0, max_sec)
+        with self.stage(name):
+            yield
+
+    def current_stage(self) -> str:
+        if self.stage_name is None:
+            return 'start'
+        return '/'.join([self.stage_name] + self.substages)
+
+    def end_cycle(self) -> float:
+        """Cerrar el ciclo: duración frente al presupuesto y overrun con su etapa"""
+        if self.cycle_started is None:
+            return 0.0
+        self.mark(None)
+        duration = self.time_fn() - self.cycle_started
+        self.cycle_started = None
+        self.cycles += 1
+        self.last_duration_sec = duration
+        self.durations.append(duration)
+        if duration > self.budget_sec:
+            stage, stage_sec = max(self.stage_times.items(), key=lambda item: item[1], default=('start', duration))
+            self.overruns += 1
+            self.overruns_by_stage[stage] = self.overruns_by_stage.get(stage, 0) + 1
+            self.recent_overruns.append({
+                'cycle': self.cycle_id,
+                'duration_sec': duration,
+                'stage': stage,
+                'stage_sec': stage_sec,
+                'timestamp': datetime.now().isoformat()
+            })
+            self.logger.warning("⏱️ Ciclo %s: %.2fs > presupuesto %.1fs (etapa %s: %.2fs)",
+                                self.cycle_id, duration, self.budget_sec, stage, stage_sec)
+        return duration
+
+    # === VIGILANCIA (hilo del watchdog) ===
+
+    def check(self) -> bool:
+        """Detectar un ciclo colgado; devuelve True si está bloqueado ahora"""
+        now = self.time_fn()
+        if self.restart_deadline is not None and now >= self.restart_deadline:
+            self.logger.critical("🛑 Watchdog: apagado limpio no completado en %.0fs, salida forzada (%d)",
+                                 self.restart_grace_sec, WATCHDOG_RESTART_EXIT_CODE)
+            self.restart_deadline = None
+            self.exit_fn(WATCHDOG_RESTART_EXIT_CODE)
+            return True
+
+        started = self.cycle_started
+        if started is None or now - started < self.stall_sec + self.stall_allowance_sec:
+            return False
+        if not self.stall_reported:
+            self.stall_reported = True
+            self._report_stall(now - started)
+        return True
+
+    def _report_stall(self, elapsed: float) -> None:
+        stage = self.current_stage()
+        self.stalls += 1
+        self.stalls_by_stage[stage] = self.stalls_by_stage.get(stage, 0) + 1
+        self.last_stall_file = self.dump_stacks(f"ciclo {self.cycle_id} bloqueado {elapsed:.0f}s en {stage}")
+        self.logger.error("🧊 Ciclo %s bloqueado %.0fs en etapa %s (pilas en %s)",
+                          self.cycle_id, elapsed, stage, self.last_stall_file)
+        if self.restart_on_stall and not self.restart_requested:
+            self.restart_requested = True
+            self.restart_deadline = self.time_fn() + self.restart_grace_sec
+            self.logger.error("🔁 Watchdog: reinicio controlado (apagado limpio, %.0fs de gracia)",
+                              self.restart_grace_sec)
+            if self.on_restart:
+                self.on_restart()
+
+    def dump_stacks(self, reason: str) -> Optional[str]:
+        """Pilas de todos los hilos (sys._current_frames) añadidas al log de bloqueos"""
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            path = os.path.join(self.output_dir, 'watchdog_stalls.log')
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            lines = [f"=== {datetime.now().isoformat()} - {reason} ===\n"]
+            for ident, frame in sys._current_frames().items():
+                lines.append(f"--- Hilo {names.get(ident, '?')} ({ident}) ---\n")
+                lines.extend(traceback.format_stack(frame))
+            with open(path, 'a') as f:
+                f.writelines(lines)
+                f.write('\n')
+            return path
+        except Exception as e:
+            self.logger.error(f"❌ Error volcando pilas del watchdog: {e}")
+            return None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.check_interval_sec):
+            try:
+                self.check()
+            except Exception as e:
+                self.logger.error(f"❌ Error en watchdog de ciclo: {e}")
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='cycle-watchdog', daemon=True)
+        self._thread.start()
+        self.logger.info("⏱️ Watchdog de ciclo: presupuesto %.0fs, bloqueo a %.0fs, reinicio %s",
+                         self.budget_sec, self.stall_sec, 'sí' if self.restart_on_stall else 'no')
+
+    def is_running(self) -> bool:
+        """Hilo vigilante activo (sin él las etiquetas de subetapa no las lee nadie)"""
+        return self._thread is not None
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.check_interval_sec + 1)
+            self._thread = None
+
+    # === MÉTRICAS ===
+
+    def duration_percentile(self, pct: float = 95.0) -> float:
+        if not self.durations:
+            return 0.0
+        ordered = sorted(self.durations)
+        return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+    def budget_usage_pct(self) -> float:
+        """p95 de duración del ciclo como % del presupuesto"""
+        return self.duration_percentile() / self.budget_sec * 100 if self.budget_sec > 0 else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        started = self.cycle_started
+        return {
+            'cycles': self.cycles,
+            'budget_sec': self.budget_sec,
+            'last_duration_sec': self.last_duration_sec,
+            'p95_duration_sec': self.duration_percentile(),
+            'budget_usage_pct': self.budget_usage_pct(),
+            'overruns': self.overruns,
+            'overruns_by_stage': dict(self.overruns_by_stage),
+            'stalls': self.stalls,
+            'stalls_by_stage': dict(self.stalls_by_stage),
+            'current_stage': self.current_stage() if started is not None else None,
+            'cycle_elapsed_sec': self.time_fn() - started if started is not None else 0.0,
+            'stall_allowance_sec': self.stall_allowance_sec if started is not None else 0.0,
+            'restart_requested': self.restart_requested
+        }
+
+# Instancia global
+cycle_watchdog = None
+
+def init_cycle_watchdog(config, on_restart: Callable[[], None] = None,
+                        exit_fn: Callable[[int], None] = os._exit) -> CycleWatchdog:
+    """Inicializar el watchdog del ciclo a partir de la configuración"""
+    global cycle_watchdog
+    cycle_watchdog = CycleWatchdog(
+        budget_sec=config.CYCLE_BUDGET_SEC,
+        stall_sec=config.CYCLE_STALL_SEC,
+        restart_on_stall=config.WATCHDOG_RESTART_ON_STALL,
+        restart_grace_sec=config.WATCHDOG_RESTART_GRACE_SEC,
+        on_restart=on_restart,
+        exit_fn=exit_fn
+    )
+    return cycle_watchdog
+
+def get_cycle_watchdog() -> Optional[CycleWatchdog]:
+    """Obtener watchdog del ciclo"""
+    return cycle_watchdog
+
+@contextmanager
+def cycle_stage(name: str):
+    """Subetapa del ciclo en curso (Sheets, Telegram...); sin watchdog no hace nada"""
+    watchdog = cycle_watchdog
+    if watchdog is None:
+        yield
+        return
+    with watchdog.stage(name):
+        yield
+
+@contextmanager
+def bounded_wait(name: str, max_sec: float):
+    """Espera acotada del ciclo en curso (fill de una orden); sin watchdog no hace nada"""
+    watchdog = cycle_watchdog
+    if watchdog is None:
+        yield
+        return
+    with watchdog.bounded_wait(name, max_sec):
+        yield
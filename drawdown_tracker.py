@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+📉 DRAWDOWN TRACKER - FASE 1.6
+Curva de equity con pico/valle por horizonte (día, semana, sesión y ventanas móviles).
+Cada horizonte mantiene dos deques monótonos (máximos y mínimos): actualizar y consultar
+cuestan O(1) amortizado sin importar cuántos trades haya. Los horizontes de calendario
+se reinician en los límites de día/semana de TIMEZONE.
+"""
+
+import time
+import logging
+from collections import deque
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+try:
+    from zoneinfo import ZoneInfo
+    ZONEINFO_AVAILABLE = True
+except ImportError:
+    ZONEINFO_AVAILABLE = False
+
+# Horizontes por defecto: nombre → (anclaje de calendario, duración móvil en segundos)
+DEFAULT_HORIZONS = {
+    'daily': ('day', None),
+    'weekly': ('week', None),
+    'session': (None, None)
+}
+
+def resolve_timezone(name: str):
+    """Zona horaria IANA; UTC si zoneinfo/tzdata no están disponibles"""
+    if ZONEINFO_AVAILABLE:
+        try:
+            return ZoneInfo(name)
+        except Exception:
+            logging.getLogger(__name__).warning("⚠️ Zona horaria %s no disponible, usando UTC", name)
+    return dt_timezone.utc
+
+def period_bounds(ts: float, anchor: str, tz) -> Tuple[float, float]:
+    """Inicio y fin (epoch) del día o semana (lunes) que contiene ts en la zona tz"""
+    local = datetime.fromtimestamp(ts, tz)
+    start_date = local.date()
+    if anchor == 'week':
+        start_date -= timedelta(days=local.weekday())
+    end_date = start_date + timedelta(days=7 if anchor == 'week' else 1)
+    # Medianoche local construida desde la fecha: respeta los cambios de horario (DST)
+    start = datetime(start_date.year, start_date.month, start_date.day, tzinfo=tz).timestamp()
+    end = datetime(end_date.year, end_date.month, end_date.day, tzinfo=tz).timestamp()
+    return start, end
+
+class HorizonWindow:
+    """Pico y valle de la equity dentro de un horizonte mediante deques monótonos"""
+
+    __slots__ = ('name', 'anchor', 'duration', 'maxq', 'minq', 'period_start', 'period_end',
+                 'open_equity', 'max_drawdown')
+
+    def __init__(self, name: str, anchor: Optional[str] = None, duration: Optional[float] = None):
+        self.name = name
+        self.anchor = anchor
+        self.duration = duration
+        self.maxq: deque = deque()  # (ts, equity) con equity decreciente
+        self.minq: deque = deque()  # (ts, equity) con equity creciente
+        self.period_start = None
+        self.period_end = float('inf')
+        self.open_equity = None
+        self.max_drawdown = 0.0
+
+    def reset(self, ts: float, equity: float, tz) -> None:
+        self.maxq.clear()
+        self.minq.clear()
+        if self.anchor:
+            self.period_start, self.period_end = period_bounds(ts, self.anchor, tz)
+        else:
+            self.period_start, self.period_end = ts, float('inf')
+        self.open_equity = equity
+        self.max_drawdown = 0.0
+
+    def push(self, ts: float, equity: float) -> None:
+        maxq, minq = self.maxq, self.minq
+        if self.duration is None:
+            # Sin expiración solo importa el extremo: deques de un elemento
+            if not maxq or equity >= maxq[0][1]:
+                maxq.clear()
+                maxq.append((ts, equity))
+            if not minq or equity <= minq[0][1]:
+                minq.clear()
+                minq.append((ts, equity))
+            self.max_drawdown = max(self.max_drawdown, self.drawdown(equity))
+            return
+
+        while maxq and maxq[-1][1] <= equity:
+            maxq.pop()
+        maxq.append((ts, equity))
+        while minq and minq[-1][1] >= equity:
+            minq.pop()
+        minq.append((ts, equity))
+
+        if self.duration is not None:
+            cutoff = ts - self.duration
+            while maxq[0][0] < cutoff:
+                maxq.popleft()
+            while minq[0][0] < cutoff:
+                minq.popleft()
+
+        self.max_drawdown = max(self.max_drawdown, self.drawdown(equity))
+
+    @property
+    def peak(self) -> float:
+        return self.maxq[0][1]
+
+    @property
+    def trough(self) -> float:
+        return self.minq[0][1]
+
+    def drawdown(self, equity: float) -> float:
+        """Caída desde el pico del horizonte, en %"""
+        peak = self.maxq[0][1]
+        return (peak - equity) / peak * 100 if peak > 0 else 0.0
+
+class DrawdownTracker:
+    """Tracker de drawdown multi-horizonte alineado a calendario"""
+
+    def __init__(self, initial_equity: float, timezone: str = 'Europe/Madrid',
+                 horizons: Dict[str, Tuple[Optional[str], Optional[float]]] = None,
+                 time_fn: Callable[[], float] = time.time):
+        self.logger = logging.getLogger(__name__)
+        self.tz = resolve_timezone(timezone)
+        self.time_fn = time_fn
+        self.windows: Dict[str, HorizonWindow] = {
+            name: HorizonWindow(name, anchor, duration)
+            for name, (anchor, duration) in (horizons or DEFAULT_HORIZONS).items()
+        }
+        self.equity = initial_equity
+        self.last_ts = None
+        self.updates = 0
+        self.reset(initial_equity)
+
+    def reset(self, equity: float) -> None:
+        """Reiniciar todos los horizontes (nueva sesión o capital real recién cargado)"""
+        now = self.time_fn()
+        self.equity = equity
+        self.last_ts = now
+        for window in self.windows.values():
+            window.reset(now, equity, self.tz)
+            window.push(now, equity)
+
+    def update(self, equity: float) -> List[str]:
+        """Registrar equity actual; devuelve los horizontes de calendario que han cambiado de periodo"""
+        now = self.time_fn()
+        rolled = []
+        for window in self.windows.values():
+            if now >= window.period_end:
+                window.reset(now, equity, self.tz)
+                rolled.append(window.name)
+            window.push(now, equity)
+        self.equity = equity
+        self.last_ts = now
+        self.updates += 1
+        if rolled:
+            self.logger.info("📉 Nuevo periodo %s: equity de apertura $%.2f", ', '.join(rolled), equity)
+        return rolled
+
+    def drawdown(self, horizon: str) -> float:
+        """Drawdown actual desde el pico del horizonte, en %"""
+        return self.windows[horizon].drawdown(self.equity)
+
+    def loss_from_open(self, horizon: str) -> float:
+        """Pérdida desde la equity de apertura del periodo, en %"""
+        window = self.windows[horizon]
+        if not window.open_equity:
+            return 0.0
+        return (window.open_equity - self.equity) / window.open_equity * 100
+
+    def open_equity(self, horizon: str) -> float:
+        return self.windows[horizon].open_equity
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        """Pico, valle y drawdown por horizonte para telemetría"""
+        return {
+            name: {
+                'peak': window.peak,
+                'trough': window.trough,
+                'open': window.open_equity,
+                'drawdown_pct': window.drawdown(self.equity),
+                'max_drawdown_pct': window.max_drawdown,
+                'period_start': window.period_start
+            } for name, window in self.windows.items()
+        }
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+🧮 FILTER PIPELINE - FASE 1.6
+Pipeline declarativo de filtros de entrada con cortocircuito.
+Cada etapa mide su coste (EWMA) y su tasa de rechazo; el orden se ajusta por
+coste / P(rechazo), de modo que las etapas baratas y selectivas van primero.
+La evaluación por lotes recorre etapa por etapa solo los pares que siguen vivos,
+y los datos caros se cargan de forma perezosa únicamente para esos pares.
+"""
+
+import time
+import logging
+from typing import Dict, List, Any, Optional, Callable
+
+class FilterContext:
+    """Datos de un candidato (un par) con carga perezosa de valores caros"""
+
+    __slots__ = ('symbol', 'values', 'loaders', 'shared', 'details', 'warnings', 'message')
+
+    def __init__(self, symbol: Optional[str], values: Dict[str, Any] = None,
+                 loaders: Dict[str, Callable[['FilterContext'], Any]] = None, shared: Dict[str, Any] = None):
+        self.symbol = symbol
+        self.values = values if values is not None else {}
+        self.loaders = loaders or {}
+        self.shared = shared if shared is not None else {}
+        self.details: Dict[str, Any] = {}
+        self.warnings: List[str] = []
+        self.message = None
+
+    def get(self, name: str) -> Any:
+        """Valor del contexto; si no existe se calcula con su loader (una sola vez)"""
+        if name not in self.values:
+            self.values[name] = self.loaders[name](self)
+        return self.values[name]
+
+    def has(self, name: str) -> bool:
+        return name in self.values
+
+class FilterStage:
+    """Etapa del pipeline: check(ctx) devuelve None si pasa o el código de rechazo"""
+
+    __slots__ = ('name', 'check', 'group', 'ewma_cost', 'ewma_reject', 'evaluations', 'rejections')
+
+    def __init__(self, name: str, check: Callable[[FilterContext], Optional[str]], group: str = None,
+                 cost_hint: float = 1e-5, reject_hint: float = 0.5):
+        self.name = name
+        self.check = check
+        self.group = group or name
+        self.ewma_cost = cost_hint
+        self.ewma_reject = reject_hint
+        self.evaluations = 0
+        self.rejections = 0
+
+class FilterPipeline:
+    """Pipeline con cortocircuito y reordenación adaptativa por coste/selectividad"""
+
+    def __init__(self, stages: List[FilterStage], name: str = 'pipeline', adaptive: bool = True,
+                 alpha: float = 0.05, reorder_every: int = 32, min_reject_rate: float = 0.01,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.stages = list(stages)
+        self.adaptive = adaptive
+        self.alpha = alpha
+        self.reorder_every = reorder_every
+        self.min_reject_rate = min_reject_rate
+        self.clock = clock
+
+        self.evaluations = 0
+        self.reorders = 0
+        self.tracer = None  # CycleTracer activo: un span por etapa y candidato
+
+    def _run_stage(self, stage: FilterStage, ctx: FilterContext) -> Optional[str]:
+        """Ejecutar etapa midiendo coste y actualizando su tasa de rechazo"""
+        start = self.clock()
+        try:
+            reason = stage.check(ctx)
+        except Exception as e:
+            self.logger.error("❌ Error en etapa %s (%s): %s", stage.name, ctx.symbol, e)
+            reason = 'STAGE_ERROR'
+        elapsed = self.clock() - start
+        if self.tracer is not None:
+            self.tracer.add_span(stage.name, start, elapsed, 'filter', symbol=ctx.symbol, outcome=reason or 'pass')
+
+        alpha = self.alpha
+        stage.ewma_cost += alpha * (elapsed - stage.ewma_cost)
+        stage.ewma_reject += alpha * ((1.0 if reason else 0.0) - stage.ewma_reject)
+        stage.evaluations += 1
+        if reason:
+            stage.rejections += 1
+        return reason
+
+    def _result(self, stage: Optional[FilterStage], reason: Optional[str], ctx: FilterContext) -> Dict[str, Any]:
+        if stage is None:
+            return {'passed': True, 'stage': None, 'group': None, 'reason': 'OK', 'message': None}
+        self.logger.debug("🧮 %s: %s rechazado en %s (%s)", self.name, ctx.symbol, stage.name, reason)
+        return {'passed': False, 'stage': stage.name, 'group': stage.group, 'reason': reason,
+                'message': ctx.message or reason}
+
+    def evaluate(self, ctx: FilterContext) -> Dict[str, Any]:
+        """Evaluar un candidato; se detiene en el primer rechazo"""
+        result = self._result(None, None, ctx)
+        for stage in self.stages:
+            reason = self._run_stage(stage, ctx)
+            if reason:
+                result = self._result(stage, reason, ctx)
+                break
+        self._after_evaluations(1)
+        return result
+
+    def evaluate_batch(self, contexts: Dict[str, FilterContext]) -> Dict[str, Dict[str, Any]]:
+        """Evaluar varios candidatos etapa por etapa: cada etapa solo ve a los supervivientes"""
+        results: Dict[str, Dict[str, Any]] = {}
+        survivors = list(contexts.items())
+        for stage in self.stages:
+            if not survivors:
+                break
+            still_alive = []
+            for key, ctx in survivors:
+                reason = self._run_stage(stage, ctx)
+                if reason:
+                    results[key] = self._result(stage, reason, ctx)
+                else:
+                    still_alive.append((key, ctx))
+            survivors = still_alive
+        for key, ctx in survivors:
+            results[key] = self._result(None, None, ctx)
+        self._after_evaluations(len(contexts))
+        return results
+
+    def _after_evaluations(self, count: int) -> None:
+        previous = self.evaluations
+        self.evaluations += count
+        if self.adaptive and previous // self.reorder_every != self.evaluations // self.reorder_every:
+            self.reorder()
+
+    def stage_rank(self, stage: FilterStage) -> float:
+        """Coste esperado por rechazo: menor = antes en el pipeline"""
+        return stage.ewma_cost / max(stage.ewma_reject, self.min_reject_rate)
+
+    def reorder(self) -> None:
+        """Reordenar etapas por coste / P(rechazo)"""
+        previous = [stage.name for stage in self.stages]
+        self.stages.sort(key=self.stage_rank)
+        if [stage.name for stage in self.stages] != previous:
+            self.reorders += 1
+            self.logger.debug("🧮 %s reordenado: %s", self.name, ' → '.join(stage.name for stage in self.stages))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estado de las etapas para telemetría"""
+        return {
+            'name': self.name,
+            'evaluations': self.evaluations,
+            'reorders': self.reorders,
+            'order': [stage.name for stage in self.stages],
+            'stages': {
+                stage.name: {
+                    'group': stage.group,
+                    'ewma_cost_us': stage.ewma_cost * 1e6,
+                    'ewma_reject_rate': stage.ewma_reject,
+                    'evaluations': stage.evaluations,
+                    'rejections': stage.rejections
+                } for stage in self.stages
+            }
+        }
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+📝 LOG SETUP - FASE 1.6
+Logging no bloqueante: el hilo de trading solo encola registros (QueueHandler) y un
+QueueListener en segundo plano formatea y escribe a consola/fichero. El fichero rota por
+tamaño o por tiempo y los ficheros rotados se comprimen con gzip. Formato texto o JSON
+estructurado, y limitación por punto de llamada para mensajes repetitivos del hot path.
+"""
+
+import os
+import gzip
+import json
+import time
+import queue
+import atexit
+import shutil
+import logging
+import logging.handlers
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Listener activo (uno por proceso)
+_listener: Optional[logging.handlers.QueueListener] = None
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro con campos estables para ingesta"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'ts': round(record.created, 3),
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'site': f"{record.module}:{record.lineno}",
+            'thread': record.threadName,
+            'msg': record.getMessage()
+        }
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            payload['suppressed'] = suppressed
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload['exc'] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+class TextFormatter(logging.Formatter):
+    """Formato de texto clásico; indica cuántos registros suprimió el limitador"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            line += f" (+{suppressed} suprimidos)"
+        return line
+
+class CallSiteRateLimiter(logging.Filter):
+    """
+    Limitador por punto de llamada (fichero, línea): como mucho `burst` registros por
+    `interval_sec`, y fuera de ese cupo se deja pasar 1 de cada `sample_every`.
+    WARNING y superiores nunca se descartan. El siguiente registro emitido lleva
+    el número de suprimidos en `record.suppressed`.
+    """
+
+    def __init__(self, burst: int = 10, interval_sec: float = 60.0, sample_every: int = 0,
+                 max_level: int = logging.INFO, time_fn: Callable[[], float] = time.monotonic):
+        super().__init__()
+        self.burst = burst
+        self.interval_sec = interval_sec
+        self.sample_every = sample_every
+        self.max_level = max_level
+        self.time_fn = time_fn
+
+        # (pathname, lineno) → [inicio de ventana, emitidos en ventana, suprimidos, vistos fuera de cupo]
+        self.sites: Dict[Tuple[str, int], List[float]] = {}
+        self.total_suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level or self.burst <= 0:
+            return True
+
+        now = self.time_fn()
+        key = (record.pathname, record.lineno)
+        state = self.sites.get(key)
+        if state is None:
+            state = [now, 0, 0, 0]
+            self.sites[key] = state
+        elif now - state[0] >= self.interval_sec:
+            state[0] = now
+            state[1] = 0
+            state[3] = 0
+
+        if state[1] < self.burst:
+            state[1] += 1
+        else:
+            state[3] += 1
+            if not self.sample_every or state[3] % self.sample_every:
+                state[2] += 1
+                self.total_suppressed += 1
+                return False
+
+        if state[2]:
+            record.suppressed = int(state[2])
+            state[2] = 0
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'sites': len(self.sites), 'suppressed': self.total_suppressed}
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que no formatea en el hilo emisor: el registro viaja intacto a la cola
+    y el listener hace el %-formatting. Solo se materializa la traza de excepción,
+    que no puede esperar a que el frame desaparezca.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def gzip_namer(name: str) -> str:
+    return name + '.gz'
+
+def gzip_rotator(source: str, dest: str) -> None:
+    """Comprimir el fichero rotado y eliminar el original"""
+    with open(source, 'rb') as src, gzip.open(dest, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+def build_file_handler(path: str, rotation: str = 'size', max_bytes: int = 10 * 1024 * 1024,
+                       backup_count: int = 5, when: str = 'midnight', compress: bool = True) -> logging.Handler:
+    """Handler de fichero con rotación por tamaño ('size') o por tiempo ('time')"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    if rotation == 'time':
+        handler = logging.handlers.TimedRotatingFileHandler(path, when=when, backupCount=backup_count,
+                                                            encoding='utf-8', delay=True)
+    else:
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count,
+                                                       encoding='utf-8', delay=True)
+    if compress:
+        handler.namer = gzip_namer
+        handler.rotator = gzip_rotator
+    return handler
+
+def setup_logging(level: str = 'INFO', log_file: Optional[str] = 'trading_bot.log', json_format: bool = False,
+                  rotation: str = 'size', max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5,
+                  when: str = 'midnight', compress: bool = True, console: bool = True,
+                  rate_limit_burst: int = 10, rate_limit_interval_sec: float = 60.0,
+                  sample_every: int = 0) -> logging.handlers.QueueListener:
+    """
+    Configurar el logging raíz del proceso. Sustituye cualquier handler previo
+    (p. ej. basicConfig de otros módulos) por un único QueueHandler.
+    """
+    global _listener
+    stop_logging()
+
+    formatter = JsonFormatter() if json_format else TextFormatter(TEXT_FORMAT)
+    handlers: List[logging.Handler] = []
+    if console:
+        handlers.append(logging.StreamHandler())
+    if log_file:
+        handlers.append(build_file_handler(log_file, rotation, max_bytes, backup_count, when, compress))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    # El filtro va en el QueueHandler: lo descartado ni siquiera se encola
+    queue_handler.addFilter(CallSiteRateLimiter(burst=rate_limit_burst, interval_sec=rate_limit_interval_sec,
+                                                sample_every=sample_every))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+        existing.close()
+    root.addHandler(queue_handler)
+    root.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+def setup_logging_from_config(config) -> logging.handlers.QueueListener:
+    """Configurar logging a partir de Fase16Config"""
+    return setup_logging(
+        level=config.LOG_LEVEL,
+        log_file=config.LOG_FILE or None,
+        json_format=config.LOG_FORMAT == 'json',
+        rotation=config.LOG_ROTATION,
+        max_bytes=config.LOG_MAX_BYTES,
+        backup_count=config.LOG_BACKUP_COUNT,
+        when=config.LOG_ROTATION_WHEN,
+        compress=config.LOG_COMPRESS,
+        rate_limit_burst=config.LOG_RATE_LIMIT_BURST,
+        rate_limit_interval_sec=config.LOG_RATE_LIMIT_INTERVAL_SEC,
+        sample_every=config.LOG_SAMPLE_EVERY
+    )
+
+def get_rate_limiter() -> Optional[CallSiteRateLimiter]:
+    """Limitador instalado en el QueueHandler raíz (para telemetría)"""
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, DeferredQueueHandler):
+            for log_filter in handler.filters:
+                if isinstance(log_filter, CallSiteRateLimiter):
+                    return log_filter
+    return None
+
+def stop_logging() -> None:
+    """Vaciar la cola y detener el listener (idempotente)"""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, DeferredQueueHandler):
+            root.removeHandler(handler)
+    listener.stop()
+    for handler in listener.handlers:
+        handler.flush()
+        handler.close()
+
+atexit.register(stop_logging)
@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+📡 MARKET DATA BUS - FASE 1.6
+Bus de datos de mercado en memoria compartida para varios consumidores en la misma
+máquina. Un único proceso feed-handler escribe top-of-book, trades y velas de 1m
+normalizados en anillos de `multiprocessing.shared_memory`; cualquier número de
+lectores (trader, shards, selector, evaluadores shadow) los leen sin serializar
+ni pasar por sockets.
+
+- Un solo escritor: cada registro/anillo lleva un número de secuencia tipo seqlock
+  (impar = escritura en curso). El lector copia y reintenta si la secuencia cambió
+- Layout fijo float64: cabecera (con capacidades), tabla de símbolos (16 bytes), libro por símbolo,
+  anillo de trades [ts, precio, qty, buyer_maker] y anillo de velas 1m
+  [open_time, open, high, low, close, volume]
+- El lector alimenta un BarResampler local: selector y MarketFilter lo usan como
+  bar_source igual que con la sincronización REST
+
+Uso del feed: python market_data_bus.py --name menudito-md --source rest --symbols BTCUSDT,ETHUSDT
+"""
+
+import os
+import sys
+import time
+import signal
+import logging
+import argparse
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+from typing import Dict, List, Any, Optional, Callable, Iterable, Tuple
+
+from bar_resampler import BarResampler, DEFAULT_TIMEFRAMES
+from request_budget import PRIORITY_SCAN, request_weight
+
+MAGIC = 0x4D44425553  # 'MDBUS'
+VERSION = 1
+SYMBOL_BYTES = 16
+MAX_READ_RETRIES = 100
+DAY_MINUTES = 1440
+
+# === CABECERA ===
+H_MAGIC = 0
+H_VERSION = 1
+H_SYMBOLS = 2
+H_TRADE_CAPACITY = 3
+H_BAR_CAPACITY = 4
+H_WRITER_PID = 5
+H_HEARTBEAT = 6
+HEADER_FIELDS = 8
+
+# === LIBRO: [seq, ts, bid, ask, bid_qty, ask_qty] ===
+BOOK_FIELDS = 6
+# === ANILLOS: cabecera [seq, total escrito] ===
+RING_HEADER = 2
+TRADE_FIELDS = 4
+BAR_FIELDS = 6
+
+def _layout(n_symbols: int, trade_capacity: int, bar_capacity: int) -> Dict[str, Tuple[int, tuple]]:
+    """Offset (bytes) y forma de cada bloque del segmento"""
+    shapes = [
+        ('book', (n_symbols, BOOK_FIELDS)),
+        ('trade_header', (n_symbols, RING_HEADER)),
+        ('trades', (n_symbols, trade_capacity, TRADE_FIELDS)),
+        ('bar_header', (n_symbols, RING_HEADER)),
+        ('bars', (n_symbols, bar_capacity, BAR_FIELDS))
+    ]
+    layout = {'header': (0, (HEADER_FIELDS,))}
+    offset = HEADER_FIELDS * 8 + n_symbols * SYMBOL_BYTES  # cabecera y tabla de símbolos (múltiplo de 8)
+    for key, shape in shapes:
+        layout[key] = (offset, shape)
+        offset += int(np.prod(shape)) * 8
+    layout['size'] = (offset, ())
+    return layout
+
+class MarketDataBus:
+    """Segmento compartido: libro, trades y velas de 1m por símbolo (un escritor, N lectores)"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.logger = logging.getLogger(__name__)
+        self.shm = shm
+        self.owner = owner
+        self.name = shm.name
+        self.read_retries = 0
+        self.torn_reads = 0
+
+    @classmethod
+    def create(cls, symbols: Iterable[str], name: str = None, trade_capacity: int = 4096,
+               bar_capacity: int = 2880) -> 'MarketDataBus':
+        """Crear el segmento (feed-handler); un segmento huérfano con el mismo nombre se reemplaza"""
+        symbols = list(dict.fromkeys(symbols))
+        size = _layout(len(symbols), trade_capacity, bar_capacity)['size'][0]
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        bus = cls(shm, owner=True)
+        bus._map(len(symbols), trade_capacity, bar_capacity)
+        bus.symbol_table[:] = [symbol.encode() for symbol in symbols]
+        bus._index_symbols()
+        for key in ('book', 'trade_header', 'trades', 'bar_header', 'bars'):
+            getattr(bus, key)[...] = 0.0
+        header = bus.header
+        header[H_VERSION] = VERSION
+        header[H_SYMBOLS] = len(symbols)
+        header[H_TRADE_CAPACITY] = trade_capacity
+        header[H_BAR_CAPACITY] = bar_capacity
+        header[H_WRITER_PID] = os.getpid()
+        header[H_HEARTBEAT] = time.time()
+        header[H_MAGIC] = MAGIC  # último: el segmento ya es legible
+        return bus
+
+    @classmethod
+    def attach(cls, name: str) -> 'MarketDataBus':
+        """Adjuntarse como lector a un bus existente (FileNotFoundError si no hay feed)"""
+        shm = shared_memory.SharedMemory(name=name)
+        # El segmento es del feed: este proceso no debe destruirlo al salir (tracker de 3.9)
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        bus = cls(shm, owner=False)
+        header = np.ndarray((HEADER_FIELDS,), dtype=np.float64, buffer=shm.buf)
+        valid = header[H_MAGIC] == MAGIC and header[H_VERSION] == VERSION
+        n_symbols, trade_capacity, bar_capacity = (int(header[key]) for key in
+                                                   (H_SYMBOLS, H_TRADE_CAPACITY, H_BAR_CAPACITY))
+        del header
+        if not valid:
+            bus.close()
+            raise ValueError(f"Segmento {name} no es un bus de mercado v{VERSION}")
+        bus._map(n_symbols, trade_capacity, bar_capacity)
+        bus._index_symbols()
+        return bus
+
+    def _map(self, n_symbols: int, trade_capacity: int, bar_capacity: int) -> None:
+        buf = self.shm.buf
+        self.symbol_table = np.ndarray((n_symbols,), dtype=f'S{SYMBOL_BYTES}', buffer=buf,
+                                       offset=HEADER_FIELDS * 8)
+        for key, (offset, shape) in _layout(n_symbols, trade_capacity, bar_capacity).items():
+            if key != 'size':
+                setattr(self, key, np.ndarray(shape, dtype=np.float64, buffer=buf, offset=offset))
+        self.trade_capacity = trade_capacity
+        self.bar_capacity = bar_capacity
+
+    def _index_symbols(self) -> None:
+        self.symbols = [raw.decode() for raw in self.symbol_table]
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    def close(self) -> None:
+        """Soltar las vistas y el mapeo; el dueño además destruye el segmento"""
+        for key in ('symbol_table', 'header', 'book', 'trade_header', 'trades', 'bar_header', 'bars'):
+            self.__dict__.pop(key, None)
+        self.shm.close()
+        if self.owner:
+            # Un lector del mismo árbol de procesos pudo des-registrarlo del tracker compartido
+            resource_tracker.register(self.shm._name, 'shared_memory')
+            self.shm.unlink()
+
+    # === ESCRITURA (solo el feed-handler) ===
+
+    def write_book(self, symbol: str, ts: float, bid: float, ask: float, bid_qty: float, ask_qty: float) -> None:
+        record = self.book[self.index[symbol]]
+        record[0] += 1  # impar: escritura en curso
+        record[1:] = (ts, bid, ask, bid_qty, ask_qty)
+        record[0] += 1
+
+    def _append(self, ring_header: np.ndarray, ring: np.ndarray, rows: np.ndarray) -> int:
+        capacity = ring.shape[0]
+        total = int(ring_header[1]) + len(rows)  # el contador cuenta también lo que no cabe
+        kept = rows[-capacity:]
+        positions = (total - len(kept) + np.arange(len(kept))) % capacity
+        ring_header[0] += 1
+        ring[positions] = kept
+        ring_header[1] = total
+        ring_header[0] += 1
+        return len(rows)
+
+    def append_trades(self, symbol: str, rows: Any) -> int:
+        """Trades [ts, precio, qty, buyer_maker] en orden temporal"""
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, TRADE_FIELDS)
+        i = self.index[symbol]
+        return self._append(self.trade_header[i], self.trades[i], rows) if len(rows) else 0
+
+    def append_bars(self, symbol: str, rows: Any) -> int:
+        """Velas de 1m cerradas [open_time, o, h, l, c, v]; se descartan las ya publicadas"""
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, BAR_FIELDS)
+        last = self.last_bar_time(symbol)
+        if last is not None:
+            rows = rows[rows[:, 0] > last]
+        i = self.index[symbol]
+        return self._append(self.bar_header[i], self.bars[i], rows) if len(rows) else 0
+
+    def heartbeat(self, now: float = None) -> None:
+        self.header[H_HEARTBEAT] = time.time() if now is None else now
+
+    # === LECTURA (cualquier proceso, sin lock) ===
+
+    def read_book(self, symbol: str) -> Optional[Tuple[float, float, float, float, float]]:
+        """(ts, bid, ask, bid_qty, ask_qty) consistente; None si aún no hay libro"""
+        record = self.book[self.index[symbol]]
+        for _ in range(MAX_READ_RETRIES):
+            seq = record[0]
+            if seq % 2 == 0:
+                values = tuple(record[1:].tolist())
+                if record[0] == seq:
+                    return values if seq else None
+            self.read_retries += 1
+        self.torn_reads += 1
+        return None
+
+    def _read_ring(self, ring_header: np.ndarray, ring: np.ndarray, since: int,
+                   limit: int = None) -> Tuple[np.ndarray, int]:
+        capacity = ring.shape[0]
+        for _ in range(MAX_READ_RETRIES):
+            seq = ring_header[0]
+            if seq % 2 == 0:
+                total = int(ring_header[1])
+                start = max(since, total - capacity)  # lo sobrescrito ya no está
+                if limit is not None:
+                    start = max(start, total - limit)
+                rows = ring[np.arange(start, total) % capacity]  # indexado avanzado: copia
+                if ring_header[0] == seq:
+                    return rows, total
+            self.read_retries += 1
+        self.torn_reads += 1
+        return np.empty((0, ring.shape[1])), since
+
+    def read_trades(self, symbol: str, since: int = 0, limit: int = None) -> Tuple[np.ndarray, int]:
+        """Trades posteriores al contador `since`; devuelve (filas, nuevo contador)"""
+        i = self.index[symbol]
+        return self._read_ring(self.trade_header[i], self.trades[i], since, limit)
+
+    def read_bars(self, symbol: str, since: int = 0, limit: int = None) -> Tuple[np.ndarray, int]:
+        """Velas de 1m posteriores al contador `since`; devuelve (filas, nuevo contador)"""
+        i = self.index[symbol]
+        return self._read_ring(self.bar_header[i], self.bars[i], since, limit)
+
+    def last_bar_time(self, symbol: str) -> Optional[int]:
+        i = self.index[symbol]
+        total = int(self.bar_header[i][1])
+        return int(self.bars[i][(total - 1) % self.bar_capacity][0]) if total else None
+
+    def heartbeat_age(self, now: float = None) -> float:
+        return (time.time() if now is None else now) - self.header[H_HEARTBEAT]
+
+class MarketDataConsumer:
+    """Lector del bus: velas a un BarResampler local, libro y trades bajo demanda"""
+
+    def __init__(self, bus: MarketDataBus, base_minutes: int = 2880,
+                 timeframes: Iterable[str] = DEFAULT_TIMEFRAMES, time_fn: Callable[[], float] = time.time):
+        self.logger = logging.getLogger(__name__)
+        self.bus = bus
+        self.time_fn = time_fn
+        self.resampler = BarResampler(timeframes=timeframes, base_minutes=base_minutes, time_fn=time_fn)
+        self.bar_cursor: Dict[str, int] = {}
+        self.trade_cursor: Dict[str, int] = {}
+        self.polls = 0
+
+    @classmethod
+    def attach(cls, name: str, base_minutes: int = 2880, time_fn: Callable[[], float] = time.time) -> 'MarketDataConsumer':
+        return cls(MarketDataBus.attach(name), base_minutes=base_minutes, time_fn=time_fn)
+
+    def poll(self, symbols: Iterable[str] = None) -> int:
+        """Pasar al resampler las velas nuevas del bus; devuelve cuántas se añadieron"""
+        self.polls += 1
+        added = 0
+        push = self.resampler.push
+        for symbol in (self.bus.symbols if symbols is None else symbols):
+            if symbol not in self.bus.index:
+                continue
+            rows, total = self.bus.read_bars(symbol, self.bar_cursor.get(symbol, 0), self.resampler.base_minutes)
+            self.bar_cursor[symbol] = total
+            for open_time, o, h, l, c, v in rows.tolist():
+                if push(symbol, int(open_time), o, h, l, c, v):
+                    added += 1
+        return added
+
+    def book(self, symbol: str, max_age_sec: float = None) -> Optional[Dict[str, float]]:
+        """Top-of-book del símbolo; None si no existe o es más viejo que max_age_sec"""
+        if symbol not in self.bus.index:
+            return None
+        values = self.bus.read_book(symbol)
+        if values is None or (max_age_sec is not None and self.time_fn() - values[0] > max_age_sec):
+            return None
+        ts, bid, ask, bid_qty, ask_qty = values
+        return {'ts': ts, 'bid': bid, 'ask': ask, 'bid_qty': bid_qty, 'ask_qty': ask_qty}
+
+    def bulk_snapshot(self) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+        """Ticker 24h y bookTicker en formato Binance desde el bus (velas de 1m con volumen en quote)"""
+        tickers, books = [], []
+        for symbol in self.bus.symbols:
+            values = self.bus.read_book(symbol)
+            series = self.resampler.series.get(symbol)
+            if values is None or series is None or not series.base:
+                continue
+            day = list(series.base)[-DAY_MINUTES:]
+            last = day[-1][4]
+            tickers.append({
+                'symbol': symbol,
+                'lastPrice': f"{last:.8f}",
+                'priceChangePercent': f"{(last / day[0][1] - 1) * 100:.3f}",
+                'quoteVolume': f"{sum(bar[5] for bar in day):.2f}"
+            })
+            books.append({'symbol': symbol, 'bidPrice': f"{values[1]:.8f}", 'askPrice': f"{values[2]:.8f}"})
+        return tickers, books
+
+    def new_trades(self, symbol: str) -> np.ndarray:
+        """Trades publicados desde la última llamada para este símbolo"""
+        if symbol not in self.bus.index:
+            return np.empty((0, TRADE_FIELDS))
+        rows, total = self.bus.read_trades(symbol, self.trade_cursor.get(symbol, 0))
+        self.trade_cursor[symbol] = total
+        return rows
+
+    def close(self) -> None:
+        self.bus.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'bus': self.bus.name,
+            'symbols': len(self.bus.symbols),
+            'polls': self.polls,
+            'feed_age_sec': self.bus.heartbeat_age(self.time_fn()),
+            'read_retries': self.bus.read_retries,
+            'torn_reads': self.bus.torn_reads,
+            'bars': self.resampler.get_stats()
+        }
+
+# === FUENTES DEL FEED-HANDLER ===
+
+class RestFeedSource:
+    """
+    Libro (bookTicker bulk) y velas de 1m (klines incrementales) en cada paso. Los
+    aggTrades (peso 4 por símbolo) son opcionales: una ronda cada trades_interval_sec
+    (0 = desactivados) con prioridad de cribado, que el presupuesto aplaza primero
+    """
+
+    def __init__(self, rest_client: Any, base_minutes: int = 2880, trades_interval_sec: float = 0.0,
+                 time_fn: Callable[[], float] = time.time):
+        self.logger = logging.getLogger(__name__)
+        self.rest = rest_client
+        self.time_fn = time_fn
+        self.resampler = BarResampler(timeframes=(), base_minutes=base_minutes, time_fn=time_fn)
+        self.trade_ids: Dict[str, int] = {}
+        self.trades_enabled = trades_interval_sec > 0
+        self.trades_interval_sec = trades_interval_sec
+        self.next_trades = 0.0
+        self.trades_deferred = 0
+
+    def publish(self, bus: MarketDataBus) -> int:
+        updates = 0
+        now = self.time_fn()
+        response = self.rest.request('GET', '/api/v3/ticker/bookTicker')  # todo el exchange: peso 4
+        if response['ok']:
+            for row in response['data']:
+                if row['symbol'] in bus.index:
+                    bus.write_book(row['symbol'], now, float(row['bidPrice']), float(row['askPrice']),
+                                   float(row['bidQty']), float(row['askQty']))
+                    updates += 1
+
+        self.resampler.sync(self.rest, bus.symbols)
+        for symbol in bus.symbols:
+            last = bus.last_bar_time(symbol)
+            newer = []
+            for bar in reversed(self.resampler.series[symbol].base if symbol in self.resampler.series else ()):
+                if last is not None and bar[0] <= last:
+                    break
+                newer.append(bar)
+            newer.reverse()
+            updates += bus.append_bars(symbol, newer)
+
+        if self.trades_enabled and now >= self.next_trades:
+            self.next_trades = now + self.trades_interval_sec
+            for symbol in bus.symbols:
+                published = self._publish_trades(bus, symbol)
+                if published is None:
+                    break  # sin peso: el resto de la ronda espera a la siguiente
+                updates += published
+        return updates
+
+    def _publish_trades(self, bus: MarketDataBus, symbol: str) -> Optional[int]:
+        """Trades nuevos del símbolo; None si el presupuesto aplazó la petición"""
+        params = {'symbol': symbol, 'limit': 1000}
+        if symbol in self.trade_ids:
+            params['fromId'] = self.trade_ids[symbol] + 1
+        response = self.rest.request('GET', '/api/v3/aggTrades', params, priority=PRIORITY_SCAN)
+        if not response['ok']:
+            if response.get('deferred'):
+                self.trades_deferred += 1
+                return None
+            if response['status'] == 404:
+                self.trades_enabled = False
+                self.logger.warning("⚠️ aggTrades no disponible: el bus publicará solo libro y velas")
+            return 0
+        rows = [(t['T'] / 1000, float(t['p']), float(t['q']), 1.0 if t['m'] else 0.0) for t in response['data']]
+        if response['data']:
+            self.trade_ids[symbol] = int(response['data'][-1]['a'])
+        return bus.append_trades(symbol, rows)
+
+class SyntheticFeedSource:
+    """Mercado sintético determinista (simulación/shadow sin exchange) con trades derivados de cada vela"""
+
+    def __init__(self, market: Any, trades_per_bar: int = 4, time_fn: Callable[[], float] = time.time):
+        self.market = market
+        self.trades_per_bar = trades_per_bar
+        self.time_fn = time_fn
+        self.state: Dict[str, Tuple[int, float]] = {}  # símbolo -> (índice de la última vela, cierre)
+
+    def publish(self, bus: MarketDataBus) -> int:
+        updates = 0
+        now = self.time_fn()
+        index = int(now // self.market.bar_seconds) - 1
+        for symbol in bus.symbols:
+            state = self.state.get(symbol)
+            if state is None:
+                n_bars, start = bus.bar_capacity, None
+            else:
+                n_bars, start = min(index - state[0], bus.bar_capacity), [state[1]]
+            if n_bars <= 0:
+                continue
+            data = self.market.generate([symbol], n_bars, index - n_bars + 1, start)
+            o, h, l, c = (data[key][0] for key in ('open', 'high', 'low', 'close'))
+            volume, spread = data['volume'][0], data['spread_bps'][0]
+            times = data['timestamp'].astype(np.float64)
+            updates += bus.append_bars(symbol, np.column_stack([times, o, h, l, c, volume]))
+
+            # Trades: recorrido open → extremo → extremo → close dentro de cada vela
+            k = self.trades_per_bar
+            up = c >= o
+            path = np.column_stack([o, np.where(up, l, h), np.where(up, h, l), c])
+            path = np.repeat(path, max(1, k // 4), axis=1) if k > 4 else path[:, :k]
+            steps = path.shape[1]
+            ts = times[:, None] + (np.arange(steps) + 0.5) * self.market.bar_seconds / steps
+            qty = np.repeat((volume / c / steps)[:, None], steps, axis=1)
+            maker = np.tile(np.arange(steps) % 2, (len(c), 1))
+            trades = np.stack([ts, path, qty, maker], axis=-1).reshape(-1, TRADE_FIELDS)
+            updates += bus.append_trades(symbol, trades)
+
+            half = spread[-1] / 2e4
+            book_qty = volume[-1] / c[-1] / 100
+            bus.write_book(symbol, now, c[-1] * (1 - half), c[-1] * (1 + half), book_qty, book_qty)
+            self.state[symbol] = (index, float(c[-1]))
+        return updates
+
+class FeedHandler:
+    """Proceso escritor: publica la fuente en el bus a intervalo fijo y marca latido"""
+
+    def __init__(self, bus: MarketDataBus, source: Any, interval_sec: float = 1.0,
+                 time_fn: Callable[[], float] = time.time):
+        self.logger = logging.getLogger(__name__)
+        self.bus = bus
+        self.source = source
+        self.interval_sec = interval_sec
+        self.time_fn = time_fn
+        self.steps = 0
+        self.updates = 0
+        self.errors = 0
+        self.running = True
+
+    def step(self) -> int:
+        try:
+            updates = self.source.publish(self.bus)
+        except Exception as e:
+            self.errors += 1
+            self.logger.error(f"❌ Error publicando en el bus de mercado: {e}")
+            updates = 0
+        self.bus.heartbeat(self.time_fn())
+        self.steps += 1
+        self.updates += updates
+        return updates
+
+    def run(self, max_steps: int = None) -> None:
+        while self.running and (max_steps is None or self.steps < max_steps):
+            started = time.time()
+            self.step()
+            time.sleep(max(0.0, self.interval_sec - (time.time() - started)))
+
+def main(argv: List[str] = None) -> int:
+    """Función principal: lanzar el feed-handler"""
+    parser = argparse.ArgumentParser(description='Feed-handler del bus de mercado en memoria compartida')
+    parser.add_argument('--name', default=os.getenv('MARKET_BUS_NAME') or 'menudito-md')
+    parser.add_argument('--source', choices=['rest', 'synthetic'], default='rest')
+    parser.add_argument('--symbols', default=None, help='Lista separada por comas (por defecto PAIRS_CANDIDATES)')
+    parser.add_argument('--interval', type=float, default=1.0)
+    parser.add_argument('--bar-capacity', type=int, default=None)
+    parser.add_argument('--trade-capacity', type=int, default=4096)
+    parser.add_argument('--trades-interval', type=float, default=0.0,
+                        help='Segundos entre rondas de aggTrades REST (0 = sin trades; peso 4 por símbolo)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - feed - %(levelname)s - %(message)s')
+    from config_fase_1_6 import config
+    symbols = args.symbols.split(',') if args.symbols else list(config.PAIRS_CANDIDATES)
+    bar_capacity = args.bar_capacity or config.BAR_BASE_MINUTES
+
+    if args.source == 'rest':
+        from binance_rest import BinanceRestClient
+        from request_budget import RequestBudget
+        from circuit_breaker import init_circuit_breakers
+        # Solo su parte del peso de la IP (REQUEST_FEED_WEIGHT_PCT); el trader usa el resto
+        rest_client = BinanceRestClient.from_config(config, budget=RequestBudget.from_config(config, feed=True),
+                                                    breaker=init_circuit_breakers(config)['exchange'])
+        source = RestFeedSource(rest_client, base_minutes=bar_capacity, trades_interval_sec=args.trades_interval)
+        if args.trades_interval > 0:
+            trades_weight = request_weight('GET', '/api/v3/aggTrades') * len(symbols) * 60 / args.trades_interval
+            logging.getLogger(__name__).info("📡 aggTrades cada %.0fs: ~%.0f de peso/min de %d", args.trades_interval,
+                                             trades_weight, config.REQUEST_WEIGHT_LIMIT_1M)
+    else:
+        from synthetic_market import SyntheticMarket
+        source = SyntheticFeedSource(SyntheticMarket(seed=config.SYNTHETIC_SEED, bar_seconds=60))
+
+    bus = MarketDataBus.create(symbols, name=args.name, trade_capacity=args.trade_capacity,
+                               bar_capacity=bar_capacity)
+    handler = FeedHandler(bus, source, interval_sec=args.interval)
+
+    def stop(signum, frame):
+        handler.running = False
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    logging.getLogger(__name__).info("📡 Bus de mercado %s: %d símbolos, fuente %s", bus.name, len(symbols), args.source)
+    try:
+        handler.run()
+    finally:
+        bus.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,11 +9,13 @@ import os
 import time
 import logging
 import signal
+import socket
 import random
 import argparse
+import multiprocessing
 import sys
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from decimal import getcontext
 import requests
 
@@ -39,6 +41,30 @@ except ImportError:
             self.MAX_WS_LATENCY_MS = 1500
             self.MAX_REST_LATENCY_MS = 800
             self.RETRY_ORDER = 2
+            self.INITIAL_CAPITAL = 50.0
+            self.TIMEZONE = 'Europe/Madrid'
+            self.WEEKLY_MAX_DRAWDOWN_PCT = 1.50
+            self.BAR_RESAMPLER_ENABLED = False
+            self.SYNTHETIC_SEED = 0
+            self.PAIR_SELECTOR_MODE = 'inline'
+            self.MARKET_BUS_NAME = ''
+            self.MAX_RETRY_ATTEMPTS = 2
+            self.PAUSE_AFTER_FAILURE_MIN = 15
+            self.CIRCUIT_FAILURE_RATE_PCT = 50.0
+            self.CIRCUIT_WINDOW_SIZE = 20
+            self.CIRCUIT_MIN_CALLS = 10
+            self.CIRCUIT_EXCHANGE_FAILURES = 5
+            self.CIRCUIT_EXCHANGE_OPEN_SEC = 30.0
+            self.WATCHDOG_ENABLED = False
+            self.CYCLE_BUDGET_SEC = 15.0
+            self.CYCLE_STALL_SEC = 120.0
+            self.WATCHDOG_RESTART_ON_STALL = False
+            self.WATCHDOG_RESTART_GRACE_SEC = 60.0
+            self.TRACE_ENABLED = False
+            self.TRACE_FILE = 'trading_data/cycle_trace.json'
+            self.TRACE_MAX_BYTES = 50 * 1024 * 1024
+            self.TRACE_BACKUP_COUNT = 3
+            self.TRACE_MIN_CYCLE_MS = 0.0
             # Auto Pair Selector
             self.AUTO_PAIR_SELECTOR = False
             self.PAIRS_CANDIDATES = ['BTCUSDT', 'ETHUSDT', 'BNBUSDT', 'SOLUSDT']
@@ -54,14 +80,44 @@ except ImportError:
     AUTO_PAIR_SELECTOR_AVAILABLE = False
     print("⚠️ Auto Pair Selector no disponible, usando configuración por defecto")
 
+from position_book import PositionBook
+from symbol_registry import init_symbol_registry
+from account_state import AccountState
+from rejection_stats import RejectionStats
+from drawdown_tracker import DrawdownTracker, resolve_timezone
+from filter_pipeline import FilterContext, FilterStage, FilterPipeline
+from log_setup import setup_logging, setup_logging_from_config, stop_logging
+from profiler_trigger import init_profiler_trigger
+from bar_resampler import BarResampler
+from synthetic_market import SyntheticMarket, SyntheticTape
+from pair_selector_service import init_pair_selector_service, ShardSelectorLink, SelectorRelay
+from risk_coordinator import RiskCoordinator, shard_of
+from market_data_bus import MarketDataConsumer
+from request_budget import RequestBudget, init_request_budget, get_request_budget, PRIORITY_MARKET
+from circuit_breaker import CircuitBreaker, init_circuit_breakers, get_breaker_states
+from cycle_watchdog import init_cycle_watchdog, bounded_wait, WATCHDOG_RESTART_EXIT_CODE
+from cycle_tracer import init_cycle_tracer, cycle_stage
+
+# Importar Order Gateway (ejecución real)
+try:
+    from order_gateway import init_order_gateway, UserDataStream
+    ORDER_GATEWAY_AVAILABLE = True
+except ImportError:
+    ORDER_GATEWAY_AVAILABLE = False
+    print("⚠️ Order Gateway no disponible, solo ejecución simulada")
+
 # Configurar precisión decimal
 getcontext().prec = 8
 
-# Configurar logging profesional
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Fuentes de libro válidas para precio de órdenes reales (la cinta sintética nunca lo es)
+LIVE_BOOK_SOURCES = ('bus', 'rest')
+
+# Ejecución real: rango de las últimas velas de 1m y caché del volumen 24h (ticker REST)
+LIVE_RANGE_BARS = 15
+VOLUME_24H_TTL_SEC = 300
+
+# Fracción mínima de la cantidad de un largo recuperado que debe seguir en saldo (comisión en el activo base)
+RESTORE_BALANCE_TOLERANCE = 0.99
 
 # Variable global para control de apagado (mutable)
 shutdown_state = {"stop": False}
@@ -83,10 +139,22 @@ def sleep_responsive(seconds: int):
         time.sleep(1)
         remaining -= 1
 
+def watchdog_hard_exit(code: int) -> None:
+    """Salida forzada del watchdog: vaciar la cola de logs antes de terminar el proceso"""
+    stop_logging()
+    os._exit(code)
+
+def parse_daily_summary_time(value: str):
+    """'22:05 Europe/Madrid' → (22, 5, tz); zona por defecto config.TIMEZONE"""
+    parts = value.split()
+    hour, minute = (int(x) for x in parts[0].split(':'))
+    tz_name = parts[1] if len(parts) > 1 else getattr(config, 'TIMEZONE', 'UTC')
+    return hour, minute, resolve_timezone(tz_name)
+
 class SafetyManager:
     """Sistema de gestión de seguridad y protecciones FASE 1.6"""
     
-    def __init__(self):
+    def __init__(self, initial_capital: float = None):
         self.logger = logging.getLogger(__name__)
         self.daily_loss = 0.0
         self.intraday_drawdown = 0.0
@@ -95,7 +163,17 @@ class SafetyManager:
         self.hourly_trades = 0
         self.daily_trades = 0
         self.session_start_time = datetime.now()
-        self.session_start_capital = 50.0
+        self.hour_window_start = self.session_start_time
+        self.session_start_capital = initial_capital if initial_capital is not None else config.INITIAL_CAPITAL
+        self.day_start_capital = self.session_start_capital
+        self.weekly_drawdown = 0.0
+        self.session_drawdown = 0.0
+        
+        # Curva de equity por horizonte (día/semana/sesión en TIMEZONE)
+        self.drawdown_tracker = DrawdownTracker(self.session_start_capital, timezone=config.TIMEZONE)
+        
+        # Límites globales compartidos entre shards (--shards N); None = proceso único
+        self.risk_coordinator: Optional[RiskCoordinator] = None
         
         # Cooldown racha
         self.racha_cooldown_start = None
@@ -106,6 +184,7 @@ class SafetyManager:
         
         # === FASE 1.6: LÍMITES DE SEGURIDAD ACTUALIZADOS ===
         self.daily_loss_limit = float(os.getenv('DAILY_MAX_DRAWDOWN_PCT', '0.50')) / 100  # 0.5%
+        self.weekly_drawdown_limit = config.WEEKLY_MAX_DRAWDOWN_PCT  # % desde el pico semanal
         self.intraday_drawdown_limit = 0.10  # 10%
         self.max_consecutive_losses = int(os.getenv('MAX_CONSECUTIVE_LOSSES', '2'))
         self.min_cooldown_seconds = int(os.getenv('COOLDOWN_AFTER_LOSS_MIN', '2')) * 60  # 2 minutos (reducido de 5)
@@ -135,6 +214,12 @@ class SafetyManager:
         self.max_rest_latency_ms = config.MAX_REST_LATENCY_MS
         self.retry_order = config.RETRY_ORDER
         
+        # === FASE 1.6: EDGE MÍNIMO ===
+        self.edge_min_bps = 3.0
+        
+        # Filtros pre-trade sueltos (API directa): orden fijo para resultados reproducibles
+        self.pre_trade_pipeline = FilterPipeline(self.pre_trade_stages(), name='pre_trade', adaptive=False)
+        
     def compute_trade_targets(self, price: float, atr_value: float = None) -> Dict[str, float]:
         """FASE 1.6: Calcular TP y SL dinámicos con fricción"""
         
@@ -166,99 +251,143 @@ class SafetyManager:
             'sl_pct': sl_bps / 10000   # convertir a porcentaje
         }
     
-    def pre_trade_filters(self, market_data: Dict[str, Any]) -> Dict[str, Any]:
-        """FASE 1.6: Aplicar filtros previos al trade"""
-        
-        filter_result = {
-            'passed': True,
-            'reason': 'OK',
-            'details': {},
-            'warnings': []
-        }
-        
-        # Extraer datos del mercado
+    # === FASE 1.6: ETAPAS DE FILTRO (check(ctx) → None si pasa, código si rechaza) ===
+    
+    def check_safety_stage(self, ctx: FilterContext) -> Optional[str]:
+        """Etapa: límites de seguridad (se calcula una vez por lote y se comparte)"""
+        safety_status = ctx.get('safety_status')
+        if safety_status['can_trade']:
+            return None
+        ctx.message = safety_status['reason']
+        return 'cooldown' if 'cooldown' in safety_status['reason'].lower() else 'safety_block'
+    
+    def check_live_data(self, ctx: FilterContext) -> Optional[str]:
+        """Etapa: en real todos los datos de los filtros deben venir del exchange"""
+        missing = ctx.get('market_data').get('missing')
+        if not missing:
+            return None
+        ctx.details['missing'] = missing
+        ctx.message = f"Sin datos reales del exchange: {', '.join(missing)}"
+        return 'NO_LIVE_DATA'
+    
+    def check_range(self, ctx: FilterContext) -> Optional[str]:
+        """Etapa: rango mínimo de vela"""
+        market_data = ctx.get('market_data')
         current_price = market_data.get('price', 0.0)
         high = market_data.get('high', current_price)
         low = market_data.get('low', current_price)
         close = market_data.get('close', current_price)
+        if close <= 0:
+            return 'INVALID_PRICE'
+        
+        range_pct = ((high - low) / close) * 100
+        range_bps = range_pct * 100  # convertir a bps
+        ctx.details['range_pct'] = range_pct
+        ctx.details['range_bps'] = range_bps
+        
+        if range_bps < self.min_range_bps:
+            ctx.details['min_range_bps'] = self.min_range_bps
+            ctx.message = f"Rango bajo {range_bps:.1f} bps < {self.min_range_bps} bps"
+            return 'LOW_RANGE'
+        return None
+    
+    def check_spread(self, ctx: FilterContext) -> Optional[str]:
+        """Etapa: spread máximo"""
+        market_data = ctx.get('market_data')
+        current_price = market_data.get('price', 0.0)
         best_ask = market_data.get('best_ask', current_price)
         best_bid = market_data.get('best_bid', current_price)
-        volume_usd = market_data.get('volume_usd', 0.0)
-        ws_latency_ms = market_data.get('ws_latency_ms', 0.0)
-        rest_latency_ms = market_data.get('rest_latency_ms', 0.0)
-        
-        # 1. Filtro de rango de vela
-        if close > 0:
-            range_pct = ((high - low) / close) * 100
-            range_bps = range_pct * 100  # convertir a bps
-            
-            filter_result['details']['range_pct'] = range_pct
-            filter_result['details']['range_bps'] = range_bps
-            
-            if range_bps < self.min_range_bps:
-                filter_result['passed'] = False
-                filter_result['reason'] = 'LOW_RANGE'
-                filter_result['details']['min_range_bps'] = self.min_range_bps
-                self.logger.info(f"❌ Trade rechazado: Rango bajo {range_bps:.1f} bps < {self.min_range_bps} bps")
-                return filter_result
-        else:
-            filter_result['passed'] = False
-            filter_result['reason'] = 'INVALID_PRICE'
-            return filter_result
-        
-        # 2. Filtro de spread
-        if best_ask > 0 and best_bid > 0:
-            mid_price = (best_ask + best_bid) / 2
-            spread_pct = ((best_ask - best_bid) / mid_price) * 100
-            spread_bps = spread_pct * 100  # convertir a bps
-            
-            filter_result['details']['spread_pct'] = spread_pct
-            filter_result['details']['spread_bps'] = spread_bps
-            
-            if spread_bps > self.max_spread_bps:
-                filter_result['passed'] = False
-                filter_result['reason'] = 'HIGH_SPREAD'
-                filter_result['details']['max_spread_bps'] = self.max_spread_bps
-                self.logger.info(f"❌ Trade rechazado: Spread alto {spread_bps:.1f} bps > {self.max_spread_bps} bps")
-                return filter_result
-        else:
-            filter_result['warnings'].append("Spread no disponible")
+        if best_ask is None or best_bid is None:
+            # Ejecución real sin libro del exchange: no hay precio maker fiable
+            ctx.message = "Sin libro real del exchange (bid/ask)"
+            return 'NO_BOOK'
+        if best_ask <= 0 or best_bid <= 0:
+            ctx.warnings.append("Spread no disponible")
+            return None
         
-        # 3. Filtro de volumen
-        filter_result['details']['volume_usd'] = volume_usd
+        mid_price = (best_ask + best_bid) / 2
+        spread_pct = ((best_ask - best_bid) / mid_price) * 100
+        spread_bps = round(spread_pct * 100, 6)  # a bps; sin ruido de coma flotante en el límite exacto
+        ctx.details['spread_pct'] = spread_pct
+        ctx.details['spread_bps'] = spread_bps
         
-        if volume_usd < self.min_vol_usd:
-            filter_result['passed'] = False
-            filter_result['reason'] = 'LOW_VOLUME'
-            filter_result['details']['min_vol_usd'] = self.min_vol_usd
-            self.logger.info(f"❌ Trade rechazado: Volumen bajo ${volume_usd:,.0f} < ${self.min_vol_usd:,.0f}")
-            return filter_result
+        if spread_bps > self.max_spread_bps:
+            ctx.details['max_spread_bps'] = self.max_spread_bps
+            ctx.message = f"Spread alto {spread_bps:.1f} bps > {self.max_spread_bps} bps"
+            return 'HIGH_SPREAD'
+        return None
+    
+    def check_volume(self, ctx: FilterContext) -> Optional[str]:
+        """Etapa: volumen mínimo"""
+        volume_usd = ctx.get('market_data').get('volume_usd', 0.0)
+        ctx.details['volume_usd'] = volume_usd
         
-        # 4. Filtro de latencia WebSocket
-        filter_result['details']['ws_latency_ms'] = ws_latency_ms
+        if volume_usd < self.min_vol_usd:
+            ctx.details['min_vol_usd'] = self.min_vol_usd
+            ctx.message = f"Volumen bajo ${volume_usd:,.0f} < ${self.min_vol_usd:,.0f}"
+            return 'LOW_VOLUME'
+        return None
+    
+    def check_ws_latency(self, ctx: FilterContext) -> Optional[str]:
+        """Etapa: latencia WebSocket"""
+        ws_latency_ms = ctx.get('market_data').get('ws_latency_ms', 0.0)
+        ctx.details['ws_latency_ms'] = ws_latency_ms
         
         if ws_latency_ms > self.max_ws_latency_ms:
-            filter_result['passed'] = False
-            filter_result['reason'] = 'HIGH_WS_LAT'
-            filter_result['details']['max_ws_latency_ms'] = self.max_ws_latency_ms
-            self.logger.info(f"❌ Trade rechazado: Latencia WS alta {ws_latency_ms:.1f}ms > {self.max_ws_latency_ms}ms")
-            return filter_result
-        
-        # 5. Filtro de latencia REST
-        filter_result['details']['rest_latency_ms'] = rest_latency_ms
+            ctx.details['max_ws_latency_ms'] = self.max_ws_latency_ms
+            ctx.message = f"Latencia WS alta {ws_latency_ms:.1f}ms > {self.max_ws_latency_ms}ms"
+            return 'HIGH_WS_LAT'
+        return None
+    
+    def check_rest_latency(self, ctx: FilterContext) -> Optional[str]:
+        """Etapa: latencia REST"""
+        rest_latency_ms = ctx.get('market_data').get('rest_latency_ms', 0.0)
+        ctx.details['rest_latency_ms'] = rest_latency_ms
         
         if rest_latency_ms > self.max_rest_latency_ms:
-            filter_result['passed'] = False
-            filter_result['reason'] = 'HIGH_REST_LAT'
-            filter_result['details']['max_rest_latency_ms'] = self.max_rest_latency_ms
-            self.logger.info(f"❌ Trade rechazado: Latencia REST alta {rest_latency_ms:.1f}ms > {self.max_rest_latency_ms}ms")
-            return filter_result
+            ctx.details['max_rest_latency_ms'] = self.max_rest_latency_ms
+            ctx.message = f"Latencia REST alta {rest_latency_ms:.1f}ms > {self.max_rest_latency_ms}ms"
+            return 'HIGH_REST_LAT'
+        return None
+    
+    def check_edge(self, ctx: FilterContext) -> Optional[str]:
+        """Etapa: edge mínimo (TP menos fricción)"""
+        targets = ctx.get('targets')
+        edge_bps = targets['tp_bps'] - targets['fric_bps']
+        ctx.details['edge_bps'] = edge_bps
         
-        # Si pasa todos los filtros
-        if filter_result['passed']:
-            self.logger.info(f"✅ Filtros pasados: Rango={range_bps:.1f}bps, Spread={spread_bps:.1f}bps, Vol=${volume_usd:,.0f}")
+        if edge_bps < self.edge_min_bps:
+            ctx.message = f"Edge insuficiente: {edge_bps:.1f} bps < {self.edge_min_bps} bps"
+            return 'low_edge'
+        return None
+    
+    def pre_trade_stages(self) -> List[FilterStage]:
+        """Etapas pre-trade (requieren snapshot 'market_data')"""
+        return [
+            FilterStage('live_data', self.check_live_data, group='pre_trade'),
+            FilterStage('range', self.check_range, group='pre_trade'),
+            FilterStage('spread', self.check_spread, group='pre_trade'),
+            FilterStage('volume', self.check_volume, group='pre_trade'),
+            FilterStage('ws_latency', self.check_ws_latency, group='pre_trade'),
+            FilterStage('rest_latency', self.check_rest_latency, group='pre_trade')
+        ]
+    
+    def pre_trade_filters(self, market_data: Dict[str, Any]) -> Dict[str, Any]:
+        """FASE 1.6: Aplicar filtros previos al trade (orden fijo, sobre un snapshot)"""
+        ctx = FilterContext(None, values={'market_data': market_data})
+        result = self.pre_trade_pipeline.evaluate(ctx)
+        
+        if result['passed']:
+            self.logger.debug("✅ Filtros pasados: Rango=%.1fbps, Spread=%.1fbps, Vol=$%,.0f",
+                              ctx.details.get('range_bps', 0), ctx.details.get('spread_bps', 0),
+                              ctx.details.get('volume_usd', 0))
         
-        return filter_result
+        return {
+            'passed': result['passed'],
+            'reason': result['reason'],
+            'details': ctx.details,
+            'warnings': ctx.warnings
+        }
     
     def calculate_fees_and_slippage(self, trade_data: Dict[str, Any]) -> Dict[str, float]:
         """FASE 1.6: Calcular fees y slippage realistas"""
@@ -318,12 +447,28 @@ class SafetyManager:
             'friction_impact': (friction_data['total_friction'] / abs(gross_pnl) * 100) if gross_pnl != 0 else 0
         }
     
+    def reset_session_capital(self, capital: float):
+        """Fijar capital de referencia de sesión/día (p. ej. tras cargar balances reales)"""
+        self.session_start_capital = capital
+        self.day_start_capital = capital
+        self.drawdown_tracker.reset(capital)
+    
     def check_safety_conditions(self, current_capital: float) -> Dict[str, Any]:
         """Verificar todas las condiciones de seguridad"""
         try:
-            # Calcular métricas de seguridad
-            self.intraday_drawdown = ((self.session_start_capital - current_capital) / self.session_start_capital) * 100
-            self.daily_loss = ((50.0 - current_capital) / 50.0) * 100
+            # Calcular métricas de seguridad (O(1) amortizado por horizonte)
+            tracker = self.drawdown_tracker
+            if 'daily' in tracker.update(current_capital):
+                self.daily_trades = 0
+            now = datetime.now()
+            if (now - self.hour_window_start).total_seconds() >= 3600:
+                self.hour_window_start = now
+                self.reset_hourly_counters()
+            self.day_start_capital = tracker.open_equity('daily')
+            self.daily_loss = tracker.loss_from_open('daily')
+            self.intraday_drawdown = tracker.drawdown('daily')
+            self.weekly_drawdown = tracker.drawdown('weekly')
+            self.session_drawdown = tracker.drawdown('session')
             
             # Verificar cooldown racha
             self.check_racha_cooldown()
@@ -334,6 +479,8 @@ class SafetyManager:
                 'reason': None,
                 'daily_loss': self.daily_loss,
                 'intraday_drawdown': self.intraday_drawdown,
+                'weekly_drawdown': self.weekly_drawdown,
+                'session_drawdown': self.session_drawdown,
                 'consecutive_losses': self.consecutive_losses,
                 'probation_mode': self.probation_mode,
                 'racha_cooldown_active': self.racha_cooldown_start is not None,
@@ -349,6 +496,10 @@ class SafetyManager:
                 safety_status['can_trade'] = False
                 safety_status['reason'] = f"Drawdown intradía crítico: {self.intraday_drawdown:.2f}%"
                 
+            elif self.weekly_drawdown >= self.weekly_drawdown_limit:
+                safety_status['can_trade'] = False
+                safety_status['reason'] = f"Drawdown semanal crítico: {self.weekly_drawdown:.2f}%"
+                
             elif self.consecutive_losses >= 3 and not self.probation_mode:
                 safety_status['can_trade'] = False
                 safety_status['reason'] = f"Racha de pérdidas: {self.consecutive_losses} consecutivas"
@@ -374,6 +525,13 @@ class SafetyManager:
                 safety_status['can_trade'] = False
                 safety_status['reason'] = f"Límite diario alcanzado: {self.daily_trades}/{self.max_trades_per_day}"
             
+            # Límites globales de todos los shards (lectura sin lock)
+            if safety_status['can_trade'] and self.risk_coordinator is not None:
+                global_reason = self.risk_coordinator.blocked_reason()
+                if global_reason:
+                    safety_status['can_trade'] = False
+                    safety_status['reason'] = global_reason
+            
             return safety_status
             
         except Exception as e:
@@ -393,12 +551,20 @@ class SafetyManager:
         except Exception as e:
             self.logger.error(f"❌ Error verificando cooldown racha: {e}")
     
-    def record_trade(self, result: str, pnl: float) -> None:
+    def record_entry(self) -> None:
+        """Contar la entrada (límites diario/horario y cooldown) al abrir la posición"""
+        self.last_trade_time = datetime.now()
+        self.hourly_trades += 1
+        self.daily_trades += 1
+    
+    def record_trade(self, result: str, pnl: float, entry_recorded: bool = False) -> None:
         """Registrar resultado de trade para métricas de seguridad"""
         try:
-            self.last_trade_time = datetime.now()
-            self.hourly_trades += 1
-            self.daily_trades += 1
+            # Posiciones vivas ya contaron su entrada al abrirse; en simulación se abre y cierra a la vez
+            if not entry_recorded:
+                self.record_entry()
+            if self.risk_coordinator is not None:
+                self.risk_coordinator.record_result(pnl)
             
             # Actualizar racha de pérdidas
             if result == 'PÉRDIDA':
@@ -425,7 +591,8 @@ class SafetyManager:
                     self.probation_trades = 0
                     self.logger.info("✅ Probation completado - Modo normal restaurado")
                 
-            self.logger.info(f"📊 Seguridad: DD={self.intraday_drawdown:.2f}%, DL={self.daily_loss:.2f}%, CL={self.consecutive_losses}, Probation={self.probation_mode}")
+            self.logger.info("📊 Seguridad: DD=%.2f%%, DL=%.2f%%, CL=%d, Probation=%s",
+                             self.intraday_drawdown, self.daily_loss, self.consecutive_losses, self.probation_mode)
             
         except Exception as e:
             self.logger.error(f"❌ Error registrando trade: {e}")
@@ -434,7 +601,7 @@ class SafetyManager:
         """Resetear contadores horarios"""
         try:
             self.hourly_trades = 0
-            self.logger.info("🔄 Contadores horarios reseteados")
+            self.logger.debug("🔄 Contadores horarios reseteados")
         except Exception as e:
             self.logger.error(f"❌ Error reseteando contadores: {e}")
 
@@ -460,20 +627,30 @@ class MarketFilter:
         self.spread_epsilon = 0.00001
         self.maker_only_enabled = True
         
-    def check_market_conditions(self, price: float, volume: float) -> Dict[str, Any]:
-        """Verificar condiciones de mercado para operar"""
+        # Velas reales (BarResampler); sin historia suficiente se simulan los indicadores
+        self.bar_source = None
+        
+    def check_market_conditions(self, price: float, volume: float, symbol: str = None,
+                                live: bool = False) -> Dict[str, Any]:
+        """Verificar condiciones de mercado para operar (live: solo velas reales, nada simulado)"""
         try:
-            # Simular indicadores técnicos
-            atr_value = self.simulate_atr(price)
-            ema_value = self.simulate_ema(price)
-            spread_value = self.simulate_spread(price)
+            indicators = self.indicators_from_bars(symbol) if self.bar_source is not None and symbol else None
+            if indicators:
+                atr_value, ema_value = indicators
+            elif live:
+                return {'can_trade': False, 'reason': "Sin velas reales para ATR/EMA", 'reason_code': 'no_bars'}
+            else:
+                atr_value = self.simulate_atr(price)
+                ema_value = self.simulate_ema(price)
+            # En real el spread lo filtra la etapa pre-trade con el libro del exchange
+            spread_value = None if live else self.simulate_spread(price)
             
             # Spread adaptativo
             current_spread_max = self.spread_max
-            if self.spread_adaptive_on and spread_value > self.spread_max:
+            if self.spread_adaptive_on and spread_value is not None and spread_value > self.spread_max:
                 # Permitir spread más alto si es necesario
                 current_spread_max = min(spread_value * 1.2, self.spread_adaptive_threshold)
-                self.logger.info(f"📊 Spread adaptativo: {spread_value:.3f}% → permitido hasta {current_spread_max:.3f}%")
+                self.logger.debug("📊 Spread adaptativo: %.3f%% → permitido hasta %.3f%%", spread_value, current_spread_max)
             
             filter_status = {
                 'can_trade': True,
@@ -486,25 +663,25 @@ class MarketFilter:
                 'spread_adaptive': self.spread_adaptive_on
             }
             
-            # Filtro ATR (volatilidad mínima) con umbral dinámico y relajación
-            atr_min_dynamic = 0.033 + (0.017 * random.random())  # 0.033–0.050 (reducido de 0.32-0.40)
+            # Filtro ATR (volatilidad mínima) con umbral dinámico y relajación (en real, el máximo fijo)
+            atr_min_dynamic = 0.050 if live else 0.033 + (0.017 * random.random())  # 0.033–0.050 (reducido de 0.32-0.40)
             
             # === FASE 1.6: ATR SUAVE ===
             ATR_RELAX_FACTOR = 0.95
-            spread_bps = spread_value * 10000  # Convertir a bps
             max_spread_bps = 2.0  # Config.MAX_SPREAD_BPS
+            spread_bps = spread_value * 10000 if spread_value is not None else max_spread_bps  # Convertir a bps
             
             # Aplicar ATR suave si condiciones son favorables (spread bajo)
             if spread_bps <= 0.6 * max_spread_bps:
                 atr_min_effective = atr_min_dynamic * ATR_RELAX_FACTOR
-                self.logger.info(f"🎯 ATR suave aplicado: {atr_min_dynamic:.3f} → {atr_min_effective:.3f} (spread={spread_bps:.1f} bps)")
+                self.logger.debug("🎯 ATR suave aplicado: %.3f → %.3f (spread=%.1f bps)", atr_min_dynamic, atr_min_effective, spread_bps)
             else:
                 atr_min_effective = atr_min_dynamic
             
             if atr_value < atr_min_effective:
                 filter_status['can_trade'] = False
                 filter_status['reason'] = f"Volatilidad insuficiente: ATR={atr_value:.3f} (<{atr_min_effective:.3f})"
-                filter_status['reason_code'] = 'low_volatility'
+                filter_status['reason_code'] = 'low_vol'
                 return filter_status
             
             # Filtro EMA50 (tendencia)
@@ -514,7 +691,7 @@ class MarketFilter:
                 filter_status['direction'] = 'SELL'
             
             # Filtro spread adaptativo con tolerancia epsilon
-            if (spread_value - current_spread_max) > self.spread_epsilon:
+            if spread_value is not None and (spread_value - current_spread_max) > self.spread_epsilon:
                 filter_status['can_trade'] = False
                 filter_status['reason'] = f"Spread alto: {spread_value:.3f}% (máx: {current_spread_max:.3f}%)"
                 filter_status['reason_code'] = 'spread_high'
@@ -525,6 +702,31 @@ class MarketFilter:
             self.logger.error(f"❌ Error en filtros de mercado: {e}")
             return {'can_trade': False, 'reason': f"Error de filtros: {e}"}
     
+    def check_regime_stage(self, ctx: FilterContext) -> Optional[str]:
+        """Etapa: volatilidad mínima, tendencia y spread adaptativo"""
+        conditions = ctx.get('market_conditions')
+        if conditions['can_trade']:
+            return None
+        ctx.message = conditions['reason']
+        return conditions.get('reason_code') or 'other'
+    
+    def indicators_from_bars(self, symbol: str) -> Optional[Tuple[float, float]]:
+        """ATR (% del cierre) en atr_timeframe y EMA en ema_timeframe desde el resampler"""
+        atr_bars = self.bar_source.get_bars(symbol, self.atr_timeframe, self.atr_period + 1)
+        ema_bars = self.bar_source.get_bars(symbol, self.ema_timeframe, self.ema_period)
+        if len(atr_bars) <= self.atr_period or len(ema_bars) < self.ema_period:
+            return None
+        
+        # Velas: (open_time, open, high, low, close, volume)
+        true_ranges = [max(bar[2], prev[4]) - min(bar[3], prev[4]) for prev, bar in zip(atr_bars, atr_bars[1:])]
+        atr_pct = sum(true_ranges) / len(true_ranges) / atr_bars[-1][4] * 100
+        
+        alpha = 2 / (self.ema_period + 1)
+        ema = ema_bars[0][4]
+        for bar in ema_bars[1:]:
+            ema += alpha * (bar[4] - ema)
+        return atr_pct, ema
+    
     def simulate_atr(self, price: float) -> float:
         """Simular valor ATR"""
         return random.uniform(0.033, 0.8)  # Rango realista: 0.033% - 0.8%
@@ -594,7 +796,7 @@ class PositionManager:
                 'spread_adaptive': self.spread_adaptive_on
             }
             
-            self.logger.info(f"💰 Tamaño posición: ${final_size:.2f} (ATR: {atr_value:.3f}, Maker: {self.enable_maker_only})")
+            self.logger.debug("💰 Tamaño posición: $%.2f (ATR: %.3f, Maker: %s)", final_size, atr_value, self.enable_maker_only)
             return position_data
             
         except Exception as e:
@@ -615,8 +817,9 @@ class PositionManager:
                 sl_price = entry_price + sl_distance
                 tp_price = entry_price - tp_distance
             
-            # Trailing stop
-            trailing_activation_price = entry_price + (tp_distance * self.trailing_activation)
+            # Trailing stop (la activación va en la dirección del TP)
+            direction_sign = 1 if direction == 'BUY' else -1
+            trailing_activation_price = entry_price + direction_sign * (tp_distance * self.trailing_activation)
             trailing_step = tp_distance * self.trailing_step
             
             sl_tp_data = {
@@ -627,30 +830,116 @@ class PositionManager:
                 'atr_value': atr_value
             }
             
-            self.logger.info(f"📊 SL: ${sl_price:.2f}, TP: ${tp_price:.2f} (ATR: {atr_value:.3f})")
+            self.logger.debug("📊 SL: $%.2f, TP: $%.2f (ATR: %.3f)", sl_price, tp_price, atr_value)
             return sl_tp_data
             
         except Exception as e:
             self.logger.error(f"❌ Error calculando SL/TP: {e}")
             return {'sl_price': 0, 'tp_price': 0}
+    
+    def build_exit_levels(self, entry_price: float, direction: str, tp_pct: float, sl_pct: float) -> Dict[str, Any]:
+        """Niveles absolutos de salida (TP/SL/trailing) a partir de targets en fracción"""
+        direction_sign = 1 if direction == 'BUY' else -1
+        tp_distance = entry_price * tp_pct
+        sl_distance = entry_price * sl_pct
+        
+        return {
+            'tp_price': entry_price + direction_sign * tp_distance,
+            'sl_price': entry_price - direction_sign * sl_distance,
+            'trailing_activation': entry_price + direction_sign * (tp_distance * self.trailing_activation),
+            'trailing_step': tp_distance * self.trailing_step
+        }
+
+class SymbolPerformance:
+    """Agregados incrementales de rendimiento realizado de un símbolo (toda la sesión)"""
+    
+    __slots__ = ('symbol', 'trades', 'wins', 'losses', 'gross_pnl', 'net_pnl', 'fees', 'notional',
+                 'net_gains', 'net_losses', 'peak_net', 'max_adverse_run', 'loss_streak', 'max_loss_streak')
+    
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.trades = 0
+        self.wins = 0
+        self.losses = 0
+        self.gross_pnl = 0.0
+        self.net_pnl = 0.0
+        self.fees = 0.0
+        self.notional = 0.0
+        self.net_gains = 0.0
+        self.net_losses = 0.0
+        self.peak_net = 0.0
+        self.max_adverse_run = 0.0  # mayor caída pico-valle del P&L neto acumulado
+        self.loss_streak = 0
+        self.max_loss_streak = 0
+    
+    def add(self, operation: Dict[str, Any]) -> None:
+        net = operation.get('net_pnl', operation.get('pnl_net', 0.0))
+        self.trades += 1
+        self.gross_pnl += operation.get('gross_pnl', 0.0)
+        self.net_pnl += net
+        self.fees += operation.get('fees_cost', operation.get('fees', 0.0))
+        self.notional += operation.get('notional', 0.0)
+        
+        if operation.get('result') == 'GANANCIA':
+            self.wins += 1
+            self.loss_streak = 0
+        else:
+            self.losses += 1
+            self.loss_streak += 1
+            self.max_loss_streak = max(self.max_loss_streak, self.loss_streak)
+        
+        if net > 0:
+            self.net_gains += net
+        else:
+            self.net_losses -= net
+        
+        if self.net_pnl > self.peak_net:
+            self.peak_net = self.net_pnl
+        self.max_adverse_run = max(self.max_adverse_run, self.peak_net - self.net_pnl)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'symbol': self.symbol,
+            'trades': self.trades,
+            'wins': self.wins,
+            'losses': self.losses,
+            'win_rate': self.wins / self.trades * 100 if self.trades else 0.0,
+            'gross_pnl': self.gross_pnl,
+            'net_pnl': self.net_pnl,
+            'fees': self.fees,
+            'profit_factor': self.net_gains / self.net_losses if self.net_losses > 0 else 0.0,
+            'expectancy_bps': self.net_pnl / self.notional * 10000 if self.notional > 0 else 0.0,
+            'max_adverse_run': self.max_adverse_run,
+            'max_loss_streak': self.max_loss_streak
+        }
 
 class MetricsTracker:
     """Sistema de monitoreo de métricas clave con fees incluidos"""
     
-    def __init__(self, max_operations: int = 50):
+    def __init__(self, max_operations: int = 50, initial_capital: float = None):
         self.logger = logging.getLogger(__name__)
         self.max_operations = max_operations
         self.operations_history: List[Dict] = []
-        self.peak_capital = 50.0
-        self.current_capital = 50.0
+        self.peak_capital = initial_capital if initial_capital is not None else config.INITIAL_CAPITAL
+        self.current_capital = self.peak_capital
         self.fees_included = True
         
+        # Agregados por símbolo (no se recortan con la ventana de max_operations)
+        self.symbol_stats: Dict[str, SymbolPerformance] = {}
+        
     def add_operation(self, operation: Dict[str, Any]) -> None:
         """Añadir operación al historial"""
         try:
             # Añadir operación
             self.operations_history.append(operation)
             
+            # Actualizar agregados del símbolo
+            symbol = operation.get('symbol', 'UNKNOWN')
+            stats = self.symbol_stats.get(symbol)
+            if stats is None:
+                stats = self.symbol_stats[symbol] = SymbolPerformance(symbol)
+            stats.add(operation)
+            
             # Mantener solo las últimas max_operations
             if len(self.operations_history) > self.max_operations:
                 self.operations_history = self.operations_history[-self.max_operations:]
@@ -662,7 +951,7 @@ class MetricsTracker:
             if self.current_capital > self.peak_capital:
                 self.peak_capital = self.current_capital
                 
-            self.logger.info(f"✅ Operación añadida al historial. Total: {len(self.operations_history)}")
+            self.logger.debug("✅ Operación añadida al historial. Total: %d", len(self.operations_history))
             
         except Exception as e:
             self.logger.error(f"❌ Error añadiendo operación: {e}")
@@ -677,7 +966,7 @@ class MetricsTracker:
             total_operations = len(self.operations_history)
             
             win_rate = (winning_operations / total_operations) * 100
-            self.logger.info(f"📊 Win Rate calculado: {win_rate:.2f}% ({winning_operations}/{total_operations})")
+            self.logger.debug("📊 Win Rate calculado: %.2f%% (%d/%d)", win_rate, winning_operations, total_operations)
             return win_rate
             
         except Exception as e:
@@ -708,9 +997,10 @@ class MetricsTracker:
             
             # Log sin mostrar infinito
             if total_losses == 0 and total_gains > 0:
-                self.logger.info(f"📈 Profit Factor (neto) calculado: N/A (Gains: ${total_gains:.4f}, Losses: $0.0000)")
+                self.logger.debug("📈 Profit Factor (neto) calculado: N/A (Gains: $%.4f, Losses: $0.0000)", total_gains)
             else:
-                self.logger.info(f"📈 Profit Factor (neto) calculado: {profit_factor:.2f} (Gains: ${total_gains:.4f}, Losses: ${total_losses:.4f})")
+                self.logger.debug("📈 Profit Factor (neto) calculado: %.2f (Gains: $%.4f, Losses: $%.4f)",
+                                  profit_factor, total_gains, total_losses)
             
             return profit_factor
             
@@ -745,13 +1035,27 @@ class MetricsTracker:
                 return 0.0
             
             drawdown = ((self.peak_capital - self.current_capital) / self.peak_capital) * 100
-            self.logger.info(f"📉 Drawdown calculado: {drawdown:.2f}% (Peak: ${self.peak_capital:.2f}, Current: ${self.current_capital:.2f})")
+            self.logger.debug("📉 Drawdown calculado: %.2f%% (Peak: $%.2f, Current: $%.2f)",
+                              drawdown, self.peak_capital, self.current_capital)
             return drawdown
             
         except Exception as e:
             self.logger.error(f"❌ Error calculando Drawdown: {e}")
             return 0.0
     
+    def get_symbol_stats(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Rendimiento realizado de un símbolo (None si no ha operado)"""
+        stats = self.symbol_stats.get(symbol)
+        return stats.to_dict() if stats else None
+    
+    def get_symbols_traded(self) -> List[str]:
+        return list(self.symbol_stats)
+    
+    def get_symbol_breakdown(self) -> Dict[str, Dict[str, Any]]:
+        """Desglose por símbolo ordenado por P&L neto"""
+        ranked = sorted(self.symbol_stats.values(), key=lambda stats: stats.net_pnl, reverse=True)
+        return {stats.symbol: stats.to_dict() for stats in ranked}
+    
     def get_metrics_summary(self) -> Dict[str, Any]:
         """Obtener resumen de métricas"""
         try:
@@ -768,18 +1072,35 @@ class MetricsTracker:
                 'peak_capital': self.peak_capital
             }
             
-            self.logger.info(f"📊 Métricas calculadas: WR={win_rate:.2f}%, PF={profit_factor:.2f}, DD={drawdown:.2f}%")
+            self.logger.debug("📊 Métricas calculadas: WR=%.2f%%, PF=%.2f, DD=%.2f%%", win_rate, profit_factor, drawdown)
             return metrics
             
         except Exception as e:
             self.logger.error(f"❌ Error obteniendo métricas: {e}")
             return {}
 
+def sheets_transport_errors() -> Tuple[type, ...]:
+    """Errores que indican Sheets caído (API de gspread, red, timeout); el resto es local"""
+    errors = [requests.exceptions.RequestException, ConnectionError, TimeoutError, socket.timeout]
+    try:
+        from gspread.exceptions import GSpreadException
+        errors.append(GSpreadException)
+    except ImportError:
+        pass
+    try:
+        from google.auth.exceptions import TransportError
+        errors.append(TransportError)
+    except ImportError:
+        pass
+    return tuple(errors)
+
 class GoogleSheetsLogger:
     """Logger profesional para Google Sheets con métricas"""
     
-    def __init__(self):
+    def __init__(self, breaker: CircuitBreaker = None):
         self.logger = logging.getLogger(__name__)
+        self.breaker = breaker or CircuitBreaker('sheets')
+        self.transport_errors = sheets_transport_errors()
         self.sheets_enabled = False
         self.spreadsheet_name = "Trading Bot Log"
         self.worksheet_name = "Trading Log"
@@ -820,7 +1141,7 @@ class GoogleSheetsLogger:
     def log_trade(self, trade_data: Dict[str, Any], metrics: Dict[str, Any] = None) -> bool:
         """Log trade a Google Sheets con métricas"""
         try:
-            if not self.sheets_enabled:
+            if not self.sheets_enabled or not self.breaker.allow():
                 return False
             
             # Obtener worksheet
@@ -883,17 +1204,24 @@ class GoogleSheetsLogger:
             
             # Añadir fila
             worksheet.append_row(row_data)
-            self.logger.info("✅ Trade FASE 1.6 registrado en Google Sheets con métricas mejoradas")
+            self.breaker.record_success()
+            self.logger.debug("✅ Trade FASE 1.6 registrado en Google Sheets con métricas mejoradas")
             return True
             
-        except Exception as e:
+        except self.transport_errors as e:
+            self.breaker.record_failure(e)
             self.logger.error(f"❌ Error registrando trade FASE 1.6 en Sheets: {e}")
             return False
+        except Exception as e:
+            # Error local (datos o formato): Sheets responde, el circuito no cuenta el fallo
+            self.breaker.release()
+            self.logger.error(f"❌ Error preparando trade FASE 1.6 para Sheets: {e}")
+            return False
     
     def log_telemetry(self, telemetry_data: Dict[str, Any]) -> bool:
         """Log telemetría a Google Sheets"""
         try:
-            if not self.sheets_enabled:
+            if not self.sheets_enabled or not self.breaker.allow():
                 return False
             
             # Obtener worksheet de telemetría
@@ -910,7 +1238,8 @@ class GoogleSheetsLogger:
                     'Trades/Hour', 'Fees Ratio', 'Rejection Low Vol', 
                     'Rejection Trend Mismatch', 'Rejection Spread', 
                     'Rejection Safety', 'Rejection Cooldown', 'Total Signals',
-                    'Probation Mode', 'Racha Cooldown'
+                    'Probation Mode', 'Racha Cooldown', 'Rejection Pre-Trade', 'Top Rejection 1h',
+                    'Weight Headroom', 'Circuit Breakers', 'Cycle Budget p95'
                 ]
                 worksheet.append_row(headers)
             
@@ -934,17 +1263,29 @@ class GoogleSheetsLogger:
                 f"{telemetry_data.get('rejection_cooldown', 0):.2f}%",  # Rejection Cooldown
                 telemetry_data.get('total_signals', 0),  # Total Signals
                 telemetry_data.get('probation_mode', False),  # Probation Mode
-                telemetry_data.get('racha_cooldown', False)  # Racha Cooldown
+                telemetry_data.get('racha_cooldown', False),  # Racha Cooldown
+                f"{telemetry_data.get('rejection_pre_trade', 0):.2f}%",  # Rejection Pre-Trade
+                telemetry_data.get('top_rejection', ''),  # Top Rejection 1h
+                f"{telemetry_data['weight_headroom']:.1f}%" if telemetry_data.get('weight_headroom') is not None else '',
+                telemetry_data.get('circuit_breakers', ''),  # Circuit Breakers
+                f"{telemetry_data.get('cycle_budget_pct', 0):.0f}%"  # Cycle Budget p95
             ]
             
             # Añadir fila
             worksheet.append_row(row_data)
-            self.logger.info("✅ Telemetría registrada en Google Sheets")
+            self.breaker.record_success()
+            self.logger.debug("✅ Telemetría registrada en Google Sheets")
             return True
             
-        except Exception as e:
+        except self.transport_errors as e:
+            self.breaker.record_failure(e)
             self.logger.error(f"❌ Error registrando telemetría FASE 1.6 en Sheets: {e}")
             return False
+        except Exception as e:
+            # Error local (datos o formato): Sheets responde, el circuito no cuenta el fallo
+            self.breaker.release()
+            self.logger.error(f"❌ Error preparando telemetría FASE 1.6 para Sheets: {e}")
+            return False
 
 class LocalLogger:
     """Logger local para análisis y respaldo"""
@@ -1012,7 +1353,7 @@ class LocalLogger:
             with open(file_path, 'w', encoding='utf-8') as f:
                 json.dump(operations, f, indent=2, ensure_ascii=False)
             
-            self.logger.info("✅ Operación registrada localmente")
+            self.logger.debug("✅ Operación registrada localmente")
             return True
             
         except Exception as e:
@@ -1026,23 +1367,60 @@ class ProfessionalTradingBot:
         self.logger = logging.getLogger(__name__)
         self.running = True
         self.cycle_count = 0
-        self.current_capital = 50.0
+        
+        # === FASE 1.6: CIRCUIT BREAKERS (Sheets, Telegram, exchange) ===
+        self.circuit_breakers = init_circuit_breakers(config)
+        
+        # === FASE 1.6: WATCHDOG DEL CICLO (el hilo arranca en start()) ===
+        self.cycle_watchdog = init_cycle_watchdog(config, on_restart=self.request_restart,
+                                                  exit_fn=watchdog_hard_exit)
+        
+        # === FASE 1.6: TRAZA POR CICLO (Chrome/Perfetto, opt-in con TRACE_ENABLED) ===
+        self.cycle_tracer = init_cycle_tracer(config)
+        
+        # === FASE 1.6: CUENTA (balances/equity en memoria) ===
+        self.initial_capital = config.INITIAL_CAPITAL
+        self.account_state = AccountState()
+        self.metrics_tracker = MetricsTracker(initial_capital=self.initial_capital)
         
         # === FASE 1.6: MULTI-PAR CONFIGURACIÓN ===
         self.symbols = config.SYMBOLS  # ['BTCUSDT', 'ETHUSDT', 'BNBUSDT', 'SOLUSDT']
         self.current_symbol_index = 0
         self.symbol_rotation_counter = 0
+        self.shard_index = 0
+        self.shard_count = 1  # > 1: este proceso solo opera los pares de su shard
         
         # === FASE 1.6: AUTO PAIR SELECTOR ===
         self.auto_pair_selector = config.AUTO_PAIR_SELECTOR
         self.pair_selector = None
+        self.pair_selector_service = None  # selector en proceso aparte (PAIR_SELECTOR_MODE=process)
+        self.selector_snapshot: Dict[str, Any] = {}
         self.active_pairs = []
         
         # Inicializar Auto Pair Selector UNA SOLA VEZ
-        if self.auto_pair_selector:
+        live_data = config.LIVE_TRADING and not config.SHADOW_MODE and config.MODE != 'testnet'
+        selector_mode = config.PAIR_SELECTOR_MODE
+        if selector_mode == 'process' and live_data and not config.MARKET_BUS_NAME:
+            # El proceso del selector solo lee datos reales del bus: sin bus, selector en línea con el REST del trader
+            self.logger.warning("⚠️ PAIR_SELECTOR_MODE=process sin MARKET_BUS_NAME: selector en línea")
+            selector_mode = 'inline'
+        if self.auto_pair_selector and selector_mode == 'shard':
+            # Shard: el supervisor ejecuta el único selector y reenvía sus publicaciones (attach_shard)
+            self.active_pairs = config.SYMBOLS[:config.MAX_ACTIVE_PAIRS]
+        elif self.auto_pair_selector and selector_mode == 'process':
             try:
-                from pair_selector import PairSelector
-                self.pair_selector = PairSelector()
+                # El proceso del selector publica los pares; hasta la primera publicación, pares por defecto
+                self.pair_selector_service = init_pair_selector_service(config)
+                self.active_pairs = config.SYMBOLS[:config.MAX_ACTIVE_PAIRS]
+                self.logger.info(f"🎯 Auto Pair Selector: ✅ ACTIVO (proceso aparte) - Pares iniciales: {', '.join(self.active_pairs)}")
+            except Exception as e:
+                self.logger.error(f"❌ Error lanzando el servicio del selector: {e}")
+                self.active_pairs = config.SYMBOLS[:config.MAX_ACTIVE_PAIRS]
+                self.auto_pair_selector = False
+        elif self.auto_pair_selector:
+            try:
+                self.pair_selector = init_pair_selector(config)
+                self.pair_selector.set_performance_source(self.metrics_tracker.get_symbol_stats)
                 self.active_pairs = self.initialize_active_pairs()
                 if self.active_pairs:
                     self.logger.info(f"🎯 Auto Pair Selector: ✅ ACTIVO - Pares activos: {', '.join(self.active_pairs)}")
@@ -1060,18 +1438,82 @@ class ProfessionalTradingBot:
         # === FASE 1.6: RESUMEN DIARIO ===
         self.daily_summary_enabled = config.DAILY_SUMMARY_ENABLED
         self.daily_summary_time = config.DAILY_SUMMARY_TIME
+        self.daily_summary_hour, self.daily_summary_minute, self.daily_summary_tz = \
+            parse_daily_summary_time(self.daily_summary_time)
         self.last_daily_summary = None
+        self.last_daily_summary_date = None
         self.daily_trades = []
         self.daily_pnl_net = 0.0
         
         # Inicializar sistemas
-        self.metrics_tracker = MetricsTracker()
-        self.safety_manager = SafetyManager()
+        self.safety_manager = SafetyManager(initial_capital=self.initial_capital)
         self.market_filter = MarketFilter()
         self.position_manager = PositionManager()
-        self.sheets_logger = GoogleSheetsLogger()
+        self.sheets_logger = GoogleSheetsLogger(self.circuit_breakers['sheets'])
         self.local_logger = LocalLogger()
         self.telemetry_manager = TelemetryManager(self)
+        self.position_book = PositionBook()
+        self.pending_exits: Dict[int, Dict[str, Any]] = {}  # posición → orden de salida en vuelo
+        self.unpriced_assets: List[str] = []  # activos con saldo sin libro real para valorarlos
+        self.volume_24h: Dict[str, Tuple[float, float]] = {}  # símbolo → (instante, volumen quote 24h)
+        
+        # === FASE 1.6: PIPELINE DE ENTRADA (orden adaptativo por coste/selectividad) ===
+        self.entry_loaders = {
+            'safety_status': self.load_safety_status,
+            'market_conditions': self.load_market_conditions,
+            'market_data': self.load_market_data,
+            'targets': self.load_targets
+        }
+        self.entry_pipeline = self.build_entry_pipeline()
+        if self.cycle_tracer.enabled:
+            # Spans por filtro y por loader solo con traza activa (sin coste si está apagada)
+            self.entry_loaders.update({name: self.cycle_tracer.wrap_loader(name, loader)
+                                       for name, loader in self.entry_loaders.items()})
+            self.entry_pipeline.tracer = self.cycle_tracer
+        
+        # === FASE 1.6: GATEWAY DE ÓRDENES (solo LIVE sin shadow) ===
+        self.order_gateway = None
+        self.user_data_stream = None
+        if config.LIVE_TRADING and not config.SHADOW_MODE:
+            self.setup_order_gateway()
+        
+        # Sin cuenta real: capital simulado desde INITIAL_CAPITAL
+        if not self.account_state.bootstrapped:
+            self.account_state.bootstrap_simulated(self.initial_capital)
+        
+        # === FASE 1.6: METADATOS DE SÍMBOLOS (tick/step/min notional) ===
+        self.symbol_registry = init_symbol_registry(
+            config, rest_client=self.order_gateway.rest if self.order_gateway else None
+        )
+        
+        # Selector con datos reales (cribado bulk + klines) cuando hay gateway; testnet sigue simulado
+        if self.pair_selector and self.order_gateway and config.MODE != 'testnet':
+            self.pair_selector.set_rest_client(self.order_gateway.rest)
+        
+        # === FASE 1.6: VELAS MULTI-TIMEFRAME DESDE UNA SERIE BASE DE 1m ===
+        # Con bus de mercado local las velas y el libro llegan del feed-handler (sin REST propio)
+        self.bar_resampler = None
+        self.market_consumer = None
+        if config.MARKET_BUS_NAME:
+            try:
+                self.market_consumer = MarketDataConsumer.attach(config.MARKET_BUS_NAME,
+                                                                 base_minutes=config.BAR_BASE_MINUTES)
+                self.market_filter.bar_source = self.market_consumer.resampler
+                if self.pair_selector:
+                    self.pair_selector.set_bar_source(self.market_consumer.resampler)
+                self.logger.info("📡 Bus de mercado %s: %d símbolos", config.MARKET_BUS_NAME,
+                                 len(self.market_consumer.bus.symbols))
+            except (FileNotFoundError, ValueError) as e:
+                self.logger.warning(f"⚠️ Bus de mercado {config.MARKET_BUS_NAME} no disponible: {e}")
+        if self.market_consumer is None and config.BAR_RESAMPLER_ENABLED and self.order_gateway \
+                and config.MODE != 'testnet':
+            self.bar_resampler = BarResampler(base_minutes=config.BAR_BASE_MINUTES)
+            self.market_filter.bar_source = self.bar_resampler
+            if self.pair_selector:
+                self.pair_selector.set_bar_source(self.bar_resampler)
+        
+        # === FASE 1.6: PRECIO SIMULADO (mercado sintético determinista, velas de 1m) ===
+        self.synthetic_tape = SyntheticTape(SyntheticMarket(seed=config.SYNTHETIC_SEED, bar_seconds=60))
         
         # Configuración de trading
         self.update_interval = 180  # 3 minutos (configurable)
@@ -1132,6 +1574,89 @@ class ProfessionalTradingBot:
         self.send_telegram_message(startup_message)
         self.logger.info("✅ Bot profesional - FASE 1.6 MULTI-PAR + AUTO PAIR SELECTOR iniciado correctamente")
     
+    @property
+    def current_capital(self) -> float:
+        """Equity actual (lectura O(1) de la caché de cuenta)"""
+        return self.account_state.get_equity()
+    
+    def setup_order_gateway(self) -> bool:
+        """Inicializar gateway de órdenes y user-data stream para ejecución real"""
+        try:
+            if not ORDER_GATEWAY_AVAILABLE:
+                self.logger.warning("⚠️ Order Gateway no disponible - ejecución simulada")
+                return False
+            
+            if get_request_budget() is None:  # un shard ya está adjunto al bucket compartido
+                init_request_budget(config)  # antes del cliente REST: todas sus peticiones pasan por él
+            gateway = init_order_gateway(config)
+            stream = UserDataStream()
+            stream.subscribe(gateway.on_user_data)
+            stream.subscribe(self.account_state.on_user_data)
+            
+            # Sin user-data stream no hay seguimiento de fills: no operar en real
+            if not stream.start(api_key=config.BINANCE_API_KEY, api_secret=config.BINANCE_SECRET_KEY,
+                                testnet=config.MODE == 'testnet'):
+                self.logger.error("❌ User-data stream no disponible - ejecución simulada")
+                return False
+            
+            # Snapshot de balances tras abrir el stream (los eventos intermedios quedan en cola)
+            if not self.account_state.bootstrap(gateway.rest):
+                self.logger.error("❌ Balances no disponibles - ejecución simulada")
+                stream.stop()
+                return False
+            
+            # Valorar los activos no-quote del snapshot antes de fijar el capital inicial
+            self.order_gateway = gateway
+            self.mark_account(self.position_books(self.account_state.mark_symbols()))
+            self.initial_capital = self.account_state.get_equity()
+            self.safety_manager.reset_session_capital(self.initial_capital)
+            self.metrics_tracker.peak_capital = self.initial_capital
+            self.metrics_tracker.current_capital = self.initial_capital
+            
+            self.user_data_stream = stream
+            self.logger.info(f"✅ Order Gateway activo (maker_only={config.MAKER_ONLY}, retry={config.RETRY_ORDER})")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"❌ Error inicializando Order Gateway: {e}")
+            self.order_gateway = None
+            return False
+    
+    def execute_entry_order(self, signal: Dict[str, Any], notional: float, market_data: Dict[str, Any],
+                            symbol_spec: Any = None) -> Dict[str, Any]:
+        """Ejecutar entrada real con orden maker en el lado pasivo del libro"""
+        symbol = signal['symbol']
+        side = signal['signal']
+        
+        # Solo libro real del exchange: sin él no se coloca la orden (nunca la cinta sintética)
+        best_bid, best_ask = market_data.get('best_bid'), market_data.get('best_ask')
+        if market_data.get('book_source') not in LIVE_BOOK_SOURCES or not best_bid or not best_ask:
+            self.logger.warning("⚠️ Entrada %s no colocada: sin libro real del exchange", symbol)
+            return {'filled': False, 'executed_qty': 0.0, 'avg_price': 0.0, 'slippage_bps': 0.0,
+                    'attempts': 0, 'order': None, 'reason': 'NO_BOOK'}
+        reference_price = (best_bid + best_ask) / 2
+        
+        # Post-only: comprar en el bid, vender en el ask
+        limit_price = best_bid if side == 'BUY' else best_ask
+        if symbol_spec is not None:
+            # Precio al tick (lado pasivo) y cantidad al step
+            order_limits = symbol_spec.quantize_order(limit_price, notional, side)
+            limit_price, quantity = order_limits['price'], order_limits['quantity']
+        else:
+            quantity = notional / limit_price
+        
+        # Espera del fill acotada: el watchdog amplía el umbral de bloqueo del ciclo en su máximo
+        with bounded_wait('order_wait', self.order_gateway.max_wait_sec(config.ORDER_FILL_TIMEOUT_SEC)):
+            execution = self.order_gateway.execute_maker_order(
+                symbol, side, quantity, limit_price,
+                intent_key=f"{symbol}:{signal['timestamp']}",
+                reference_price=reference_price,
+                fill_timeout=config.ORDER_FILL_TIMEOUT_SEC,
+                reprice=self.passive_price
+            )
+        execution['reference_price'] = reference_price
+        return execution
+    
     def initialize_active_pairs(self) -> List[str]:
         """Inicializar pares activos usando Auto Pair Selector o fallback"""
         try:
@@ -1160,20 +1685,61 @@ class ProfessionalTradingBot:
         self.current_symbol_index = (self.current_symbol_index + 1) % len(self.symbols)
         self.symbol_rotation_counter += 1
         new_symbol = self.get_current_symbol()
-        self.logger.info(f"🔄 Rotando símbolo: {new_symbol} (ciclo {self.symbol_rotation_counter})")
+        self.logger.info("🔄 Rotando símbolo: %s (ciclo %d)", new_symbol, self.symbol_rotation_counter)
         return new_symbol
     
     def should_rotate_symbol(self) -> bool:
         """Verificar si debe rotar símbolo (cada 4 ciclos)"""
         return self.cycle_count > 0 and self.cycle_count % 4 == 0
     
+    def sync_bars(self) -> int:
+        """Sincronizar la serie de 1m de los símbolos vigilados; suelta los que salen del universo"""
+        try:
+            watched = set(self.active_pairs or self.symbols)
+            if self.pair_selector:
+                watched.update(self.pair_selector.pair_data)
+            watched.update(self.selector_snapshot.get('candidates', ()))
+            for symbol in set(self.bar_resampler.series) - watched:
+                self.bar_resampler.drop(symbol)
+            return self.bar_resampler.sync(self.order_gateway.rest, sorted(watched))
+        except Exception as e:
+            self.logger.error(f"❌ Error sincronizando velas: {e}")
+            return 0
+    
+    def apply_selector_snapshot(self) -> bool:
+        """
+        Modo proceso: enviar posiciones/rendimiento al servicio y adoptar su última
+        publicación. Nunca espera al selector; el cambio de pares es una única asignación.
+        """
+        try:
+            service = self.pair_selector_service
+            service.send_positions(self.position_book.open_symbols())
+            service.send_performance(self.metrics_tracker.get_symbol_breakdown())
+            snapshot = service.poll()
+            if snapshot is None:
+                return False
+            self.selector_snapshot = snapshot
+            new_active_pairs = snapshot['active_pairs']
+            if not new_active_pairs or new_active_pairs == self.active_pairs:
+                return False
+            old_pairs = ', '.join(self.active_pairs)
+            self.active_pairs = list(new_active_pairs)
+            self.logger.info("🔄 Pares rebalanceados (servicio, %.0f ms): %s → %s",
+                             snapshot['duration_ms'], old_pairs, ', '.join(self.active_pairs))
+            return True
+        except Exception as e:
+            self.logger.error(f"❌ Error leyendo el servicio del selector: {e}")
+            return False
+    
     def should_rebalance_pairs(self) -> bool:
         """Verificar si debe rebalancear pares (Auto Pair Selector)"""
         if not self.auto_pair_selector or not self.pair_selector:
             return False
         
         try:
-            return self.pair_selector.should_rebalance()
+            # Scores al día con las barras cerradas (solo los candidatos con barras nuevas)
+            self.pair_selector.update_scores()
+            return self.pair_selector.should_rebalance(self.position_book.open_symbols())
         except Exception as e:
             self.logger.error(f"❌ Error verificando rebalance: {e}")
             return False
@@ -1185,7 +1751,9 @@ class ProfessionalTradingBot:
                 return False
             
             self.logger.info("🔄 Iniciando rebalance de pares...")
-            new_active_pairs = self.pair_selector.select_active_pairs()
+            new_active_pairs = self.pair_selector.select_active_pairs(
+                self.position_book.open_symbols(), refresh=self.pair_selector.needs_full_refresh()
+            )
             
             if new_active_pairs and new_active_pairs != self.active_pairs:
                 old_pairs = ', '.join(self.active_pairs)
@@ -1214,6 +1782,10 @@ class ProfessionalTradingBot:
             chat_id = os.getenv('TELEGRAM_CHAT_ID')
             
             if bot_token and chat_id:
+                breaker = self.circuit_breakers['telegram']
+                if not breaker.allow():
+                    self.logger.debug("🔌 Telegram omitido: circuito abierto")
+                    return
                 url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
                 data = {
                     'chat_id': chat_id,
@@ -1221,7 +1793,18 @@ class ProfessionalTradingBot:
                     'parse_mode': 'Markdown'
                 }
                 
-                response = requests.post(url, data=data, timeout=10)
+                try:
+                    with cycle_stage('telegram', cat='sink') as span:
+                        response = requests.post(url, data=data, timeout=10)
+                        span.set(outcome=response.status_code)
+                except Exception as e:
+                    breaker.record_failure(e)
+                    raise
+                # 5xx/429 = Telegram caído o saturado; otro 4xx es un problema del mensaje
+                if response.status_code >= 500 or response.status_code == 429:
+                    breaker.record_failure(f"HTTP {response.status_code}")
+                else:
+                    breaker.record_success()
                 if response.status_code == 200:
                     self.logger.info("✅ Mensaje enviado a Telegram")
                 else:
@@ -1252,8 +1835,8 @@ class ProfessionalTradingBot:
             profit_factor = gains / losses if losses > 0 else (gains if gains > 0 else 0)
             
             # Calcular Drawdown
-            peak_capital = max([t.get('capital', 50.0) for t in self.daily_trades])
-            current_capital = self.daily_trades[-1].get('capital', 50.0) if self.daily_trades else 50.0
+            peak_capital = max([t.get('capital', self.initial_capital) for t in self.daily_trades])
+            current_capital = self.daily_trades[-1].get('capital', self.initial_capital) if self.daily_trades else self.initial_capital
             drawdown = ((peak_capital - current_capital) / peak_capital * 100) if peak_capital > 0 else 0
             
             # Calcular P&L neto del día
@@ -1307,76 +1890,236 @@ class ProfessionalTradingBot:
             if not self.daily_summary_enabled:
                 return
             
-            current_time = datetime.now()
+            current_time = datetime.now(self.daily_summary_tz)
             
-            # Verificar si es la hora configurada (22:05)
-            if (current_time.hour == 22 and current_time.minute == 5 and 
-                (self.last_daily_summary is None or 
-                 (current_time - self.last_daily_summary).days >= 1)):
-                
+            # Pasada la hora configurada (22:05) y sin resumen hoy: un ciclo que caiga
+            # fuera del minuto exacto no debe saltarse el resumen ni el vaciado de daily_trades
+            if ((current_time.hour, current_time.minute) >= (self.daily_summary_hour, self.daily_summary_minute)
+                    and self.last_daily_summary_date != current_time.date()):
+                self.last_daily_summary_date = current_time.date()
                 self.send_daily_summary()
                 
         except Exception as e:
             self.logger.error(f"❌ Error verificando hora de resumen: {e}")
     
+    def build_entry_pipeline(self) -> FilterPipeline:
+        """Pipeline único de entrada: seguridad, régimen de mercado, pre-trade y edge"""
+        stages = [
+            FilterStage('safety', self.safety_manager.check_safety_stage, group='safety'),
+            FilterStage('market_regime', self.market_filter.check_regime_stage, group='market_filter')
+        ]
+        stages.extend(self.safety_manager.pre_trade_stages())
+        stages.append(FilterStage('edge', self.safety_manager.check_edge, group='edge'))
+        return FilterPipeline(stages, name='entry')
+    
+    def load_safety_status(self, ctx: FilterContext) -> Dict[str, Any]:
+        """Estado de seguridad: uno por lote, compartido entre candidatos"""
+        if 'safety_status' not in ctx.shared:
+            ctx.shared['safety_status'] = self.safety_manager.check_safety_conditions(self.current_capital)
+        return ctx.shared['safety_status']
+    
+    def load_market_conditions(self, ctx: FilterContext) -> Dict[str, Any]:
+        if self.order_gateway and ctx.get('price') is None:
+            return {'can_trade': False, 'reason': "Sin velas reales del exchange", 'reason_code': 'no_bars'}
+        return self.market_filter.check_market_conditions(ctx.get('price'), ctx.get('volume'), ctx.symbol,
+                                                          live=bool(self.order_gateway))
+    
+    def load_market_data(self, ctx: FilterContext) -> Dict[str, Any]:
+        """Snapshot de mercado para filtros pre-trade (dato caro: solo para supervivientes)"""
+        if self.order_gateway:
+            return self.load_live_market_data(ctx)
+        price = ctx.get('price')
+        market_data = {
+            'price': price,
+            'high': price * (1 + random.uniform(0.005, 0.02)),
+            'low': price * (1 - random.uniform(0.005, 0.02)),
+            'close': price,
+            'best_ask': price * 1.0001,
+            'best_bid': price * 0.9999,
+            'book_source': 'synthetic',
+            'volume_usd': random.uniform(5000000, 15000000),
+            'ws_latency_ms': random.uniform(50, 200),
+            'rest_latency_ms': random.uniform(100, 500)
+        }
+        # Top-of-book del bus local si lo hay; la cinta sintética solo alimenta la simulación
+        book = self.fetch_live_book(ctx.symbol)
+        if book is not None:
+            market_data['best_bid'] = book['bid']
+            market_data['best_ask'] = book['ask']
+            market_data['book_source'] = book['source']
+        return market_data
+    
+    def load_live_market_data(self, ctx: FilterContext) -> Dict[str, Any]:
+        """Snapshot real: velas de 1m, volumen 24h, libro y latencias medidas; lo que falte se lista en 'missing'"""
+        missing = []
+        bar_source = self.market_filter.bar_source
+        bars = bar_source.get_bars(ctx.symbol, '1m', LIVE_RANGE_BARS) if bar_source is not None else []
+        if bars:
+            # Velas: (open_time, open, high, low, close, volume)
+            high, low, close = max(bar[2] for bar in bars), min(bar[3] for bar in bars), bars[-1][4]
+        else:
+            high = low = close = None
+            missing.append('klines')
+        volume_usd = self.fetch_volume_24h(ctx.symbol)
+        if volume_usd is None:
+            missing.append('volume_24h')
+        
+        # Libro real (bus local o bookTicker); sin él la etapa de spread rechaza (NO_BOOK)
+        book = self.fetch_live_book(ctx.symbol)
+        best_bid, best_ask, book_source = (book['bid'], book['ask'], book['source']) if book else (None, None, None)
+        
+        return {
+            'price': close,
+            'high': high,
+            'low': low,
+            'close': close,
+            'best_ask': best_ask,
+            'best_bid': best_bid,
+            'book_source': book_source,
+            'volume_usd': volume_usd,
+            'ws_latency_ms': self.stream_latency_ms(ctx.symbol),
+            'rest_latency_ms': self.order_gateway.rest.last_get_latency_ms,  # último GET de cotización medido
+            'missing': missing
+        }
+    
+    def fetch_volume_24h(self, symbol: str) -> Optional[float]:
+        """Volumen 24h en quote (ticker/24hr por símbolo, cacheado VOLUME_24H_TTL_SEC)"""
+        now = time.time()
+        cached = self.volume_24h.get(symbol)
+        if cached is not None and now - cached[0] < VOLUME_24H_TTL_SEC:
+            return cached[1]
+        response = self.order_gateway.rest.request('GET', '/api/v3/ticker/24hr', {'symbol': symbol})
+        try:
+            volume = float(response['data']['quoteVolume']) if response['ok'] else None
+        except (KeyError, TypeError, ValueError):
+            volume = None
+        if volume is None:
+            return cached[1] if cached is not None else None
+        self.volume_24h[symbol] = (now, volume)
+        return volume
+    
+    def stream_latency_ms(self, symbol: str) -> float:
+        """Latencia del stream medida: edad del libro del bus o retraso del último evento user-data"""
+        if self.market_consumer:
+            book = self.market_consumer.book(symbol)
+            if book is not None:
+                return max(0.0, (self.market_consumer.time_fn() - book['ts']) * 1000)
+        return self.user_data_stream.last_lag_ms if self.user_data_stream else 0.0
+    
+    def fetch_live_book(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Top-of-book real: bus local si está fresco, si no bookTicker REST (solo con gateway)"""
+        book = self.market_consumer.book(symbol, config.MARKET_BUS_MAX_BOOK_AGE_SEC) \
+            if self.market_consumer else None
+        if book is not None:
+            return {'bid': book['bid'], 'ask': book['ask'], 'source': 'bus'}
+        if not self.order_gateway:
+            return None
+        response = self.order_gateway.rest.request('GET', '/api/v3/ticker/bookTicker', {'symbol': symbol}, quote=True)
+        if not response['ok'] or not isinstance(response['data'], dict):
+            return None
+        try:
+            bid, ask = float(response['data']['bidPrice']), float(response['data']['askPrice'])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if bid <= 0 or ask < bid:
+            return None  # libro vacío o cruzado
+        return {'bid': bid, 'ask': ask, 'source': 'rest'}
+    
+    def passive_price(self, symbol: str, side: str) -> Optional[float]:
+        """Precio maker actual desde el libro real (reprecio de reintentos del gateway)"""
+        book = self.fetch_live_book(symbol)
+        if book is None:
+            return None
+        price = book['bid'] if side == 'BUY' else book['ask']
+        symbol_spec = self.symbol_registry.get(symbol)
+        return symbol_spec.round_price(price, side) if symbol_spec is not None else price
+    
+    def load_targets(self, ctx: FilterContext) -> Dict[str, float]:
+        return self.safety_manager.compute_trade_targets(ctx.get('price'), ctx.get('market_conditions')['atr'])
+    
+    def build_entry_context(self, symbol: str, shared: Dict[str, Any]) -> FilterContext:
+        """Contexto de un candidato: en real, última vela de 1m del exchange; si no, la cinta sintética"""
+        if self.order_gateway:
+            bar_source = self.market_filter.bar_source
+            bars = bar_source.get_bars(symbol, '1m', 1) if bar_source is not None else []
+            price, volume = (bars[-1][4], bars[-1][5]) if bars else (None, None)
+        else:
+            price, volume = self.synthetic_tape.quote(symbol)
+        values = {'price': price, 'volume': volume}
+        return FilterContext(symbol, values=values, loaders=self.entry_loaders, shared=shared)
+    
+    def attach_shard(self, shard_index: int, shard_count: int, risk_coordinator: RiskCoordinator,
+                     selector_link: ShardSelectorLink = None) -> None:
+        """Operar solo los pares del shard con los límites globales y el selector del supervisor"""
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.safety_manager.risk_coordinator = risk_coordinator
+        if selector_link is not None:
+            self.pair_selector_service = selector_link
+        owned = [symbol for symbol in self.symbols if self.owns_symbol(symbol)]
+        if owned:
+            self.symbols = owned
+            self.current_symbol_index = 0
+        self.logger.info("🧩 Shard %d/%d: pares fijos %s", shard_index, shard_count, ', '.join(owned) or '-')
+    
+    def owns_symbol(self, symbol: str) -> bool:
+        return self.shard_count <= 1 or shard_of(symbol, self.shard_count) == self.shard_index
+    
+    def get_candidate_symbols(self) -> List[str]:
+        """Pares a evaluar en este ciclo (solo los del shard si hay varios)"""
+        if self.auto_pair_selector and (self.pair_selector or self.pair_selector_service) and self.active_pairs:
+            symbols = list(self.active_pairs)
+        else:
+            symbols = [self.get_current_symbol()]
+        if self.shard_count > 1:
+            symbols = [symbol for symbol in symbols if self.owns_symbol(symbol)]
+        return symbols
+    
     def simulate_trading_signal(self) -> Dict[str, Any]:
-        """Simular señal de trading con multi-par + Auto Pair Selector"""
+        """Simular señal de trading con multi-par + Auto Pair Selector (pipeline por lotes)"""
         try:
             # Rotar símbolo si es necesario (multi-par tradicional)
             if self.should_rotate_symbol():
                 self.rotate_symbol()
             
-            # Usar pares activos del Auto Pair Selector si está habilitado
-            if self.auto_pair_selector and self.pair_selector and self.active_pairs:
-                # Seleccionar símbolo de los pares activos
-                current_symbol = random.choice(self.active_pairs)
-                self.logger.info(f"🎯 Auto Pair Selector: usando símbolo activo {current_symbol}")
-            else:
-                # Usar método tradicional de rotación
-                current_symbol = self.get_current_symbol()
-            
-            # Simular precio según el símbolo (expandido para más pares)
-            price_ranges = {
-                'BTCUSDT': (40000, 50000),
-                'ETHUSDT': (2000, 3000),
-                'BNBUSDT': (500, 650),
-                'SOLUSDT': (80, 120),
-                'XRPUSDT': (0.4, 0.6),
-                'ADAUSDT': (0.3, 0.5),
-                'DOGEUSDT': (0.06, 0.10),
-                'LINKUSDT': (12, 18),
-                'TONUSDT': (2.0, 3.0),
-                'MATICUSDT': (0.6, 1.0),
-                'ARBUSDT': (1.0, 1.5),
-                'OPUSDT': (2.5, 3.5),
-                'LTCUSDT': (65, 85),
-                'APTUSDT': (6, 10),
-                'TRXUSDT': (0.06, 0.10)
-            }
-            
-            if current_symbol in price_ranges:
-                min_price, max_price = price_ranges[current_symbol]
-                current_price = random.uniform(min_price, max_price)
-            else:
-                current_price = random.uniform(500, 650)
-            
-            volume = random.uniform(1000, 5000)
-            
-            # Verificar condiciones de mercado
-            market_conditions = self.market_filter.check_market_conditions(current_price, volume)
+            # Evaluar todos los pares candidatos a la vez: las etapas caras solo
+            # se ejecutan para los pares que superan las baratas
+            shared = {}
+            contexts = {symbol: self.build_entry_context(symbol, shared) for symbol in self.get_candidate_symbols()}
+            if not contexts:
+                return None  # ningún par activo pertenece a este shard
+            results = self.entry_pipeline.evaluate_batch(contexts)
+            
+            passed = []
+            for symbol, result in results.items():
+                self.telemetry_manager.record_signal(symbol)
+                if result['passed']:
+                    passed.append(symbol)
+                else:
+                    self.telemetry_manager.record_rejection(result['reason'], symbol=symbol, filter_name=result['group'])
             
-            if not market_conditions['can_trade']:
-                # Registrar motivo de rechazo con código
-                self.telemetry_manager.record_rejection(market_conditions.get('reason_code', 'other'))
+            if not passed:
+                # Sin supervivientes: informar el rechazo de uno de los candidatos
+                current_symbol = random.choice(list(results))
+                ctx, result = contexts[current_symbol], results[current_symbol]
+                self.logger.info("❌ Señal rechazada %s (%s): %s", current_symbol, result['stage'], result['message'])
                 return {
                     'signal': 'REJECTED',
-                    'reason': market_conditions['reason'],
-                    'price': current_price,
-                    'volume': volume,
-                    'market_data': market_conditions,
+                    'reason': result['message'],
+                    'price': ctx.get('price'),
+                    'volume': ctx.get('volume'),
+                    'market_data': ctx.values.get('market_conditions', {}),
+                    'safety_status': ctx.shared.get('safety_status'),
                     'symbol': current_symbol
                 }
             
+            current_symbol = random.choice(passed)
+            if len(contexts) > 1:
+                self.logger.info("🎯 Auto Pair Selector: %d/%d pares pasan filtros, usando %s",
+                                 len(passed), len(contexts), current_symbol)
+            ctx = contexts[current_symbol]
+            market_conditions = ctx.get('market_conditions')
+            
             # Generar señal basada en dirección del mercado
             direction = market_conditions['direction']
             
@@ -1386,16 +2129,22 @@ class ProfessionalTradingBot:
             signal_data = {
                 'signal': direction,
                 'direction': direction,  # Para compatibilidad
-                'price': current_price,
-                'volume': volume,
+                'price': ctx.get('price'),
+                'volume': ctx.get('volume'),
                 'confidence': confidence,
                 'timestamp': datetime.now().isoformat(),
                 'market_data': market_conditions,
-                'symbol': current_symbol
+                'symbol': current_symbol,
+                
+                # Resultado del pipeline de entrada (lo consume simulate_trade)
+                'safety_status': ctx.get('safety_status'),
+                'pre_trade_data': ctx.get('market_data'),
+                'filter_result': {'passed': True, 'reason': 'OK', 'details': ctx.details, 'warnings': ctx.warnings},
+                'targets': ctx.get('targets')
             }
             
             friendly_reason = market_conditions.get('reason') or 'Condiciones favorables'
-            self.logger.info(f"📊 Señal: {direction} {current_symbol} - {friendly_reason}")
+            self.logger.info("📊 Señal: %s %s - %s", direction, current_symbol, friendly_reason)
             return signal_data
             
         except Exception as e:
@@ -1404,58 +2153,28 @@ class ProfessionalTradingBot:
     
     def simulate_trade(self, signal: Dict[str, Any]) -> Dict[str, Any]:
         """FASE 1.6: Simular ejecución de trade con multi-par"""
+        reservation = None  # cupo global reservado y aún sin ejecución: se devuelve si algo falla
         try:
             if signal['signal'] in ['REJECTED', 'ERROR']:
-                # Registrar rechazo por seguridad
-                if signal['signal'] == 'REJECTED':
-                    self.telemetry_manager.record_rejection('safety_block')
+                # El rechazo ya quedó registrado por la etapa del pipeline que lo generó
                 return {
                     'executed': False,
                     'reason': signal.get('reason', 'Señal rechazada'),
-                    'signal': signal
-                }
-            
-            # Verificar condiciones de seguridad
-            safety_status = self.safety_manager.check_safety_conditions(self.current_capital)
-            
-            if not safety_status['can_trade']:
-                # Registrar rechazo por cooldown
-                if 'cooldown' in safety_status['reason'].lower():
-                    self.telemetry_manager.record_rejection('cooldown')
-                else:
-                    self.telemetry_manager.record_rejection('safety_block')
-                    
-                return {
-                    'executed': False,
-                    'reason': safety_status['reason'],
                     'signal': signal,
-                    'safety_status': safety_status
+                    'safety_status': signal.get('safety_status')
                 }
             
-            # === FASE 1.6: APLICAR FILTROS PRE-TRADE ===
-            market_data = {
-                'price': signal['price'],
-                'high': signal['price'] * (1 + random.uniform(0.005, 0.02)),
-                'low': signal['price'] * (1 - random.uniform(0.005, 0.02)),
-                'close': signal['price'],
-                'best_ask': signal['price'] * 1.0001,
-                'best_bid': signal['price'] * 0.9999,
-                'volume_usd': random.uniform(5000000, 15000000),
-                'ws_latency_ms': random.uniform(50, 200),
-                'rest_latency_ms': random.uniform(100, 500)
-            }
+            # Una sola posición viva por símbolo: no apilar entradas mientras siga abierta
+            if self.order_gateway and self.position_book.has_open_position(signal['symbol']):
+                self.logger.info("❌ Trade rechazado: posición abierta en %s", signal['symbol'])
+                self.telemetry_manager.record_rejection('position_open', symbol=signal['symbol'])
+                return {'executed': False, 'reason': f"Posición abierta en {signal['symbol']}", 'signal': signal}
             
-            # Aplicar filtros
-            filter_result = self.safety_manager.pre_trade_filters(market_data)
-            if not filter_result['passed']:
-                self.logger.info(f"❌ Trade rechazado por filtros: {filter_result['reason']}")
-                # NO registrar trade rechazado - solo retornar
-                return {
-                    'executed': False,
-                    'reason': f"Filtro fallido: {filter_result['reason']}",
-                    'signal': signal,
-                    'filter_result': filter_result
-                }
+            # Resultado del pipeline de entrada (seguridad, pre-trade y edge ya verificados)
+            safety_status = signal['safety_status']
+            market_data = signal['pre_trade_data']
+            filter_result = signal['filter_result']
+            targets = signal['targets']
             
             # Obtener datos de mercado
             entry_price = signal['price']
@@ -1463,52 +2182,113 @@ class ProfessionalTradingBot:
             atr_value = signal['market_data']['atr']
             current_symbol = signal['symbol']
             
-            # === FASE 1.6: CALCULAR TARGETS DINÁMICOS ===
-            targets = self.safety_manager.compute_trade_targets(entry_price, atr_value)
+            self.logger.debug("✅ Edge: %.1f bps (TP=%.1f, Fricción=%.1f)",
+                              filter_result['details']['edge_bps'], targets['tp_bps'], targets['fric_bps'])
             
-            # === FASE 1.6: FILTRO DE EDGE ===
-            friccion_bps = targets['fric_bps']
-            tp_bps = targets['tp_bps']
-            edge_bps = tp_bps - friccion_bps
+            # Calcular tamaño de posición (y ajustarlo a los filtros del exchange)
+            with cycle_stage('sizing', symbol=current_symbol) as span:
+                position_data = self.position_manager.calculate_position_size(self.current_capital, atr_value)
+                
+                # Aplicar reducción de tamaño en modo probation (-50%)
+                if safety_status.get('probation_mode', False):
+                    position_data['size'] = max(self.position_manager.position_size_usd_min, position_data['size'] * 0.5)
+                    position_data['fees'] = position_data['size'] * self.position_manager.fee_rate
+                
+                # === FASE 1.6: FILTROS DE EXCHANGE (tick / step / min notional) ===
+                symbol_spec = self.symbol_registry.get(current_symbol)
+                if symbol_spec is not None:
+                    order_limits = symbol_spec.quantize_order(entry_price, position_data['size'], direction)
+                    if order_limits['notional'] > self.current_capital:
+                        self.logger.info("❌ Trade rechazado: min notional $%.2f supera el capital", symbol_spec.min_notional)
+                        self.telemetry_manager.record_rejection('min_notional', symbol=current_symbol, filter_name='exchange')
+                        span.set(outcome='min_notional')
+                        return {
+                            'executed': False,
+                            'reason': f"Min notional ${symbol_spec.min_notional:.2f} > capital ${self.current_capital:.2f}",
+                            'signal': signal
+                        }
+                    if order_limits['bumped_to_min']:
+                        self.logger.info("📐 Tamaño ajustado a min notional: $%.2f (%s)", order_limits['notional'], current_symbol)
+                    position_data['size'] = order_limits['notional']
+                    position_data['fees'] = position_data['size'] * self.position_manager.fee_rate
+                span.set(outcome='ok', size_usd=position_data['size'])
+            
+            # === FASE 1.6: CUPO GLOBAL ENTRE SHARDS (reserva atómica) ===
+            risk_coordinator = self.safety_manager.risk_coordinator
+            if risk_coordinator is not None and not risk_coordinator.try_acquire_trade():
+                reason = risk_coordinator.blocked_reason() or "Cupo global de trades agotado"
+                self.logger.info("❌ Trade rechazado por límite global: %s", reason)
+                self.telemetry_manager.record_rejection('safety_block', symbol=current_symbol, filter_name='safety')
+                return {'executed': False, 'reason': reason, 'signal': signal}
+            reservation = risk_coordinator
+            
+            # === FASE 1.6: EJECUCIÓN REAL (GATEWAY) O SIMULADA ===
+            if self.order_gateway:
+                with cycle_stage('order', symbol=current_symbol) as span:
+                    execution = self.execute_entry_order(signal, position_data['size'], market_data, symbol_spec)
+                    span.set(outcome=execution['reason'] or 'filled', executed_qty=execution['executed_qty'])
+                if execution['executed_qty'] <= 0:
+                    if reservation is not None:
+                        reservation.release_trade()
+                        reservation = None
+                    self.logger.info("❌ Orden no ejecutada: %s", execution['reason'])
+                    return {
+                        'executed': False,
+                        'reason': f"Orden no ejecutada: {execution['reason']}",
+                        'signal': signal,
+                        'execution': execution
+                    }
+                entry_price = execution['reference_price']  # mid real del libro, no la cinta sintética
+                executed_price = execution['avg_price']
+                slippage_bps = execution['slippage_bps']
+                fill_latency_ms = execution['order'].get('execution', {}).get('submit_to_fill_ms', 0.0)
+                position_data['size'] = execution['executed_qty'] * executed_price
+            else:
+                fill_latency_ms = 0.0
+                slippage_bps = random.uniform(1.0, 3.0)  # 1-3 bps
+                slippage_pct = slippage_bps / 10000
+                if direction == 'BUY':
+                    executed_price = entry_price * (1 + slippage_pct)
+                else:
+                    executed_price = entry_price * (1 - slippage_pct)
+            reservation = None  # ejecutado: el cupo queda consumido
             
-            # Configurar EDGE_MIN_BPS (3.0 bps mínimo)
-            EDGE_MIN_BPS = 3.0
+            trade_context = {
+                'signal': signal,
+                'symbol': current_symbol,
+                'direction': direction,
+                'entry_price': entry_price,
+                'executed_price': executed_price,
+                'size': position_data['size'],
+                'atr_value': atr_value,
+                'targets': targets,
+                'filter_result': filter_result,
+                'safety_status': safety_status,
+                'slippage_bps': slippage_bps,
+                'fill_latency_ms': fill_latency_ms,
+                'tick_size': symbol_spec.tick_size if symbol_spec is not None else 0.0
+            }
             
-            if edge_bps < EDGE_MIN_BPS:
-                self.logger.info(f"❌ Trade rechazado: Edge insuficiente: {edge_bps:.1f} bps (TP={tp_bps:.1f}, Fricción={friccion_bps:.1f})")
-                self.telemetry_manager.record_rejection('low_edge')
+            # === FASE 1.6: POSICIÓN VIVA (GATEWAY) → CIERRE POR TRIGGERS ===
+            if self.order_gateway:
+                # La entrada cuenta ya (límites y cooldown), no al cerrar la posición
+                self.safety_manager.record_entry()
+                trade_context['entry_recorded'] = True
+                position = self.open_live_position(trade_context)
                 return {
-                    'executed': False,
-                    'reason': f"Edge insuficiente: {edge_bps:.1f} bps < {EDGE_MIN_BPS} bps",
-                    'signal': signal,
-                    'edge_bps': edge_bps,
-                    'tp_bps': tp_bps,
-                    'friccion_bps': friccion_bps
+                    'executed': True,
+                    'position_open': True,
+                    'position': position,
+                    'fill_price': trade_context['executed_price'],
+                    'safety_status': safety_status,
+                    'targets': targets,
+                    'filter_result': filter_result
                 }
             
-            self.logger.info(f"✅ Edge: {edge_bps:.1f} bps (TP={tp_bps:.1f}, Fricción={friccion_bps:.1f})")
-            
-            # Calcular tamaño de posición
-            position_data = self.position_manager.calculate_position_size(self.current_capital, atr_value)
-            
-            # Aplicar reducción de tamaño en modo probation (-50%)
-            if safety_status.get('probation_mode', False):
-                position_data['size'] = max(self.position_manager.position_size_usd_min, position_data['size'] * 0.5)
-                position_data['fees'] = position_data['size'] * self.position_manager.fee_rate
-            
-            # === FASE 1.6: SIMULAR EJECUCIÓN CON SLIPPAGE REALISTA ===
-            slippage_bps = random.uniform(1.0, 3.0)  # 1-3 bps
-            slippage_pct = slippage_bps / 10000
-            if direction == 'BUY':
-                executed_price = entry_price * (1 + slippage_pct)
-            else:
-                executed_price = entry_price * (1 - slippage_pct)
-            
             # === FASE 1.6: SIMULAR RESULTADO BASADO EN TARGETS ===
             win_probability = 0.6  # 60% win rate
             is_win = random.random() < win_probability
             
-            # Calcular P&L bruto basado en targets
             if is_win:
                 # Ganancia basada en TP dinámico
                 tp_pct = targets['tp_pct']
@@ -1516,7 +2296,6 @@ class ProfessionalTradingBot:
                     exit_price = executed_price * (1 + tp_pct)
                 else:
                     exit_price = executed_price * (1 - tp_pct)
-                pnl_gross = position_data['size'] * (exit_price - executed_price) / executed_price
             else:
                 # Pérdida basada en SL dinámico
                 sl_pct = targets['sl_pct']
@@ -1524,7 +2303,36 @@ class ProfessionalTradingBot:
                     exit_price = executed_price * (1 - sl_pct)
                 else:
                     exit_price = executed_price * (1 + sl_pct)
-                pnl_gross = position_data['size'] * (exit_price - executed_price) / executed_price
+            
+            return self.finalize_trade(trade_context, exit_price, is_win)
+            
+        except Exception as e:
+            if reservation is not None:
+                reservation.release_trade()
+            self.logger.error(f"❌ Error ejecutando trade FASE 1.6 MULTI-PAR: {e}")
+            return {'executed': False, 'reason': str(e)}
+    
+    def finalize_trade(self, trade_context: Dict[str, Any], exit_price: float, is_win: bool,
+                       exit_reason: str = None) -> Dict[str, Any]:
+        """FASE 1.6: Cerrar trade: P&L neto, capital, métricas y sinks"""
+        try:
+            signal = trade_context['signal']
+            current_symbol = trade_context['symbol']
+            direction = trade_context['direction']
+            entry_price = trade_context['entry_price']
+            executed_price = trade_context['executed_price']
+            position_data = {'size': trade_context['size']}
+            atr_value = trade_context['atr_value']
+            targets = trade_context['targets']
+            filter_result = trade_context['filter_result']
+            safety_status = trade_context['safety_status']
+            slippage_bps = trade_context['slippage_bps']
+            fill_latency_ms = trade_context['fill_latency_ms']
+            tick_size = trade_context.get('tick_size', 0.0)
+            
+            # P&L bruto según dirección (en cortos se gana cuando el precio baja)
+            direction_sign = 1 if direction == 'BUY' else -1
+            pnl_gross = direction_sign * position_data['size'] * (exit_price - executed_price) / executed_price
             
             # === FASE 1.6: CALCULAR P&L NETO CON FEES/SLIPPAGE ===
             trade_data_for_pnl = {
@@ -1543,12 +2351,14 @@ class ProfessionalTradingBot:
             # No forzar valores mínimos - usar P&L neto real
             # El P&L neto ya incluye fees y slippage calculados correctamente
             
-            # Actualizar capital
-            new_capital = self.current_capital + pnl_net
-            self.current_capital = new_capital
+            # Actualizar capital: en simulación se liquida el P&L; en real lo actualiza el stream de cuenta
+            if not self.order_gateway:
+                self.account_state.apply_realized_pnl(pnl_net)
+            new_capital = self.current_capital
             
             # Registrar trade en sistema de seguridad
-            self.safety_manager.record_trade(result, pnl_net)
+            self.safety_manager.record_trade(result, pnl_net,
+                                             entry_recorded=trade_context.get('entry_recorded', False))
             
             # === FASE 1.6: CREAR DATOS DEL TRADE MEJORADOS ===
             trade_data = {
@@ -1583,6 +2393,12 @@ class ProfessionalTradingBot:
                 'range_bps': filter_result['details'].get('range_bps', 0),
                 'spread_bps': filter_result['details'].get('spread_bps', 0),
                 'atr_pct': (atr_value / entry_price) * 100,
+                'tick_size': tick_size,
+                'expected_price': entry_price,
+                'fill_price': executed_price,
+                'slippage_pct': slippage_bps / 100,
+                'fill_latency_ms': fill_latency_ms,
+                'exit_reason': exit_reason or ('TP' if is_win else 'SL'),
                 
                 # Friction data
                 'fees_cost': pnl_data['fees_cost'],
@@ -1614,14 +2430,18 @@ class ProfessionalTradingBot:
             metrics = self.metrics_tracker.get_metrics_summary()
             
             # Logging
-            self.logger.info(f"📊 Trade FASE 1.6 MULTI-PAR: {result} | TP={targets['tp_pct']:.4f}% | SL={targets['sl_pct']:.4f}% | RR={targets['rr_ratio']:.2f}")
-            self.logger.info(f"💰 P&L: Bruto=${pnl_gross:.4f} | Neto=${pnl_net:.4f} | Friction=${pnl_data['total_friction']:.4f}")
+            self.logger.info("📊 Trade FASE 1.6 MULTI-PAR: %s | TP=%.4f%% | SL=%.4f%% | RR=%.2f",
+                             result, targets['tp_pct'], targets['sl_pct'], targets['rr_ratio'])
+            self.logger.info("💰 P&L: Bruto=$%.4f | Neto=$%.4f | Friction=$%.4f",
+                             pnl_gross, pnl_net, pnl_data['total_friction'])
             
             # Registrar en Google Sheets
-            self.sheets_logger.log_trade(trade_data, metrics)
+            with cycle_stage('sheets', cat='sink', symbol=current_symbol) as span:
+                span.set(outcome='ok' if self.sheets_logger.log_trade(trade_data, metrics) else 'failed')
             
             # Registrar localmente
-            self.local_logger.log_operation(trade_data)
+            with cycle_stage('local_log', cat='sink', symbol=current_symbol):
+                self.local_logger.log_operation(trade_data)
             
             # Mensaje Telegram FASE 1.6 MULTI-PAR
             telegram_message = f"""
@@ -1645,6 +2465,7 @@ class ProfessionalTradingBot:
 🛡️ **Seguridad**:
 📊 **DD**: {safety_status['intraday_drawdown']:.2f}%
 📊 **DL**: {safety_status['daily_loss']:.2f}%
+📊 **DD Semanal**: {safety_status.get('weekly_drawdown', 0):.2f}%
 📊 **CL**: {safety_status['consecutive_losses']}
 🔒 **Probation**: {safety_status.get('probation_mode', False)}
 
@@ -1657,6 +2478,7 @@ class ProfessionalTradingBot:
             return {
                 'executed': True,
                 'trade_data': trade_data,
+                'fill_price': executed_price,
                 'metrics': metrics,
                 'safety_status': safety_status,
                 'targets': targets,
@@ -1664,70 +2486,325 @@ class ProfessionalTradingBot:
             }
             
         except Exception as e:
-            self.logger.error(f"❌ Error ejecutando trade FASE 1.6 MULTI-PAR: {e}")
+            self.logger.error(f"❌ Error cerrando trade FASE 1.6 MULTI-PAR: {e}")
             return {'executed': False, 'reason': str(e)}
     
+    def open_live_position(self, trade_context: Dict[str, Any]) -> Dict[str, Any]:
+        """Registrar posición ejecutada en el libro con sus triggers TP/SL/trailing"""
+        targets = trade_context['targets']
+        levels = self.position_manager.build_exit_levels(
+            trade_context['executed_price'], trade_context['direction'], targets['tp_pct'], targets['sl_pct']
+        )
+        return self.position_book.open_position(
+            trade_context['symbol'],
+            trade_context['direction'],
+            trade_context['executed_price'],
+            trade_context['size'] / trade_context['executed_price'],
+            levels['tp_price'],
+            levels['sl_price'],
+            trailing_activation=levels['trailing_activation'],
+            trailing_step=levels['trailing_step'],
+            context=trade_context
+        )
+    
+    def manage_open_positions(self) -> List[Dict[str, Any]]:
+        """Cada ciclo (haya señal o no): salidas pendientes y triggers de todas las posiciones abiertas"""
+        results = self.process_pending_exits()
+        symbols = self.position_book.open_symbols()
+        watched = sorted(set(symbols) | set(self.account_state.mark_symbols()))
+        if not watched:
+            return results
+        books = self.position_books(watched)
+        self.mark_account(books)
+        for symbol in symbols:
+            book = books.get(symbol)
+            if book is None:
+                self.logger.warning("⚠️ Sin precio real de %s: triggers sin revisar este ciclo", symbol)
+                continue
+            results.extend(self.process_position_ticks(symbol, (book['bid'] + book['ask']) / 2, book))
+        return results
+    
+    def position_books(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Libro por símbolo: bus local fresco y, para el resto, un bookTicker bulk (en simulado, la cinta)"""
+        books, missing = {}, []
+        for symbol in symbols:
+            book = self.market_consumer.book(symbol, config.MARKET_BUS_MAX_BOOK_AGE_SEC) \
+                if self.market_consumer else None
+            if book is not None:
+                books[symbol] = {'bid': book['bid'], 'ask': book['ask'], 'source': 'bus'}
+            else:
+                missing.append(symbol)
+        if missing and self.order_gateway:
+            bulk = self.fetch_bulk_books()
+            books.update({symbol: bulk[symbol] for symbol in missing if symbol in bulk})
+        elif missing:
+            for symbol in missing:
+                price, _ = self.synthetic_tape.quote(symbol)
+                books[symbol] = {'bid': price * 0.9999, 'ask': price * 1.0001, 'source': 'synthetic'}
+        return books
+    
+    def mark_account(self, books: Dict[str, Dict[str, Any]]) -> None:
+        """Valorar todos los activos con saldo al mid del libro real (la cinta sintética no vale como mark)"""
+        unpriced = self.account_state.update_marks({
+            symbol: (book['bid'] + book['ask']) / 2
+            for symbol, book in books.items() if book['source'] in LIVE_BOOK_SOURCES
+        })
+        if unpriced and unpriced != self.unpriced_assets:
+            self.logger.warning("⚠️ Activos sin precio real (fuera del equity): %s", ', '.join(unpriced))
+        self.unpriced_assets = unpriced
+    
+    def fetch_bulk_books(self) -> Dict[str, Dict[str, Any]]:
+        """bookTicker de todo el exchange en una petición (peso 4) con prioridad de datos de mercado"""
+        response = self.order_gateway.rest.request('GET', '/api/v3/ticker/bookTicker', priority=PRIORITY_MARKET)
+        books = {}
+        if not response['ok'] or not isinstance(response['data'], list):
+            return books
+        for row in response['data']:
+            try:
+                bid, ask = float(row['bidPrice']), float(row['askPrice'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if 0 < bid <= ask:
+                books[row['symbol']] = {'bid': bid, 'ask': ask, 'source': 'rest'}
+        return books
+    
+    def process_position_ticks(self, symbol: str, price: float,
+                               book: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Procesar tick de precio: cerrar solo posiciones cuyos triggers se cruzaron"""
+        results = []
+        try:
+            for position in self.position_book.on_tick(symbol, price):
+                result = self.close_live_position(position, book)
+                if result is not None:
+                    results.append(result)
+        except Exception as e:
+            self.logger.error(f"❌ Error procesando tick de posiciones {symbol}: {e}")
+        return results
+    
+    def close_live_position(self, position: Dict[str, Any], book: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """Salida de una posición disparada: simulada al precio del tick; en real, orden maker sin esperar el fill"""
+        if not self.order_gateway:
+            return self.finish_position_exit(position, position['trigger_tick'])
+        self.submit_exit_order(position, book)
+        return None
+    
+    def submit_exit_order(self, position: Dict[str, Any], book: Dict[str, Any] = None, attempt: int = 0) -> bool:
+        """Colocar la salida maker en el lado pasivo del libro real; el fill se recoge en ciclos siguientes"""
+        symbol = position['symbol']
+        exit_side = 'SELL' if position['direction'] == 'BUY' else 'BUY'
+        book = book or self.fetch_live_book(symbol)
+        if book is None:
+            self.logger.warning(f"⚠️ Salida #{position['id']} sin libro real de {symbol}: triggers rearmados")
+            self.position_book.rearm(position['id'])
+            return False
+        # Post-only: vender en el ask, comprar en el bid
+        price = book['ask'] if exit_side == 'SELL' else book['bid']
+        symbol_spec = self.symbol_registry.get(symbol)
+        limit_price = symbol_spec.round_price(price, exit_side) if symbol_spec is not None else price
+        order = self.order_gateway.submit_order(
+            symbol, exit_side, position['quantity'], limit_price,
+            intent_key=f"exit:{position['id']}:{position['versions']['SL']}:{attempt}",
+            reference_price=position['trigger_price']
+        )
+        self.pending_exits[position['id']] = {
+            'position': position,
+            'order': order,
+            'attempt': attempt,
+            'submitted_at': time.time()
+        }
+        return True
+    
+    def process_pending_exits(self) -> List[Dict[str, Any]]:
+        """Revisar salidas en vuelo: cerrar las ejecutadas, cancelar las vencidas y reintentar al libro actual"""
+        results = []
+        now = time.time()
+        for position_id, pending in list(self.pending_exits.items()):
+            position, order = pending['position'], pending['order']
+            if not order['done'].is_set() and now - pending['submitted_at'] >= config.ORDER_FILL_TIMEOUT_SEC:
+                self.order_gateway.cancel_order(position['symbol'], order['client_order_id'])
+            if not order['done'].is_set():
+                continue  # sigue en el libro: se revisa en el próximo ciclo
+            
+            del self.pending_exits[position_id]
+            if order['executed_qty'] > 0:
+                result = self.finish_position_exit(position, order['avg_price'])
+                if result is not None:
+                    results.append(result)
+            elif pending['attempt'] < self.order_gateway.retry_order:
+                self.submit_exit_order(position, attempt=pending['attempt'] + 1)
+            else:
+                # Salida no ejecutada: mantener posición y volver a armar triggers
+                self.logger.warning(f"⚠️ Salida no ejecutada #{position_id}: "
+                                    f"{order.get('reject_reason') or order['status']}")
+                self.position_book.rearm(position_id)
+        return results
+    
+    def finish_position_exit(self, position: Dict[str, Any], exit_price: float) -> Optional[Dict[str, Any]]:
+        """Retirar la posición del libro y registrar el trade cerrado"""
+        closed = self.position_book.close_position(position['id'], exit_price)
+        if closed is None:
+            return None
+        direction_sign = 1 if closed['direction'] == 'BUY' else -1
+        is_win = direction_sign * (exit_price - closed['entry_price']) > 0
+        return self.finalize_trade(closed['context'], exit_price, is_win, closed['exit_reason'])
+    
     def run_trading_cycle(self):
         """Ejecutar ciclo de trading FASE 1.6 MULTI-PAR + AUTO PAIR SELECTOR"""
+        outcome = 'error'
         try:
             self.cycle_count += 1
+            self.cycle_watchdog.begin_cycle(self.cycle_count)
+            self.cycle_tracer.begin_cycle(self.cycle_count)
             current_time = datetime.now()
             
-            self.logger.info(f"🔄 Iniciando ciclo {self.cycle_count}...")
-            self.logger.info(f"🔄 Ciclo {self.cycle_count} - {current_time.strftime('%Y-%m-%d %H:%M:%S')}")
+            self.logger.info("🔄 Ciclo %d - %s", self.cycle_count, current_time.strftime('%Y-%m-%d %H:%M:%S'))
             
             # Verificar resumen diario
+            self.mark_cycle_stage('daily_summary')
             self.check_daily_summary_time()
             
+            # Velas de 1m de los pares activos y candidatos (alimentan todos los timeframes)
+            self.mark_cycle_stage('bars')
+            if self.market_consumer:
+                self.market_consumer.poll()
+            elif self.bar_resampler:
+                self.sync_bars()
+            # Filtros de exchangeInfo al día: tick/step/min notional cambian sin aviso (recarga al vencer el TTL)
+            if self.symbol_registry.refresh_if_stale():
+                self.logger.info("📐 Metadatos de símbolos recargados (%s)", self.symbol_registry.source)
+            
             # === AUTO PAIR SELECTOR: REBALANCE ===
-            if self.should_rebalance_pairs():
-                self.logger.info("🔄 Verificando rebalance de pares...")
+            self.mark_cycle_stage('rebalance')
+            if self.pair_selector_service:
+                self.apply_selector_snapshot()
+            elif self.should_rebalance_pairs():
+                self.logger.debug("🔄 Verificando rebalance de pares...")
                 if self.rebalance_pairs():
                     self.logger.info("✅ Rebalance completado")
                 else:
-                    self.logger.info("📊 No se requirió rebalance")
+                    self.logger.debug("📊 No se requirió rebalance")
             
             # Rotar símbolo si es necesario
+            self.mark_cycle_stage('rotate')
             if self.should_rotate_symbol():
                 self.rotate_symbol()
             
+            # Triggers TP/SL/trailing de todas las posiciones abiertas con precios reales (cada ciclo)
+            self.mark_cycle_stage('position_ticks')
+            for closed_result in self.manage_open_positions():
+                if closed_result.get('executed'):
+                    self.telemetry_manager.send_telemetry(closed_result['metrics'], closed_result['safety_status'])
+            
             # Simular señal de trading
+            self.mark_cycle_stage('signal')
             signal = self.simulate_trading_signal()
             
             if not signal:
+                outcome = 'no_signal'
                 self.logger.info("❌ No se generó señal de trading")
                 return
+            self.cycle_tracer.set(symbol=signal['symbol'], outcome=signal['signal'])
             
             # Ejecutar trade
+            self.mark_cycle_stage('trade')
             trade_result = self.simulate_trade(signal)
+            outcome = 'executed' if trade_result['executed'] else 'rejected'
+            self.cycle_tracer.set(symbol=signal['symbol'], outcome=outcome)
             
             if trade_result['executed']:
-                self.logger.info(f"✅ Trade ejecutado: {signal['direction']} @ ${signal['price']:.2f}")
+                self.logger.info("✅ Trade ejecutado: %s @ $%.2f", signal['direction'], trade_result['fill_price'])
                 
                 # Actualizar métricas
                 if 'metrics' in trade_result:
                     metrics = trade_result['metrics']
-                    self.logger.info(f"📊 Métricas: WR={metrics['win_rate']:.2f}%, PF={self.metrics_tracker.get_profit_factor_display()}, DD={metrics['drawdown']:.2f}%")
+                    self.logger.info("📊 Métricas: WR=%.2f%%, PF=%s, DD=%.2f%%", metrics['win_rate'],
+                                     self.metrics_tracker.get_profit_factor_display(), metrics['drawdown'])
                 
                 # Enviar telemetría
+                self.mark_cycle_stage('telemetry')
                 if 'safety_status' in trade_result:
                     self.telemetry_manager.send_telemetry(
                         trade_result.get('metrics', {}),
                         trade_result['safety_status']
                     )
             else:
-                self.logger.info(f"❌ Trade rechazado: {trade_result.get('reason', 'Desconocido')}")
+                self.logger.info("❌ Trade rechazado: %s", trade_result.get('reason', 'Desconocido'))
                 # NO registrar trades rechazados en Google Sheets
             
-            self.logger.info(f"✅ Ciclo {self.cycle_count} completado, esperando {self.update_interval}s...")
+            self.logger.debug("✅ Ciclo %d completado, esperando %ss...", self.cycle_count, self.update_interval)
             
         except Exception as e:
             self.logger.error(f"❌ Error en ciclo de trading FASE 1.6: {e}")
+        finally:
+            self.cycle_watchdog.end_cycle()
+            self.cycle_tracer.end_cycle(outcome=outcome)
+    
+    def mark_cycle_stage(self, stage: str):
+        """Etapa del ciclo en curso para el watchdog y la traza"""
+        self.cycle_watchdog.mark(stage)
+        self.cycle_tracer.mark(stage)
+    
+    def request_restart(self):
+        """Reinicio controlado pedido por el watchdog: posiciones a disco, apagado limpio y salida con código 75"""
+        # El libro solo vive en memoria: guardarlo antes de pedir la parada (la salida forzada no pasa por el cierre)
+        self.save_open_positions()
+        shutdown_state["stop"] = True
+        self.running = False
+    
+    def positions_file(self) -> str:
+        """Posiciones abiertas entre procesos (por shard, junto a sus operaciones)"""
+        return os.path.join(self.local_logger.data_dir, 'open_positions.json')
+    
+    def save_open_positions(self) -> int:
+        """Persistir el libro de posiciones para el siguiente proceso"""
+        try:
+            saved = self.position_book.save(self.positions_file())
+            if saved:
+                self.logger.info("💾 %d posiciones abiertas guardadas en %s", saved, self.positions_file())
+            return saved
+        except Exception as e:
+            self.logger.error(f"❌ Error guardando posiciones abiertas: {e}")
+            return 0
+    
+    def restore_open_positions(self) -> List[Dict[str, Any]]:
+        """Recuperar las posiciones del proceso anterior; en real solo las que el saldo respalda"""
+        path = self.positions_file()
+        try:
+            restored = self.position_book.load(path)
+            if os.path.exists(path):
+                os.remove(path)
+        except Exception as e:
+            self.logger.error(f"❌ Error recuperando posiciones abiertas de {path}: {e}")
+            return []
+        
+        # Reconciliar con la cuenta: un largo spot exige el activo base en saldo (una salida
+        # en vuelo pudo llenarse durante el reinicio)
+        available: Dict[str, float] = {}
+        kept = []
+        for position in restored:
+            spec = self.symbol_registry.get(position['symbol'])
+            base_asset = spec.base_asset if spec else None
+            if self.order_gateway and position['direction'] == 'BUY' and base_asset:
+                held = available.setdefault(base_asset, self.account_state.get_total(base_asset))
+                if held < position['quantity'] * RESTORE_BALANCE_TOLERANCE:
+                    self.position_book.close_position(position['id'], position['entry_price'], reason='RECONCILED')
+                    self.logger.warning("⚠️ Posición %s %.6f descartada: saldo %s %.6f en el exchange",
+                                        position['symbol'], position['quantity'], base_asset, held)
+                    continue
+                available[base_asset] = held - position['quantity']
+            kept.append(position)
+        if restored:
+            self.logger.info("📒 %d/%d posiciones abiertas recuperadas del proceso anterior",
+                             len(kept), len(restored))
+        return kept
     
     def start(self):
         """Iniciar bot FASE 1.6 MULTI-PAR"""
         try:
             self.running = True
+            self.restore_open_positions()
+            if config.WATCHDOG_ENABLED:
+                self.cycle_watchdog.start()
             self.logger.info("🚀 Bot profesional - FASE 1.6 MULTI-PAR iniciado correctamente")
             self.logger.info("🔄 Iniciando bucle principal con optimizaciones...")
             
@@ -1758,6 +2835,14 @@ class ProfessionalTradingBot:
         try:
             self.logger.info("💾 Guardando estado...")
             
+            if self.pair_selector_service:
+                self.pair_selector_service.stop()
+            if self.market_consumer:
+                self.market_consumer.close()
+            if self.order_gateway:
+                self.order_gateway.rest.close()
+            self.save_open_positions()
+            
             # Calcular métricas finales
             metrics = self.metrics_tracker.get_metrics_summary()
             self.logger.info(f"📊 Win Rate calculado: {metrics['win_rate']:.2f}%")
@@ -1773,13 +2858,14 @@ class ProfessionalTradingBot:
             session_summary = {
                 'session_start': self.session_start_time.isoformat(),
                 'session_end': datetime.now().isoformat(),
-                'initial_capital': 50.0,
+                'initial_capital': self.initial_capital,
                 'final_capital': self.current_capital,
                 'total_trades': len(self.metrics_tracker.operations_history),
                 'win_rate': metrics['win_rate'],
                 'profit_factor': self.metrics_tracker.get_profit_factor_display(),
                 'drawdown': metrics['drawdown'],
-                'symbols_traded': list(set([t.get('symbol', 'UNKNOWN') for t in self.metrics_tracker.operations_history])),
+                'symbols_traded': self.metrics_tracker.get_symbols_traded(),
+                'symbol_breakdown': self.metrics_tracker.get_symbol_breakdown(),
                 'symbol_rotations': self.symbol_rotation_counter
             }
             
@@ -1796,7 +2882,7 @@ class ProfessionalTradingBot:
 🛑 **BOT PROFESIONAL - FASE 1.6 MULTI-PAR CERRADO**
 
 📅 **Sesión**: {self.session_start_time.strftime('%Y-%m-%d %H:%M')} → {datetime.now().strftime('%Y-%m-%d %H:%M')}
-💰 **Capital**: ${50.0:.2f} → ${self.current_capital:.2f}
+💰 **Capital**: ${self.initial_capital:.2f} → ${self.current_capital:.2f}
 
 📊 **Resumen Final**:
 🎯 **Trades**: {len(self.metrics_tracker.operations_history)}
@@ -1805,7 +2891,7 @@ class ProfessionalTradingBot:
 📉 **Drawdown**: {metrics['drawdown']:.2f}%
 
 🔄 **Multi-Par**:
-📊 **Símbolos**: {', '.join(list(set([t.get('symbol', 'UNKNOWN') for t in self.metrics_tracker.operations_history])))}
+📊 **Símbolos**: {', '.join(self.metrics_tracker.get_symbols_traded())}
 🔄 **Rotaciones**: {self.symbol_rotation_counter}
 
 ---
@@ -1814,11 +2900,29 @@ class ProfessionalTradingBot:
             self.send_telegram_message(closing_message)
             
             self.logger.info("✅ Bot FASE 1.6 MULTI-PAR cerrado correctamente")
+            self.logger.info("⏱️ Ciclos: %s", self.cycle_watchdog.get_stats())
             self.logger.info("✅ Bot terminado correctamente")
             
+            # Con reinicio pedido el watchdog sigue vigilando el cierre hasta la salida
+            if not self.cycle_watchdog.restart_requested:
+                self.cycle_watchdog.stop()
+            self.cycle_tracer.close()
+            
         except Exception as e:
             self.logger.error(f"❌ Error guardando estado: {e}")
     
+# Motivos de rechazo conocidos y el filtro que los emite
+REJECTION_REASON_FILTERS = {
+    'low_vol': 'market_filter',
+    'trend_mismatch': 'market_filter',
+    'spread_high': 'market_filter',
+    'safety_block': 'safety',
+    'cooldown': 'safety',
+    'low_edge': 'edge',
+    'min_notional': 'exchange',
+    'position_open': 'safety'
+}
+
 class TelemetryManager:
     """Sistema de telemetría y alertas"""
     
@@ -1827,43 +2931,53 @@ class TelemetryManager:
         self.bot = bot_instance
         self.last_telemetry_time = datetime.now()
         self.telemetry_interval = 300  # 5 minutos
-        self.rejection_reasons = {
-            'low_vol': 0,
-            'trend_mismatch': 0,
-            'spread_high': 0,
-            'safety_block': 0,
-            'cooldown': 0
-        }
+        self.rejection_stats = RejectionStats()
+        self.rejection_window = '1h'
         self.total_signals = 0
-        
-    def record_rejection(self, reason: str):
-        """Registrar motivo de rechazo"""
+    
+    def record_signal(self, symbol: str):
+        """Registrar señal evaluada (denominador de las tasas de rechazo)"""
         try:
             self.total_signals += 1
-            if reason in self.rejection_reasons:
-                self.rejection_reasons[reason] += 1
-            else:
-                self.rejection_reasons['other'] = self.rejection_reasons.get('other', 0) + 1
-                
+            self.rejection_stats.record_signal(symbol)
+        except Exception as e:
+            self.logger.error(f"❌ Error registrando señal: {e}")
+        
+    def record_rejection(self, reason: str, symbol: str = None, filter_name: str = None):
+        """Registrar motivo de rechazo por (símbolo, filtro, motivo)"""
+        try:
+            self.rejection_stats.record_rejection(
+                symbol or 'UNKNOWN',
+                filter_name or REJECTION_REASON_FILTERS.get(reason, 'other'),
+                reason
+            )
         except Exception as e:
             self.logger.error(f"❌ Error registrando rechazo: {e}")
     
-    def calculate_rejection_percentages(self) -> Dict:
-        """Calcular porcentajes de rechazo"""
+    def calculate_rejection_percentages(self, window: str = None) -> Dict:
+        """Calcular porcentajes de rechazo en la ventana deslizante (por defecto 1h)"""
         try:
-            if self.total_signals == 0:
-                return {reason: 0.0 for reason in self.rejection_reasons}
-            
-            percentages = {}
-            for reason, count in self.rejection_reasons.items():
-                percentages[reason] = (count / self.total_signals) * 100
-                
+            window = window or self.rejection_window
+            percentages = {
+                reason: self.rejection_stats.rate(window, filter_name=filter_name, reason=reason)
+                for reason, filter_name in REJECTION_REASON_FILTERS.items()
+            }
+            percentages['pre_trade'] = self.rejection_stats.rate(window, filter_name='pre_trade')
+            percentages['total'] = self.rejection_stats.rate(window)
             return percentages
             
         except Exception as e:
             self.logger.error(f"❌ Error calculando porcentajes: {e}")
             return {}
     
+    def format_top_rejection(self) -> str:
+        """Filtro que más señales consume ahora mismo (p. ej. 'BTCUSDT pre_trade:HIGH_SPREAD 12')"""
+        top = self.rejection_stats.top_rejections(self.rejection_window, limit=1)
+        if not top:
+            return ''
+        row = top[0]
+        return f"{row['symbol']} {row['filter']}:{row['reason']} {row['count']}"
+    
     def should_send_telemetry(self) -> bool:
         """Verificar si debe enviar telemetría"""
         return (datetime.now() - self.last_telemetry_time).total_seconds() >= self.telemetry_interval
@@ -1922,20 +3036,26 @@ class TelemetryManager:
                 'rejection_spread': rejection_percentages.get('spread_high', 0),
                 'rejection_safety': rejection_percentages.get('safety_block', 0),
                 'rejection_cooldown': rejection_percentages.get('cooldown', 0),
+                'rejection_pre_trade': rejection_percentages.get('pre_trade', 0),
+                'top_rejection': self.format_top_rejection(),
                 'total_signals': self.total_signals,
                 'probation_mode': safety_status.get('probation_mode', False),
-                'racha_cooldown': safety_status.get('racha_cooldown_active', False)
+                'racha_cooldown': safety_status.get('racha_cooldown_active', False),
+                'weight_headroom': get_request_budget().headroom() * 100 if get_request_budget() else None,
+                'circuit_breakers': ' '.join(f"{name}:{state}" for name, state in get_breaker_states().items()),
+                'cycle_budget_pct': self.bot.cycle_watchdog.budget_usage_pct()
             }
             
             # Enviar a Google Sheets
-            self.bot.sheets_logger.log_telemetry(telemetry_data)
+            with cycle_stage('sheets_telemetry', cat='sink') as span:
+                span.set(outcome='ok' if self.bot.sheets_logger.log_telemetry(telemetry_data) else 'failed')
             
             # Verificar alertas críticas
             if self.should_send_alert(metrics, safety_status):
                 self.send_critical_alert(metrics, safety_status, telemetry_data)
             
             self.last_telemetry_time = datetime.now()
-            self.logger.info("📊 Telemetría enviada")
+            self.logger.debug("📊 Telemetría enviada")
             
         except Exception as e:
             self.logger.error(f"❌ Error enviando telemetría: {e}")
@@ -1966,6 +3086,97 @@ class TelemetryManager:
         except Exception as e:
             self.logger.error(f"❌ Error enviando alerta crítica: {e}")
 
+# === FASE 1.6: WORKERS POR SHARD (--shards N) ===
+
+SHARD_REPORT_SEC = 60
+SELECTOR_RELAY_SEC = 1  # cadencia del reenvío de pares del selector a los shards
+
+def run_shard_worker(shard_index: int, shard_count: int, risk_handle: Dict[str, Any],
+                     budget_handle: Dict[str, Any], selector_conn: Any = None) -> None:
+    """Proceso worker: sus pares, su fracción del capital, los límites globales y el peso REST compartidos"""
+    config.PAIR_SELECTOR_MODE = 'shard'  # la selección es del supervisor: ningún selector por shard
+    root, ext = os.path.splitext(config.LOG_FILE)
+    config.LOG_FILE = f"{root}.shard{shard_index}{ext}"
+    root, ext = os.path.splitext(config.TRACE_FILE)
+    config.TRACE_FILE = f"{root}.shard{shard_index}{ext}"
+    config.INITIAL_CAPITAL = config.INITIAL_CAPITAL / shard_count
+    setup_logging_from_config(config)
+    risk_coordinator = RiskCoordinator.attach(risk_handle)
+    request_budget = init_request_budget(config, handle=budget_handle)
+    try:
+        bot = ProfessionalTradingBot()
+        bot.local_logger.data_dir = os.path.join(bot.local_logger.data_dir, f"shard{shard_index}")
+        bot.local_logger.setup_directory()
+        bot.attach_shard(shard_index, shard_count, risk_coordinator,
+                         ShardSelectorLink(selector_conn) if selector_conn is not None else None)
+        bot.start()
+        if bot.cycle_watchdog.restart_requested:
+            sys.exit(WATCHDOG_RESTART_EXIT_CODE)
+    finally:
+        risk_coordinator.close()
+        request_budget.close()
+        stop_logging()
+
+def run_sharded(shard_count: int) -> int:
+    """Supervisor: crea el coordinador de riesgo y el selector, lanza los shards y los cierra con la señal"""
+    logger = logging.getLogger(__name__)
+    risk_coordinator = RiskCoordinator.from_config(config)
+    request_budget = RequestBudget.from_config(config, shared=True)  # un solo bucket de peso para todos los shards
+    context = multiprocessing.get_context('spawn')
+    
+    # Un único selector (proceso aparte) para todos los shards; datos reales solo desde el bus
+    relay = None
+    live_data = config.LIVE_TRADING and not config.SHADOW_MODE and config.MODE != 'testnet'
+    if config.AUTO_PAIR_SELECTOR and live_data and not config.MARKET_BUS_NAME:
+        logger.warning("⚠️ Shards sin MARKET_BUS_NAME: sin selector, cada shard opera sus pares fijos")
+    elif config.AUTO_PAIR_SELECTOR:
+        relay = SelectorRelay(init_pair_selector_service(config), shard_count, context)
+    
+    def launch(index: int):
+        worker = context.Process(target=run_shard_worker,
+                                 args=(index, shard_count, risk_coordinator.handle(), request_budget.handle(),
+                                       relay.shard_conn(index) if relay else None),
+                                 name=f"shard-{index}")
+        worker.start()
+        return worker
+    
+    workers = [launch(index) for index in range(shard_count)]
+    logger.info("🧩 %d shards lanzados (pids %s)", shard_count, ', '.join(str(w.pid) for w in workers))
+    
+    try:
+        next_report = time.time() + SHARD_REPORT_SEC
+        while not shutdown_state["stop"] and any(worker.is_alive() for worker in workers):
+            sleep_responsive(SELECTOR_RELAY_SEC)
+            if relay is not None:
+                relay.step()
+            if time.time() >= next_report:
+                next_report = time.time() + SHARD_REPORT_SEC
+                logger.info("🛡️ Riesgo global: %s", risk_coordinator.get_snapshot())
+            
+            # Shard reiniciado por su watchdog (ciclo bloqueado): relanzarlo con el mismo índice
+            for index, worker in enumerate(workers):
+                if not worker.is_alive() and worker.exitcode == WATCHDOG_RESTART_EXIT_CODE \
+                        and not shutdown_state["stop"]:
+                    workers[index] = launch(index)
+                    if relay is not None:
+                        relay.forward(index)  # pares vigentes sin esperar a la próxima publicación
+                    logger.warning("🔁 Shard %d relanzado tras reinicio del watchdog (pid %d)",
+                                   index, workers[index].pid)
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()  # SIGTERM: apagado limpio del worker
+        for worker in workers:
+            worker.join(30)
+            if worker.is_alive():
+                worker.kill()
+        if relay is not None:
+            relay.close()
+        logger.info("🛡️ Riesgo global final: %s", risk_coordinator.get_snapshot())
+        risk_coordinator.close()
+        request_budget.close()
+    return 0 if all(worker.exitcode == 0 for worker in workers) else 1
+
 def main():
     """Función principal del bot FASE 1.6 MULTI-PAR"""
     try:
@@ -1975,18 +3186,31 @@ def main():
                           help='Modo de operación (testnet/production)')
         parser.add_argument('--config', type=str, default='config_fase_1_6.py',
                           help='Archivo de configuración')
+        parser.add_argument('--soak', action='store_true',
+                          help='Soak test acelerado: reloj virtual, sin sleeps, sinks nulos')
+        parser.add_argument('--soak-cycles', type=int, default=1_000_000,
+                          help='Ciclos a ejecutar en modo soak')
+        parser.add_argument('--soak-samples', type=int, default=20,
+                          help='Muestreos de memoria/estructuras durante el soak')
+        parser.add_argument('--soak-report', type=str, default=None,
+                          help='Fichero JSON para el informe de soak')
+        parser.add_argument('--soak-no-tracemalloc', action='store_true',
+                          help='Desactivar tracemalloc (más ciclos/s, sin memoria trazada)')
+        parser.add_argument('--shards', type=int, default=1,
+                          help='Workers en procesos separados con límites de riesgo globales compartidos')
         
         args = parser.parse_args()
         
-        # Configurar logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.StreamHandler(),
-                logging.FileHandler('trading_bot.log')
-            ]
-        )
+        if args.soak:
+            from soak_runner import run_soak, print_report
+            setup_logging(level='WARNING', log_file=None)
+            report = run_soak(cycles=args.soak_cycles, samples=args.soak_samples,
+                              use_tracemalloc=not args.soak_no_tracemalloc, report_path=args.soak_report)
+            print_report(report)
+            sys.exit(1 if report['growing_structures'] else 0)
+        
+        # Configurar logging no bloqueante (cola + listener con rotación)
+        setup_logging_from_config(config)
         
         logger = logging.getLogger(__name__)
         
@@ -2010,6 +3234,9 @@ def main():
         logger.info(f"🛡️ DD Máximo: {summary['daily_max_drawdown_pct']}%")
         logger.info(f"📊 Trades Máx/Día: {summary['max_trades_per_day']}")
         
+        if args.shards > 1:
+            sys.exit(run_sharded(args.shards))
+        
         # Crear y iniciar bot
         bot = ProfessionalTradingBot()
         
@@ -2021,15 +3248,24 @@ def main():
             
         signal.signal(signal.SIGTERM, signal_handler)
         signal.signal(signal.SIGINT, signal_handler)
+        
+        # Perfilado bajo demanda: kill -USR1 (perfil acotado) / kill -USR2 (pilas de hilos)
+        init_profiler_trigger(config).install()
             
         # Iniciar bot
         bot.start()
         
+        # Reinicio controlado del watchdog: código 75 para que el supervisor relance el proceso
+        if bot.cycle_watchdog.restart_requested:
+            sys.exit(WATCHDOG_RESTART_EXIT_CODE)
+        
     except KeyboardInterrupt:
         logger.info("🛑 Interrupción manual recibida")
     except Exception as e:
         logger.error(f"❌ Error en función principal: {e}")
         sys.exit(1)
+    finally:
+        stop_logging()
 
 if __name__ == "__main__":
     main()
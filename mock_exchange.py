@@ -0,0 +1,786 @@
+#!/usr/bin/env python3
+"""
+🧪 MOCK EXCHANGE - FASE 1.6
+Exchange local (en proceso o localhost) que habla el subconjunto REST/user-data de Binance
+que usa el bot: klines, bookTicker, ticker 24h, exchangeInfo, cuenta, órdenes y eventos
+executionReport / outboundAccountPosition / balanceUpdate.
+Soporta distribuciones de latencia, respuestas de rate-limit y modelado de cola maker.
+"""
+
+import json
+import math
+import time
+import hmac
+import heapq
+import random
+import hashlib
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlencode, urlparse, parse_qsl
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+from symbol_registry import DEFAULT_FIXTURE_PATH
+from request_budget import request_weight  # misma tabla de pesos que el presupuesto del cliente
+
+# Precios medios por defecto del mock
+DEFAULT_MID_PRICES = {
+    'BTCUSDT': 45000.0,
+    'ETHUSDT': 2800.0,
+    'BNBUSDT': 600.0,
+    'SOLUSDT': 100.0
+}
+
+SIGNED_ENDPOINTS = {'/api/v3/order', '/api/v3/account'}
+
+INTERVAL_MS = {
+    '1m': 60_000,
+    '5m': 300_000,
+    '15m': 900_000,
+    '1h': 3_600_000,
+    '4h': 14_400_000,
+    '1d': 86_400_000
+}
+
+class LatencyModel:
+    """Distribución de latencia reproducible (fixed, uniform, normal, lognormal)"""
+
+    def __init__(self, kind: str = 'lognormal', median_ms: float = 50.0, sigma: float = 0.5,
+                 low_ms: float = 0.0, high_ms: float = None, spike_prob: float = 0.0,
+                 spike_ms: float = 0.0, seed: int = 0):
+        self.kind = kind
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.low_ms = low_ms
+        self.high_ms = high_ms
+        self.spike_prob = spike_prob
+        self.spike_ms = spike_ms
+        self.rng = random.Random(seed)
+
+    def sample(self) -> float:
+        """Muestrear una latencia en milisegundos"""
+        if self.kind == 'fixed':
+            value = self.median_ms
+        elif self.kind == 'uniform':
+            value = self.rng.uniform(self.low_ms, self.high_ms if self.high_ms is not None else 2 * self.median_ms)
+        elif self.kind == 'normal':
+            value = self.rng.gauss(self.median_ms, self.sigma * self.median_ms)
+        else:
+            value = self.rng.lognormvariate(math.log(max(self.median_ms, 1e-6)), self.sigma)
+
+        # Colas pesadas: picos ocasionales (GC, red, saturación del exchange)
+        if self.spike_prob > 0 and self.rng.random() < self.spike_prob:
+            value += self.spike_ms
+
+        value = max(value, self.low_ms)
+        if self.high_ms is not None and self.kind != 'uniform':
+            value = min(value, self.high_ms)
+        return value
+
+class MockExchange:
+    """Estado del exchange simulado: libros, órdenes, rate limits y user-data"""
+
+    def __init__(self, mid_prices: Dict[str, float] = None, seed: int = 0,
+                 rest_latency: LatencyModel = None, ws_latency: LatencyModel = None,
+                 apply_rest_latency: bool = False, async_events: bool = False,
+                 weight_limit_1m: int = 6000, order_limit_10s: int = 100, ban_after_429: int = 3,
+                 spread_bps: float = 1.0, level_qty: float = 5.0, api_secret: str = None,
+                 balances: Dict[str, float] = None, quote_asset: str = 'USDT',
+                 time_fn: Callable[[], float] = time.time):
+        self.logger = logging.getLogger(__name__)
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.time_fn = time_fn
+        self.lock = threading.RLock()
+
+        # Latencias simuladas
+        self.rest_latency = rest_latency
+        self.ws_latency = ws_latency
+        self.apply_rest_latency = apply_rest_latency
+        self.async_events = async_events
+
+        # Rate limits
+        self.weight_limit_1m = weight_limit_1m
+        self.order_limit_10s = order_limit_10s
+        self.ban_after_429 = ban_after_429
+        self.weight_window = None
+        self.used_weight = 0
+        self.order_window = None
+        self.order_count = 0
+        self.consecutive_429 = 0
+        self.banned_until = 0.0
+        self.api_secret = api_secret
+
+        # Libros de órdenes (top-of-book + profundidad por nivel)
+        self.spread_bps = spread_bps
+        self.level_qty = level_qty
+        self.books: Dict[str, Dict[str, float]] = {}
+        self.exchange_info_fixture = None
+
+        # Balances de la cuenta (solo 'free'; el mock no reserva saldo en órdenes abiertas)
+        self.quote_asset = quote_asset
+        self.balances: Dict[str, float] = dict(balances) if balances is not None else {quote_asset: 10000.0}
+
+        # Órdenes
+        self.next_order_id = 1
+        self.orders: Dict[int, Dict[str, Any]] = {}
+        self.open_by_client_id: Dict[str, int] = {}
+        self.client_ids: Dict[str, int] = {}
+        self.next_trade_id = 1
+
+        # User-data stream
+        self.subscribers: List[Callable[[Dict[str, Any]], None]] = []
+        self.event_queue: List[Tuple[float, int, Dict[str, Any]]] = []
+        self.event_seq = 0
+        self.event_cond = threading.Condition()
+        self.delivery_thread = None
+        self.running = True
+
+        self.request_log: List[Tuple[str, str, int]] = []
+
+        for symbol, mid in (mid_prices or DEFAULT_MID_PRICES).items():
+            self.set_mid(symbol, mid)
+
+    # === LIBROS ===
+
+    def set_mid(self, symbol: str, mid: float, bid_qty: float = None, ask_qty: float = None) -> None:
+        """Fijar precio medio y reconstruir top-of-book"""
+        half = mid * self.spread_bps / 2 / 10000
+        self.set_book(symbol, mid - half, mid + half, bid_qty, ask_qty)
+
+    def set_book(self, symbol: str, bid: float, ask: float, bid_qty: float = None, ask_qty: float = None) -> None:
+        """Fijar top-of-book; las órdenes atravesadas por el nuevo precio se ejecutan"""
+        with self.lock:
+            book = self.books.setdefault(symbol, {})
+            book['bid'] = bid
+            book['ask'] = ask
+            book['bid_qty'] = bid_qty if bid_qty is not None else self.level_qty
+            book['ask_qty'] = ask_qty if ask_qty is not None else self.level_qty
+            book['last'] = (bid + ask) / 2
+            events = self._fill_crossed_orders(symbol)
+        self._emit_all(events)
+
+    def book_ticker(self, symbol: str) -> Dict[str, str]:
+        """bookTicker en formato Binance"""
+        book = self.books[symbol]
+        return {
+            'symbol': symbol,
+            'bidPrice': f"{book['bid']:.8f}",
+            'bidQty': f"{book['bid_qty']:.8f}",
+            'askPrice': f"{book['ask']:.8f}",
+            'askQty': f"{book['ask_qty']:.8f}"
+        }
+
+    def ticker_24h(self, symbol: str) -> Dict[str, str]:
+        """ticker/24hr en formato Binance, coherente con las klines horarias del mock"""
+        rows = self.klines(symbol, '1h', 24)
+        open_price = float(rows[0][1])
+        last = self.books[symbol]['last']
+        return {
+            'symbol': symbol,
+            'priceChangePercent': f"{(last - open_price) / open_price * 100:.3f}",
+            'openPrice': f"{open_price:.8f}",
+            'highPrice': f"{max(float(row[2]) for row in rows):.8f}",
+            'lowPrice': f"{min(float(row[3]) for row in rows):.8f}",
+            'lastPrice': f"{last:.8f}",
+            'volume': f"{sum(float(row[5]) for row in rows):.8f}",
+            'quoteVolume': f"{sum(float(row[7]) for row in rows):.8f}",
+            'count': sum(row[8] for row in rows)
+        }
+
+    def exchange_info(self, symbol: str = None) -> Dict[str, Any]:
+        """exchangeInfo del fixture, limitado a los símbolos con libro en el mock"""
+        if self.exchange_info_fixture is None:
+            with open(DEFAULT_FIXTURE_PATH, 'r', encoding='utf-8') as f:
+                self.exchange_info_fixture = json.load(f)
+        if symbol is not None and symbol not in self.books:
+            raise KeyError(symbol)
+        wanted = {symbol} if symbol is not None else set(self.books)
+        info = dict(self.exchange_info_fixture)
+        info['serverTime'] = int(self.time_fn() * 1000)
+        info['symbols'] = [entry for entry in self.exchange_info_fixture['symbols'] if entry['symbol'] in wanted]
+        return info
+
+    def klines(self, symbol: str, interval: str = '1m', limit: int = 500, end_time_ms: int = None) -> List[List[Any]]:
+        """Klines deterministas terminando en el precio actual"""
+        step_ms = INTERVAL_MS.get(interval, 60_000)
+        end_ms = end_time_ms or int(self.time_fn() * 1000)
+        end_ms -= end_ms % step_ms
+        seed = int(hashlib.sha1(f"{self.seed}|{symbol}|{interval}|{end_ms}".encode()).hexdigest()[:12], 16)
+        rng = random.Random(seed)
+
+        vol = 0.002 * math.sqrt(step_ms / 60_000)
+        price = self.books[symbol]['last']
+        closes = [price]
+        for _ in range(limit - 1):
+            price = price / (1 + rng.gauss(0, vol))
+            closes.append(price)
+        closes.reverse()
+
+        rows = []
+        open_price = closes[0] * (1 + rng.gauss(0, vol / 2))
+        for i, close in enumerate(closes):
+            open_time = end_ms - (limit - 1 - i) * step_ms
+            high = max(open_price, close) * (1 + abs(rng.gauss(0, vol / 2)))
+            low = min(open_price, close) * (1 - abs(rng.gauss(0, vol / 2)))
+            volume = rng.uniform(50, 500) * 1000 / close
+            rows.append([open_time, f"{open_price:.8f}", f"{high:.8f}", f"{low:.8f}", f"{close:.8f}",
+                         f"{volume:.8f}", open_time + step_ms - 1, f"{volume * close:.8f}",
+                         rng.randint(100, 1000), f"{volume / 2:.8f}", f"{volume * close / 2:.8f}", "0"])
+            open_price = close
+        return rows
+
+    def market_snapshot(self, symbol: str) -> Dict[str, float]:
+        """Snapshot en el formato que consumen los filtros pre-trade"""
+        book = self.books[symbol]
+        price = book['last']
+        return {
+            'price': price,
+            'high': price * (1 + self.rng.uniform(0.0005, 0.002)),
+            'low': price * (1 - self.rng.uniform(0.0005, 0.002)),
+            'close': price,
+            'best_ask': book['ask'],
+            'best_bid': book['bid'],
+            'volume_usd': self.rng.uniform(5_000_000, 15_000_000),
+            'ws_latency_ms': self.ws_latency.sample() if self.ws_latency else 0.0,
+            'rest_latency_ms': self.rest_latency.sample() if self.rest_latency else 0.0
+        }
+
+    # === FLUJO DE MERCADO Y COLA MAKER ===
+
+    def trade(self, symbol: str, price: float, qty: float, aggressor_side: str) -> None:
+        """Imprimir un trade: consume la cola por delante de nuestras órdenes maker"""
+        events = []
+        with self.lock:
+            remaining = qty
+            resting_side = 'BUY' if aggressor_side == 'SELL' else 'SELL'
+            for order in self._resting_orders(symbol, resting_side):
+                if remaining <= 0:
+                    break
+                through = order['price'] > price if resting_side == 'BUY' else order['price'] < price
+                at_level = abs(order['price'] - price) <= 1e-12 * max(price, 1.0)
+                if not (through or at_level):
+                    continue
+
+                if at_level:
+                    # Prioridad precio-tiempo: primero se consume la cola por delante
+                    consumed = min(order['queue_ahead'], remaining)
+                    order['queue_ahead'] -= consumed
+                    remaining -= consumed
+                    if order['queue_ahead'] > 0:
+                        continue
+                    fill_qty = min(order['origQty'] - order['executedQty'], remaining)
+                    remaining -= fill_qty
+                else:
+                    fill_qty = order['origQty'] - order['executedQty']
+
+                if fill_qty > 0:
+                    events.extend(self._fill(order, fill_qty, order['price']))
+            self.books[symbol]['last'] = price
+        self._emit_all(events)
+
+    def random_walk(self, symbol: str, steps: int = 1, vol_bps: float = 2.0, trade_qty: float = 1.0) -> None:
+        """Avanzar el mercado: movimiento del medio + flujo agresor aleatorio"""
+        for _ in range(steps):
+            book = self.books[symbol]
+            mid = (book['bid'] + book['ask']) / 2 * (1 + self.rng.gauss(0, vol_bps / 10000))
+            self.set_mid(symbol, mid)
+            side = 'SELL' if self.rng.random() < 0.5 else 'BUY'
+            price = self.books[symbol]['bid'] if side == 'SELL' else self.books[symbol]['ask']
+            self.trade(symbol, price, self.rng.expovariate(1 / trade_qty), side)
+
+    def _resting_orders(self, symbol: str, side: str) -> List[Dict[str, Any]]:
+        """Órdenes abiertas de un lado ordenadas por prioridad precio-tiempo"""
+        orders = [o for o in self.orders.values()
+                  if o['symbol'] == symbol and o['side'] == side and o['status'] in ('NEW', 'PARTIALLY_FILLED')]
+        reverse = side == 'BUY'
+        return sorted(orders, key=lambda o: (-o['price'] if reverse else o['price'], o['orderId']))
+
+    def _fill_crossed_orders(self, symbol: str) -> List[Dict[str, Any]]:
+        """Ejecutar órdenes que el nuevo top-of-book ha atravesado"""
+        book = self.books[symbol]
+        events = []
+        for order in self._resting_orders(symbol, 'BUY'):
+            if book['ask'] <= order['price'] - 1e-12:
+                events.extend(self._fill(order, order['origQty'] - order['executedQty'], order['price']))
+        for order in self._resting_orders(symbol, 'SELL'):
+            if book['bid'] >= order['price'] + 1e-12:
+                events.extend(self._fill(order, order['origQty'] - order['executedQty'], order['price']))
+        return events
+
+    def _fill(self, order: Dict[str, Any], qty: float, price: float, maker: bool = True) -> List[Dict[str, Any]]:
+        """Aplicar fill: executionReport TRADE + outboundAccountPosition con los balances movidos"""
+        order['executedQty'] += qty
+        order['cummulativeQuoteQty'] += qty * price
+        filled = order['executedQty'] >= order['origQty'] - 1e-12
+        order['status'] = 'FILLED' if filled else 'PARTIALLY_FILLED'
+        if filled:
+            self.open_by_client_id.pop(order['clientOrderId'], None)
+        trade_id = self.next_trade_id
+        self.next_trade_id += 1
+        report = self._execution_report(order, 'TRADE', last_qty=qty, last_price=price, trade_id=trade_id, maker=maker)
+
+        base_asset = self._base_asset(order['symbol'])
+        direction = 1 if order['side'] == 'BUY' else -1
+        self.balances[base_asset] = self.balances.get(base_asset, 0.0) + direction * qty
+        self.balances[self.quote_asset] = self.balances.get(self.quote_asset, 0.0) - direction * qty * price
+        return [report, self._account_position([base_asset, self.quote_asset])]
+
+    def _base_asset(self, symbol: str) -> str:
+        return symbol[:-len(self.quote_asset)] if symbol.endswith(self.quote_asset) else symbol
+
+    def _account_position(self, assets: List[str]) -> Dict[str, Any]:
+        """Construir evento outboundAccountPosition"""
+        now_ms = int(self.time_fn() * 1000)
+        return {
+            'e': 'outboundAccountPosition',
+            'E': now_ms,
+            'u': now_ms,
+            'B': [{'a': asset, 'f': f"{self.balances.get(asset, 0.0):.8f}", 'l': '0.00000000'} for asset in assets]
+        }
+
+    def account(self) -> Dict[str, Any]:
+        """GET /api/v3/account"""
+        with self.lock:
+            return {
+                'makerCommission': 10,
+                'takerCommission': 10,
+                'canTrade': True,
+                'accountType': 'SPOT',
+                'updateTime': int(self.time_fn() * 1000),
+                'balances': [{'asset': asset, 'free': f"{free:.8f}", 'locked': '0.00000000'}
+                             for asset, free in sorted(self.balances.items())]
+            }
+
+    def deposit(self, asset: str, amount: float) -> None:
+        """Movimiento externo de saldo (emite balanceUpdate)"""
+        with self.lock:
+            self.balances[asset] = self.balances.get(asset, 0.0) + amount
+            now_ms = int(self.time_fn() * 1000)
+            event = {'e': 'balanceUpdate', 'E': now_ms, 'a': asset, 'd': f"{amount:.8f}", 'T': now_ms}
+        self._emit_all([event])
+
+    # === ÓRDENES ===
+
+    def place_order(self, params: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """POST /api/v3/order"""
+        events = []
+        with self.lock:
+            symbol = params.get('symbol')
+            if symbol not in self.books:
+                return 400, {'code': -1121, 'msg': 'Invalid symbol.'}
+
+            client_id = params.get('newClientOrderId') or f"mock_{self.next_order_id}"
+            if client_id in self.open_by_client_id:
+                return 400, {'code': -2010, 'msg': 'Duplicate order sent.'}
+
+            side = params.get('side')
+            order_type = params.get('type')
+            qty = float(params.get('quantity', 0))
+            price = float(params.get('price', 0))
+            book = self.books[symbol]
+
+            marketable = price >= book['ask'] if side == 'BUY' else price <= book['bid']
+            if order_type == 'LIMIT_MAKER' and marketable:
+                return 400, {'code': -2010, 'msg': 'Order would immediately match and take.'}
+
+            order_id = self.next_order_id
+            self.next_order_id += 1
+            order = {
+                'orderId': order_id,
+                'clientOrderId': client_id,
+                'symbol': symbol,
+                'side': side,
+                'type': order_type,
+                'price': price,
+                'origQty': qty,
+                'executedQty': 0.0,
+                'cummulativeQuoteQty': 0.0,
+                'status': 'NEW',
+                'time': int(self.time_fn() * 1000),
+                'queue_ahead': self._queue_ahead(book, side, price)
+            }
+            self.orders[order_id] = order
+            self.open_by_client_id[client_id] = order_id
+            self.client_ids[client_id] = order_id
+            events.append(self._execution_report(order, 'NEW'))
+
+            if marketable:
+                # LIMIT agresiva: fill inmediato como taker al mejor precio contrario
+                fill_price = book['ask'] if side == 'BUY' else book['bid']
+                events.extend(self._fill(order, qty, fill_price, maker=False))
+
+            response = {
+                'symbol': symbol,
+                'orderId': order_id,
+                'orderListId': -1,
+                'clientOrderId': client_id,
+                'transactTime': order['time']
+            }
+            if params.get('newOrderRespType') != 'ACK':
+                response.update(self._order_json(order))
+        self._emit_all(events)
+        return 200, response
+
+    def _queue_ahead(self, book: Dict[str, float], side: str, price: float) -> float:
+        """Cantidad visible por delante en la cola al entrar en un nivel"""
+        best = book['bid'] if side == 'BUY' else book['ask']
+        best_qty = book['bid_qty'] if side == 'BUY' else book['ask_qty']
+        improves = price > best if side == 'BUY' else price < best
+        if improves:
+            return 0.0
+        if abs(price - best) <= 1e-12 * max(price, 1.0):
+            return best_qty
+        return self.level_qty
+
+    def find_order(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Buscar orden por orderId o origClientOrderId"""
+        if 'orderId' in params:
+            return self.orders.get(int(params['orderId']))
+        order_id = self.client_ids.get(params.get('origClientOrderId'))
+        return self.orders.get(order_id) if order_id else None
+
+    def cancel_order(self, params: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """DELETE /api/v3/order"""
+        events = []
+        with self.lock:
+            order = self.find_order(params)
+            if order is None or order['status'] not in ('NEW', 'PARTIALLY_FILLED'):
+                return 400, {'code': -2011, 'msg': 'Unknown order sent.'}
+            order['status'] = 'CANCELED'
+            self.open_by_client_id.pop(order['clientOrderId'], None)
+            events.append(self._execution_report(order, 'CANCELED',
+                                                 cancel_client_id=params.get('newClientOrderId', f"cancel_{order['orderId']}")))
+            response = self._order_json(order)
+        self._emit_all(events)
+        return 200, response
+
+    def _order_json(self, order: Dict[str, Any]) -> Dict[str, Any]:
+        """Orden en formato de respuesta REST"""
+        return {
+            'symbol': order['symbol'],
+            'orderId': order['orderId'],
+            'clientOrderId': order['clientOrderId'],
+            'price': f"{order['price']:.8f}",
+            'origQty': f"{order['origQty']:.8f}",
+            'executedQty': f"{order['executedQty']:.8f}",
+            'cummulativeQuoteQty': f"{order['cummulativeQuoteQty']:.8f}",
+            'status': order['status'],
+            'type': order['type'],
+            'side': order['side'],
+            'time': order['time']
+        }
+
+    # === USER-DATA STREAM ===
+
+    def start_user_socket(self, callback: Callable[[Dict[str, Any]], None]) -> str:
+        """Suscribirse a eventos (compatible con ThreadedWebsocketManager.start_user_socket)"""
+        self.subscribers.append(callback)
+        if self.async_events and self.delivery_thread is None:
+            self.delivery_thread = threading.Thread(target=self._delivery_loop, name='mock-user-data', daemon=True)
+            self.delivery_thread.start()
+        return 'mock_user_socket'
+
+    def stop(self) -> None:
+        """Detener entrega asíncrona de eventos"""
+        self.running = False
+        with self.event_cond:
+            self.event_cond.notify_all()
+
+    def _execution_report(self, order: Dict[str, Any], exec_type: str, last_qty: float = 0.0,
+                          last_price: float = 0.0, trade_id: int = -1, maker: bool = False,
+                          cancel_client_id: str = None) -> Dict[str, Any]:
+        """Construir evento executionReport"""
+        now_ms = int(self.time_fn() * 1000)
+        return {
+            'e': 'executionReport',
+            'E': now_ms,
+            's': order['symbol'],
+            'c': cancel_client_id or order['clientOrderId'],
+            'C': order['clientOrderId'] if cancel_client_id else '',
+            'S': order['side'],
+            'o': order['type'],
+            'q': f"{order['origQty']:.8f}",
+            'p': f"{order['price']:.8f}",
+            'x': exec_type,
+            'X': order['status'],
+            'r': 'NONE',
+            'i': order['orderId'],
+            'l': f"{last_qty:.8f}",
+            'z': f"{order['executedQty']:.8f}",
+            'L': f"{last_price:.8f}",
+            'n': '0',
+            'N': None,
+            'T': now_ms,
+            't': trade_id,
+            'm': maker,
+            'Z': f"{order['cummulativeQuoteQty']:.8f}"
+        }
+
+    def _emit_all(self, events: List[Dict[str, Any]]) -> None:
+        """Entregar eventos fuera del lock (en orden, con latencia WS opcional)"""
+        for event in events:
+            if not self.async_events:
+                self._deliver(event)
+                continue
+            delay = self.ws_latency.sample() / 1000 if self.ws_latency else 0.0
+            with self.event_cond:
+                self.event_seq += 1
+                heapq.heappush(self.event_queue, (time.monotonic() + delay, self.event_seq, event))
+                self.event_cond.notify()
+
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        for callback in list(self.subscribers):
+            try:
+                callback(event)
+            except Exception as e:
+                self.logger.error(f"❌ Error en suscriptor user-data del mock: {e}")
+
+    def _delivery_loop(self) -> None:
+        """Hilo de entrega: respeta latencia y orden FIFO entre eventos"""
+        last_due = 0.0
+        while self.running:
+            with self.event_cond:
+                while self.running and not self.event_queue:
+                    self.event_cond.wait(0.5)
+                if not self.running:
+                    return
+                due, _, event = self.event_queue[0]
+                wait = max(due, last_due) - time.monotonic()
+                if wait > 0:
+                    self.event_cond.wait(wait)
+                    continue
+                heapq.heappop(self.event_queue)
+                last_due = max(due, last_due)
+            self._deliver(event)
+
+    # === RATE LIMITS ===
+
+    def _check_rate_limits(self, method: str, path: str,
+                           params: Dict[str, Any] = None) -> Optional[Tuple[int, Dict[str, str], Dict[str, Any]]]:
+        """Contabilizar peso y devolver 429/418 si se excede"""
+        now = self.time_fn()
+        if now < self.banned_until:
+            retry_after = int(math.ceil(self.banned_until - now))
+            return 418, {'Retry-After': str(retry_after)}, {'code': -1003, 'msg': f'IP banned until {int(self.banned_until * 1000)}.'}
+
+        minute = int(now // 60)
+        if self.weight_window != minute:
+            self.weight_window = minute
+            self.used_weight = 0
+        window_10s = int(now // 10)
+        if self.order_window != window_10s:
+            self.order_window = window_10s
+            self.order_count = 0
+
+        weight = request_weight(method, path, params)
+        is_order = method == 'POST' and path == '/api/v3/order'
+
+        if self.used_weight + weight > self.weight_limit_1m or (is_order and self.order_count >= self.order_limit_10s):
+            self.consecutive_429 += 1
+            retry_after = 60 - int(now % 60) if self.used_weight + weight > self.weight_limit_1m else 10 - int(now % 10)
+            if self.consecutive_429 > self.ban_after_429:
+                self.banned_until = now + 120
+                return 418, {'Retry-After': '120'}, {'code': -1003, 'msg': 'Way too many requests; IP banned.'}
+            return 429, {'Retry-After': str(retry_after)}, {'code': -1003, 'msg': 'Too many requests.'}
+
+        self.consecutive_429 = 0
+        self.used_weight += weight
+        if is_order:
+            self.order_count += 1
+        return None
+
+    def _rate_headers(self) -> Dict[str, str]:
+        return {
+            'X-MBX-USED-WEIGHT-1M': str(self.used_weight),
+            'X-MBX-ORDER-COUNT-10S': str(self.order_count)
+        }
+
+    def _verify_signature(self, params: Dict[str, Any], raw_query: str = None) -> bool:
+        """Verificar firma HMAC si el mock tiene secreto configurado"""
+        if self.api_secret is None:
+            return 'signature' in params
+        signature = params.get('signature', '')
+        if raw_query is not None:
+            payload = raw_query.split('&signature=')[0]
+        else:
+            payload = urlencode([(k, v) for k, v in params.items() if k != 'signature'])
+        expected = hmac.new(self.api_secret.encode('utf-8'), payload.encode('utf-8'), hashlib.sha256).hexdigest()
+        return hmac.compare_digest(signature, expected)
+
+    # === DESPACHO REST ===
+
+    def dispatch(self, method: str, path: str, params: Dict[str, Any],
+                 raw_query: str = None) -> Tuple[int, Dict[str, str], Any]:
+        """Resolver una petición REST: (status, headers, body)"""
+        with self.lock:
+            self.request_log.append((method, path, int(self.time_fn() * 1000)))
+            limited = self._check_rate_limits(method, path, params)
+            headers = self._rate_headers()
+        if limited:
+            status, extra_headers, body = limited
+            headers.update(extra_headers)
+            return status, headers, body
+
+        if path in SIGNED_ENDPOINTS and not self._verify_signature(params, raw_query):
+            return 400, headers, {'code': -1022, 'msg': 'Signature for this request is not valid.'}
+
+        try:
+            status, body = self._route(method, path, params)
+        except KeyError as e:
+            status, body = 400, {'code': -1121, 'msg': f'Invalid symbol {e}.'}
+        except (TypeError, ValueError) as e:
+            status, body = 400, {'code': -1100, 'msg': f'Illegal characters found in parameter: {e}'}
+        return status, headers, body
+
+    def _route(self, method: str, path: str, params: Dict[str, Any]) -> Tuple[int, Any]:
+        if path == '/api/v3/ping':
+            return 200, {}
+        if path == '/api/v3/time':
+            return 200, {'serverTime': int(self.time_fn() * 1000)}
+        if path == '/api/v3/account' and method == 'GET':
+            return 200, self.account()
+        if path == '/api/v3/exchangeInfo' and method == 'GET':
+            return 200, self.exchange_info(params.get('symbol'))
+        if path == '/api/v3/klines' and method == 'GET':
+            end_time = int(params['endTime']) if 'endTime' in params else None
+            limit = int(params.get('limit', 500))
+            if 'startTime' in params and end_time is None:
+                step_ms = INTERVAL_MS.get(params.get('interval', '1m'), 60_000)
+                start_ms = int(params['startTime'])
+                start_ms += -start_ms % step_ms
+                end_time = min(start_ms + (limit - 1) * step_ms, int(self.time_fn() * 1000))
+                limit = min(limit, (end_time - end_time % step_ms - start_ms) // step_ms + 1)
+            return 200, self.klines(params['symbol'], params.get('interval', '1m'), limit, end_time)
+        if path == '/api/v3/ticker/bookTicker' and method == 'GET':
+            if 'symbol' in params:
+                return 200, self.book_ticker(params['symbol'])
+            return 200, [self.book_ticker(s) for s in sorted(self.books)]
+        if path == '/api/v3/ticker/24hr' and method == 'GET':
+            if 'symbol' in params:
+                return 200, self.ticker_24h(params['symbol'])
+            return 200, [self.ticker_24h(s) for s in sorted(self.books)]
+        if path == '/api/v3/order':
+            if method == 'POST':
+                return self.place_order(params)
+            if method == 'DELETE':
+                return self.cancel_order(params)
+            if method == 'GET':
+                order = self.find_order(params)
+                if order is None:
+                    return 400, {'code': -2013, 'msg': 'Order does not exist.'}
+                return 200, self._order_json(order)
+        if path == '/api/v3/userDataStream':
+            if method == 'POST':
+                return 200, {'listenKey': hashlib.sha1(str(self.seed).encode()).hexdigest()}
+            return 200, {}
+        return 404, {'code': -1, 'msg': f'Unsupported endpoint {method} {path}'}
+
+    def session(self) -> 'MockSession':
+        """Sesión en proceso compatible con requests.Session.request"""
+        return MockSession(self)
+
+class MockResponse:
+    """Respuesta mínima compatible con requests.Response"""
+
+    def __init__(self, status_code: int, headers: Dict[str, str], body: Any):
+        self.status_code = status_code
+        self.headers = headers
+        self._body = body
+
+    def json(self) -> Any:
+        return self._body
+
+class MockSession:
+    """Transporte en proceso hacia MockExchange (sin sockets)"""
+
+    def __init__(self, exchange: MockExchange):
+        self.exchange = exchange
+        self.headers = {}
+
+    def request(self, method: str, url: str, params: Dict[str, Any] = None, headers: Dict[str, str] = None,
+                timeout: float = None, **kwargs) -> MockResponse:
+        latency_ms = self.exchange.rest_latency.sample() if self.exchange.rest_latency else 0.0
+        if timeout is not None and latency_ms / 1000 > timeout:
+            if self.exchange.apply_rest_latency:
+                time.sleep(timeout)
+            raise TimeoutError(f"Read timed out (mock latency {latency_ms:.0f}ms)")
+        if self.exchange.apply_rest_latency and latency_ms > 0:
+            time.sleep(latency_ms / 1000)
+
+        path = urlparse(url).path
+        status, response_headers, body = self.exchange.dispatch(method.upper(), path, dict(params or {}))
+        response_headers['X-MOCK-LATENCY-MS'] = f"{latency_ms:.3f}"
+        return MockResponse(status, response_headers, body)
+
+class MockExchangeServer:
+    """Servidor HTTP localhost que expone MockExchange con rutas Binance"""
+
+    def __init__(self, exchange: MockExchange, host: str = '127.0.0.1', port: int = 0):
+        self.exchange = exchange
+        self.logger = logging.getLogger(__name__)
+        handler = self._make_handler()
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _make_handler(self):
+        exchange = self.exchange
+
+        class Handler(BaseHTTPRequestHandler):
+            def _handle(self, method):
+                parsed = urlparse(self.path)
+                raw_query = parsed.query
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    body = self.rfile.read(length).decode('utf-8')
+                    raw_query = f"{raw_query}&{body}" if raw_query else body
+                params = dict(parse_qsl(raw_query, keep_blank_values=True))
+
+                latency_ms = exchange.rest_latency.sample() if exchange.rest_latency else 0.0
+                if exchange.apply_rest_latency and latency_ms > 0:
+                    time.sleep(latency_ms / 1000)
+
+                status, headers, payload = exchange.dispatch(method, parsed.path, params, raw_query)
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._handle('GET')
+
+            def do_POST(self):
+                self._handle('POST')
+
+            def do_PUT(self):
+                self._handle('PUT')
+
+            def do_DELETE(self):
+                self._handle('DELETE')
+
+            def log_message(self, format, *args):
+                return
+
+        return Handler
+
+    def start(self) -> 'MockExchangeServer':
+        """Arrancar servidor en hilo de fondo"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='mock-exchange-http', daemon=True)
+        self.thread.start()
+        self.logger.info(f"🧪 Mock exchange escuchando en {self.base_url}")
+        return self
+
+    def stop(self) -> None:
+        """Detener servidor"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.exchange.stop()
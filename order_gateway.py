@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+📨 ORDER GATEWAY - FASE 1.6
+Ejecución real de órdenes LIMIT_MAKER (post-only) con seguimiento hasta fill
+vía user-data stream, client order IDs idempotentes y medición de latencia/slippage
+"""
+
+import time
+import hashlib
+import logging
+import threading
+from collections import deque
+from typing import Dict, List, Any, Optional, Callable
+
+from binance_rest import BinanceRestClient, format_decimal
+from request_budget import get_request_budget
+from circuit_breaker import get_circuit_breaker
+from symbol_registry import get_symbol_registry
+
+# Estados finales de una orden en Binance
+FINAL_STATUSES = ('FILLED', 'CANCELED', 'REJECTED', 'EXPIRED', 'EXPIRED_IN_MATCH')
+
+# Códigos de error relevantes
+ERROR_ORDER_REJECTED = -2010
+ERROR_CANCEL_REJECTED = -2011
+
+# Espera del estado final tras cancelar una orden vencida
+CANCEL_ACK_WAIT_SEC = 2.0
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentil simple por interpolación (sin numpy en el hot path)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+class UserDataStream:
+    """User-data stream con reparto de eventos a varios consumidores"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.handlers: List[Callable[[Dict[str, Any]], None]] = []
+        self.manager = None
+        self.events_received = 0
+        self.last_lag_ms = 0.0  # retraso del último evento (recepción - 'E' del exchange)
+
+    def subscribe(self, handler: Callable[[Dict[str, Any]], None]) -> None:
+        """Registrar consumidor de eventos"""
+        if handler not in self.handlers:
+            self.handlers.append(handler)
+
+    def dispatch(self, event: Dict[str, Any]) -> None:
+        """Repartir un evento a todos los consumidores"""
+        self.events_received += 1
+        if event.get('E'):
+            self.last_lag_ms = max(0.0, time.time() * 1000 - float(event['E']))
+        for handler in self.handlers:
+            try:
+                handler(event)
+            except Exception as e:
+                self.logger.error(f"❌ Error procesando evento user-data: {e}")
+
+    def start(self, source: Any = None, api_key: str = '', api_secret: str = '', testnet: bool = True) -> bool:
+        """Iniciar stream desde una fuente con start_user_socket (python-binance o mock)"""
+        try:
+            if source is None:
+                from binance import ThreadedWebsocketManager
+                source = ThreadedWebsocketManager(api_key=api_key, api_secret=api_secret, testnet=testnet)
+                source.start()
+
+            source.start_user_socket(callback=self.dispatch)
+            self.manager = source
+            self.logger.info("✅ User-data stream iniciado")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"❌ Error iniciando user-data stream: {e}")
+            return False
+
+    def stop(self) -> None:
+        """Detener stream"""
+        try:
+            if self.manager is not None and hasattr(self.manager, 'stop'):
+                self.manager.stop()
+        except Exception as e:
+            self.logger.error(f"❌ Error deteniendo user-data stream: {e}")
+
+class OrderGateway:
+    """Gateway de órdenes maker-only con idempotencia y telemetría de ejecución"""
+
+    def __init__(self, rest_client: BinanceRestClient, maker_only: bool = True, retry_order: int = 2,
+                 track_latency: bool = True, track_slippage: bool = True, history_size: int = 1000,
+                 symbol_registry: Any = None, finished_capacity: int = 500):
+        self.logger = logging.getLogger(__name__)
+        self.rest = rest_client
+        self.symbol_registry = symbol_registry  # None → registro global (se carga tras el gateway)
+        self.maker_only = maker_only
+        self.retry_order = retry_order
+        self.track_latency = track_latency
+        self.track_slippage = track_slippage
+
+        # Órdenes indexadas por client order id (clave de idempotencia). Las terminadas se
+        # conservan solo las últimas finished_capacity (reintentos y eventos tardíos recientes)
+        self.orders: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self.finished_ids = deque()
+        self.finished_capacity = max(1, finished_capacity)
+        self.finished_lock = threading.Lock()
+        self.orders_pruned = 0
+
+        # Historial acotado de ejecuciones para telemetría
+        self.execution_log = deque(maxlen=history_size)
+
+    @staticmethod
+    def make_client_order_id(symbol: str, side: str, intent_key: str) -> str:
+        """Client order ID determinista: mismo intento → mismo ID (máx. 36 chars)"""
+        digest = hashlib.sha1(f"{symbol}|{side}|{intent_key}".encode('utf-8')).hexdigest()
+        return f"mnd_{digest[:28]}"
+
+    def format_order(self, symbol: str, side: str, quantity: float, price: float) -> Dict[str, Any]:
+        """Precio/cantidad al tick/step con aritmética entera (SymbolSpec); sin spec, formato decimal"""
+        registry = self.symbol_registry or get_symbol_registry()
+        spec = registry.get(symbol) if registry is not None else None
+        if spec is None:
+            return {'price': price, 'quantity': quantity, 'price_str': format_decimal(price),
+                    'quantity_str': format_decimal(quantity), 'valid': True}
+        ticks, steps, price_str, quantity_str = spec.format_order(price, quantity, side)
+        return {
+            'price': ticks * spec.tick_units / spec.price_scale,
+            'quantity': steps * spec.step_units / spec.qty_scale,
+            'price_str': price_str,
+            'quantity_str': quantity_str,
+            'valid': ticks > 0 and steps >= max(1, spec.min_qty_steps)
+        }
+
+    def submit_order(self, symbol: str, side: str, quantity: float, price: float,
+                     intent_key: str, reference_price: float = None) -> Dict[str, Any]:
+        """Enviar orden límite post-only; reenviar el mismo intento nunca duplica la orden"""
+        client_order_id = self.make_client_order_id(symbol, side, intent_key)
+        formatted = self.format_order(symbol, side, quantity, price)
+        quantity, price = formatted['quantity'], formatted['price']
+
+        with self.lock:
+            existing = self.orders.get(client_order_id)
+            if existing is not None and existing['status'] != 'SUBMIT_FAILED':
+                return existing
+
+            order = {
+                'client_order_id': client_order_id,
+                'order_id': None,
+                'symbol': symbol,
+                'side': side,
+                'quantity': quantity,
+                'price': price,
+                'reference_price': reference_price or price,
+                'status': 'PENDING_NEW',
+                'reject_reason': None,
+                'executed_qty': 0.0,
+                'cum_quote': 0.0,
+                'avg_price': 0.0,
+                'submit_ts': time.perf_counter(),
+                'ack_ts': None,
+                'first_fill_ts': None,
+                'fill_ts': None,
+                'done': threading.Event()
+            }
+            self.orders[client_order_id] = order
+
+        if not formatted['valid']:
+            # Por debajo de un tick o de minQty: el exchange la rechazaría (LOT_SIZE/PRICE_FILTER)
+            self._finish(order, 'REJECTED', 'LOT_SIZE')
+            self.logger.info(f"❌ Orden {client_order_id} no enviada: {formatted['quantity_str']} "
+                             f"@ {formatted['price_str']} fuera de filtros")
+            return order
+
+        params = {
+            'symbol': symbol,
+            'side': side,
+            'quantity': formatted['quantity_str'],
+            'price': formatted['price_str'],
+            'newClientOrderId': client_order_id,
+            'newOrderRespType': 'ACK'
+        }
+        if self.maker_only:
+            params['type'] = 'LIMIT_MAKER'
+        else:
+            params['type'] = 'LIMIT'
+            params['timeInForce'] = 'GTC'
+
+        for attempt in range(self.retry_order + 1):
+            response = self.rest.request('POST', '/api/v3/order', params, signed=True)
+
+            if response['ok']:
+                self._on_ack(order, response['data'] or {})
+                return order
+
+            msg = (response.get('msg') or '').lower()
+            if response['code'] == ERROR_ORDER_REJECTED and 'duplicate' in msg:
+                # Un reintento anterior sí llegó: sincronizar en lugar de duplicar
+                self.query_order(symbol, client_order_id)
+                return order
+
+            if response['code'] == ERROR_ORDER_REJECTED:
+                # LIMIT_MAKER que cruzaría el libro u otro rechazo de negocio
+                reason = 'WOULD_TAKE' if 'immediately match' in msg else (response.get('msg') or 'REJECTED')
+                self._finish(order, 'REJECTED', reason)
+                self.logger.info(f"❌ Orden {client_order_id} rechazada: {reason}")
+                return order
+
+            if response['status'] == 0 or response['status'] >= 500:
+                # Estado desconocido: consultar antes de reintentar con el mismo ID
+                if self.query_order(symbol, client_order_id):
+                    return order
+                self.logger.warning(f"⚠️ Reintentando orden {client_order_id} ({attempt + 1}/{self.retry_order})")
+                continue
+
+            break
+
+        self._finish(order, 'SUBMIT_FAILED', response.get('msg') or f"HTTP {response['status']}")
+        return order
+
+    def _on_ack(self, order: Dict[str, Any], data: Dict[str, Any]) -> None:
+        """Registrar confirmación REST de la orden"""
+        with self.lock:
+            if order['ack_ts'] is None:
+                order['ack_ts'] = time.perf_counter()
+            order['order_id'] = data.get('orderId', order['order_id'])
+            # El fill puede llegar por el stream antes que el ACK REST
+            if order['status'] == 'PENDING_NEW':
+                order['status'] = data.get('status', 'NEW')
+            if data.get('status') in FINAL_STATUSES and not order['done'].is_set():
+                self._apply_fill_totals(order, float(data.get('executedQty', 0) or 0),
+                                        float(data.get('cummulativeQuoteQty', 0) or 0))
+                self._finish(order, data['status'])
+
+    def query_order(self, symbol: str, client_order_id: str) -> bool:
+        """Consultar estado de una orden por client order id"""
+        response = self.rest.request('GET', '/api/v3/order',
+                                     {'symbol': symbol, 'origClientOrderId': client_order_id}, signed=True)
+        if not response['ok'] or not isinstance(response['data'], dict):
+            return False
+
+        order = self.orders.get(client_order_id)
+        if order is None:
+            return True
+
+        data = response['data']
+        self._on_ack(order, data)
+        with self.lock:
+            status = data.get('status', order['status'])
+            if status not in FINAL_STATUSES:
+                order['status'] = status
+        return True
+
+    def cancel_order(self, symbol: str, client_order_id: str) -> bool:
+        """Cancelar orden abierta"""
+        response = self.rest.request('DELETE', '/api/v3/order',
+                                     {'symbol': symbol, 'origClientOrderId': client_order_id}, signed=True)
+        if response['ok']:
+            order = self.orders.get(client_order_id)
+            data = response['data'] or {}
+            if order is not None and not order['done'].is_set():
+                self._apply_fill_totals(order, float(data.get('executedQty', order['executed_qty']) or 0),
+                                        float(data.get('cummulativeQuoteQty', order['cum_quote']) or 0))
+                self._finish(order, 'CANCELED')
+            return True
+        if response['code'] == ERROR_CANCEL_REJECTED:
+            # Ya no está abierta (fill o cancelación previa): resolver vía consulta
+            self.query_order(symbol, client_order_id)
+        return False
+
+    def on_user_data(self, event: Dict[str, Any]) -> None:
+        """Procesar executionReport del user-data stream"""
+        try:
+            if event.get('e') != 'executionReport':
+                return
+
+            # En cancelaciones el ID original viaja en 'C'
+            client_order_id = event.get('C') or event.get('c')
+            order = self.orders.get(client_order_id) or self.orders.get(event.get('c'))
+            if order is None:
+                return
+
+            now = time.perf_counter()
+            status = event.get('X', order['status'])
+            with self.lock:
+                if order['order_id'] is None:
+                    order['order_id'] = event.get('i')
+                if float(event.get('l', 0) or 0) > 0 and order['first_fill_ts'] is None:
+                    order['first_fill_ts'] = now
+                self._apply_fill_totals(order, float(event.get('z', 0) or 0), float(event.get('Z', 0) or 0))
+                if status not in FINAL_STATUSES:
+                    order['status'] = status
+
+            if status in FINAL_STATUSES:
+                reason = event.get('r') if event.get('r') not in (None, 'NONE') else None
+                self._finish(order, status, reason, now)
+
+        except Exception as e:
+            self.logger.error(f"❌ Error procesando executionReport: {e}")
+
+    def _apply_fill_totals(self, order: Dict[str, Any], executed_qty: float, cum_quote: float) -> None:
+        """Actualizar cantidades ejecutadas acumuladas"""
+        if executed_qty >= order['executed_qty']:
+            order['executed_qty'] = executed_qty
+            order['cum_quote'] = cum_quote
+            if executed_qty > 0:
+                order['avg_price'] = cum_quote / executed_qty
+
+    def _finish(self, order: Dict[str, Any], status: str, reason: str = None, now: float = None) -> None:
+        """Cerrar orden y registrar métricas de ejecución"""
+        if order['done'].is_set():
+            return
+        order['status'] = status
+        if reason:
+            order['reject_reason'] = reason
+        if order['executed_qty'] > 0:
+            order['fill_ts'] = now or time.perf_counter()
+            if order['first_fill_ts'] is None:
+                order['first_fill_ts'] = order['fill_ts']
+            self._record_execution(order)
+        order['done'].set()
+        self._retire(order)
+
+    def _retire(self, order: Dict[str, Any]) -> None:
+        """Orden en estado final: ventana acotada de terminadas; las más viejas salen de orders"""
+        with self.finished_lock:
+            self.finished_ids.append(order['client_order_id'])
+            while len(self.finished_ids) > self.finished_capacity:
+                client_order_id = self.finished_ids.popleft()
+                stale = self.orders.get(client_order_id)
+                # Un reenvío tras SUBMIT_FAILED reutiliza el ID: solo se retira si sigue terminada
+                if stale is not None and stale['done'].is_set():
+                    del self.orders[client_order_id]
+                    self.orders_pruned += 1
+
+    def _record_execution(self, order: Dict[str, Any]) -> None:
+        """Guardar latencias submit→ack→fill y slippage realizado"""
+        record = {
+            'client_order_id': order['client_order_id'],
+            'symbol': order['symbol'],
+            'side': order['side'],
+            'status': order['status'],
+            'executed_qty': order['executed_qty'],
+            'avg_price': order['avg_price']
+        }
+
+        if self.track_latency:
+            submit_ts = order['submit_ts']
+            ack_ts = order['ack_ts'] or order['fill_ts']
+            record['submit_to_ack_ms'] = (ack_ts - submit_ts) * 1000
+            record['ack_to_fill_ms'] = max(order['fill_ts'] - ack_ts, 0.0) * 1000
+            record['submit_to_fill_ms'] = (order['fill_ts'] - submit_ts) * 1000
+
+        if self.track_slippage:
+            reference = order['reference_price']
+            sign = 1 if order['side'] == 'BUY' else -1
+            # Positivo = peor que el precio de referencia
+            record['slippage_bps'] = sign * (order['avg_price'] - reference) / reference * 10000 if reference else 0.0
+
+        order['execution'] = record
+        self.execution_log.append(record)
+
+    def wait_for_fill(self, client_order_id: str, timeout: float) -> Dict[str, Any]:
+        """Esperar a que la orden llegue a estado final"""
+        order = self.orders[client_order_id]
+        order['done'].wait(timeout)
+        return order
+
+    def max_wait_sec(self, fill_timeout: float) -> float:
+        """Cota de execute_maker_order: por intento, envío, fill, cancelación, su confirmación y reprecio"""
+        per_attempt = fill_timeout + CANCEL_ACK_WAIT_SEC + 3 * self.rest.timeout
+        return (self.retry_order + 1) * per_attempt
+
+    def execute_maker_order(self, symbol: str, side: str, quantity: float, price: float,
+                            intent_key: str, reference_price: float = None, fill_timeout: float = 30.0,
+                            reprice: Callable[[str, str], Optional[float]] = None) -> Dict[str, Any]:
+        """Colocar orden maker, esperar fill y reintentar (RETRY_ORDER) si cruza o no llena"""
+        result = {
+            'filled': False,
+            'executed_qty': 0.0,
+            'avg_price': 0.0,
+            'slippage_bps': 0.0,
+            'attempts': 0,
+            'order': None,
+            'reason': None
+        }
+
+        for attempt in range(self.retry_order + 1):
+            result['attempts'] = attempt + 1
+            order = self.submit_order(symbol, side, quantity, price, f"{intent_key}:{attempt}", reference_price)
+            result['order'] = order
+
+            if not order['done'].is_set():
+                order = self.wait_for_fill(order['client_order_id'], fill_timeout)
+                if not order['done'].is_set():
+                    self.cancel_order(symbol, order['client_order_id'])
+                    order['done'].wait(CANCEL_ACK_WAIT_SEC)
+
+            if order['executed_qty'] > 0:
+                execution = order.get('execution', {})
+                result.update({
+                    'filled': order['status'] == 'FILLED',
+                    'executed_qty': order['executed_qty'],
+                    'avg_price': order['avg_price'],
+                    'slippage_bps': execution.get('slippage_bps', 0.0),
+                    'reason': order['status']
+                })
+                return result
+
+            result['reason'] = order.get('reject_reason') or order['status']
+            if order['status'] == 'SUBMIT_FAILED':
+                break
+
+            new_price = reprice(symbol, side) if reprice else None
+            if new_price is None:
+                break
+            price = new_price
+
+        return result
+
+    def get_execution_stats(self) -> Dict[str, Any]:
+        """Resumen de latencia y slippage de las últimas ejecuciones"""
+        try:
+            records = list(self.execution_log)
+            stats = {'executions': len(records), 'orders_tracked': len(self.orders),
+                     'orders_pruned': self.orders_pruned}
+            for key in ('submit_to_ack_ms', 'ack_to_fill_ms', 'submit_to_fill_ms'):
+                values = [r[key] for r in records if key in r]
+                stats[f"{key}_p50"] = percentile(values, 50)
+                stats[f"{key}_p95"] = percentile(values, 95)
+            slippages = [r['slippage_bps'] for r in records if 'slippage_bps' in r]
+            stats['slippage_bps_avg'] = sum(slippages) / len(slippages) if slippages else 0.0
+            return stats
+
+        except Exception as e:
+            self.logger.error(f"❌ Error calculando estadísticas de ejecución: {e}")
+            return {}
+
+# Instancia global
+order_gateway = None
+
+def init_order_gateway(config, rest_client: BinanceRestClient = None) -> OrderGateway:
+    """Inicializar gateway de órdenes a partir de la configuración"""
+    global order_gateway
+    order_gateway = OrderGateway(
+        rest_client or BinanceRestClient.from_config(config, budget=get_request_budget(),
+                                                     breaker=get_circuit_breaker('exchange')),
+        maker_only=config.MAKER_ONLY,
+        retry_order=config.RETRY_ORDER,
+        track_latency=config.FILL_LATENCY_TRACKING,
+        track_slippage=config.SLIPPAGE_TRACKING
+    )
+    return order_gateway
+
+def get_order_gateway() -> Optional[OrderGateway]:
+    """Obtener gateway de órdenes"""
+    return order_gateway
@@ -10,19 +10,24 @@ import logging
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Callable
 import requests
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
+from symbol_registry import reference_price
+from universe_screener import UniverseScreener
+from bar_resampler import BAR_COLUMNS, TIMEFRAME_SECONDS
+from synthetic_market import SyntheticMarket
+from request_budget import PRIORITY_SCAN
+
 logger = logging.getLogger(__name__)
 
 class AutoPairSelector:
     """Selector automático de pares basado en métricas de mercado"""
     
-    def __init__(self, config):
+    def __init__(self, config, rest_client: Any = None):
         self.config = config
         self.logger = logging.getLogger(__name__)
+        self.rest_client = rest_client
         
         # === CONFIGURACIÓN AUTO PAIR SELECTOR ===
         self.auto_pair_selector = os.getenv('AUTO_PAIR_SELECTOR', 'false').lower() == 'true'
@@ -38,10 +43,33 @@ class AutoPairSelector:
         self.cand_min_trend_score = float(os.getenv('CAND_MIN_TREND_SCORE', '0.60'))  # 0.6
         self.cand_max_correlation = float(os.getenv('CAND_MAX_CORRELATION', '0.85'))  # 0.85
         
+        # === CRIBADO BULK DEL UNIVERSO (etapa 1) ===
+        self.universe_screening = os.getenv('UNIVERSE_SCREENING', 'true').lower() == 'true'
+        self.screen_full_universe = os.getenv('SCREEN_FULL_UNIVERSE', 'true').lower() == 'true'
+        self.screener = UniverseScreener(
+            rest_client=rest_client,
+            quote_asset=os.getenv('SCREEN_QUOTE_ASSET', 'USDT'),
+            min_volume_usd=self.cand_min_24h_volume_usd,
+            max_spread_bps=self.cand_max_spread_bps,
+            max_candidates=int(os.getenv('SCREEN_MAX_CANDIDATES', '50'))
+        )
+        
+        # === REBALANCE POR DERIVA DE SCORES ===
+        self.rebalance_trigger = os.getenv('REBALANCE_TRIGGER', 'drift').lower()  # drift | time
+        self.rebalance_hysteresis = float(os.getenv('REBALANCE_HYSTERESIS', '0.10'))  # 10% de margen
+        self.universe_refresh_minutes = int(os.getenv('UNIVERSE_REFRESH_MINUTES', '360'))
+        self.bar_seconds = 3600  # barras de 1h (intervalo de las klines del score)
+        
         # === SEGURIDAD DE CAMBIO ===
         self.do_not_switch_if_position_open = os.getenv('DO_NOT_SWITCH_IF_POSITION_OPEN', 'true').lower() == 'true'
         self.min_hours_between_switches = int(os.getenv('MIN_HOURS_BETWEEN_SWITCHES', '2'))
         
+        # === RENDIMIENTO REALIZADO (opcional) ===
+        self.perf_factor_weight = float(os.getenv('PERF_FACTOR_WEIGHT', '0.25'))  # 0 = desactivado
+        self.perf_min_trades = int(os.getenv('PERF_MIN_TRADES', '5'))
+        self.perf_scale_bps = float(os.getenv('PERF_SCALE_BPS', '10.0'))
+        self.performance_source: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None
+        
         # === FALLBACK ===
         self.enable_multi_pair = os.getenv('ENABLE_MULTI_PAIR', 'true').lower() == 'true'
         self.fallback_pairs = os.getenv('PAIRS', 'BTCUSDT,ETHUSDT,BNBUSDT,SOLUSDT').split(',')
@@ -51,6 +79,16 @@ class AutoPairSelector:
         self.active_pairs = []
         self.pair_scores = {}
         self.pair_metrics = {}
+        self.screen_data: Optional[pd.DataFrame] = None
+        self.pair_data: Dict[str, pd.DataFrame] = {}  # ventana de klines por candidato
+        self.screen_rows: Dict[str, Dict[str, Any]] = {}
+        self.last_bar_index: Dict[str, int] = {}  # epoch // bar_seconds de la última barra cerrada
+        self.last_universe_refresh = None
+        self.last_drift: Dict[str, Any] = {'swaps': 0, 'pairs': []}
+        self.drift_stats = {'full_refreshes': 0, 'incremental_rebalances': 0, 'bars_processed': 0}
+        self.bar_source = None  # BarResampler opcional (velas derivadas de la serie de 1m)
+        self.synthetic_seed = int(os.getenv('SYNTHETIC_SEED', '0'))
+        self.synthetic_markets: Dict[int, SyntheticMarket] = {}  # sin cliente REST: bar_seconds -> mercado
         
         self.logger.info(f"🎯 Auto Pair Selector inicializado:")
         self.logger.info(f"📊 Candidatos: {len(self.pairs_candidates)} pares")
@@ -58,80 +96,62 @@ class AutoPairSelector:
         self.logger.info(f"🔄 Rebalance: {self.rebalance_minutes} min")
         self.logger.info(f"📈 Lookback: {self.lookback_hours} horas")
     
+    def set_rest_client(self, rest_client: Any) -> None:
+        """Usar datos reales (bulk + klines); la selección previa se rehace en el próximo ciclo"""
+        self.rest_client = rest_client
+        self.screener.rest_client = rest_client
+        self.last_rebalance = None
+    
+    def set_bar_source(self, bar_source: Any) -> None:
+        """Leer velas del resampler en memoria cuando tenga historia suficiente"""
+        self.bar_source = bar_source
+    
     def get_market_data(self, symbol: str, interval: str = '1h', limit: int = 24) -> Optional[pd.DataFrame]:
         """Obtener datos de mercado para un símbolo"""
         try:
-            # Simular datos de mercado para testing
-            if self.config.MODE == 'testnet':
-                return self._simulate_market_data(symbol, interval, limit)
+            if self.bar_source is not None and self.bar_source.count(symbol, interval) >= limit:
+                return self.bar_source.bars(symbol, interval, limit)
             
-            # TODO: Implementar llamada real a Binance API
-            # Por ahora, usar simulación
+            if self.rest_client is not None:
+                return self._fetch_klines(symbol, interval, limit)
+            
+            # Sin cliente REST (testnet/shadow): datos simulados
             return self._simulate_market_data(symbol, interval, limit)
             
         except Exception as e:
             self.logger.error(f"❌ Error obteniendo datos para {symbol}: {e}")
             return None
     
+    def _fetch_klines(self, symbol: str, interval: str, limit: int) -> Optional[pd.DataFrame]:
+        """Klines reales; 'volume' es el volumen en quote (USD) como en la simulación"""
+        response = self.rest_client.request('GET', '/api/v3/klines',
+                                            {'symbol': symbol, 'interval': interval, 'limit': limit},
+                                            priority=PRIORITY_SCAN)  # cribado: cede peso a órdenes y velas
+        if not response['ok'] or not response['data']:
+            self.logger.warning("⚠️ Klines no disponibles para %s (status %s)", symbol, response['status'])
+            return None
+        rows = pd.DataFrame(response['data']).iloc[:, [0, 1, 2, 3, 4, 7]]
+        rows.columns = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+        df = rows.astype({'open': float, 'high': float, 'low': float, 'close': float, 'volume': float})
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
+    
     def _simulate_market_data(self, symbol: str, interval: str, limit: int) -> pd.DataFrame:
-        """Simular datos de mercado para testing"""
+        """Simular datos de mercado para testing (generador sintético determinista)"""
         try:
-            # Precios base por símbolo
-            base_prices = {
-                'BTCUSDT': 45000,
-                'ETHUSDT': 2800,
-                'BNBUSDT': 600,
-                'SOLUSDT': 100,
-                'XRPUSDT': 0.5,
-                'ADAUSDT': 0.4,
-                'DOGEUSDT': 0.08,
-                'LINKUSDT': 15,
-                'TONUSDT': 2.5,
-                'MATICUSDT': 0.8,
-                'ARBUSDT': 1.2,
-                'OPUSDT': 2.8,
-                'LTCUSDT': 70,
-                'APTUSDT': 8,
-                'TRXUSDT': 0.08
-            }
-            
-            base_price = base_prices.get(symbol, 100)
-            
-            # Generar datos simulados
-            dates = pd.date_range(end=datetime.now(), periods=limit, freq='H')
-            np.random.seed(hash(symbol) % 1000)  # Seed consistente por símbolo
-            
-            # Simular OHLCV
-            prices = []
-            for i in range(limit):
-                # Simular movimiento de precio
-                change_pct = np.random.normal(0, 0.02)  # 2% std dev
-                price = base_price * (1 + change_pct)
-                
-                # Simular OHLC
-                high = price * (1 + abs(np.random.normal(0, 0.01)))
-                low = price * (1 - abs(np.random.normal(0, 0.01)))
-                open_price = price * (1 + np.random.normal(0, 0.005))
-                close_price = price
-                
-                # Simular volumen
-                volume = np.random.uniform(1000000, 50000000)  # 1M-50M USD
-                
-                prices.append({
-                    'timestamp': dates[i],
-                    'open': open_price,
-                    'high': high,
-                    'low': low,
-                    'close': close_price,
-                    'volume': volume
-                })
-            
-            return pd.DataFrame(prices)
-            
+            return self.synthetic_market(interval).bars(symbol, limit, datetime.now().timestamp())
         except Exception as e:
             self.logger.error(f"❌ Error simulando datos para {symbol}: {e}")
             return None
     
+    def synthetic_market(self, interval: str = '1h') -> SyntheticMarket:
+        """Mercado sintético del intervalo (uno por tamaño de vela, misma semilla)"""
+        seconds = TIMEFRAME_SECONDS.get(interval, self.bar_seconds)
+        market = self.synthetic_markets.get(seconds)
+        if market is None:
+            market = self.synthetic_markets[seconds] = SyntheticMarket(seed=self.synthetic_seed, bar_seconds=seconds)
+        return market
+    
     def calculate_atr(self, df: pd.DataFrame, period: int = 14) -> float:
         """Calcular ATR (Average True Range)"""
         try:
@@ -220,15 +240,42 @@ class AutoPairSelector:
             self.logger.error(f"❌ Error calculando correlación: {e}")
             return 0.0
     
-    def calculate_pair_score(self, symbol: str, df: pd.DataFrame) -> Dict[str, Any]:
-        """Calcular score completo para un par"""
+    def set_performance_source(self, source: Optional[Callable[[str], Optional[Dict[str, Any]]]]) -> None:
+        """Fuente O(1) de rendimiento realizado por símbolo (p. ej. MetricsTracker.get_symbol_stats)"""
+        self.performance_source = source
+    
+    def calculate_performance_factor(self, symbol: str) -> float:
+        """
+        Multiplicador del score según la expectativa neta realizada del par:
+        1 ± PERF_FACTOR_WEIGHT, saturado con tanh. Neutro (1.0) sin fuente o con pocos trades.
+        """
+        if not self.performance_source or self.perf_factor_weight <= 0:
+            return 1.0
+        stats = self.performance_source(symbol)
+        if not stats or stats['trades'] < self.perf_min_trades:
+            return 1.0
+        return 1.0 + self.perf_factor_weight * float(np.tanh(stats['expectancy_bps'] / self.perf_scale_bps))
+    
+    def calculate_pair_score(self, symbol: str, df: pd.DataFrame, screen_row: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Calcular score completo para un par. screen_row aporta volumen 24h, spread y
+        rank de volumen del cribado bulk; sin él se usan las klines, rank neutro (0.5)
+        y el spread máximo admitido (supuesto conservador).
+        """
         try:
             if df is None or len(df) == 0:
                 return {'score': 0.0, 'metrics': {}}
             
             # Métricas básicas
             close_price = df['close'].iloc[-1]
-            volume_24h = df['volume'].sum()
+            if screen_row is not None:
+                volume_24h = screen_row['quote_volume']
+                spread_bps = screen_row['spread_bps']
+                volume_rank = screen_row['volume_rank']
+            else:
+                volume_24h = df['volume'].sum()
+                spread_bps = self.cand_max_spread_bps
+                volume_rank = 0.5
             atr = self.calculate_atr(df, 14)
             atr_bps = (atr / close_price) * 100 * 100  # Convertir a bps
             
@@ -237,15 +284,9 @@ class AutoPairSelector:
             low_24h = df['low'].min()
             range_bps = ((high_24h - low_24h) / close_price) * 100 * 100
             
-            # Spread simulado
-            spread_bps = np.random.uniform(0.5, 2.0)  # 0.5-2.0 bps
-            
             # Trend score
             trend_score = self.calculate_trend_score(df)
             
-            # Volumen rank (simulado)
-            volume_rank = np.random.uniform(0.3, 1.0)  # 0.3-1.0
-            
             # Normalización
             def normalize(value, min_val, max_val):
                 if max_val == min_val:
@@ -271,6 +312,10 @@ class AutoPairSelector:
             if trend_score < self.cand_min_trend_score:
                 score = 0.0
             
+            # Rendimiento realizado del par (opcional)
+            perf_factor = self.calculate_performance_factor(symbol)
+            score *= perf_factor
+            
             metrics = {
                 'volume_24h': volume_24h,
                 'atr_bps': atr_bps,
@@ -278,6 +323,7 @@ class AutoPairSelector:
                 'spread_bps': spread_bps,
                 'trend_score': trend_score,
                 'volume_rank': volume_rank,
+                'perf_factor': perf_factor,
                 'close_price': close_price
             }
             
@@ -287,47 +333,45 @@ class AutoPairSelector:
             self.logger.error(f"❌ Error calculando score para {symbol}: {e}")
             return {'score': 0.0, 'metrics': {}}
     
-    def select_active_pairs(self, current_positions: List[str] = None) -> List[str]:
-        """Seleccionar pares activos basado en métricas"""
+    def select_active_pairs(self, current_positions: List[str] = None, refresh: bool = True) -> List[str]:
+        """
+        Seleccionar pares activos basado en métricas. refresh=False reutiliza los scores
+        mantenidos incrementalmente (sin cribado ni klines) si ya hay universo cargado y
+        conserva los titulares salvo desplazamiento por histéresis (apply_drift).
+        """
         try:
             if not self.auto_pair_selector:
                 self.logger.info("🎯 Auto Pair Selector desactivado, usando pares por defecto")
                 return self.fallback_pairs[:self.max_active_pairs]
             
-            self.logger.info(f"🎯 Iniciando selección de pares activos...")
-            self.logger.info(f"📊 Candidatos: {len(self.pairs_candidates)} pares")
-            
-            # Obtener datos para todos los candidatos
-            pair_data = {}
-            for symbol in self.pairs_candidates:
-                df = self.get_market_data(symbol, '1h', self.lookback_hours)
-                if df is not None:
-                    pair_data[symbol] = df
-            
-            if not pair_data:
-                self.logger.warning("⚠️ No se pudieron obtener datos, usando fallback")
-                return self.fallback_pairs[:self.max_active_pairs]
-            
-            # Calcular scores
-            pair_scores = {}
-            for symbol, df in pair_data.items():
-                result = self.calculate_pair_score(symbol, df)
-                pair_scores[symbol] = result
-                self.pair_metrics[symbol] = result['metrics']
+            if refresh or not self.pair_data:
+                if not self.refresh_universe():
+                    self.logger.warning("⚠️ No se pudieron obtener datos, usando fallback")
+                    return self.fallback_pairs[:self.max_active_pairs]
+            else:
+                self.drift_stats['incremental_rebalances'] += 1
+                if self.active_pairs:
+                    # Incremental: los titulares se conservan salvo que un aspirante los supere por el margen
+                    selected_pairs = self.apply_drift(current_positions)
+                    self.active_pairs = selected_pairs
+                    self.last_rebalance = datetime.now()
+                    self.logger.info(f"🎯 Pares activos (histéresis): {', '.join(selected_pairs)}")
+                    return selected_pairs
+            pair_data = self.pair_data
             
             # Ordenar por score
-            sorted_pairs = sorted(pair_scores.items(), key=lambda x: x[1]['score'], reverse=True)
+            sorted_pairs = sorted(self.pair_scores.items(), key=lambda x: x[1], reverse=True)
             
             # Seleccionar top pares
             selected_pairs = []
-            for symbol, score_data in sorted_pairs:
+            for symbol, score in sorted_pairs:
                 if len(selected_pairs) >= self.max_active_pairs:
                     break
                 
                 # Verificar si hay posición abierta
                 if current_positions and symbol in current_positions:
                     if self.do_not_switch_if_position_open:
-                        self.logger.info(f"🛡️ Manteniendo {symbol} (posición abierta)")
+                        self.logger.info("🛡️ Manteniendo %s (posición abierta)", symbol)
                         selected_pairs.append(symbol)
                         continue
                 
@@ -337,13 +381,13 @@ class AutoPairSelector:
                     if selected_pair in pair_data:
                         corr = self.calculate_correlation(pair_data[symbol], pair_data[selected_pair])
                         if corr > self.cand_max_correlation:
-                            self.logger.info(f"📊 {symbol} descartado por correlación alta ({corr:.2f}) con {selected_pair}")
+                            self.logger.debug("📊 %s descartado por correlación alta (%.2f) con %s", symbol, corr, selected_pair)
                             correlation_ok = False
                             break
                 
-                if correlation_ok and score_data['score'] > 0:
+                if correlation_ok and score > 0:
                     selected_pairs.append(symbol)
-                    self.logger.info(f"✅ {symbol} seleccionado (score: {score_data['score']:.3f})")
+                    self.logger.debug("✅ %s seleccionado (score: %.3f)", symbol, score)
             
             # Fallback si no hay suficientes pares
             if len(selected_pairs) < self.max_active_pairs:
@@ -353,8 +397,8 @@ class AutoPairSelector:
                         selected_pairs.append(symbol)
             
             self.active_pairs = selected_pairs
-            self.pair_scores = {k: v['score'] for k, v in pair_scores.items()}
             self.last_rebalance = datetime.now()
+            self.last_drift = {'swaps': 0, 'pairs': []}
             
             self.logger.info(f"🎯 Pares activos seleccionados: {', '.join(selected_pairs)}")
             return selected_pairs
@@ -363,6 +407,170 @@ class AutoPairSelector:
             self.logger.error(f"❌ Error en selección de pares: {e}")
             return self.fallback_pairs[:self.max_active_pairs]
     
+    def refresh_universe(self) -> bool:
+        """Recalcular desde cero: cribado bulk, klines de los supervivientes y scores"""
+        self.logger.info("🎯 Iniciando selección de pares activos (%d candidatos)...", len(self.pairs_candidates))
+        
+        # Etapa 1: cribado bulk (2 peticiones para todo el exchange)
+        screen = self.screener.screen(self.pairs_candidates) if self.universe_screening else None
+        if screen is not None:
+            # Sin specs de exchangeInfo no se sabe qué es operable: solo PAIRS_CANDIDATES
+            if not self.screen_full_universe or not self.screener.spec_filtered:
+                screen = screen[screen.index.isin(self.pairs_candidates)]
+            candidates = self.screener.survivors(screen)
+        else:
+            candidates = self.pairs_candidates
+        self.screen_data = screen
+        
+        # Etapa 2: klines solo de los supervivientes
+        pair_data = {}
+        for symbol in candidates:
+            df = self.get_market_data(symbol, '1h', self.lookback_hours)
+            if df is not None:
+                pair_data[symbol] = df
+        
+        if not pair_data:
+            return False
+        
+        # La ventana recién descargada llega hasta la última barra cerrada
+        last_closed = int(datetime.now().timestamp() // self.bar_seconds) - 1
+        self.pair_data = pair_data
+        self.screen_rows = self.build_screen_rows(screen, pair_data)
+        self.last_bar_index = {symbol: last_closed for symbol in pair_data}
+        self.pair_scores = {}
+        self.pair_metrics = {}
+        for symbol in pair_data:
+            self.rescore(symbol)
+        self.last_universe_refresh = datetime.now()
+        self.drift_stats['full_refreshes'] += 1
+        return True
+    
+    def rescore(self, symbol: str) -> float:
+        """Recalcular el score de un único candidato con su ventana actual"""
+        result = self.calculate_pair_score(symbol, self.pair_data[symbol], self.screen_rows.get(symbol))
+        self.pair_scores[symbol] = result['score']
+        self.pair_metrics[symbol] = result['metrics']
+        return result['score']
+    
+    # === MANTENIMIENTO INCREMENTAL DE SCORES ===
+    
+    def on_bar_close(self, symbol: str, bar: Dict[str, Any]) -> Optional[float]:
+        """Añadir una barra cerrada a la ventana del candidato y recalcular solo su score"""
+        window = self.pair_data.get(symbol)
+        if window is None:
+            return None
+        row = pd.DataFrame([{column: bar[column] for column in window.columns}])
+        self.pair_data[symbol] = pd.concat([window.iloc[1:], row], ignore_index=True)
+        self.drift_stats['bars_processed'] += 1
+        return self.rescore(symbol)
+    
+    def update_scores(self) -> int:
+        """
+        Incorporar las barras cerradas desde la última actualización (modo drift).
+        Solo se tocan los candidatos con barras nuevas; devuelve cuántas barras se procesaron.
+        """
+        if self.rebalance_trigger != 'drift' or not self.pair_data:
+            return 0
+        last_closed = int(datetime.now().timestamp() // self.bar_seconds) - 1
+        processed = 0
+        for symbol in list(self.pair_data):
+            known = self.last_bar_index.get(symbol, last_closed)
+            if known >= last_closed:
+                continue
+            for bar in self.get_closed_bars(symbol, known, last_closed):
+                self.on_bar_close(symbol, bar)
+                processed += 1
+            self.last_bar_index[symbol] = last_closed
+        return processed
+    
+    def get_closed_bars(self, symbol: str, after_index: int, last_index: int) -> List[Dict[str, Any]]:
+        """Barras cerradas con índice (epoch // bar_seconds) en (after_index, last_index]"""
+        missing = min(last_index - after_index, self.lookback_hours)
+        if self.bar_source is not None and self.bar_source.count(symbol, '1h'):
+            return [dict(zip(BAR_COLUMNS, bar), timestamp=pd.Timestamp(bar[0], unit='s'))
+                    for bar in self.bar_source.closed_since(symbol, '1h', after_index * self.bar_seconds)
+                    if bar[0] // self.bar_seconds <= last_index]
+        if self.rest_client is None:
+            last_close = float(self.pair_data[symbol]['close'].iloc[-1])
+            bars = []
+            for index in range(last_index - missing + 1, last_index + 1):
+                bar = self._simulate_bar(symbol, index, last_close)
+                last_close = bar['close']
+                bars.append(bar)
+            return bars
+        # La barra en curso también llega en la respuesta: se pide una más y se descarta
+        df = self._fetch_klines(symbol, '1h', missing + 1)
+        if df is None:
+            return []
+        open_index = df['timestamp'].astype('int64') // 10**9 // self.bar_seconds
+        return df[(open_index > after_index) & (open_index <= last_index)].to_dict('records')
+    
+    def _simulate_bar(self, symbol: str, index: int, last_close: float) -> Dict[str, Any]:
+        """Barra simulada determinista por (símbolo, índice) que continúa desde el último cierre"""
+        return self.synthetic_market('1h').bar(symbol, index, last_close)
+    
+    def score_drift(self) -> Dict[str, Any]:
+        """
+        Cambios de pertenencia al top-K con histéresis: el mejor aspirante desplaza al
+        titular más débil solo si lo supera en más de REBALANCE_HYSTERESIS (relativo).
+        """
+        scores = self.pair_scores
+        incumbents = sorted(self.active_pairs, key=lambda symbol: scores.get(symbol, 0.0))
+        challengers = sorted((symbol for symbol, score in scores.items()
+                              if score > 0 and symbol not in self.active_pairs),
+                             key=scores.get, reverse=True)
+        pairs = []
+        for challenger, incumbent in zip(challengers, incumbents):
+            if scores[challenger] <= scores.get(incumbent, 0.0) * (1 + self.rebalance_hysteresis):
+                break
+            pairs.append((incumbent, challenger))
+        self.last_drift = {'swaps': len(pairs), 'pairs': pairs}
+        return self.last_drift
+    
+    def apply_drift(self, current_positions: List[str] = None) -> List[str]:
+        """
+        Sustituir en su sitio solo los titulares desplazados por score_drift; se respetan
+        las posiciones abiertas y el límite de correlación con los pares que se quedan.
+        """
+        selected = list(self.active_pairs)
+        applied = []
+        for incumbent, challenger in self.score_drift()['pairs']:
+            if current_positions and incumbent in current_positions and self.do_not_switch_if_position_open:
+                self.logger.info("🛡️ Manteniendo %s (posición abierta)", incumbent)
+                continue
+            correlated = any(
+                self.calculate_correlation(self.pair_data[challenger], self.pair_data[symbol]) > self.cand_max_correlation
+                for symbol in selected
+                if symbol != incumbent and symbol in self.pair_data and challenger in self.pair_data
+            )
+            if correlated:
+                self.logger.debug("📊 %s descartado por correlación alta con los titulares", challenger)
+                continue
+            selected[selected.index(incumbent)] = challenger
+            applied.append((incumbent, challenger))
+        self.last_drift = {'swaps': len(applied), 'pairs': applied}
+        return selected
+    
+    def needs_full_refresh(self) -> bool:
+        """Cribado + klines desde cero: modo time, sin universo o universo caducado"""
+        if self.rebalance_trigger != 'drift' or not self.pair_data or self.last_universe_refresh is None:
+            return True
+        age = (datetime.now() - self.last_universe_refresh).total_seconds()
+        return age >= self.universe_refresh_minutes * 60
+    
+    def build_screen_rows(self, screen: Optional[pd.DataFrame], pair_data: Dict[str, pd.DataFrame]) -> Dict[str, Dict[str, Any]]:
+        """Filas del cribado por símbolo; sin cribado, rank de volumen sobre las klines"""
+        if screen is not None:
+            rows = screen.loc[screen.index.intersection(list(pair_data)), ['quote_volume', 'spread_bps', 'volume_rank']]
+            return rows.to_dict('index')
+        volumes = pd.Series({symbol: df['volume'].sum() for symbol, df in pair_data.items()})
+        ranks = volumes.rank(pct=True)
+        return {
+            symbol: {'quote_volume': volumes[symbol], 'spread_bps': self.cand_max_spread_bps,
+                     'volume_rank': ranks[symbol]}
+            for symbol in pair_data
+        }
+    
     def should_rebalance(self, current_positions: List[str] = None) -> bool:
         """Verificar si se debe rebalancear"""
         try:
@@ -374,7 +582,7 @@ class AutoPairSelector:
                 return True
             
             time_since_rebalance = datetime.now() - self.last_rebalance
-            if time_since_rebalance.total_seconds() < self.rebalance_minutes * 60:
+            if self.rebalance_trigger != 'drift' and time_since_rebalance.total_seconds() < self.rebalance_minutes * 60:
                 return False
             
             # Verificar si hay posiciones abiertas
@@ -387,7 +595,14 @@ class AutoPairSelector:
             if self.last_rebalance and time_since_rebalance.total_seconds() < self.min_hours_between_switches * 3600:
                 return False
             
-            return True
+            if self.rebalance_trigger != 'drift' or self.needs_full_refresh():
+                return True
+            
+            # Modo drift: solo si el top-K cambiaría más allá del margen de histéresis
+            drift = self.score_drift()
+            if drift['swaps']:
+                self.logger.info("📈 Deriva de scores: %s", ', '.join(f"{old}→{new}" for old, new in drift['pairs']))
+            return drift['swaps'] > 0
             
         except Exception as e:
             self.logger.error(f"❌ Error verificando rebalance: {e}")
@@ -400,14 +615,14 @@ class AutoPairSelector:
                 return False
             
             self.logger.info("🔄 Iniciando rebalance de pares...")
-            new_active_pairs = self.select_active_pairs()
+            new_active_pairs = self.select_active_pairs(refresh=self.needs_full_refresh())
             
             if new_active_pairs and new_active_pairs != self.active_pairs:
                 old_pairs = ', '.join(self.active_pairs)
                 self.active_pairs = new_active_pairs
                 new_pairs = ', '.join(self.active_pairs)
                 
-                self.logger.info(f"🔄 Pares rebalanceados: {old_pairs} → {new_pairs}")
+                self.logger.info("🔄 Pares rebalanceados: %s → %s", old_pairs, new_pairs)
                 self.last_rebalance = datetime.now()
                 return True
             else:
@@ -423,7 +638,7 @@ class AutoPairSelector:
         try:
             universe_data = []
             
-            for symbol in self.pairs_candidates:
+            for symbol in self.pair_scores:  # evaluados en la última selección
                 if symbol in self.pair_metrics:
                     metrics = self.pair_metrics[symbol]
                     score = self.pair_scores.get(symbol, 0.0)
@@ -444,6 +659,9 @@ class AutoPairSelector:
             return {
                 'universe_data': universe_data,
                 'active_pairs': self.active_pairs,
+                'screening': self.screener.get_stats(),
+                'drift': dict(self.drift_stats, rebalance_trigger=self.rebalance_trigger,
+                              last_swaps=self.last_drift['swaps']),
                 'last_rebalance': self.last_rebalance.isoformat() if self.last_rebalance else None,
                 'next_rebalance': (self.last_rebalance + timedelta(minutes=self.rebalance_minutes)).isoformat() if self.last_rebalance else None
             }
@@ -483,10 +701,10 @@ class AutoPairSelector:
 # Instancia global
 pair_selector = None
 
-def init_pair_selector(config):
+def init_pair_selector(config, rest_client: Any = None):
     """Inicializar selector de pares"""
     global pair_selector
-    pair_selector = AutoPairSelector(config)
+    pair_selector = AutoPairSelector(config, rest_client=rest_client)
     return pair_selector
 
 def get_pair_selector():
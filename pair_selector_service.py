@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+🛰️ PAIR SELECTOR SERVICE - FASE 1.6
+Auto Pair Selector fuera del proceso de trading. Un proceso hijo (spawn) es dueño
+del scoring (pandas); con MARKET_BUS_NAME lee velas, libro y volumen 24h del bus
+de mercado (sin cliente REST ni presupuesto de peticiones propios). Publica por un
+Pipe local el conjunto de pares activos y las métricas del universo. El bucle de
+trading solo drena el Pipe sin esperar (poll(0)) y sustituye la lista de pares en una única asignación:
+un rebalance lento nunca congela un ciclo.
+
+Con --shards N el supervisor es el único dueño del servicio (SelectorRelay): reúne
+posiciones y rendimiento de los shards y les reenvía cada publicación por su Pipe
+(ShardSelectorLink); ningún shard selecciona por su cuenta.
+
+Mensajes trader → servicio: ('positions', [símbolos]), ('performance', {símbolo: stats}), ('stop', None)
+Mensajes servicio → trader: ('snapshot', {...})
+"""
+
+import time
+import signal
+import logging
+import multiprocessing
+from typing import Dict, List, Any, Optional, Callable
+
+DEFAULT_POLL_SEC = 30.0
+MAX_RESTARTS = 5
+
+def selector_service_main(conn, options: Dict[str, Any]) -> None:
+    """Punto de entrada del proceso hijo: seleccionar, mantener scores y publicar"""
+    # Ctrl+C llega a todo el grupo de procesos: el cierre lo decide el trader
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(level=options.get('log_level', 'INFO'),
+                        format='%(asctime)s - selector - %(levelname)s - %(message)s')
+    logger = logging.getLogger(__name__)
+
+    from config_fase_1_6 import config
+    from pair_selector import AutoPairSelector
+
+    selector = AutoPairSelector(config)
+    consumer = None
+    if options.get('market_bus'):
+        # Datos reales del bus local: velas, libro y volumen 24h sin REST ni presupuesto propios
+        from market_data_bus import MarketDataConsumer
+        from symbol_registry import init_symbol_registry
+        consumer = MarketDataConsumer.attach(options['market_bus'], base_minutes=config.BAR_BASE_MINUTES)
+        consumer.poll()
+        selector.set_bar_source(consumer.resampler)
+        selector.screener.snapshot_source = consumer.bulk_snapshot
+        init_symbol_registry(config)  # caché de exchangeInfo que escribe el trader (o fixture)
+    selector.auto_pair_selector = True
+    performance: Dict[str, Dict[str, Any]] = {}
+    selector.set_performance_source(performance.get)
+
+    poll_sec = options.get('poll_sec', DEFAULT_POLL_SEC)
+    positions: List[str] = []
+    seq = 0
+
+    def publish(pairs: List[str], started: float) -> None:
+        nonlocal seq
+        seq += 1
+        conn.send(('snapshot', {
+            'seq': seq,
+            'active_pairs': list(pairs),
+            'candidates': list(selector.pair_data),
+            'scores': dict(selector.pair_scores),
+            'metrics': dict(selector.pair_metrics),
+            'universe': selector.get_universe_data(),
+            'duration_ms': (time.time() - started) * 1000,
+            'published_at': time.time()
+        }))
+
+    try:
+        started = time.time()
+        publish(selector.select_active_pairs(), started)
+        next_check = time.time() + poll_sec
+        while True:
+            # Esperar mensajes del trader hasta la próxima comprobación
+            if conn.poll(max(0.0, next_check - time.time())):
+                kind, payload = conn.recv()
+                if kind == 'stop':
+                    break
+                if kind == 'positions':
+                    positions = list(payload)
+                elif kind == 'performance':
+                    performance.clear()
+                    performance.update(payload)
+                continue
+
+            next_check = time.time() + poll_sec
+            started = time.time()
+            if consumer is not None:
+                consumer.poll()
+            processed = selector.update_scores()
+            if selector.should_rebalance(positions):
+                publish(selector.select_active_pairs(positions, refresh=selector.needs_full_refresh()), started)
+            elif processed:
+                publish(selector.active_pairs, started)  # mismos pares, métricas al día
+    except (EOFError, BrokenPipeError):
+        logger.warning("⚠️ Trader desconectado: cerrando servicio del selector")
+    finally:
+        if consumer is not None:
+            consumer.close()
+        conn.close()
+
+class PairSelectorService:
+    """Lado trader: lanza el proceso del selector y lee sus publicaciones sin bloquear"""
+
+    def __init__(self, poll_sec: float = DEFAULT_POLL_SEC, market_bus: str = '', log_level: str = 'INFO',
+                 max_restarts: int = MAX_RESTARTS, time_fn: Callable[[], float] = time.time):
+        self.logger = logging.getLogger(__name__)
+        self.options = {'poll_sec': poll_sec, 'market_bus': market_bus, 'log_level': log_level}
+        self.max_restarts = max_restarts
+        self.time_fn = time_fn
+        self.context = multiprocessing.get_context('spawn')  # sin heredar hilos ni sockets del trader
+
+        self.process = None
+        self.conn = None
+        self.latest: Optional[Dict[str, Any]] = None
+        self.snapshots = 0
+        self.restarts = 0
+        self.dropped_messages = 0
+        self.stopping = False
+        self._last_positions: Optional[List[str]] = None
+        self._last_performance: Optional[Dict[str, Any]] = None
+
+    # === CICLO DE VIDA ===
+
+    def start(self) -> None:
+        parent_conn, child_conn = self.context.Pipe(duplex=True)
+        self.process = self.context.Process(target=selector_service_main, args=(child_conn, self.options),
+                                            name='pair-selector', daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        self.stopping = False
+        self._last_positions = None
+        self._last_performance = None
+        self.logger.info("🛰️ Servicio del selector iniciado (pid %s)", self.process.pid)
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Pedir cierre ordenado; si no responde, terminar el proceso"""
+        self.stopping = True
+        if self.process is None:
+            return
+        try:
+            self.conn.send(('stop', None))
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.logger.warning("⚠️ Servicio del selector sin respuesta: terminando proceso")
+            self.process.terminate()
+            self.process.join(timeout)
+        self.conn.close()
+        self.process = None
+
+    # === LECTURA (nunca bloquea) ===
+
+    def poll(self) -> Optional[Dict[str, Any]]:
+        """Drenar el Pipe; devuelve la publicación más reciente si hay alguna nueva"""
+        if self.process is None:
+            return None
+        fresh = None
+        try:
+            while self.conn.poll(0):
+                kind, payload = self.conn.recv()
+                if kind == 'snapshot':
+                    fresh = payload
+                    self.snapshots += 1
+                else:
+                    self.dropped_messages += 1
+        except (EOFError, OSError):
+            pass
+        if fresh is not None:
+            self.latest = fresh
+        if not self.process.is_alive() and not self.stopping:
+            self._restart()
+        return fresh
+
+    def _restart(self) -> None:
+        exitcode = self.process.exitcode
+        self.conn.close()
+        self.process = None
+        if self.restarts >= self.max_restarts:
+            self.logger.error("❌ Servicio del selector caído (exit %s); sin más reinicios", exitcode)
+            return
+        self.restarts += 1
+        self.logger.warning("⚠️ Servicio del selector caído (exit %s); reinicio %d/%d",
+                            exitcode, self.restarts, self.max_restarts)
+        self.start()
+
+    # === ESCRITURA (solo cambios, mensajes pequeños) ===
+
+    def send_positions(self, symbols: List[str]) -> None:
+        symbols = sorted(symbols)
+        if symbols != self._last_positions and self._send('positions', symbols):
+            self._last_positions = symbols
+
+    def send_performance(self, stats: Dict[str, Dict[str, Any]]) -> None:
+        if stats != self._last_performance and self._send('performance', stats):
+            self._last_performance = stats
+
+    def _send(self, kind: str, payload: Any) -> bool:
+        if self.process is None:
+            return False
+        try:
+            self.conn.send((kind, payload))
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        latest = self.latest or {}
+        return {
+            'alive': self.is_alive(),
+            'pid': self.process.pid if self.process is not None else None,
+            'snapshots': self.snapshots,
+            'last_seq': latest.get('seq'),
+            'snapshot_age_sec': self.time_fn() - latest['published_at'] if latest else None,
+            'last_duration_ms': latest.get('duration_ms'),
+            'restarts': self.restarts,
+            'dropped_messages': self.dropped_messages
+        }
+
+# === SHARDS (--shards N): UN SOLO SELECTOR PARA TODOS ===
+
+class ShardSelectorLink:
+    """Lado shard: la misma interfaz que PairSelectorService sobre el Pipe del supervisor"""
+
+    def __init__(self, conn, time_fn: Callable[[], float] = time.time):
+        self.conn = conn
+        self.time_fn = time_fn
+        self.latest: Optional[Dict[str, Any]] = None
+        self.snapshots = 0
+        self._last_positions: Optional[List[str]] = None
+        self._last_performance: Optional[Dict[str, Any]] = None
+
+    def is_alive(self) -> bool:
+        return not self.conn.closed
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self.conn.close()  # el servicio es del supervisor: solo se suelta el enlace
+
+    def poll(self) -> Optional[Dict[str, Any]]:
+        """Drenar el Pipe; devuelve la publicación más reciente reenviada por el supervisor"""
+        fresh = None
+        try:
+            while self.conn.poll(0):
+                kind, payload = self.conn.recv()
+                if kind == 'snapshot':
+                    fresh = payload
+                    self.snapshots += 1
+        except (EOFError, OSError):
+            pass
+        if fresh is not None:
+            self.latest = fresh
+        return fresh
+
+    def send_positions(self, symbols: List[str]) -> None:
+        symbols = sorted(symbols)
+        if symbols != self._last_positions and self._send('positions', symbols):
+            self._last_positions = symbols
+
+    def send_performance(self, stats: Dict[str, Dict[str, Any]]) -> None:
+        if stats != self._last_performance and self._send('performance', stats):
+            self._last_performance = stats
+
+    def _send(self, kind: str, payload: Any) -> bool:
+        try:
+            self.conn.send((kind, payload))
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        latest = self.latest or {}
+        return {
+            'alive': self.is_alive(),
+            'snapshots': self.snapshots,
+            'last_seq': latest.get('seq'),
+            'snapshot_age_sec': self.time_fn() - latest['published_at'] if latest else None
+        }
+
+class SelectorRelay:
+    """
+    Lado supervisor: un único servicio del selector y un Pipe por shard. Reúne las
+    posiciones y el rendimiento de todos los shards para el servicio y reenvía cada
+    publicación a todos; los shards no seleccionan ni gastan peso REST en el selector.
+    """
+
+    def __init__(self, service: Any, shard_count: int, context: Any = None):
+        self.logger = logging.getLogger(__name__)
+        self.service = service
+        context = context or multiprocessing.get_context('spawn')
+        self.pipes = [context.Pipe(duplex=True) for _ in range(shard_count)]  # (supervisor, shard)
+        self.positions: Dict[int, List[str]] = {index: [] for index in range(shard_count)}
+        self.performance: Dict[int, Dict[str, Any]] = {index: {} for index in range(shard_count)}
+        self.latest: Optional[Dict[str, Any]] = None
+        self.forwarded = 0
+
+    def shard_conn(self, index: int):
+        """Extremo del shard (pasar en Process(args=...)); se reutiliza si el shard se relanza"""
+        return self.pipes[index][1]
+
+    def step(self) -> bool:
+        """Drenar los shards, informar al servicio y reenviar su publicación nueva"""
+        for index, (conn, _) in enumerate(self.pipes):
+            try:
+                while conn.poll(0):
+                    kind, payload = conn.recv()
+                    if kind == 'positions':
+                        self.positions[index] = payload
+                    elif kind == 'performance':
+                        self.performance[index] = payload
+            except (EOFError, OSError):
+                pass
+        self.service.send_positions(sorted(set().union(*self.positions.values())))
+        merged: Dict[str, Any] = {}
+        for stats in self.performance.values():
+            merged.update(stats)  # cada shard opera pares distintos
+        self.service.send_performance(merged)
+
+        snapshot = self.service.poll()
+        if snapshot is None:
+            return False
+        self.latest = snapshot
+        for index in range(len(self.pipes)):
+            self.forward(index)
+        return True
+
+    def forward(self, index: int) -> None:
+        """Enviar la última publicación a un shard (también al relanzarlo)"""
+        if self.latest is None:
+            return
+        try:
+            self.pipes[index][0].send(('snapshot', self.latest))
+            self.forwarded += 1
+        except (OSError, ValueError):
+            self.logger.warning("⚠️ Shard %d sin enlace con el selector", index)
+
+    def close(self) -> None:
+        self.service.stop()
+        for conn, shard_conn in self.pipes:
+            conn.close()
+            shard_conn.close()
+
+# Instancia global
+pair_selector_service = None
+
+def init_pair_selector_service(config) -> PairSelectorService:
+    """Inicializar y lanzar el servicio del selector a partir de la configuración"""
+    global pair_selector_service
+    pair_selector_service = PairSelectorService(
+        poll_sec=config.PAIR_SELECTOR_POLL_SEC,
+        market_bus=config.MARKET_BUS_NAME,
+        log_level=config.LOG_LEVEL
+    )
+    pair_selector_service.start()
+    return pair_selector_service
+
+def get_pair_selector_service() -> Optional[PairSelectorService]:
+    """Obtener servicio del selector"""
+    return pair_selector_service
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+📒 POSITION BOOK - FASE 1.6
+Libro de posiciones abiertas con índice ordenado de triggers TP/SL/trailing por símbolo.
+Cada tick solo toca los triggers realmente cruzados (heaps, O(log n) por trigger).
+El libro vive en memoria: save/load lo pasan a disco para un reinicio (watchdog o apagado).
+"""
+
+import os
+import json
+import time
+import heapq
+import logging
+import itertools
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+# Campos persistidos por posición (versiones y heaps se reconstruyen al cargar)
+PERSISTED_FIELDS = ('symbol', 'direction', 'entry_price', 'quantity', 'tp_price', 'sl_price',
+                    'trailing_activation', 'trailing_step', 'trailing_active', 'opened_at', 'context')
+
+class PositionBook:
+    """Posiciones vivas indexadas por símbolo y nivel de disparo"""
+
+    def __init__(self, time_fn: Callable[[], float] = time.time):
+        self.logger = logging.getLogger(__name__)
+        self.time_fn = time_fn
+        self.positions: Dict[int, Dict[str, Any]] = {}
+        self.by_symbol: Dict[str, Dict[int, Dict[str, Any]]] = {}
+
+        # Triggers por símbolo:
+        #  upper → se disparan cuando precio >= nivel (min-heap por nivel)
+        #  lower → se disparan cuando precio <= nivel (max-heap vía nivel negado)
+        # Entradas: (clave, seq, position_id, tipo, versión); las obsoletas se descartan al salir
+        self.upper: Dict[str, List[Tuple[float, int, int, str, int]]] = {}
+        self.lower: Dict[str, List[Tuple[float, int, int, str, int]]] = {}
+        self.seq = itertools.count()
+        self.next_id = 1
+
+        self.triggers_fired = 0
+        self.stale_entries_skipped = 0
+
+    def open_position(self, symbol: str, direction: str, entry_price: float, quantity: float,
+                      tp_price: float, sl_price: float, trailing_activation: float = None,
+                      trailing_step: float = None, context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Registrar posición abierta e indexar sus triggers"""
+        position_id = self.next_id
+        self.next_id += 1
+
+        position = {
+            'id': position_id,
+            'symbol': symbol,
+            'direction': direction,
+            'entry_price': entry_price,
+            'quantity': quantity,
+            'tp_price': tp_price,
+            'sl_price': sl_price,
+            'trailing_activation': trailing_activation,
+            'trailing_step': trailing_step,
+            'trailing_active': False,
+            'opened_at': self.time_fn(),
+            'versions': {'TP': 0, 'SL': 0, 'TRAIL': 0},
+            'context': context or {}
+        }
+
+        self.positions[position_id] = position
+        self.by_symbol.setdefault(symbol, {})[position_id] = position
+        self._arm(position)
+
+        self.logger.info(f"📒 Posición abierta #{position_id}: {direction} {symbol} @ {entry_price:.6f} "
+                         f"(TP={tp_price:.6f}, SL={sl_price:.6f})")
+        return position
+
+    def _arm(self, position: Dict[str, Any]) -> None:
+        """Indexar todos los triggers de la posición"""
+        self._push(position, 'TP', position['tp_price'])
+        self._push(position, 'SL', position['sl_price'])
+        if position['trailing_activation'] and position['trailing_step']:
+            self._push(position, 'TRAIL', position['trailing_activation'])
+
+    def _push(self, position: Dict[str, Any], kind: str, level: float) -> None:
+        """Insertar trigger invalidando versiones anteriores del mismo tipo"""
+        if level is None:
+            return
+        position['versions'][kind] += 1
+        version = position['versions'][kind]
+        is_long = position['direction'] == 'BUY'
+        # Largo: TP/TRAIL por arriba, SL por abajo. Corto: al revés.
+        fires_upward = (kind != 'SL') if is_long else (kind == 'SL')
+        symbol = position['symbol']
+        if fires_upward:
+            heap = self.upper.setdefault(symbol, [])
+            heapq.heappush(heap, (level, next(self.seq), position['id'], kind, version))
+        else:
+            heap = self.lower.setdefault(symbol, [])
+            heapq.heappush(heap, (-level, next(self.seq), position['id'], kind, version))
+
+        # Compactar si las entradas obsoletas (trailing) dominan el heap
+        if len(heap) > 16 and len(heap) > 6 * len(self.by_symbol.get(symbol, ())):
+            heap[:] = [entry for entry in heap
+                       if entry[2] in self.positions and self.positions[entry[2]]['versions'][entry[3]] == entry[4]]
+            heapq.heapify(heap)
+
+    def _is_live(self, position_id: int, kind: str, version: int) -> Optional[Dict[str, Any]]:
+        position = self.positions.get(position_id)
+        if position is None or position['versions'][kind] != version:
+            self.stale_entries_skipped += 1
+            return None
+        return position
+
+    def on_tick(self, symbol: str, price: float) -> List[Dict[str, Any]]:
+        """Procesar tick: devolver posiciones cuyo TP/SL se ha cruzado"""
+        triggered = []
+
+        upper = self.upper.get(symbol)
+        while upper and upper[0][0] <= price:
+            level, _, position_id, kind, version = heapq.heappop(upper)
+            position = self._is_live(position_id, kind, version)
+            if position is not None:
+                self._fire(position, kind, level, price, triggered)
+
+        lower = self.lower.get(symbol)
+        while lower and -lower[0][0] >= price:
+            neg_level, _, position_id, kind, version = heapq.heappop(lower)
+            position = self._is_live(position_id, kind, version)
+            if position is not None:
+                self._fire(position, kind, -neg_level, price, triggered)
+
+        return triggered
+
+    def _fire(self, position: Dict[str, Any], kind: str, level: float, price: float,
+              triggered: List[Dict[str, Any]]) -> None:
+        """Aplicar un trigger cruzado"""
+        self.triggers_fired += 1
+
+        if kind == 'TRAIL':
+            # Trailing escalonado: mover el stop un paso por detrás y armar el siguiente escalón
+            step = position['trailing_step']
+            if position['direction'] == 'BUY':
+                new_stop, next_level = price - step, price + step
+                improves = new_stop > position['sl_price']
+            else:
+                new_stop, next_level = price + step, price - step
+                improves = new_stop < position['sl_price']
+            position['trailing_active'] = True
+            if improves:
+                position['sl_price'] = new_stop
+                self._push(position, 'SL', new_stop)
+            self._push(position, 'TRAIL', next_level)
+            return
+
+        # TP/SL: desarmar el resto de triggers y entregar la posición para cierre
+        for other in position['versions']:
+            position['versions'][other] += 1
+        position['exit_reason'] = 'TRAILING_STOP' if kind == 'SL' and position['trailing_active'] else kind
+        position['trigger_price'] = level
+        position['trigger_tick'] = price
+        triggered.append(position)
+
+    def rearm(self, position_id: int) -> bool:
+        """Volver a indexar triggers (p. ej. si la orden de salida no se ejecutó)"""
+        position = self.positions.get(position_id)
+        if position is None:
+            return False
+        self._push(position, 'TP', position['tp_price'])
+        self._push(position, 'SL', position['sl_price'])
+        if position['trailing_activation'] and position['trailing_step']:
+            next_level = position['trigger_tick'] if position['trailing_active'] else position['trailing_activation']
+            self._push(position, 'TRAIL', next_level)
+        return True
+
+    def close_position(self, position_id: int, exit_price: float, reason: str = None) -> Optional[Dict[str, Any]]:
+        """Cerrar y retirar posición del libro"""
+        position = self.positions.pop(position_id, None)
+        if position is None:
+            return None
+
+        symbol_positions = self.by_symbol.get(position['symbol'], {})
+        symbol_positions.pop(position_id, None)
+        if not symbol_positions:
+            # Sin posiciones en el símbolo: liberar heaps con entradas obsoletas
+            self.by_symbol.pop(position['symbol'], None)
+            self.upper.pop(position['symbol'], None)
+            self.lower.pop(position['symbol'], None)
+
+        position['exit_price'] = exit_price
+        position['exit_reason'] = reason or position.get('exit_reason', 'MANUAL')
+        position['closed_at'] = self.time_fn()
+        self.logger.info(f"📒 Posición cerrada #{position_id}: {position['symbol']} @ {exit_price:.6f} "
+                         f"({position['exit_reason']})")
+        return position
+
+    def save(self, path: str) -> int:
+        """Guardar las posiciones abiertas (escritura atómica); sin posiciones se borra el archivo"""
+        positions = [{field: position.get(field) for field in PERSISTED_FIELDS}
+                     for position in list(self.positions.values())]
+        if not positions:
+            if os.path.exists(path):
+                os.remove(path)
+            return 0
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'saved_at': self.time_fn(), 'positions': positions}, f, default=str)
+        os.replace(tmp_path, path)
+        return len(positions)
+
+    def load(self, path: str) -> List[Dict[str, Any]]:
+        """Reabrir las posiciones guardadas con sus triggers (el stop ya arrastrado se conserva)"""
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            saved = json.load(f)
+        restored = []
+        for fields in saved.get('positions', []):
+            position = self.open_position(
+                fields['symbol'], fields['direction'], fields['entry_price'], fields['quantity'],
+                fields['tp_price'], fields['sl_price'], trailing_activation=fields.get('trailing_activation'),
+                trailing_step=fields.get('trailing_step'), context=fields.get('context')
+            )
+            # Con trailing activo el escalón de activación vuelve a disparar al precio actual;
+            # el stop solo se mueve si mejora el guardado
+            position['trailing_active'] = bool(fields.get('trailing_active'))
+            position['opened_at'] = fields.get('opened_at') or position['opened_at']
+            restored.append(position)
+        return restored
+
+    def open_symbols(self) -> List[str]:
+        """Símbolos con posición abierta"""
+        return list(self.by_symbol.keys())
+
+    def has_open_position(self, symbol: str) -> bool:
+        """Verificar si hay posición abierta en el símbolo"""
+        return symbol in self.by_symbol
+
+    def get_positions(self, symbol: str = None) -> List[Dict[str, Any]]:
+        """Listar posiciones abiertas"""
+        if symbol is not None:
+            return list(self.by_symbol.get(symbol, {}).values())
+        return list(self.positions.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estado del libro para telemetría"""
+        return {
+            'open_positions': len(self.positions),
+            'symbols': len(self.by_symbol),
+            'indexed_triggers': sum(len(h) for h in self.upper.values()) + sum(len(h) for h in self.lower.values()),
+            'triggers_fired': self.triggers_fired,
+            'stale_entries_skipped': self.stale_entries_skipped
+        }
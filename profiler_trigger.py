@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+🔬 PROFILER TRIGGER - FASE 1.6
+Perfilado bajo demanda del worker en marcha, sin reiniciar ni perder estado:
+- SIGUSR1 inicia una sesión acotada en tiempo: muestreo de pilas de todos los hilos
+  (por defecto) o cProfile del bucle de trading. Al terminar deja en trading_data/
+  el perfil (.folded / .prof) y un resumen top-N de funciones calientes.
+- SIGUSR2 vuelca las pilas de todos los hilos (faulthandler, funciona aunque el
+  intérprete esté bloqueado en código C).
+"""
+
+import os
+import sys
+import time
+import signal
+import logging
+import cProfile
+import pstats
+import threading
+import faulthandler
+from io import StringIO
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+SIGNALS_AVAILABLE = hasattr(signal, 'SIGUSR1') and hasattr(signal, 'SIGUSR2')
+
+class ProfilerTrigger:
+    """Sesiones de perfilado disparadas por señal con salida en disco"""
+
+    def __init__(self, output_dir: str = 'trading_data', duration_sec: float = 60.0, mode: str = 'sampling',
+                 interval_ms: float = 5.0, top_n: int = 25):
+        self.logger = logging.getLogger(__name__)
+        self.output_dir = output_dir
+        self.duration_sec = duration_sec
+        self.mode = mode
+        self.interval_sec = interval_ms / 1000.0
+        self.top_n = top_n
+
+        self.active = False
+        self.sessions = 0
+        self.last_outputs: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._profile: Optional[cProfile.Profile] = None
+        self._stacks_file = None
+        self._previous_handlers: Dict[int, Any] = {}
+
+    # === INSTALACIÓN ===
+
+    def install(self, start_signal: int = None, dump_signal: int = None) -> bool:
+        """Registrar manejadores (solo desde el hilo principal)"""
+        if not SIGNALS_AVAILABLE:
+            self.logger.warning("⚠️ Señales SIGUSR1/SIGUSR2 no disponibles en esta plataforma")
+            return False
+        start_signal = start_signal or signal.SIGUSR1
+        dump_signal = dump_signal or signal.SIGUSR2
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        self._previous_handlers[start_signal] = signal.signal(start_signal, self._on_start_signal)
+        self._stacks_file = open(os.path.join(self.output_dir, 'thread_stacks.log'), 'a')
+        faulthandler.register(dump_signal, file=self._stacks_file, all_threads=True, chain=False)
+        self._dump_signal = dump_signal
+        self.logger.info("🔬 Profiler: kill -USR1 %d (perfil %.0fs, %s) | kill -USR2 %d (pilas)",
+                         os.getpid(), self.duration_sec, self.mode, os.getpid())
+        return True
+
+    def uninstall(self) -> None:
+        for signum, handler in self._previous_handlers.items():
+            signal.signal(signum, handler)
+        self._previous_handlers = {}
+        if self._stacks_file:
+            faulthandler.unregister(self._dump_signal)
+            self._stacks_file.close()
+            self._stacks_file = None
+
+    def _on_start_signal(self, signum, frame) -> None:
+        self.start_session()
+
+    # === SESIONES ===
+
+    def _output_base(self) -> str:
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return os.path.join(self.output_dir, f"profile_{stamp}_{self.sessions}")
+
+    def start_session(self, duration_sec: float = None) -> bool:
+        """Iniciar una sesión acotada; se ignora si ya hay una en curso"""
+        with self._lock:
+            if self.active:
+                self.logger.warning("⚠️ Sesión de perfilado ya en curso")
+                return False
+            self.active = True
+            self.sessions += 1
+        duration = duration_sec or self.duration_sec
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        if self.mode == 'cprofile':
+            # cProfile perfila el hilo que lo activa: el manejador corre en el hilo principal
+            # (el bucle de trading) y SIGALRM lo detiene también en ese hilo
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+            if hasattr(signal, 'setitimer'):
+                signal.signal(signal.SIGALRM, lambda signum, frame: self.stop_cprofile())
+                signal.setitimer(signal.ITIMER_REAL, duration)
+        else:
+            thread = threading.Thread(target=self._sample, args=(duration,), name='profiler-sampler', daemon=True)
+            thread.start()
+        self.logger.info("🔬 Perfilado iniciado (%s, %.0fs)", self.mode, duration)
+        return True
+
+    def stop_cprofile(self) -> Optional[str]:
+        """Detener la sesión cProfile y escribir .prof + resumen"""
+        profile, self._profile = self._profile, None
+        if profile is None:
+            return None
+        profile.disable()
+        base = self._output_base()
+        profile.dump_stats(base + '.prof')
+
+        buffer = StringIO()
+        stats = pstats.Stats(profile, stream=buffer)
+        stats.sort_stats('cumulative').print_stats(self.top_n)
+        buffer.write("\n")
+        stats.sort_stats('tottime').print_stats(self.top_n)
+        self._write_summary(base + '_top.txt', buffer.getvalue())
+        self.last_outputs = {'profile': base + '.prof', 'summary': base + '_top.txt'}
+        self._finish()
+        return base
+
+    def _sample(self, duration: float) -> None:
+        """Muestrear pilas de todos los hilos cada interval_sec durante duration"""
+        own_id = threading.get_ident()
+        stacks: Counter = Counter()
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        samples = 0
+        deadline = time.monotonic() + duration
+        try:
+            while time.monotonic() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_id:
+                        continue
+                    leaf_line = frame.f_lineno
+                    names = []
+                    while frame is not None:
+                        code = frame.f_code
+                        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                        frame = frame.f_back
+                    names.reverse()
+                    stacks[';'.join(names)] += 1
+                    self_counts[f"{names[-1]}:{leaf_line}"] += 1
+                    for name in set(names):  # recursión: una vez por muestra
+                        total_counts[name] += 1
+                    samples += 1
+                time.sleep(self.interval_sec)
+
+            base = self._output_base()
+            with open(base + '.folded', 'w', encoding='utf-8') as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            self._write_summary(base + '_top.txt', self.format_sampling_summary(self_counts, total_counts, samples))
+            self.last_outputs = {'profile': base + '.folded', 'summary': base + '_top.txt'}
+        except Exception as e:
+            self.logger.error(f"❌ Error en perfilado por muestreo: {e}")
+        finally:
+            self._finish()
+
+    def format_sampling_summary(self, self_counts: Counter, total_counts: Counter, samples: int) -> str:
+        lines = [f"🔬 Perfil por muestreo: {samples} muestras cada {self.interval_sec * 1000:.1f} ms", "",
+                 f"TOP {self.top_n} (propio)"]
+        for name, count in self_counts.most_common(self.top_n):
+            lines.append(f"{count / max(samples, 1) * 100:6.1f}%  {count:7d}  {name}")
+        lines += ["", f"TOP {self.top_n} (acumulado)"]
+        for name, count in total_counts.most_common(self.top_n):
+            lines.append(f"{count / max(samples, 1) * 100:6.1f}%  {count:7d}  {name}")
+        return "\n".join(lines) + "\n"
+
+    def _write_summary(self, path: str, text: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def _finish(self) -> None:
+        with self._lock:
+            self.active = False
+        self.logger.info("🔬 Perfil guardado: %s", ', '.join(self.last_outputs.values()))
+
+    def dump_stacks(self) -> None:
+        """Volcado inmediato de pilas (equivalente a SIGUSR2)"""
+        target = self._stacks_file or sys.stderr
+        faulthandler.dump_traceback(file=target, all_threads=True)
+        target.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'active': self.active, 'sessions': self.sessions, 'mode': self.mode,
+                'last_outputs': dict(self.last_outputs)}
+
+# Instancia global
+profiler_trigger = None
+
+def init_profiler_trigger(config, output_dir: str = 'trading_data') -> ProfilerTrigger:
+    """Inicializar el disparador de perfilado a partir de la configuración"""
+    global profiler_trigger
+    profiler_trigger = ProfilerTrigger(
+        output_dir=output_dir,
+        duration_sec=config.PROFILE_DURATION_SEC,
+        mode=config.PROFILE_MODE,
+        interval_ms=config.PROFILE_INTERVAL_MS,
+        top_n=config.PROFILE_TOP_N
+    )
+    return profiler_trigger
+
+def get_profiler_trigger() -> Optional[ProfilerTrigger]:
+    """Obtener instancia del disparador de perfilado"""
+    return profiler_trigger
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+🚦 REJECTION STATS - FASE 1.6
+Contadores de rechazos por (símbolo, filtro, motivo) con ventanas deslizantes 1m/1h/24h.
+Cada ventana es un anillo de buckets de tamaño fijo con total acumulado: registrar y leer
+cuestan O(1) amortizado, y las tasas reflejan el momento actual, no el total desde el arranque.
+"""
+
+import time
+import logging
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+# Ventanas: nombre → (segundos por bucket, número de buckets)
+DEFAULT_WINDOWS = {
+    '1m': (5, 12),
+    '1h': (60, 60),
+    '24h': (900, 96)
+}
+
+class RollingCounter:
+    """Contador en anillo de buckets temporales con total mantenido incrementalmente"""
+
+    __slots__ = ('bucket_sec', 'size', 'counts', 'head', 'total')
+
+    def __init__(self, bucket_sec: float, size: int):
+        self.bucket_sec = bucket_sec
+        self.size = size
+        self.counts = [0] * size
+        self.head = None  # índice absoluto del bucket más reciente
+        self.total = 0
+
+    def _advance(self, now: float) -> int:
+        """Expirar buckets que salen de la ventana (como mucho size por avance)"""
+        index = int(now // self.bucket_sec)
+        if self.head is None:
+            self.head = index
+        elif index > self.head:
+            if index - self.head >= self.size:
+                self.counts = [0] * self.size
+                self.total = 0
+            else:
+                for stale in range(self.head + 1, index + 1):
+                    slot = stale % self.size
+                    self.total -= self.counts[slot]
+                    self.counts[slot] = 0
+            self.head = index
+        return index
+
+    def add(self, now: float, amount: int = 1) -> None:
+        index = self._advance(now)
+        if index < self.head - self.size + 1:
+            return  # evento más antiguo que la ventana
+        self.counts[index % self.size] += amount
+        self.total += amount
+
+    def value(self, now: float) -> int:
+        self._advance(now)
+        return self.total
+
+class RejectionStats:
+    """Almacén de contadores de señales evaluadas y rechazos por (símbolo, filtro, motivo)"""
+
+    def __init__(self, windows: Dict[str, Tuple[float, int]] = None, time_fn: Callable[[], float] = time.time):
+        self.logger = logging.getLogger(__name__)
+        self.windows = windows or DEFAULT_WINDOWS
+        self.time_fn = time_fn
+
+        # Clave → {ventana: RollingCounter}. Se mantienen también agregados con comodín (None)
+        # para que cualquier tasa por símbolo, filtro o global sea una lectura directa.
+        self.rejections: Dict[Tuple[Optional[str], Optional[str], Optional[str]], Dict[str, RollingCounter]] = {}
+        self.signals: Dict[Optional[str], Dict[str, RollingCounter]] = {}
+
+    def _counters(self, store: Dict, key: Any) -> Dict[str, RollingCounter]:
+        counters = store.get(key)
+        if counters is None:
+            counters = {name: RollingCounter(bucket_sec, size) for name, (bucket_sec, size) in self.windows.items()}
+            store[key] = counters
+        return counters
+
+    def record_signal(self, symbol: str) -> None:
+        """Registrar una señal evaluada (denominador de las tasas)"""
+        now = self.time_fn()
+        for key in (symbol, None):
+            for counter in self._counters(self.signals, key).values():
+                counter.add(now)
+
+    def record_rejection(self, symbol: str, filter_name: str, reason: str) -> None:
+        """Registrar rechazo en la clave exacta y en sus agregados"""
+        now = self.time_fn()
+        keys = (
+            (symbol, filter_name, reason),
+            (symbol, filter_name, None),
+            (symbol, None, None),
+            (None, filter_name, reason),
+            (None, filter_name, None),
+            (None, None, None)
+        )
+        for key in keys:
+            for counter in self._counters(self.rejections, key).values():
+                counter.add(now)
+
+    def count(self, window: str, symbol: str = None, filter_name: str = None, reason: str = None) -> int:
+        """Rechazos en la ventana (None = todos)"""
+        counters = self.rejections.get((symbol, filter_name, reason))
+        return counters[window].value(self.time_fn()) if counters else 0
+
+    def signal_count(self, window: str, symbol: str = None) -> int:
+        counters = self.signals.get(symbol)
+        return counters[window].value(self.time_fn()) if counters else 0
+
+    def rate(self, window: str, symbol: str = None, filter_name: str = None, reason: str = None) -> float:
+        """Porcentaje de señales rechazadas en la ventana"""
+        signals = self.signal_count(window, symbol)
+        if signals == 0:
+            return 0.0
+        return self.count(window, symbol, filter_name, reason) / signals * 100
+
+    def top_rejections(self, window: str = '1h', limit: int = 5) -> List[Dict[str, Any]]:
+        """Pares (símbolo, filtro, motivo) que más señales están consumiendo ahora"""
+        now = self.time_fn()
+        rows = []
+        for (symbol, filter_name, reason), counters in self.rejections.items():
+            if symbol is None or reason is None:
+                continue
+            count = counters[window].value(now)
+            if count > 0:
+                rows.append({'symbol': symbol, 'filter': filter_name, 'reason': reason, 'count': count,
+                             'rate': self.rate(window, symbol, filter_name, reason)})
+        rows.sort(key=lambda row: row['count'], reverse=True)
+        return rows[:limit]
+
+    def get_snapshot(self, window: str = '1h') -> Dict[str, Any]:
+        """Resumen por filtro/motivo para telemetría"""
+        now = self.time_fn()
+        by_reason = {}
+        for (symbol, filter_name, reason), counters in self.rejections.items():
+            if symbol is None and filter_name is not None and reason is not None:
+                by_reason[f"{filter_name}:{reason}"] = counters[window].value(now)
+        return {
+            'window': window,
+            'signals': self.signal_count(window),
+            'rejections': self.count(window),
+            'rejection_rate': self.rate(window),
+            'by_reason': by_reason,
+            'top': self.top_rejections(window)
+        }
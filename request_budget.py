@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+🚦 REQUEST BUDGET - FASE 1.6
+Presupuesto global de peso de peticiones REST (límite por minuto de Binance) y de
+órdenes (límite por 10s) compartido por todos los clientes REST del proceso.
+
+- Token bucket por peso y por órdenes; se corrige con X-MBX-USED-WEIGHT-1M y
+  X-MBX-ORDER-COUNT-10S (el exchange cuenta el peso de toda la IP)
+- Varios procesos en la misma IP: los shards (--shards N) comparten un único bucket
+  en memoria compartida (el supervisor lo crea, los workers se adjuntan con handle());
+  el feed-handler del bus usa una fracción fija del límite (REQUEST_FEED_WEIGHT_PCT)
+  y el trader el resto
+- Prioridades: órdenes > cuenta/metadatos > datos de mercado > cribado del selector.
+  Cada prioridad solo gasta por encima de su reserva; el trabajo de baja prioridad
+  se aplaza (respuesta 'deferred') en vez de arriesgar un 429/418
+- Un 429/418 bloquea todas las peticiones hasta Retry-After
+"""
+
+import time
+import logging
+import threading
+import multiprocessing
+import numpy as np
+from multiprocessing import shared_memory
+from typing import Dict, Any, Optional, Callable
+
+# === PRIORIDADES (menor = más importante) ===
+PRIORITY_ORDER = 0     # colocar/consultar/cancelar órdenes
+PRIORITY_ACCOUNT = 1   # cuenta, exchangeInfo, user-data stream, hora del servidor
+PRIORITY_MARKET = 2    # velas y libro de los pares que se operan
+PRIORITY_SCAN = 3      # cribado del universo y klines del selector
+
+PRIORITY_NAMES = {
+    PRIORITY_ORDER: 'order',
+    PRIORITY_ACCOUNT: 'account',
+    PRIORITY_MARKET: 'market',
+    PRIORITY_SCAN: 'scan'
+}
+
+# === ESTADO DEL BUCKET (float64, local o en memoria compartida) ===
+S_WEIGHT_TOKENS = 0
+S_ORDER_TOKENS = 1
+S_LAST_REFILL = 2
+S_BLOCKED_UNTIL = 3
+STATE_FIELDS = 4
+
+# Peso por endpoint (documentación de Binance, aproximado); el exchange mock usa la misma tabla
+REQUEST_WEIGHTS = {
+    ('GET', '/api/v3/ping'): 1,
+    ('GET', '/api/v3/time'): 1,
+    ('GET', '/api/v3/exchangeInfo'): 20,
+    ('GET', '/api/v3/account'): 20,
+    ('GET', '/api/v3/klines'): 2,
+    ('GET', '/api/v3/aggTrades'): 4,
+    ('GET', '/api/v3/ticker/bookTicker'): 2,
+    ('GET', '/api/v3/ticker/24hr'): 2,
+    ('GET', '/api/v3/order'): 4,
+    ('POST', '/api/v3/order'): 1,
+    ('DELETE', '/api/v3/order'): 1,
+    ('POST', '/api/v3/userDataStream'): 2,
+    ('PUT', '/api/v3/userDataStream'): 2,
+    ('DELETE', '/api/v3/userDataStream'): 2
+}
+
+# Peso sin parámetro symbol (snapshot de todo el exchange)
+BULK_REQUEST_WEIGHTS = {
+    ('GET', '/api/v3/ticker/bookTicker'): 4,
+    ('GET', '/api/v3/ticker/24hr'): 80
+}
+
+ACCOUNT_PATHS = {'/api/v3/account', '/api/v3/exchangeInfo', '/api/v3/userDataStream', '/api/v3/time', '/api/v3/ping'}
+
+def request_weight(method: str, path: str, params: Dict[str, Any] = None) -> int:
+    key = (method, path)
+    if key in BULK_REQUEST_WEIGHTS and 'symbol' not in (params or {}):
+        return BULK_REQUEST_WEIGHTS[key]
+    return REQUEST_WEIGHTS.get(key, 1)
+
+def classify_request(method: str, path: str, params: Dict[str, Any] = None) -> int:
+    """Prioridad por defecto de una petición (el llamador puede indicar otra)"""
+    if path == '/api/v3/order':
+        return PRIORITY_ORDER
+    if path in ACCOUNT_PATHS:
+        return PRIORITY_ACCOUNT
+    if (method, path) in BULK_REQUEST_WEIGHTS and 'symbol' not in (params or {}):
+        return PRIORITY_SCAN
+    return PRIORITY_MARKET
+
+def _header(headers: Dict[str, str], name: str) -> Optional[str]:
+    """Cabecera sin distinguir mayúsculas (Binance las envía en minúsculas)"""
+    value = headers.get(name)
+    if value is None:
+        lowered = name.lower()
+        for key, candidate in headers.items():
+            if key.lower() == lowered:
+                return candidate
+    return value
+
+class RequestBudget:
+    """Token bucket de peso/órdenes con reservas por prioridad y sincronización por cabeceras"""
+
+    def __init__(self, weight_limit_1m: int = 6000, order_limit_10s: int = 50,
+                 market_reserve_pct: float = 15.0, scan_reserve_pct: float = 40.0,
+                 account_reserve_pct: float = 5.0, max_order_wait_sec: float = 2.0,
+                 weight_share_pct: float = 100.0, shared: bool = False, name: str = None, lock: Any = None,
+                 time_fn: Callable[[], float] = time.time, sleep_fn: Callable[[float], None] = time.sleep):
+        self.logger = logging.getLogger(__name__)
+        self.ip_weight_limit = weight_limit_1m  # límite del exchange para toda la IP (cabeceras)
+        self.weight_limit = weight_limit_1m * weight_share_pct / 100  # parte de este bucket
+        self.order_limit = order_limit_10s
+        self.market_reserve_pct = market_reserve_pct
+        self.scan_reserve_pct = scan_reserve_pct
+        self.account_reserve_pct = account_reserve_pct
+        self.max_order_wait_sec = max_order_wait_sec
+        self.weight_share_pct = weight_share_pct
+        self.time_fn = time_fn
+        self.sleep_fn = sleep_fn
+
+        # Bucket compartido entre procesos: segmento + lock de proceso; si no, array y lock locales
+        self.shm = None
+        self.owner = name is None
+        if name is not None:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.lock = lock
+        elif shared:
+            self.shm = shared_memory.SharedMemory(create=True, size=STATE_FIELDS * 8)
+            self.lock = lock or multiprocessing.get_context('spawn').Lock()
+        else:
+            self.lock = threading.Lock()
+        self.state = np.ndarray((STATE_FIELDS,), dtype=np.float64,
+                                buffer=self.shm.buf if self.shm is not None else None)
+
+        # Peso que debe quedar libre tras la petición para cada prioridad
+        self.reserve = {
+            PRIORITY_ORDER: 0.0,
+            PRIORITY_ACCOUNT: self.weight_limit * account_reserve_pct / 100,
+            PRIORITY_MARKET: self.weight_limit * market_reserve_pct / 100,
+            PRIORITY_SCAN: self.weight_limit * scan_reserve_pct / 100
+        }
+        self.weight_rate = self.weight_limit / 60.0
+        self.order_rate = order_limit_10s / 10.0
+        if self.owner:
+            self.weight_tokens = float(self.weight_limit)
+            self.order_tokens = float(order_limit_10s)
+            self.last_refill = time_fn()
+            self.blocked_until = 0.0
+
+        self.server_used_weight = None
+        self.server_order_count = None
+        self.granted = {priority: 0 for priority in PRIORITY_NAMES}
+        self.deferred = {priority: 0 for priority in PRIORITY_NAMES}
+        self.rate_limited = 0
+        self.banned = 0
+
+    @classmethod
+    def from_config(cls, config, feed: bool = False, shared: bool = False) -> 'RequestBudget':
+        """Presupuesto del trader (o del feed-handler con feed=True) según el reparto de la IP"""
+        if feed:
+            share = config.REQUEST_FEED_WEIGHT_PCT
+        else:
+            share = 100.0 - config.REQUEST_FEED_WEIGHT_PCT if config.MARKET_BUS_NAME else 100.0
+        return cls(
+            weight_limit_1m=config.REQUEST_WEIGHT_LIMIT_1M,
+            order_limit_10s=config.REQUEST_ORDER_LIMIT_10S,
+            market_reserve_pct=config.REQUEST_MARKET_RESERVE_PCT,
+            scan_reserve_pct=config.REQUEST_SCAN_RESERVE_PCT,
+            weight_share_pct=share,
+            shared=shared
+        )
+
+    def handle(self) -> Dict[str, Any]:
+        """Argumentos para adjuntarse desde otro proceso (pasar en Process(args=...))"""
+        return {
+            'name': self.shm.name,
+            'lock': self.lock,
+            'weight_limit_1m': self.ip_weight_limit,
+            'order_limit_10s': self.order_limit,
+            'market_reserve_pct': self.market_reserve_pct,
+            'scan_reserve_pct': self.scan_reserve_pct,
+            'account_reserve_pct': self.account_reserve_pct,
+            'max_order_wait_sec': self.max_order_wait_sec,
+            'weight_share_pct': self.weight_share_pct
+        }
+
+    @classmethod
+    def attach(cls, handle: Dict[str, Any], time_fn: Callable[[], float] = time.time) -> 'RequestBudget':
+        return cls(time_fn=time_fn, **handle)
+
+    def close(self) -> None:
+        if self.shm is None:
+            return
+        self.state = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    # === ESTADO (compartido si hay segmento) ===
+
+    @property
+    def weight_tokens(self) -> float:
+        return self.state[S_WEIGHT_TOKENS]
+
+    @weight_tokens.setter
+    def weight_tokens(self, value: float) -> None:
+        self.state[S_WEIGHT_TOKENS] = value
+
+    @property
+    def order_tokens(self) -> float:
+        return self.state[S_ORDER_TOKENS]
+
+    @order_tokens.setter
+    def order_tokens(self, value: float) -> None:
+        self.state[S_ORDER_TOKENS] = value
+
+    @property
+    def last_refill(self) -> float:
+        return self.state[S_LAST_REFILL]
+
+    @last_refill.setter
+    def last_refill(self, value: float) -> None:
+        self.state[S_LAST_REFILL] = value
+
+    @property
+    def blocked_until(self) -> float:
+        return self.state[S_BLOCKED_UNTIL]
+
+    @blocked_until.setter
+    def blocked_until(self, value: float) -> None:
+        self.state[S_BLOCKED_UNTIL] = value
+
+    # === BUCKET ===
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.last_refill
+        if elapsed > 0:
+            self.weight_tokens = min(self.weight_limit, self.weight_tokens + elapsed * self.weight_rate)
+            self.order_tokens = min(self.order_limit, self.order_tokens + elapsed * self.order_rate)
+            self.last_refill = now
+
+    def _wait_needed(self, weight: int, priority: int, is_order: bool, now: float) -> float:
+        """Segundos hasta poder gastar (0 = ya)"""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        wait = max(0.0, (weight + self.reserve[priority] - self.weight_tokens) / self.weight_rate)
+        if is_order:
+            wait = max(wait, (1.0 - self.order_tokens) / self.order_rate)
+        return wait
+
+    def _take(self, weight: int, priority: int, is_order: bool) -> float:
+        """Bajo lock: gastar si hay peso por encima de la reserva; devuelve la espera necesaria"""
+        now = self.time_fn()
+        self._refill(now)
+        wait = self._wait_needed(weight, priority, is_order, now)
+        if wait <= 0:
+            self.weight_tokens -= weight
+            if is_order:
+                self.order_tokens -= 1
+            self.granted[priority] += 1
+        return wait
+
+    def acquire(self, weight: int, priority: int = PRIORITY_MARKET, is_order: bool = False) -> bool:
+        """Reservar peso; las órdenes esperan hasta max_order_wait_sec, el resto se aplaza al momento"""
+        with self.lock:
+            wait = self._take(weight, priority, is_order)
+        if 0 < wait <= self.max_order_wait_sec and priority == PRIORITY_ORDER:
+            self.sleep_fn(wait)
+            with self.lock:
+                wait = self._take(weight, priority, is_order)
+        if wait > 0:
+            with self.lock:
+                self.deferred[priority] += 1
+            return False
+        return True
+
+    def record_response(self, status: int, headers: Dict[str, str]) -> None:
+        """Ajustar el bucket al peso que ve el exchange y respetar Retry-After"""
+        with self.lock:
+            now = self.time_fn()
+            self._refill(now)
+            used = _header(headers, 'X-MBX-USED-WEIGHT-1M')
+            if used is not None:
+                self.server_used_weight = int(used)
+                self.weight_tokens = min(self.weight_tokens, float(self.ip_weight_limit - self.server_used_weight))
+            orders = _header(headers, 'X-MBX-ORDER-COUNT-10S')
+            if orders is not None:
+                self.server_order_count = int(orders)
+                self.order_tokens = min(self.order_tokens, float(self.order_limit - self.server_order_count))
+            if status in (429, 418):
+                retry_after = float(_header(headers, 'Retry-After') or 60)
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+                self.weight_tokens = min(self.weight_tokens, 0.0)
+                if status == 418:
+                    self.banned += 1
+                else:
+                    self.rate_limited += 1
+                self.logger.warning("🚦 Rate limit %d: REST en pausa %.0fs", status, retry_after)
+
+    def headroom(self) -> float:
+        """Fracción del peso por minuto disponible ahora (0-1)"""
+        with self.lock:
+            now = self.time_fn()
+            self._refill(now)
+            if now < self.blocked_until:
+                return 0.0
+            return max(0.0, self.weight_tokens) / self.weight_limit
+
+    def get_stats(self) -> Dict[str, Any]:
+        headroom = self.headroom()
+        return {
+            'headroom_pct': headroom * 100,
+            'weight_limit_1m': self.weight_limit,
+            'weight_share_pct': self.weight_share_pct,
+            'shared': self.shm is not None,
+            'server_used_weight': self.server_used_weight,
+            'server_order_count': self.server_order_count,
+            'blocked_sec': max(0.0, self.blocked_until - self.time_fn()),
+            'granted': {PRIORITY_NAMES[p]: n for p, n in self.granted.items()},
+            'deferred': {PRIORITY_NAMES[p]: n for p, n in self.deferred.items()},
+            'rate_limited': self.rate_limited,
+            'banned': self.banned
+        }
+
+# Instancia global
+request_budget = None
+
+def init_request_budget(config, handle: Dict[str, Any] = None) -> RequestBudget:
+    """Inicializar el presupuesto del proceso; con handle, adjuntarse al bucket compartido de los shards"""
+    global request_budget
+    request_budget = RequestBudget.attach(handle) if handle is not None else RequestBudget.from_config(config)
+    return request_budget
+
+def get_request_budget() -> Optional[RequestBudget]:
+    """Obtener presupuesto de peticiones"""
+    return request_budget
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+🛡️ RISK COORDINATOR - FASE 1.6
+Límites globales de riesgo compartidos entre workers (--shards N) en memoria
+compartida: trades por día, pérdida diaria, drawdown semanal y cooldown por racha
+de pérdidas.
+
+- La decisión de cada ciclo solo LEE los contadores (sin lock)
+- Reservar un trade y registrar su resultado son secciones críticas de
+  microsegundos bajo un único lock de proceso: el límite diario se cumple exacto
+  aunque varios shards intenten entrar a la vez
+- El dueño del segmento (supervisor) lo crea y lo libera; los workers se adjuntan
+  con handle() al lanzarse (spawn)
+"""
+
+import time
+import hashlib
+import logging
+import multiprocessing
+import numpy as np
+from multiprocessing import shared_memory
+from typing import Dict, Any, Optional, Callable, Tuple
+
+from drawdown_tracker import resolve_timezone, period_bounds
+
+# === LAYOUT DEL SEGMENTO (float64) ===
+DAY_START = 0          # inicio (epoch) del día de los contadores diarios
+TRADES_TODAY = 1       # trades reservados hoy (todos los shards)
+EQUITY = 2             # capital total realizado
+DAY_OPEN_EQUITY = 3
+WEEK_START = 4
+WEEK_PEAK = 5
+CONSECUTIVE_LOSSES = 6
+COOLDOWN_UNTIL = 7     # epoch hasta el que no se abren trades
+HALT_CODE = 8          # 0 = sin bloqueo, HALT_DAILY_LOSS, HALT_WEEKLY_DRAWDOWN
+HALT_UNTIL = 9         # fin del periodo bloqueado (epoch)
+TOTAL_TRADES = 10
+REJECTED = 11          # reservas denegadas
+FIELDS = 12
+
+HALT_DAILY_LOSS = 1
+HALT_WEEKLY_DRAWDOWN = 2
+
+def shard_of(symbol: str, shard_count: int) -> int:
+    """Shard dueño de un símbolo (estable entre procesos y reinicios)"""
+    return int(hashlib.sha1(symbol.encode()).hexdigest()[:8], 16) % shard_count
+
+class RiskCoordinator:
+    """Contadores globales de riesgo en memoria compartida"""
+
+    def __init__(self, initial_capital: float, max_trades_per_day: int, daily_loss_pct: float,
+                 weekly_drawdown_pct: float, max_consecutive_losses: int, cooldown_seconds: float,
+                 timezone: str = 'Europe/Madrid', name: str = None, lock: Any = None,
+                 time_fn: Callable[[], float] = time.time):
+        self.logger = logging.getLogger(__name__)
+        self.initial_capital = initial_capital
+        self.max_trades_per_day = max_trades_per_day
+        self.daily_loss_pct = daily_loss_pct
+        self.weekly_drawdown_pct = weekly_drawdown_pct
+        self.max_consecutive_losses = max_consecutive_losses
+        self.cooldown_seconds = cooldown_seconds
+        self.timezone = timezone
+        self.tz = resolve_timezone(timezone)
+        self.time_fn = time_fn
+
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=FIELDS * 8)
+            self.lock = lock or multiprocessing.get_context('spawn').Lock()
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.lock = lock
+        self.values = np.ndarray((FIELDS,), dtype=np.float64, buffer=self.shm.buf)
+        # Límites de día/semana cacheados por proceso (solo se recalculan al cambiar de periodo)
+        self._day: Tuple[float, float] = (0.0, 0.0)
+        self._week: Tuple[float, float] = (0.0, 0.0)
+
+        if self.owner:
+            now = self.time_fn()
+            values = self.values
+            values[:] = 0.0
+            values[EQUITY] = values[DAY_OPEN_EQUITY] = values[WEEK_PEAK] = initial_capital
+            values[DAY_START] = self.day_bounds(now)[0]
+            values[WEEK_START] = self.week_bounds(now)[0]
+
+    @classmethod
+    def from_config(cls, config) -> 'RiskCoordinator':
+        return cls(
+            initial_capital=config.INITIAL_CAPITAL,
+            max_trades_per_day=config.MAX_TRADES_PER_DAY,
+            daily_loss_pct=config.DAILY_MAX_DRAWDOWN_PCT,
+            weekly_drawdown_pct=config.WEEKLY_MAX_DRAWDOWN_PCT,
+            max_consecutive_losses=config.MAX_CONSECUTIVE_LOSSES,
+            cooldown_seconds=config.COOLDOWN_AFTER_LOSS_MIN * 60,
+            timezone=config.TIMEZONE
+        )
+
+    def handle(self) -> Dict[str, Any]:
+        """Argumentos para adjuntarse desde otro proceso (pasar en Process(args=...))"""
+        return {
+            'name': self.shm.name,
+            'lock': self.lock,
+            'initial_capital': self.initial_capital,
+            'max_trades_per_day': self.max_trades_per_day,
+            'daily_loss_pct': self.daily_loss_pct,
+            'weekly_drawdown_pct': self.weekly_drawdown_pct,
+            'max_consecutive_losses': self.max_consecutive_losses,
+            'cooldown_seconds': self.cooldown_seconds,
+            'timezone': self.timezone
+        }
+
+    @classmethod
+    def attach(cls, handle: Dict[str, Any], time_fn: Callable[[], float] = time.time) -> 'RiskCoordinator':
+        return cls(time_fn=time_fn, **handle)
+
+    def close(self) -> None:
+        self.values = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    # === PERIODOS ===
+
+    def day_bounds(self, now: float) -> Tuple[float, float]:
+        if not self._day[0] <= now < self._day[1]:
+            self._day = period_bounds(now, 'day', self.tz)
+        return self._day
+
+    def week_bounds(self, now: float) -> Tuple[float, float]:
+        if not self._week[0] <= now < self._week[1]:
+            self._week = period_bounds(now, 'week', self.tz)
+        return self._week
+
+    def _roll_periods(self, now: float) -> None:
+        """Bajo lock: reabrir contadores diarios/semanales al cambiar de periodo"""
+        values = self.values
+        day_start = self.day_bounds(now)[0]
+        if values[DAY_START] != day_start:
+            values[DAY_START] = day_start
+            values[TRADES_TODAY] = 0.0
+            values[DAY_OPEN_EQUITY] = values[EQUITY]
+        week_start = self.week_bounds(now)[0]
+        if values[WEEK_START] != week_start:
+            values[WEEK_START] = week_start
+            values[WEEK_PEAK] = values[EQUITY]
+
+    # === LECTURA SIN LOCK (cada decisión) ===
+
+    def blocked_reason(self, now: float = None) -> Optional[str]:
+        """Motivo de bloqueo global o None; lecturas sueltas de float64 alineados, sin lock"""
+        now = self.time_fn() if now is None else now
+        values = self.values
+        if values[HALT_CODE] and now < values[HALT_UNTIL]:
+            if values[HALT_CODE] == HALT_DAILY_LOSS:
+                return f"Pérdida diaria global crítica: {self.daily_loss():.2f}%"
+            return f"Drawdown semanal global crítico: {self.weekly_drawdown():.2f}%"
+        if now < values[COOLDOWN_UNTIL]:
+            return f"Cooldown racha global: {(values[COOLDOWN_UNTIL] - now) / 60:.1f}min restantes"
+        if values[DAY_START] == self.day_bounds(now)[0] and values[TRADES_TODAY] >= self.max_trades_per_day:
+            return f"Límite diario global alcanzado: {int(values[TRADES_TODAY])}/{self.max_trades_per_day}"
+        return None
+
+    def daily_loss(self) -> float:
+        values = self.values
+        day_open = values[DAY_OPEN_EQUITY]
+        return max(0.0, (day_open - values[EQUITY]) / day_open * 100) if day_open > 0 else 0.0
+
+    def weekly_drawdown(self) -> float:
+        values = self.values
+        peak = values[WEEK_PEAK]
+        return max(0.0, (peak - values[EQUITY]) / peak * 100) if peak > 0 else 0.0
+
+    # === SECCIONES CRÍTICAS CORTAS ===
+
+    def try_acquire_trade(self) -> bool:
+        """Reservar un trade del cupo global; False si algún límite global lo impide"""
+        now = self.time_fn()
+        with self.lock:
+            self._roll_periods(now)
+            values = self.values
+            if self.blocked_reason(now) is not None:
+                values[REJECTED] += 1
+                return False
+            values[TRADES_TODAY] += 1
+            values[TOTAL_TRADES] += 1
+            return True
+
+    def release_trade(self) -> None:
+        """Devolver una reserva cuyo trade no llegó a ejecutarse"""
+        now = self.time_fn()
+        with self.lock:
+            values = self.values
+            if values[DAY_START] == self.day_bounds(now)[0] and values[TRADES_TODAY] > 0:
+                values[TRADES_TODAY] -= 1
+            values[TOTAL_TRADES] -= 1
+
+    def record_result(self, pnl: float) -> None:
+        """Liquidar el P&L neto de un trade: capital, racha global y bloqueos diario/semanal"""
+        now = self.time_fn()
+        with self.lock:
+            self._roll_periods(now)
+            values = self.values
+            values[EQUITY] += pnl
+            if values[EQUITY] > values[WEEK_PEAK]:
+                values[WEEK_PEAK] = values[EQUITY]
+
+            if pnl > 0:
+                values[CONSECUTIVE_LOSSES] = 0.0
+            else:
+                values[CONSECUTIVE_LOSSES] += 1
+                if values[CONSECUTIVE_LOSSES] >= self.max_consecutive_losses:
+                    values[COOLDOWN_UNTIL] = now + self.cooldown_seconds
+                    values[CONSECUTIVE_LOSSES] = 0.0
+                    self.logger.info("🚨 Racha global de pérdidas: cooldown %.0fs para todos los shards",
+                                     self.cooldown_seconds)
+
+            # El bloqueo semanal (más largo) prevalece sobre el diario
+            weekly_halt = values[HALT_CODE] == HALT_WEEKLY_DRAWDOWN and now < values[HALT_UNTIL]
+            if self.weekly_drawdown() >= self.weekly_drawdown_pct:
+                values[HALT_CODE] = HALT_WEEKLY_DRAWDOWN
+                values[HALT_UNTIL] = self.week_bounds(now)[1]
+            elif self.daily_loss() >= self.daily_loss_pct and not weekly_halt:
+                values[HALT_CODE] = HALT_DAILY_LOSS
+                values[HALT_UNTIL] = self.day_bounds(now)[1]
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        values = self.values
+        now = self.time_fn()
+        return {
+            'trades_today': int(values[TRADES_TODAY]),
+            'max_trades_per_day': self.max_trades_per_day,
+            'equity': float(values[EQUITY]),
+            'daily_loss_pct': self.daily_loss(),
+            'weekly_drawdown_pct': self.weekly_drawdown(),
+            'consecutive_losses': int(values[CONSECUTIVE_LOSSES]),
+            'cooldown_remaining_sec': max(0.0, float(values[COOLDOWN_UNTIL]) - now),
+            'blocked_reason': self.blocked_reason(now),
+            'total_trades': int(values[TOTAL_TRADES]),
+            'rejected': int(values[REJECTED])
+        }
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+🧪 SOAK RUNNER - FASE 1.6
+Modo soak acelerado: ProfessionalTradingBot sobre un reloj virtual, sin sleeps,
+con datos de mercado simulados, ejecución forzada a simulación (gateway y
+user-data stream nulos) y sinks nulos. Semanas de ciclos en minutos.
+Informa ciclos/s, RSS y memoria trazada a lo largo del tiempo, crecimiento de
+objetos por clase y estructuras del bot que crecen sin límite.
+"""
+
+import gc
+import os
+import sys
+import json
+import time
+import logging
+import tracemalloc
+from collections import Counter, deque
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Callable
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+# Contenedores vigilados: profundidad de búsqueda desde el bot
+STRUCTURE_SCAN_DEPTH = 2
+GROWTH_MIN_SAMPLES = 4
+
+class VirtualClock:
+    """Reloj virtual: time() y datetime.now() avanzan solo con advance()"""
+
+    def __init__(self, start: float = None):
+        self.now = start if start is not None else time.time()
+        clock = self
+
+        class VirtualDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return cls.fromtimestamp(clock.now, tz)
+
+        self.datetime = VirtualDatetime
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+def current_rss_kb() -> Optional[float]:
+    """RSS actual (Linux /proc); si no existe, pico de RSS vía resource"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    if RESOURCE_AVAILABLE:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 if sys.platform == 'darwin' else float(peak)
+    return None
+
+def count_objects_by_class() -> Counter:
+    """Número de objetos vivos (seguidos por el GC) por nombre de clase"""
+    return Counter(type(obj).__name__ for obj in gc.get_objects())
+
+def find_containers(root: Any, prefix: str = 'bot', depth: int = STRUCTURE_SCAN_DEPTH,
+                    seen: set = None) -> Dict[str, Any]:
+    """Listas/dicts/sets/deques alcanzables desde los atributos del bot (ruta → contenedor)"""
+    seen = seen if seen is not None else set()
+    found = {}
+    attrs = getattr(root, '__dict__', None)
+    if attrs is None or id(root) in seen:
+        return found
+    seen.add(id(root))
+    for name, value in attrs.items():
+        path = f"{prefix}.{name}"
+        if isinstance(value, (list, dict, set, deque)):
+            found[path] = value
+        elif depth > 0 and hasattr(value, '__dict__') and not isinstance(value, type) \
+                and type(value).__module__ not in ('builtins', 'logging'):
+            found.update(find_containers(value, path, depth - 1, seen))
+    return found
+
+def growing_structures(history: Dict[str, List[int]], min_samples: int = GROWTH_MIN_SAMPLES) -> List[Dict[str, Any]]:
+    """Contenedores que crecen en todos los últimos muestreos (candidatos a crecimiento sin límite)"""
+    flagged = []
+    for path, sizes in history.items():
+        tail = sizes[-min_samples:]
+        if len(tail) >= min_samples and all(b > a for a, b in zip(tail, tail[1:])):
+            flagged.append({'path': path, 'first': sizes[0], 'last': sizes[-1], 'samples': sizes})
+    flagged.sort(key=lambda row: row['last'] - row['first'], reverse=True)
+    return flagged
+
+class NullOrderGateway:
+    """Gateway nulo: falso en los `if self.order_gateway` del bot y sin envíos; cuenta los intentos"""
+
+    def __init__(self):
+        self.calls: List[str] = []
+
+    def __bool__(self) -> bool:
+        return False
+
+    def _refuse(self, name: str) -> Dict[str, Any]:
+        self.calls.append(name)
+        return {'filled': False, 'executed_qty': 0.0, 'avg_price': 0.0, 'order': None, 'reason': 'SOAK'}
+
+    def submit_order(self, *args, **kwargs) -> Dict[str, Any]:
+        return self._refuse('submit_order')
+
+    def execute_maker_order(self, *args, **kwargs) -> Dict[str, Any]:
+        return self._refuse('execute_maker_order')
+
+    def cancel_order(self, *args, **kwargs) -> Dict[str, Any]:
+        return self._refuse('cancel_order')
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'soak_null_gateway': True, 'calls': len(self.calls)}
+
+class NullUserDataStream:
+    """User-data stream nulo: nunca abre conexión"""
+
+    def __bool__(self) -> bool:
+        return False
+
+    def subscribe(self, handler: Callable) -> None:
+        pass
+
+    def start(self, *args, **kwargs) -> bool:
+        return False
+
+    def stop(self) -> None:
+        pass
+
+def force_simulation(config) -> Dict[str, Any]:
+    """Forzar simulación (LIVE_TRADING=False, SHADOW_MODE=True); devuelve los valores previos"""
+    saved = {'LIVE_TRADING': config.LIVE_TRADING, 'SHADOW_MODE': config.SHADOW_MODE}
+    config.LIVE_TRADING = False
+    config.SHADOW_MODE = True
+    return saved
+
+def install_null_execution(bot) -> NullOrderGateway:
+    """Sustituir gateway de órdenes y user-data stream por objetos nulos"""
+    if bot.user_data_stream is not None:
+        bot.user_data_stream.stop()
+    bot.order_gateway = NullOrderGateway()
+    bot.user_data_stream = NullUserDataStream()
+    return bot.order_gateway
+
+def install_null_sinks(bot) -> None:
+    """Sheets, ficheros locales, Telegram y telemetría remota sin efecto"""
+    bot.sheets_logger.sheets_enabled = False
+    bot.sheets_logger.log_trade = lambda trade_data, metrics=None: True
+    bot.sheets_logger.log_telemetry = lambda telemetry_data: True
+    bot.local_logger.log_operation = lambda trade_data: True
+    bot.send_telegram_message = lambda message: None
+
+def install_virtual_clock(bot, clock: VirtualClock, modules: List[Any]) -> None:
+    """Redirigir datetime.now() de los módulos y los time_fn de los componentes al reloj virtual"""
+    for module in modules:
+        module.datetime = clock.datetime
+    components = [
+        bot.position_book,
+        bot.account_state,
+        bot.safety_manager.drawdown_tracker,
+        bot.telemetry_manager.rejection_stats,
+        getattr(bot, 'symbol_registry', None),
+        getattr(bot, 'synthetic_tape', None)
+    ]
+    for component in components:
+        if component is not None and hasattr(component, 'time_fn'):
+            component.time_fn = clock.time
+
+def run_soak(cycles: int = 1_000_000, cycle_seconds: float = None, samples: int = 20,
+             use_tracemalloc: bool = True, report_path: str = None, start_time: float = None,
+             log_level: int = logging.WARNING) -> Dict[str, Any]:
+    """Ejecutar el bot `cycles` ciclos sobre reloj virtual y devolver el informe"""
+    import minimal_working_bot
+    import pair_selector
+
+    logging.getLogger().setLevel(log_level)
+
+    clock = VirtualClock(start_time)
+    modules = [minimal_working_bot, pair_selector]
+    originals = [module.datetime for module in modules]
+    for module in modules:
+        module.datetime = clock.datetime
+    # Antes de construir el bot: con LIVE_TRADING=true y SHADOW_MODE=false abriría el gateway real
+    saved_modes = force_simulation(minimal_working_bot.config)
+    try:
+        bot = minimal_working_bot.ProfessionalTradingBot()
+        gateway = install_null_execution(bot)
+        install_null_sinks(bot)
+        install_virtual_clock(bot, clock, modules)
+        report = _soak_loop(bot, clock, cycles, cycle_seconds, samples, use_tracemalloc, report_path)
+        report['gateway_calls'] = len(gateway.calls)
+        return report
+    finally:
+        for module, original in zip(modules, originals):
+            module.datetime = original
+        for name, value in saved_modes.items():
+            setattr(minimal_working_bot.config, name, value)
+
+def _soak_loop(bot, clock: VirtualClock, cycles: int, cycle_seconds: Optional[float], samples: int,
+               use_tracemalloc: bool, report_path: Optional[str]) -> Dict[str, Any]:
+    logger = logging.getLogger(__name__)
+    step = cycle_seconds if cycle_seconds is not None else bot.update_interval
+    sample_every = max(1, cycles // max(samples, 1))
+
+    if use_tracemalloc:
+        tracemalloc.start()
+    containers = find_containers(bot)
+    size_history: Dict[str, List[int]] = {path: [] for path in containers}
+    timeline = []
+    objects_start = count_objects_by_class()
+
+    def sample(cycle: int, elapsed: float) -> None:
+        # Re-escanear: atributos reasignados (p. ej. daily_trades = []) sustituyen al contenedor
+        for path, container in find_containers(bot).items():
+            size_history.setdefault(path, []).append(len(container))
+        traced = tracemalloc.get_traced_memory()[0] / 1024 if use_tracemalloc else None
+        timeline.append({
+            'cycle': cycle,
+            'virtual_time': datetime.fromtimestamp(clock.now).isoformat(),
+            'elapsed_sec': elapsed,
+            'rss_kb': current_rss_kb(),
+            'traced_kb': traced
+        })
+
+    started = time.perf_counter()
+    sample(0, 0.0)
+    for cycle in range(1, cycles + 1):
+        clock.advance(step)
+        bot.run_trading_cycle()
+        if cycle % sample_every == 0 or cycle == cycles:
+            sample(cycle, time.perf_counter() - started)
+            logger.debug("🧪 Soak %d/%d ciclos", cycle, cycles)
+    elapsed = time.perf_counter() - started
+
+    objects_end = count_objects_by_class()
+    object_growth = sorted(
+        ({'class': name, 'start': objects_start.get(name, 0), 'end': count,
+          'delta': count - objects_start.get(name, 0)} for name, count in objects_end.items()),
+        key=lambda row: row['delta'], reverse=True
+    )[:15]
+
+    top_allocations = []
+    if use_tracemalloc:
+        for stat in tracemalloc.take_snapshot().statistics('lineno')[:10]:
+            frame = stat.traceback[0]
+            top_allocations.append({'site': f"{frame.filename}:{frame.lineno}", 'size_kb': stat.size / 1024,
+                                    'count': stat.count})
+        tracemalloc.stop()
+
+    report = {
+        'cycles': cycles,
+        'cycle_seconds': step,
+        'virtual_days': cycles * step / 86400,
+        'elapsed_sec': elapsed,
+        'cycles_per_sec': cycles / elapsed if elapsed > 0 else 0.0,
+        'trades': sum(stats.trades for stats in bot.metrics_tracker.symbol_stats.values()),
+        'timeline': timeline,
+        'object_growth': object_growth,
+        'growing_structures': growing_structures(size_history),
+        'top_allocations': top_allocations
+    }
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, default=str)
+    return report
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Resumen legible del informe de soak"""
+    print("=" * 70)
+    print(f"🧪 SOAK: {report['cycles']} ciclos ({report['virtual_days']:.1f} días virtuales) "
+          f"en {report['elapsed_sec']:.1f}s → {report['cycles_per_sec']:.0f} ciclos/s, {report['trades']} trades")
+    first, last = report['timeline'][0], report['timeline'][-1]
+    if first['rss_kb'] and last['rss_kb']:
+        print(f"💾 RSS: {first['rss_kb'] / 1024:.1f} MB → {last['rss_kb'] / 1024:.1f} MB")
+    if first['traced_kb'] is not None:
+        print(f"🔍 Memoria trazada: {first['traced_kb'] / 1024:.1f} MB → {last['traced_kb'] / 1024:.1f} MB")
+    print("📈 Crecimiento de objetos por clase:")
+    for row in report['object_growth'][:8]:
+        print(f"   {row['class']:<30} {row['start']:>9} → {row['end']:>9} (+{row['delta']})")
+    if report['growing_structures']:
+        print("⚠️ Estructuras que crecen en cada muestreo:")
+        for row in report['growing_structures']:
+            print(f"   {row['path']:<50} {row['first']} → {row['last']}")
+    else:
+        print("✅ Ninguna estructura del bot crece sin límite")
+    print("=" * 70)
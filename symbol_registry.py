@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+📐 SYMBOL REGISTRY - FASE 1.6
+Metadatos de símbolos desde exchangeInfo (REST, caché en disco con TTL o fixture local).
+Los filtros tick/step/min notional se precalculan como enteros para que el redondeo
+de precio/cantidad y el chequeo de min notional sean aritmética entera en el hot path.
+"""
+
+import os
+import json
+import math
+import time
+import logging
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+DEFAULT_FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'exchange_info.json')
+DEFAULT_CACHE_PATH = os.path.join('trading_data', 'exchange_info_cache.json')
+
+# Precio de referencia para simulación (mercado sintético y snapshots simulados)
+SIMULATED_REFERENCE_PRICES = {
+    'BTCUSDT': 45000,
+    'ETHUSDT': 2800,
+    'BNBUSDT': 600,
+    'SOLUSDT': 100,
+    'XRPUSDT': 0.5,
+    'ADAUSDT': 0.4,
+    'DOGEUSDT': 0.08,
+    'LINKUSDT': 15,
+    'TONUSDT': 2.5,
+    'MATICUSDT': 0.8,
+    'ARBUSDT': 1.2,
+    'OPUSDT': 2.8,
+    'LTCUSDT': 70,
+    'APTUSDT': 8,
+    'TRXUSDT': 0.08
+}
+DEFAULT_REFERENCE_PRICE = 100
+
+# Tolerancia para absorber error de coma flotante al convertir a ticks/steps
+ROUNDING_EPSILON = 1e-9
+
+def reference_price(symbol: str) -> float:
+    """Precio de referencia para simulación del símbolo"""
+    return SIMULATED_REFERENCE_PRICES.get(symbol, DEFAULT_REFERENCE_PRICE)
+
+def count_decimals(text: str) -> int:
+    """Decimales significativos de un número en texto ('0.01000000' → 2)"""
+    if '.' not in text:
+        return 0
+    return len(text.split('.', 1)[1].rstrip('0'))
+
+def to_units(text: str, decimals: int) -> int:
+    """Convertir número en texto a entero escalado por 10**decimals (sin floats ni Decimal)"""
+    integer, _, fraction = text.partition('.')
+    fraction = (fraction + '0' * decimals)[:decimals]
+    return int(integer or 0) * 10 ** decimals + int(fraction or 0)
+
+class SymbolSpec:
+    """Filtros de un símbolo precalculados en unidades enteras"""
+
+    __slots__ = ('symbol', 'status', 'tick_size', 'step_size', 'min_qty', 'min_notional',
+                 'price_decimals', 'price_scale', 'tick_units', 'ticks_per_price',
+                 'qty_decimals', 'qty_scale', 'step_units', 'steps_per_qty',
+                 'min_qty_steps', 'min_notional_units', 'base_asset', 'quote_asset', 'permissions')
+
+    def __init__(self, symbol: str, tick_size: str, step_size: str, min_qty: str,
+                 min_notional: str, status: str = 'TRADING', min_notional_floor: float = 0.0,
+                 base_asset: str = None, quote_asset: str = None, permissions: Tuple[str, ...] = ()):
+        self.symbol = symbol
+        self.status = status
+        self.base_asset = base_asset
+        self.quote_asset = quote_asset
+        self.permissions = tuple(permissions)
+
+        # Precio: entero en unidades de 10**-price_decimals
+        self.price_decimals = count_decimals(tick_size)
+        self.price_scale = 10 ** self.price_decimals
+        self.tick_units = to_units(tick_size, self.price_decimals)
+        self.ticks_per_price = self.price_scale / self.tick_units
+
+        # Cantidad: entero en unidades de 10**-qty_decimals
+        self.qty_decimals = count_decimals(step_size)
+        self.qty_scale = 10 ** self.qty_decimals
+        self.step_units = to_units(step_size, self.qty_decimals)
+        self.steps_per_qty = self.qty_scale / self.step_units
+        self.min_qty_steps = -(-to_units(min_qty, self.qty_decimals) // self.step_units)
+
+        # Min notional en unidades precio*cantidad (aplica el mínimo configurado si es mayor)
+        notional_decimals = self.price_decimals + self.qty_decimals
+        exchange_min_units = to_units(min_notional, notional_decimals)
+        floor_units = math.ceil(min_notional_floor * 10 ** notional_decimals)
+        self.min_notional_units = max(exchange_min_units, floor_units)
+
+        self.tick_size = self.tick_units / self.price_scale
+        self.step_size = self.step_units / self.qty_scale
+        self.min_qty = self.min_qty_steps * self.step_size
+        self.min_notional = self.min_notional_units / 10 ** notional_decimals
+
+    @classmethod
+    def from_exchange_info(cls, entry: Dict[str, Any], min_notional_floor: float = 0.0) -> 'SymbolSpec':
+        """Construir desde una entrada 'symbols' de exchangeInfo"""
+        filters = {f['filterType']: f for f in entry.get('filters', [])}
+        price_filter = filters.get('PRICE_FILTER', {})
+        lot_size = filters.get('LOT_SIZE', {})
+        notional = filters.get('NOTIONAL') or filters.get('MIN_NOTIONAL') or {}
+        # Permisos: lista plana antigua y permissionSets (lista de listas) actual
+        permissions = set(entry.get('permissions', []))
+        for permission_set in entry.get('permissionSets', []):
+            permissions.update(permission_set)
+        return cls(
+            entry['symbol'],
+            price_filter.get('tickSize', '0.01'),
+            lot_size.get('stepSize', '0.001'),
+            lot_size.get('minQty', lot_size.get('stepSize', '0.001')),
+            notional.get('minNotional', '0'),
+            status=entry.get('status', 'TRADING'),
+            min_notional_floor=min_notional_floor,
+            base_asset=entry.get('baseAsset'),
+            quote_asset=entry.get('quoteAsset'),
+            permissions=tuple(sorted(permissions))
+        )
+
+    # === HOT PATH: solo aritmética entera tras la conversión inicial ===
+
+    def price_to_ticks(self, price: float, side: str = None) -> int:
+        """Precio → ticks (BUY/None redondea hacia abajo, SELL hacia arriba: siempre pasivo)"""
+        if side == 'SELL':
+            return math.ceil(price * self.ticks_per_price - ROUNDING_EPSILON)
+        return math.floor(price * self.ticks_per_price + ROUNDING_EPSILON)
+
+    def qty_to_steps(self, qty: float) -> int:
+        """Cantidad → steps (siempre hacia abajo)"""
+        return math.floor(qty * self.steps_per_qty + ROUNDING_EPSILON)
+
+    def round_price(self, price: float, side: str = None) -> float:
+        """Redondear precio al tick"""
+        return self.price_to_ticks(price, side) * self.tick_units / self.price_scale
+
+    def round_qty(self, qty: float) -> float:
+        """Redondear cantidad al step"""
+        return self.qty_to_steps(qty) * self.step_units / self.qty_scale
+
+    def meets_min_notional(self, ticks: int, steps: int) -> bool:
+        """Verificar min notional y min qty con enteros"""
+        return (steps >= self.min_qty_steps and
+                ticks * self.tick_units * steps * self.step_units >= self.min_notional_units)
+
+    def min_steps_at(self, ticks: int) -> int:
+        """Steps mínimos para cumplir min notional a un precio dado"""
+        price_units = ticks * self.tick_units
+        if price_units <= 0:
+            return self.min_qty_steps
+        qty_units = -(-self.min_notional_units // price_units)
+        return max(self.min_qty_steps, -(-qty_units // self.step_units))
+
+    def format_price(self, ticks: int) -> str:
+        """Ticks → texto para la API"""
+        return self._format_units(ticks * self.tick_units, self.price_scale, self.price_decimals)
+
+    def format_qty(self, steps: int) -> str:
+        """Steps → texto para la API"""
+        return self._format_units(steps * self.step_units, self.qty_scale, self.qty_decimals)
+
+    def format_order(self, price: float, qty: float, side: str = None) -> Tuple[int, int, str, str]:
+        """(ticks, steps, precio, cantidad) para la API: texto desde enteros, nunca desde floats"""
+        ticks, steps = self.price_to_ticks(price, side), self.qty_to_steps(qty)
+        return ticks, steps, self.format_price(ticks), self.format_qty(steps)
+
+    @staticmethod
+    def _format_units(units: int, scale: int, decimals: int) -> str:
+        if decimals == 0:
+            return str(units)
+        return f"{units // scale}.{units % scale:0{decimals}d}"
+
+    def quantize_order(self, price: float, notional: float, side: str) -> Dict[str, Any]:
+        """Precio y cantidad válidos para el exchange; sube la cantidad al mínimo si hace falta"""
+        ticks = self.price_to_ticks(price, side)
+        steps = self.qty_to_steps(notional / price) if price > 0 else 0
+        min_steps = self.min_steps_at(ticks)
+        bumped = steps < min_steps
+        if bumped:
+            steps = min_steps
+        order_price = ticks * self.tick_units / self.price_scale
+        quantity = steps * self.step_units / self.qty_scale
+        return {
+            'price': order_price,
+            'quantity': quantity,
+            'price_str': self.format_price(ticks),
+            'quantity_str': self.format_qty(steps),
+            'notional': order_price * quantity,
+            'bumped_to_min': bumped
+        }
+
+class SymbolRegistry:
+    """Registro de símbolos con caché en disco (TTL) y fallback a fixture"""
+
+    def __init__(self, rest_client: Any = None, fixture_path: str = DEFAULT_FIXTURE_PATH,
+                 cache_path: str = DEFAULT_CACHE_PATH, ttl_sec: float = 86400,
+                 min_notional_floor: float = 0.0, time_fn: Callable[[], float] = time.time):
+        self.logger = logging.getLogger(__name__)
+        self.rest_client = rest_client
+        self.fixture_path = fixture_path
+        self.cache_path = cache_path
+        self.ttl_sec = ttl_sec
+        self.min_notional_floor = min_notional_floor
+        self.time_fn = time_fn
+
+        self.specs: Dict[str, SymbolSpec] = {}
+        self.loaded_at = None
+        self.source = None
+
+    def load(self, force_refresh: bool = False) -> bool:
+        """Cargar metadatos: caché vigente → exchangeInfo REST → fixture local"""
+        data = None if force_refresh else self._read_cache()
+        source = 'cache'
+
+        if data is None and self.rest_client is not None:
+            data = self._fetch_remote()
+            source = 'rest'
+            if data is not None:
+                self._write_cache(data)
+
+        if data is None:
+            data = self._read_json(self.fixture_path)
+            source = 'fixture'
+
+        if data is None:
+            self.logger.error("❌ Sin metadatos de exchange (ni caché, ni REST, ni fixture)")
+            return False
+
+        self._build(data)
+        self.source = source
+        self.loaded_at = self.time_fn()
+        self.logger.info(f"📐 Symbol registry: {len(self.specs)} símbolos desde {source}")
+        return True
+
+    def _read_json(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _read_cache(self) -> Optional[Dict[str, Any]]:
+        """Leer caché si existe y no ha expirado"""
+        cached = self._read_json(self.cache_path)
+        if not cached or 'exchange_info' not in cached:
+            return None
+        if self.time_fn() - cached.get('cached_at', 0) > self.ttl_sec:
+            return None
+        return cached['exchange_info']
+
+    def _write_cache(self, data: Dict[str, Any]) -> None:
+        try:
+            cache_dir = os.path.dirname(self.cache_path)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'cached_at': self.time_fn(), 'exchange_info': data}, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            self.logger.warning(f"⚠️ No se pudo guardar caché de exchangeInfo: {e}")
+
+    def _fetch_remote(self) -> Optional[Dict[str, Any]]:
+        response = self.rest_client.request('GET', '/api/v3/exchangeInfo')
+        if response['ok'] and isinstance(response['data'], dict) and 'symbols' in response['data']:
+            return response['data']
+        self.logger.warning(f"⚠️ exchangeInfo no disponible ({response['status']}): {response.get('msg')}")
+        return None
+
+    def _build(self, data: Dict[str, Any]) -> None:
+        specs = {}
+        for entry in data.get('symbols', []):
+            if entry.get('status', 'TRADING') != 'TRADING':
+                continue
+            try:
+                specs[entry['symbol']] = SymbolSpec.from_exchange_info(entry, self.min_notional_floor)
+            except (KeyError, ValueError, ZeroDivisionError) as e:
+                self.logger.warning(f"⚠️ Filtros inválidos para {entry.get('symbol')}: {e}")
+        self.specs = specs
+
+    def refresh_if_stale(self) -> bool:
+        """Recargar si el TTL expiró"""
+        if self.loaded_at is None or self.time_fn() - self.loaded_at > self.ttl_sec:
+            return self.load()
+        return False
+
+    def get(self, symbol: str) -> Optional[SymbolSpec]:
+        """Spec precalculada del símbolo (None si no está listado)"""
+        return self.specs.get(symbol)
+
+    def symbols(self) -> List[str]:
+        return list(self.specs.keys())
+
+    def reference_price(self, symbol: str) -> float:
+        return reference_price(symbol)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'symbols': len(self.specs),
+            'source': self.source,
+            'age_sec': (self.time_fn() - self.loaded_at) if self.loaded_at else None
+        }
+
+# Instancia global
+symbol_registry = None
+
+def init_symbol_registry(config, rest_client: Any = None) -> SymbolRegistry:
+    """Inicializar y cargar el registro global de símbolos"""
+    global symbol_registry
+    symbol_registry = SymbolRegistry(
+        rest_client=rest_client,
+        ttl_sec=getattr(config, 'EXCHANGE_INFO_TTL_HOURS', 24) * 3600,
+        min_notional_floor=getattr(config, 'MIN_NOTIONAL_USD', 0.0)
+    )
+    symbol_registry.load()
+    return symbol_registry
+
+def get_symbol_registry() -> Optional[SymbolRegistry]:
+    """Obtener instancia global del registro de símbolos"""
+    return symbol_registry
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+📈 SYNTHETIC MARKET - FASE 1.6
+Generador vectorizado y determinista de mercado sintético para carga, soak y backtests.
+
+- GBM con regímenes de volatilidad (calma / normal / volátil) comunes a todo el mercado
+- Correlación entre símbolos por un factor de mercado (modelo de un factor)
+- OHLC, volumen (correlado con |retorno| y régimen) y spread en bps por vela
+- Un `Generator` de NumPy por (semilla, símbolo, bloque) con semillas estables (sha1):
+  la misma vela sale igual en cualquier proceso, orden o subconjunto de símbolos,
+  y nunca se toca el RNG global de NumPy ni el de `random`
+"""
+
+import time
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Any, Optional, Callable, Tuple, Iterable, Iterator
+
+from symbol_registry import reference_price
+from bar_resampler import BAR_COLUMNS
+
+SECONDS_PER_YEAR = 365 * 86400
+CHUNK_BARS = 8192  # aleatoriedad por bloques de índice absoluto: ventanas solapadas comparten retornos
+
+# Regímenes: 0 calma, 1 normal, 2 volátil
+REGIME_VOL_MULT = np.array([0.6, 1.0, 2.2])
+REGIME_VOLUME_MULT = np.array([0.7, 1.0, 1.8])
+REGIME_SPREAD_MULT = np.array([0.8, 1.0, 1.6])
+REGIME_MEAN_SECONDS = (3 * 86400, 5 * 86400, 86400)
+
+SPREAD_NOISE = 0.3
+VOLUME_NOISE = 0.5
+WICK_SCALE = 0.5
+
+# Volumen diario en quote por símbolo (log-uniforme)
+DAILY_VOLUME_RANGE = (2e8, 3e9)
+
+def stable_seed(*parts: Any) -> int:
+    """Semilla de 64 bits estable entre procesos (hash() de Python no lo es)"""
+    key = '|'.join(str(part) for part in parts)
+    return int(hashlib.sha1(key.encode()).hexdigest()[:16], 16)
+
+MARKET_STREAM = stable_seed('__market__')
+PROFILE_STREAM = stable_seed('__profile__')
+
+class SyntheticMarket:
+    """Mercado sintético con velas indexadas por epoch // bar_seconds"""
+
+    def __init__(self, seed: int = 0, bar_seconds: int = 3600, annual_vol: float = 0.6,
+                 correlation: float = 0.5, drift: float = 0.0, spread_bps: float = 1.5,
+                 chunk_bars: int = CHUNK_BARS):
+        self.seed = seed
+        self.bar_seconds = bar_seconds
+        self.annual_vol = annual_vol
+        self.correlation = correlation
+        self.drift = drift
+        self.spread_bps = spread_bps
+        self.chunk_bars = chunk_bars
+        self.dt = bar_seconds / SECONDS_PER_YEAR
+        self.regime_mean_bars = [max(1.0, seconds / bar_seconds) for seconds in REGIME_MEAN_SECONDS]
+        self.profiles: Dict[str, Dict[str, float]] = {}
+        # Último bloque generado por símbolo y del mercado (el acceso suele ser secuencial)
+        self._symbol_chunks: Dict[str, Tuple[int, np.ndarray]] = {}
+        self._market_chunk: Optional[Tuple[int, np.ndarray, np.ndarray]] = None
+
+    # === PERFIL Y BLOQUES ALEATORIOS ===
+
+    def profile(self, symbol: str) -> Dict[str, float]:
+        """Parámetros fijos del símbolo: volatilidad, correlación, spread, volumen y precio inicial"""
+        profile = self.profiles.get(symbol)
+        if profile is None:
+            rng = np.random.default_rng([self.seed, stable_seed(symbol), PROFILE_STREAM])
+            profile = self.profiles[symbol] = {
+                'vol': self.annual_vol * float(np.exp(rng.normal(0, 0.35))),
+                'rho': float(np.clip(self.correlation * rng.uniform(0.7, 1.2), 0.0, 0.95)),
+                'spread_bps': self.spread_bps * float(np.exp(rng.normal(0, 0.5))),
+                'daily_volume': float(np.exp(rng.uniform(*np.log(DAILY_VOLUME_RANGE)))),
+                'start_price': float(reference_price(symbol))
+            }
+        return profile
+
+    def market_chunk(self, chunk: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Factor de mercado N(0,1) y régimen por vela del bloque"""
+        cached = self._market_chunk
+        if cached is not None and cached[0] == chunk:
+            return cached[1], cached[2]
+        rng = np.random.default_rng([self.seed, MARKET_STREAM, chunk])
+        factor = rng.standard_normal(self.chunk_bars)
+        regimes = np.empty(0, dtype=np.int8)
+        state = int(rng.integers(0, 3))
+        while len(regimes) < self.chunk_bars:
+            # Cadena de regímenes: siempre se cambia a uno de los otros dos
+            segments = max(8, int(self.chunk_bars / min(self.regime_mean_bars)) // 4)
+            states = (state + np.cumsum(rng.integers(1, 3, size=segments))) % 3
+            means = np.take(self.regime_mean_bars, states)
+            durations = rng.geometric(1.0 / means)
+            regimes = np.concatenate([regimes, np.repeat(states, durations).astype(np.int8)])
+            state = int(states[-1])
+        regimes = regimes[:self.chunk_bars]
+        self._market_chunk = (chunk, factor, regimes)
+        return factor, regimes
+
+    def symbol_chunk(self, symbol: str, chunk: int) -> np.ndarray:
+        """Ruido idiosincrático del bloque: (5, chunk_bars) = retorno, mecha alta/baja, volumen, spread"""
+        cached = self._symbol_chunks.get(symbol)
+        if cached is not None and cached[0] == chunk:
+            return cached[1]
+        rng = np.random.default_rng([self.seed, stable_seed(symbol), chunk])
+        noise = rng.standard_normal((5, self.chunk_bars))
+        self._symbol_chunks[symbol] = (chunk, noise)
+        return noise
+
+    def _window(self, symbols: List[str], first_index: int, n_bars: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Factor, régimen y ruido (5, símbolos, n_bars) de la ventana [first_index, first_index + n_bars)"""
+        chunks = range(first_index // self.chunk_bars, (first_index + n_bars - 1) // self.chunk_bars + 1)
+        lo = first_index - chunks[0] * self.chunk_bars
+        parts = [self.market_chunk(chunk) for chunk in chunks]
+        factor = np.concatenate([part[0] for part in parts])[lo:lo + n_bars]
+        regimes = np.concatenate([part[1] for part in parts])[lo:lo + n_bars]
+        noise = np.empty((5, len(symbols), n_bars))
+        for i, symbol in enumerate(symbols):
+            if len(chunks) == 1:
+                noise[:, i, :] = self.symbol_chunk(symbol, chunks[0])[:, lo:lo + n_bars]
+            else:
+                blocks = np.concatenate([self.symbol_chunk(symbol, chunk) for chunk in chunks], axis=1)
+                noise[:, i, :] = blocks[:, lo:lo + n_bars]
+        return factor, regimes, noise
+
+    # === GENERACIÓN ===
+
+    def generate(self, symbols: Iterable[str], n_bars: int, first_index: int = 0,
+                 start_prices: Optional[Iterable[float]] = None) -> Dict[str, np.ndarray]:
+        """
+        Velas [first_index, first_index + n_bars) de todos los símbolos a la vez.
+        Devuelve 'timestamp' y 'regime' (n_bars,) y open/high/low/close/volume/spread_bps
+        (símbolos, n_bars); el volumen va en quote (USD) como en las klines de Binance.
+        """
+        symbols = list(symbols)
+        profiles = [self.profile(symbol) for symbol in symbols]
+        vol = np.array([p['vol'] for p in profiles])[:, None]
+        rho = np.array([p['rho'] for p in profiles])[:, None]
+        spread = np.array([p['spread_bps'] for p in profiles])[:, None]
+        bar_volume = np.array([p['daily_volume'] for p in profiles])[:, None] * self.bar_seconds / 86400
+        if start_prices is None:
+            start = np.array([p['start_price'] for p in profiles])
+        else:
+            start = np.asarray(list(start_prices), dtype=float)
+
+        factor, regimes, noise = self._window(symbols, first_index, n_bars)
+        sigma = vol * np.sqrt(self.dt) * REGIME_VOL_MULT[regimes]
+        shock = np.sqrt(rho) * factor + np.sqrt(1.0 - rho) * noise[0]
+        log_returns = (self.drift * self.dt - 0.5 * sigma ** 2) + sigma * shock
+
+        close = start[:, None] * np.exp(np.cumsum(log_returns, axis=1))
+        open_ = np.empty_like(close)
+        open_[:, 0] = start
+        open_[:, 1:] = close[:, :-1]
+        high = np.maximum(open_, close) * np.exp(WICK_SCALE * sigma * np.abs(noise[1]))
+        low = np.minimum(open_, close) * np.exp(-WICK_SCALE * sigma * np.abs(noise[2]))
+
+        # Volumen: más actividad en velas grandes y en régimen volátil (media preservada)
+        activity = (1.0 + 2.0 * np.abs(shock)) / (1.0 + 2.0 * np.sqrt(2.0 / np.pi))
+        volume = bar_volume * REGIME_VOLUME_MULT[regimes] * activity \
+            * np.exp(VOLUME_NOISE * noise[3] - 0.5 * VOLUME_NOISE ** 2)
+        spread_bps = spread * REGIME_SPREAD_MULT[regimes] * np.exp(SPREAD_NOISE * noise[4])
+
+        return {
+            'timestamp': (first_index + np.arange(n_bars, dtype=np.int64)) * self.bar_seconds,
+            'regime': regimes,
+            'open': open_,
+            'high': high,
+            'low': low,
+            'close': close,
+            'volume': volume,
+            'spread_bps': spread_bps
+        }
+
+    def iter_blocks(self, symbols: Iterable[str], n_bars: int, block_bars: int = CHUNK_BARS,
+                    first_index: int = 0) -> Iterator[Dict[str, np.ndarray]]:
+        """Series largas por bloques encadenados (memoria acotada para soak/backtest)"""
+        symbols = list(symbols)
+        start_prices = None
+        for offset in range(0, n_bars, block_bars):
+            block = self.generate(symbols, min(block_bars, n_bars - offset), first_index + offset, start_prices)
+            start_prices = block['close'][:, -1]
+            yield block
+
+    def bars(self, symbol: str, limit: int, end_time: float = None, start_price: float = None) -> pd.DataFrame:
+        """Últimas `limit` velas cerradas antes de end_time como DataFrame (columnas del selector)"""
+        end_time = time.time() if end_time is None else end_time
+        last_closed = int(end_time // self.bar_seconds) - 1
+        data = self.generate([symbol], limit, last_closed - limit + 1,
+                             None if start_price is None else [start_price])
+        df = pd.DataFrame({column: data[column][0] for column in BAR_COLUMNS[1:]})
+        df.insert(0, 'timestamp', pd.to_datetime(data['timestamp'], unit='s'))
+        return df
+
+    def bar(self, symbol: str, index: int, last_close: float) -> Dict[str, Any]:
+        """Vela `index` que continúa desde last_close (mismo retorno que en cualquier ventana)"""
+        data = self.generate([symbol], 1, index, [last_close])
+        bar = {column: float(data[column][0, 0]) for column in BAR_COLUMNS[1:]}
+        bar['timestamp'] = pd.Timestamp(int(data['timestamp'][0]), unit='s')
+        return bar
+
+class SyntheticTape:
+    """Precio sintético continuo por símbolo que avanza con el reloj (precio de señales simuladas)"""
+
+    def __init__(self, market: SyntheticMarket, time_fn: Callable[[], float] = time.time):
+        self.market = market
+        self.time_fn = time_fn
+        self.state: Dict[str, Tuple[int, float, float]] = {}  # símbolo -> (índice, cierre, volumen quote)
+
+    def quote(self, symbol: str) -> Tuple[float, float]:
+        """(precio, volumen en unidades base) de la última vela cerrada del símbolo"""
+        index = int(self.time_fn() // self.market.bar_seconds) - 1
+        state = self.state.get(symbol)
+        if state is None or index > state[0]:
+            if state is None:
+                n_bars, start = 1, None
+            else:
+                # Tras una parada larga solo se recorre el último bloque
+                n_bars, start = min(index - state[0], self.market.chunk_bars), [state[1]]
+            data = self.market.generate([symbol], n_bars, index - n_bars + 1, start)
+            state = self.state[symbol] = (index, float(data['close'][0, -1]), float(data['volume'][0, -1]))
+        return state[1], state[2] / state[1]
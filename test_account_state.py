@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST ACCOUNT STATE - FASE 1.6
+Script para probar la caché de balances/equity: snapshot REST,
+eventos del user-data stream y replay local
+"""
+
+import logging
+
+from binance_rest import BinanceRestClient
+from order_gateway import OrderGateway, UserDataStream
+from mock_exchange import MockExchange
+from account_state import AccountState, AccountReplaySource
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def test_replay_buffers_events_until_snapshot():
+    """Eventos previos al snapshot se encolan y solo se aplican los más nuevos"""
+    print("\n1️⃣ Test: replay con eventos antes del snapshot...")
+    account = AccountState()
+    source = AccountReplaySource([
+        {'e': 'outboundAccountPosition', 'E': 900, 'u': 900, 'B': [{'a': 'USDT', 'f': '80.0', 'l': '0'}]},
+        {'e': 'outboundAccountPosition', 'E': 1100, 'u': 1100, 'B': [{'a': 'USDT', 'f': '120.0', 'l': '0'}]}
+    ])
+    stream = UserDataStream()
+    stream.subscribe(account.on_user_data)
+    stream.start(source=source)
+
+    source.replay()
+    assert account.get_equity() == 0.0 and len(account.pending_events) == 2
+
+    account.load_snapshot({'updateTime': 1000, 'balances': [{'asset': 'USDT', 'free': '100.0', 'locked': '0'}]})
+    assert account.get_equity() == 120.0
+    assert account.stale_events_skipped == 1
+
+    source.push({'e': 'balanceUpdate', 'E': 1200, 'a': 'USDT', 'd': '-20.0', 'T': 1200})
+    assert account.get_equity() == 100.0
+    print(f"✅ Equity tras replay: ${account.get_equity():.2f}")
+
+def test_equity_tracks_marks_incrementally():
+    """El equity incluye activos base valorados al último precio"""
+    print("\n2️⃣ Test: equity con marks...")
+    account = AccountState()
+    account.load_snapshot({'updateTime': 0, 'balances': [
+        {'asset': 'USDT', 'free': '50.0', 'locked': '0'},
+        {'asset': 'BTC', 'free': '0.001', 'locked': '0'}
+    ]})
+    assert account.get_equity() == 50.0
+    assert account.get_stats()['unpriced_assets'] == ['BTC']
+
+    account.update_mark('BTCUSDT', 40000.0)
+    assert abs(account.get_equity() - 90.0) < 1e-9
+    account.update_mark('BTCUSDT', 41000.0)
+    assert abs(account.get_equity() - 91.0) < 1e-9
+
+    account.apply_realized_pnl(-1.5)
+    assert abs(account.get_equity() - 89.5) < 1e-9
+    print(f"✅ Equity valorado: ${account.get_equity():.2f}")
+
+def test_bootstrap_and_fills_from_mock_exchange():
+    """Snapshot firmado del mock y balances actualizados por fills"""
+    print("\n3️⃣ Test: bootstrap REST + fills del mock...")
+    exchange = MockExchange(seed=6, api_secret='s', balances={'USDT': 1000.0})
+    rest = BinanceRestClient(base_url='http://mock', api_key='k', api_secret='s', session=exchange.session())
+    account = AccountState()
+    gateway = OrderGateway(rest, maker_only=True, retry_order=1)
+    stream = UserDataStream()
+    stream.subscribe(gateway.on_user_data)
+    stream.subscribe(account.on_user_data)
+    stream.start(source=exchange)
+
+    assert account.bootstrap(rest) and account.get_equity() == 1000.0
+
+    bid = exchange.books['SOLUSDT']['bid']
+    gateway.submit_order('SOLUSDT', 'BUY', 2.0, bid, intent_key='acct-1')
+    exchange.trade('SOLUSDT', bid, 10.0, aggressor_side='SELL')
+
+    assert abs(account.get_free('SOL') - 2.0) < 1e-9
+    assert abs(account.get_free('USDT') - (1000.0 - 2.0 * bid)) < 1e-6
+    account.update_mark('SOLUSDT', bid)
+    assert abs(account.get_equity() - 1000.0) < 1e-6
+    print(f"✅ Balances tras fill: SOL={account.get_free('SOL'):.3f}, USDT={account.get_free('USDT'):.2f}")
+
+def test_bot_marks_every_held_asset():
+    """Cada ciclo se valoran todos los activos con saldo (también los del snapshot) con el bookTicker real"""
+    print("\n4️⃣ Test: valoración de todos los activos del bot...")
+    from minimal_working_bot import ProfessionalTradingBot
+
+    exchange = MockExchange(seed=7, api_secret='s', balances={'USDT': 500.0, 'BTC': 0.01, 'SOL': 2.0, 'XYZ': 5.0})
+    exchange.set_book('BTCUSDT', 60000.0, 60002.0)  # lejos de la cinta sintética (~45000)
+    bot = ProfessionalTradingBot()
+    rest = BinanceRestClient(base_url='http://mock', api_key='k', api_secret='s', session=exchange.session())
+    bot.order_gateway = OrderGateway(rest, maker_only=True, retry_order=0)
+    assert bot.account_state.bootstrap(rest)
+    assert sorted(bot.account_state.get_stats()['unpriced_assets']) == ['BTC', 'SOL', 'XYZ']
+
+    assert bot.manage_open_positions() == []  # sin posiciones abiertas: solo valoración
+    sol_mid = (exchange.books['SOLUSDT']['bid'] + exchange.books['SOLUSDT']['ask']) / 2
+    assert abs(bot.current_capital - (500.0 + 0.01 * 60001.0 + 2.0 * sol_mid)) < 1e-6
+    assert bot.unpriced_assets == ['XYZ']
+
+    exchange.set_book('BTCUSDT', 61000.0, 61002.0)
+    bot.manage_open_positions()
+    assert abs(bot.current_capital - (500.0 + 0.01 * 61001.0 + 2.0 * sol_mid)) < 1e-6
+    print(f"✅ Equity valorado con libro real: ${bot.current_capital:.2f} (sin precio: {bot.unpriced_assets})")
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS ACCOUNT STATE")
+    print("=" * 50)
+    test_replay_buffers_events_until_snapshot()
+    test_equity_tracks_marks_incrementally()
+    test_bootstrap_and_fills_from_mock_exchange()
+    test_bot_marks_every_held_asset()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
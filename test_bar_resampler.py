@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST BAR RESAMPLER - FASE 1.6
+Script para probar la derivación incremental de 5m/15m/1h/4h desde una única
+serie de 1m, su coherencia con un resample de referencia y la sincronización REST
+"""
+
+import random
+import logging
+import pandas as pd
+
+from config_fase_1_6 import config
+from binance_rest import BinanceRestClient
+from mock_exchange import MockExchange
+from pair_selector import AutoPairSelector
+from minimal_working_bot import MarketFilter
+from bar_resampler import BarResampler, resample_base
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+START = 1_767_225_600  # 2026-01-01 00:00 UTC
+
+def random_walk(minutes: int, start: int, seed: int = 5):
+    rng = random.Random(seed)
+    price = 100.0
+    bars = []
+    for i in range(minutes):
+        close = price * (1 + rng.gauss(0, 0.001))
+        high = max(price, close) * (1 + abs(rng.gauss(0, 0.0005)))
+        low = min(price, close) * (1 - abs(rng.gauss(0, 0.0005)))
+        bars.append((start + i * 60, price, high, low, close, rng.uniform(1e4, 1e5)))
+        price = close
+    return bars
+
+def test_views_match_reference_resample():
+    """Cada timeframe coincide con un resample de pandas de la misma serie de 1m"""
+    print("\n1️⃣ Test: coherencia con resample de referencia...")
+    bars = random_walk(9 * 60, START + 7 * 60)  # primer bucket incompleto
+    resampler = BarResampler()
+    for bar in bars:
+        resampler.push('BTCUSDT', *bar)
+
+    base = pd.DataFrame(bars, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    base.index = pd.to_datetime(base['timestamp'], unit='s')
+    for tf, rule in (('5m', '5min'), ('15m', '15min'), ('1h', '1h'), ('4h', '4h')):
+        reference = base.resample(rule, origin='epoch').agg(
+            {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}).dropna()
+        view = resampler.bars('BTCUSDT', tf, include_partial=True).set_index('timestamp')
+        assert len(view) == len(reference), tf
+        assert (view.index == reference.index).all(), tf
+        diff = ((view[['open', 'high', 'low', 'close', 'volume']] - reference).abs() / reference).max().max()
+        assert diff < 1e-12, tf  # solo el orden de suma del volumen puede diferir
+        assert resample_base(bars, tf) == resampler.get_bars('BTCUSDT', tf)
+
+    hours = resampler.get_bars('BTCUSDT', '1h')
+    fives = resampler.get_bars('BTCUSDT', '5m')
+    for hour in hours:
+        inside = [bar for bar in fives if hour[0] <= bar[0] < hour[0] + 3600]
+        assert hour[2] == max(bar[2] for bar in inside) and hour[4] == inside[-1][4]
+    print(f"✅ {resampler.count('BTCUSDT', '1m')} velas de 1m → "
+          + ', '.join(f"{tf}: {resampler.count('BTCUSDT', tf)}" for tf in resampler.timeframes))
+
+def test_incremental_close_and_gaps():
+    """La vela se cierra con su último minuto; con hueco, al llegar el siguiente bucket"""
+    print("\n2️⃣ Test: cierre incremental, huecos y duplicados...")
+    resampler = BarResampler(timeframes=('1h',))
+    closed = []
+    resampler.subscribe('1h', lambda symbol, tf, bar: closed.append(bar[0]))
+
+    for bar in random_walk(60, START):
+        resampler.push('ETHUSDT', *bar)
+    assert closed == [START]  # cerrada en el minuto 59, sin esperar al siguiente
+
+    for bar in random_walk(30, START + 3600):  # 01:00-01:29 y hueco hasta 02:00
+        resampler.push('ETHUSDT', *bar)
+    assert closed == [START]
+    resampler.push('ETHUSDT', *random_walk(1, START + 7200)[0])
+    assert closed == [START, START + 3600]
+
+    assert not resampler.push('ETHUSDT', *random_walk(1, START + 7200)[0])  # duplicada
+    assert not resampler.push('ETHUSDT', *random_walk(1, START)[0])  # atrasada
+    assert resampler.get_stats()['stale_dropped'] == 2
+    print(f"✅ {len(closed)} cierres de 1h notificados")
+
+def test_rest_sync_feeds_selector_and_filter():
+    """Un fetch de 1m por símbolo alimenta selector (1h) y filtro de mercado (ATR/EMA 1m)"""
+    print("\n3️⃣ Test: sincronización REST y consumidores...")
+    clock = {'now': START + 26 * 3600 + 30}
+    exchange = MockExchange(seed=2, time_fn=lambda: clock['now'])
+    rest = BinanceRestClient(base_url='http://mock', api_key='k', api_secret='s', session=exchange.session())
+    resampler = BarResampler(base_minutes=1560, time_fn=lambda: clock['now'])
+
+    assert resampler.sync(rest, ['BTCUSDT']) == 1560
+    assert resampler.fetches == 2  # backfill paginado (1000 + 560)
+    clock['now'] += 5 * 60
+    assert resampler.sync(rest, ['BTCUSDT']) == 5 and resampler.fetches == 3
+
+    selector = AutoPairSelector(config)
+    selector.set_bar_source(resampler)
+    df = selector.get_market_data('BTCUSDT', '1h', 24)
+    assert len(df) == 24 and list(df.columns) == ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+    assert df['timestamp'].iloc[-1] == pd.Timestamp(START + 25 * 3600, unit='s')
+
+    market_filter = MarketFilter()
+    market_filter.bar_source = resampler
+    atr_pct, ema = market_filter.indicators_from_bars('BTCUSDT')
+    last_close = resampler.get_bars('BTCUSDT', '1m', 1)[0][4]
+    assert 0 < atr_pct < 5 and abs(ema / last_close - 1) < 0.05
+    assert market_filter.indicators_from_bars('SOLUSDT') is None  # sin historia: simulado
+    print(f"✅ {resampler.fetches} peticiones; ATR 1m {atr_pct:.3f}%, EMA50 {ema:.2f}")
+
+def test_backfill_starts_on_timeframe_boundary():
+    """Backfill a mitad de bucket: se alinea al 4h y la primera vela derivada es completa"""
+    print("\n4️⃣ Test: backfill alineado a la frontera del timeframe mayor...")
+    clock = {'now': START + 26 * 3600 + 7 * 60 + 30}  # base_minutes atrás cae en 00:07
+    exchange = MockExchange(seed=2, time_fn=lambda: clock['now'])
+    rest = BinanceRestClient(base_url='http://mock', api_key='k', api_secret='s', session=exchange.session())
+    resampler = BarResampler(base_minutes=1560, time_fn=lambda: clock['now'])
+    pushed = []
+    push_kline = resampler.push_kline
+    resampler.push_kline = lambda symbol, kline: pushed.append(kline) or push_kline(symbol, kline)
+
+    assert resampler.sync(rest, ['BTCUSDT']) == 1567  # 00:00 en lugar de 00:07
+    assert int(pushed[0][0]) // 1000 == START
+    for tf, seconds in (('5m', 300), ('15m', 900), ('1h', 3600), ('4h', 14400)):
+        inside = [k for k in pushed if int(k[0]) // 1000 < START + seconds]
+        expected = (START, float(inside[0][1]), max(float(k[2]) for k in inside),
+                    min(float(k[3]) for k in inside), float(inside[-1][4]), sum(float(k[7]) for k in inside))
+        first = resampler.get_bars('BTCUSDT', tf)[0]
+        assert len(inside) == seconds // 60, tf
+        assert first[:5] == expected[:5] and abs(first[5] - expected[5]) < 1e-6 * expected[5], tf
+    print(f"✅ {len(pushed)} velas de 1m desde 00:00; primeras velas derivadas completas")
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS BAR RESAMPLER")
+    print("=" * 50)
+    test_views_match_reference_resample()
+    test_incremental_close_and_gaps()
+    test_rest_sync_feeds_selector_and_filter()
+    test_backfill_starts_on_timeframe_boundary()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
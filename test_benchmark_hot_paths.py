@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST BENCHMARK HOT PATHS - FASE 1.6
+Script para probar la medición y la comparación contra baseline de los benchmarks
+"""
+
+from benchmark_hot_paths import measure, compare_results, run_suite
+
+def test_measure_calibrates_iterations():
+    """Operaciones rápidas se repiten hasta llenar min_time"""
+    print("\n1️⃣ Test: calibración de iteraciones...")
+    result = measure(lambda: sum(range(10)), repeat=3, min_time=0.01)
+    assert result['iterations'] > 1 and result['repeats'] == 3
+    assert 0 < result['min_us'] <= result['median_us']
+    print(f"✅ {result['iterations']} iteraciones, mediana {result['median_us']:.3f} µs")
+
+def test_compare_flags_regressions_over_threshold():
+    """Solo se marca regresión por encima del umbral"""
+    print("\n2️⃣ Test: comparación contra baseline...")
+    baseline = {'results': {'a': {'median_us': 10.0}, 'b': {'median_us': 10.0}, 'gone': {'median_us': 1.0}}}
+    current = {'results': {'a': {'median_us': 11.5}, 'b': {'median_us': 12.5}}}
+    rows = {row['name']: row for row in compare_results(baseline, current, threshold=0.20)}
+    assert set(rows) == {'a', 'b'}
+    assert not rows['a']['regression'] and rows['b']['regression']
+    print(f"✅ b x{rows['b']['ratio']:.2f} marcado como regresión")
+
+def test_suite_runs_filtered_benchmark():
+    """La suite real se puede ejecutar filtrada"""
+    print("\n3️⃣ Test: ejecución filtrada...")
+    results = run_suite('safety.compute_trade_targets', repeat=1, min_time=0.001)
+    assert list(results['results']) == ['safety.compute_trade_targets']
+    print("✅ Suite filtrada ejecutada")
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS BENCHMARK HOT PATHS")
+    print("=" * 50)
+    test_measure_calibrates_iterations()
+    test_compare_flags_regressions_over_threshold()
+    test_suite_runs_filtered_benchmark()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST CIRCUIT BREAKER - FASE 1.6
+Script para probar los circuit breakers por dependencia: transiciones
+closed/open/half-open, apertura por tasa de fallo en ventana, Sheets y Telegram
+omitidos sin coste con el circuito abierto, errores locales de Sheets fuera del
+circuito y cliente REST ante un exchange caído
+"""
+
+import os
+import logging
+
+import minimal_working_bot
+from binance_rest import BinanceRestClient
+from mock_exchange import MockExchange
+from circuit_breaker import CircuitBreaker, STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+START = 1_767_225_600.0  # 2026-01-01 00:00 UTC
+
+def test_state_transitions():
+    """Fallos seguidos abren; vencida la pausa pasa una sola prueba que cierra o reabre"""
+    print("\n1️⃣ Test: transiciones closed/open/half-open...")
+    clock = {'now': START}
+    breaker = CircuitBreaker('sheets', consecutive_failures=2, open_seconds=900, time_fn=lambda: clock['now'])
+    assert breaker.allow()
+    breaker.record_failure('timeout')
+    assert breaker.get_state() == STATE_CLOSED and breaker.allow()
+    breaker.record_failure('timeout')
+    assert breaker.get_state() == STATE_OPEN
+    assert not any(breaker.allow() for _ in range(100))
+
+    clock['now'] += 900
+    assert breaker.get_state() == STATE_HALF_OPEN
+    assert breaker.allow() and not breaker.allow()  # una sola prueba en vuelo
+    breaker.record_failure('sigue caído')
+    assert breaker.get_state() == STATE_OPEN and not breaker.allow()
+
+    clock['now'] += 900
+    assert breaker.allow()
+    breaker.release()  # la prueba no llegó a salir: otra llamada puede probar
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.get_state() == STATE_CLOSED and breaker.allow()
+    stats = breaker.get_stats()
+    assert stats['opened'] == 2 and stats['skipped'] == 102 and stats['failures'] == 3
+    print(f"✅ Abierto {stats['opened']} veces, {stats['skipped']} llamadas omitidas")
+
+def test_failure_rate_window():
+    """Fallos intermitentes (nunca seguidos) abren por tasa en la ventana, no antes del mínimo"""
+    print("\n2️⃣ Test: tasa de fallo en ventana...")
+    breaker = CircuitBreaker('exchange', consecutive_failures=3, failure_rate_pct=50, window_size=20,
+                             min_calls=10, time_fn=lambda: START)
+    for i in range(9):
+        assert breaker.allow()
+        breaker.record_failure('5xx') if i % 2 == 0 else breaker.record_success()
+    assert breaker.get_state() == STATE_CLOSED  # 5/9 pero aún por debajo del mínimo de llamadas
+    breaker.record_success()
+    assert breaker.get_state() == STATE_CLOSED  # 5/10 con éxito: no se evalúa la tasa
+    breaker.record_failure('5xx')
+    assert breaker.get_state() == STATE_OPEN and abs(breaker.failure_ratio() - 6 / 11) < 1e-9
+
+    healthy = CircuitBreaker('sheets', consecutive_failures=3, failure_rate_pct=50, window_size=20, min_calls=10)
+    for i in range(200):
+        healthy.record_failure('error') if i % 4 == 0 else healthy.record_success()
+    assert healthy.get_state() == STATE_CLOSED  # 25% de fallos: se tolera
+    print(f"✅ Abierto con tasa {breaker.failure_ratio():.0%}; 25% de fallos no abre")
+
+class BrokenSheetsClient:
+    """Cliente gspread que siempre falla (Sheets caído)"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def open(self, name):
+        self.calls += 1
+        raise ConnectionError('Sheets no responde')
+
+def test_sheets_and_telegram_skipped_when_open():
+    """Con Sheets o Telegram caídos solo se pagan MAX_RETRY_ATTEMPTS fallos; después nada"""
+    print("\n3️⃣ Test: Sheets y Telegram omitidos con el circuito abierto...")
+    clock = {'now': START}
+    sheets = minimal_working_bot.GoogleSheetsLogger(
+        CircuitBreaker('sheets', consecutive_failures=2, open_seconds=900, time_fn=lambda: clock['now']))
+    sheets.sheets_enabled = True
+    sheets.client = BrokenSheetsClient()
+    for _ in range(50):
+        assert not sheets.log_telemetry({'win_rate': 50.0})
+        assert not sheets.log_trade({'symbol': 'BTCUSDT'})
+    assert sheets.client.calls == 2 and sheets.breaker.get_stats()['skipped'] == 98
+
+    bot = minimal_working_bot.ProfessionalTradingBot()
+    posts = []
+
+    def broken_post(url, data=None, timeout=None):
+        posts.append(url)
+        raise ConnectionError('api.telegram.org no responde')
+
+    original_post = minimal_working_bot.requests.post
+    saved_env = {key: os.environ.get(key) for key in ('TELEGRAM_BOT_TOKEN', 'TELEGRAM_CHAT_ID')}
+    os.environ.update({'TELEGRAM_BOT_TOKEN': 'token', 'TELEGRAM_CHAT_ID': 'chat'})
+    minimal_working_bot.requests.post = broken_post
+    try:
+        for _ in range(20):
+            bot.send_telegram_message('🚨 alerta')
+    finally:
+        minimal_working_bot.requests.post = original_post
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+    telegram = bot.circuit_breakers['telegram']
+    assert len(posts) == telegram.consecutive_threshold
+    assert telegram.get_state() == STATE_OPEN and telegram.get_stats()['skipped'] == 20 - len(posts)
+    assert 'telegram:open' in ' '.join(f"{n}:{s}" for n, s in
+                                       minimal_working_bot.get_breaker_states().items())
+    print(f"✅ Sheets: {sheets.client.calls} llamadas de 100; Telegram: {len(posts)} de 20")
+
+class FlakySession:
+    """Transporte hacia el mock que puede simular la caída de la red"""
+
+    def __init__(self, exchange: MockExchange):
+        self.inner = exchange.session()
+        self.headers = {}
+        self.down = False
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError('Connection refused')
+        return self.inner.request(method, url, **kwargs)
+
+def test_rest_client_with_exchange_down():
+    """Exchange caído: tras 5 fallos los GET se omiten sin red; las órdenes siguen saliendo"""
+    print("\n4️⃣ Test: cliente REST ante un exchange caído...")
+    clock = {'now': START}
+    session = FlakySession(MockExchange(seed=1))
+    breaker = CircuitBreaker('exchange', consecutive_failures=5, open_seconds=30, time_fn=lambda: clock['now'])
+    rest = BinanceRestClient(base_url='http://mock', api_key='k', api_secret='s', session=session, breaker=breaker)
+    klines = {'symbol': 'BTCUSDT', 'interval': '1m', 'limit': 5}
+
+    assert rest.request('GET', '/api/v3/klines', klines)['ok']
+    assert rest.request('GET', '/api/v3/order', {'symbol': 'BTCUSDT', 'orderId': 999}, signed=True)['status'] == 400
+    assert breaker.get_state() == STATE_CLOSED  # un 4xx no es una caída
+
+    session.down = True
+    results = [rest.request('GET', '/api/v3/klines', klines) for _ in range(100)]
+    assert session.calls == 2 + 5 and breaker.get_state() == STATE_OPEN
+    assert all(r['circuit_open'] and not r['ok'] for r in results[5:]) and rest.circuit_skipped == 95
+
+    order = rest.request('POST', '/api/v3/order', {'symbol': 'BTCUSDT', 'side': 'BUY', 'type': 'LIMIT_MAKER',
+                                                   'quantity': '0.001', 'price': '40000'}, signed=True)
+    assert session.calls == 8 and not order['circuit_open']  # la orden sale aunque falle
+
+    session.down = False
+    clock['now'] += 30
+    assert rest.request('GET', '/api/v3/klines', klines)['ok']  # prueba half-open
+    assert breaker.get_state() == STATE_CLOSED and rest.get_stats()['circuit_skipped'] == 95
+    print(f"✅ {session.calls} llamadas de red para 104 peticiones; circuito cerrado tras la prueba")
+
+class SheetsWorksheet:
+    """Hoja que acepta filas o pierde la conexión al escribir"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def append_row(self, row):
+        if self.client.down:
+            raise TimeoutError('Sheets: timeout escribiendo la fila')
+        self.client.rows.append(row)
+
+class SheetsClient:
+    """Cliente gspread sano que se puede dejar sin red"""
+
+    def __init__(self):
+        self.rows = []
+        self.down = False
+
+    def open(self, name):
+        return self
+
+    def worksheet(self, name):
+        return SheetsWorksheet(self)
+
+def test_local_sheets_errors_do_not_trip_breaker():
+    """Un timestamp inválido es un error local: no abre el circuito; un timeout sí cuenta"""
+    print("\n5️⃣ Test: errores locales de Sheets fuera del circuito...")
+    clock = {'now': START}
+    sheets = minimal_working_bot.GoogleSheetsLogger(
+        CircuitBreaker('sheets', consecutive_failures=2, open_seconds=900, time_fn=lambda: clock['now']))
+    sheets.sheets_enabled = True
+    sheets.client = SheetsClient()
+    for _ in range(10):
+        assert not sheets.log_trade({'symbol': 'BTCUSDT', 'timestamp': 'no-es-una-fecha'})
+        assert not sheets.log_telemetry({'timestamp': 'no-es-una-fecha'})
+    stats = sheets.breaker.get_stats()
+    assert stats['state'] == STATE_CLOSED and stats['failures'] == 0 and stats['calls'] == 0
+    assert sheets.log_trade({'symbol': 'BTCUSDT'}) and len(sheets.client.rows) == 1
+
+    sheets.client.down = True
+    assert not sheets.log_trade({'symbol': 'BTCUSDT'})
+    assert not sheets.log_telemetry({'win_rate': 50.0})
+    assert sheets.breaker.get_state() == STATE_OPEN
+
+    # La prueba half-open no se consume con un error local
+    clock['now'] += 900
+    sheets.client.down = False
+    assert not sheets.log_trade({'symbol': 'BTCUSDT', 'timestamp': 'no-es-una-fecha'})
+    assert sheets.breaker.get_state() == STATE_HALF_OPEN
+    assert sheets.log_trade({'symbol': 'BTCUSDT'}) and sheets.breaker.get_state() == STATE_CLOSED
+    print("✅ 20 errores locales sin fallos contados; circuito abierto solo por el timeout")
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS CIRCUIT BREAKER")
+    print("=" * 50)
+    test_state_transitions()
+    test_failure_rate_window()
+    test_sheets_and_telegram_skipped_when_open()
+    test_rest_client_with_exchange_down()
+    test_local_sheets_errors_do_not_trip_breaker()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST CYCLE TRACER - FASE 1.6
+Script para probar la traza por ciclo en formato Chrome trace-event: spans
+anidados con atributos, camino desactivado sin coste, rotación del fichero,
+traza completa de run_trading_cycle (filtros, loaders, sizing y sinks) y
+cycle_stage sin generadores cuando no hay traza
+"""
+
+import os
+import shutil
+import logging
+import tempfile
+
+from config_fase_1_6 import config
+from cycle_tracer import CycleTracer, NULL_SPAN, read_trace_events
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def spans(events, name=None):
+    return [e for e in events if e['ph'] == 'X' and (name is None or e['name'] == name)]
+
+def contains(parent, child) -> bool:
+    return parent['ts'] <= child['ts'] and child['ts'] + child['dur'] <= parent['ts'] + parent['dur'] + 0.2
+
+def test_nested_spans_and_attributes():
+    """Ciclo → etapa → subspan: anidados por tiempo, con symbol/outcome y error capturado"""
+    print("\n1️⃣ Test: spans anidados y atributos...")
+    directory = tempfile.mkdtemp(prefix='trace-')
+    try:
+        clock = {'now': 100.0}
+        tracer = CycleTracer(enabled=True, path=os.path.join(directory, 'trace.json'), clock=lambda: clock['now'])
+        tracer.begin_cycle(1)
+        tracer.mark('signal')
+        tracer.add_span('spread', clock['now'], 0.001, 'filter', symbol='BTCUSDT', outcome='pass')
+        clock['now'] += 0.002
+        tracer.set(symbol='BTCUSDT', outcome='BUY')
+        tracer.mark('trade')
+        with tracer.span('sheets', cat='sink', symbol='BTCUSDT') as span:
+            clock['now'] += 0.010
+            span.set(outcome='ok')
+        try:
+            with tracer.span('telegram', cat='sink'):
+                clock['now'] += 0.003
+                raise TimeoutError('api.telegram.org')
+        except TimeoutError:
+            pass
+        assert tracer.end_cycle(outcome='executed') == 15.0
+        tracer.close()
+
+        events = read_trace_events(tracer.path)
+        assert {e['name'] for e in events if e['ph'] == 'M'} == {'process_name', 'thread_name'}
+        by_name = {e['name']: e for e in spans(events)}
+        assert set(by_name) == {'cycle', 'signal', 'spread', 'trade', 'sheets', 'telegram'}
+        assert by_name['cycle']['args'] == {'cycle': 1, 'outcome': 'executed'} and by_name['cycle']['dur'] == 15000
+        assert by_name['signal']['args'] == {'symbol': 'BTCUSDT', 'outcome': 'BUY'}
+        assert by_name['sheets']['args'] == {'symbol': 'BTCUSDT', 'outcome': 'ok'} and by_name['sheets']['cat'] == 'sink'
+        assert by_name['telegram']['args']['outcome'] == 'error' and 'TimeoutError' in by_name['telegram']['args']['error']
+        assert contains(by_name['cycle'], by_name['trade']) and contains(by_name['trade'], by_name['sheets'])
+        assert contains(by_name['signal'], by_name['spread']) and not contains(by_name['signal'], by_name['sheets'])
+        assert spans(events)[0]['name'] == 'cycle'  # el ciclo abre el bloque del visor
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print(f"✅ {len(spans(events))} spans anidados; error de Telegram registrado en su span")
+
+def test_disabled_path_and_slow_cycle_filter():
+    """Desactivado: span nulo compartido y ningún fichero; TRACE_MIN_CYCLE_MS descarta ciclos rápidos"""
+    print("\n2️⃣ Test: camino desactivado y filtro de ciclos lentos...")
+    directory = tempfile.mkdtemp(prefix='trace-')
+    try:
+        disabled = CycleTracer(enabled=False, path=os.path.join(directory, 'off.json'))
+        disabled.begin_cycle(1)
+        disabled.mark('signal')
+        assert disabled.span('sheets', symbol='BTCUSDT') is NULL_SPAN
+        with disabled.span('sheets') as span:
+            span.set(outcome='ok')
+        assert disabled.end_cycle(outcome='executed') is None and disabled.events == []
+        assert not os.path.exists(disabled.path)
+
+        clock = {'now': 0.0}
+        tracer = CycleTracer(enabled=True, path=os.path.join(directory, 'slow.json'), min_cycle_ms=50,
+                             clock=lambda: clock['now'])
+        assert tracer.span('fuera-de-ciclo') is NULL_SPAN
+        for cycle, duration in enumerate([0.010, 0.080, 0.020, 0.200], start=1):
+            tracer.begin_cycle(cycle)
+            tracer.mark('trade')
+            clock['now'] += duration
+            tracer.end_cycle()
+        tracer.close()
+        cycles = [e['args']['cycle'] for e in spans(read_trace_events(tracer.path), 'cycle')]
+        assert cycles == [2, 4] and tracer.get_stats()['cycles_skipped'] == 2
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print(f"✅ Desactivado sin escritura; solo ciclos lentos guardados {cycles}")
+
+def test_rotation():
+    """Fichero rotado por tamaño: cada parte es una traza válida y se guardan backup_count copias"""
+    print("\n3️⃣ Test: rotación del fichero de traza...")
+    directory = tempfile.mkdtemp(prefix='trace-')
+    try:
+        path = os.path.join(directory, 'trace.json')
+        tracer = CycleTracer(enabled=True, path=path, max_bytes=4096, backup_count=2)
+        for cycle in range(200):
+            tracer.begin_cycle(cycle)
+            for stage in ('bars', 'signal', 'trade'):
+                tracer.mark(stage)
+            tracer.end_cycle(outcome='no_signal')
+        tracer.close()
+        files = sorted(os.listdir(directory))
+        assert files == ['trace.json', 'trace.json.1', 'trace.json.2'] and tracer.rotations > 2
+        for name in files:
+            events = read_trace_events(os.path.join(directory, name))
+            assert events[0]['ph'] == 'M' and len(spans(events, 'cycle')) > 0
+        last = spans(read_trace_events(path), 'cycle')[-1]['args']['cycle']
+        assert last == 199
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print(f"✅ {tracer.rotations} rotaciones, {len(files)} ficheros válidos")
+
+def test_bot_cycle_trace():
+    """Bot con TRACE_ENABLED: un span por ciclo con etapas, filtros por símbolo, loaders, sizing y sinks"""
+    print("\n4️⃣ Test: traza de run_trading_cycle...")
+    from minimal_working_bot import ProfessionalTradingBot
+
+    directory = tempfile.mkdtemp(prefix='trace-')
+    saved = (config.TRACE_ENABLED, config.TRACE_FILE)
+    config.TRACE_ENABLED, config.TRACE_FILE = True, os.path.join(directory, 'cycle_trace.json')
+    try:
+        bot = ProfessionalTradingBot()
+        for sink in ('log_trade', 'log_telemetry'):
+            setattr(bot.sheets_logger, sink, lambda *args, **kwargs: True)
+        bot.local_logger.log_operation = lambda trade_data: True
+        bot.send_telegram_message = lambda message: None
+        for _ in range(40):
+            bot.safety_manager.last_trade_time = None
+            bot.run_trading_cycle()
+        bot.cycle_tracer.close()
+    finally:
+        config.TRACE_ENABLED, config.TRACE_FILE = saved
+    try:
+        events = read_trace_events(os.path.join(directory, 'cycle_trace.json'))
+        cycles = spans(events, 'cycle')
+        assert len(cycles) == 40 and [c['args']['cycle'] for c in cycles] == list(range(1, 41))
+        outcomes = {c['args']['outcome'] for c in cycles}
+        assert outcomes <= {'executed', 'rejected', 'no_signal'} and 'executed' in outcomes, outcomes
+
+        stages = {e['name'] for e in spans(events) if e['cat'] == 'stage'}
+        assert {'bars', 'rebalance', 'signal', 'trade'} <= stages, stages
+        filters = [e for e in spans(events) if e['cat'] == 'filter']
+        assert filters and all(e['args']['symbol'] and e['args']['outcome'] for e in filters)
+        assert {e['name'] for e in filters} == {stage.name for stage in bot.entry_pipeline.stages}
+        loaders = {e['name'] for e in spans(events) if e['cat'] == 'loader'}
+        assert 'targets' in loaders, loaders
+        assert spans(events, 'sizing') and all(e['args']['outcome'] for e in spans(events, 'sizing'))
+        sheets = spans(events, 'sheets')
+        assert sheets and all(e['args'] == {'symbol': e['args']['symbol'], 'outcome': 'ok'} for e in sheets)
+        assert len(spans(events, 'local_log')) == len(sheets)
+
+        executed = next(c for c in cycles if c['args']['outcome'] == 'executed')
+        inside = [e for e in spans(events) if e is not executed and contains(executed, e)]
+        assert {'signal', 'trade', 'sizing', 'sheets'} <= {e['name'] for e in inside}
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print(f"✅ {len(cycles)} ciclos, {len(spans(events))} spans ({len(filters)} de filtros, "
+          f"{len(sheets)} escrituras a Sheets)")
+
+def test_cycle_stage_fast_path():
+    """Sin traza ni vigilante: NULL_SPAN; con vigilante: etiqueta de subetapa sin generador"""
+    print("\n5️⃣ Test: cycle_stage sin traza...")
+    import cycle_tracer
+    import cycle_watchdog
+    from cycle_tracer import WatchdogSpan, cycle_stage
+
+    saved = (cycle_tracer.cycle_tracer, cycle_watchdog.cycle_watchdog)
+    watchdog = cycle_watchdog.CycleWatchdog(check_interval_sec=0.05)
+    try:
+        cycle_tracer.cycle_tracer = CycleTracer(enabled=False)
+        cycle_watchdog.cycle_watchdog = watchdog
+        assert cycle_stage('sheets', symbol='BTCUSDT') is NULL_SPAN  # vigilante parado: nadie lee la etiqueta
+
+        watchdog.start()
+        watchdog.begin_cycle(1)
+        watchdog.mark('trade')
+        stage = cycle_stage('sheets', symbol='BTCUSDT')
+        assert isinstance(stage, WatchdogSpan)
+        with stage as span:
+            span.set(outcome='ok')
+            assert watchdog.current_stage() == 'trade/sheets'
+        assert watchdog.current_stage() == 'trade'
+
+        cycle_tracer.cycle_tracer = CycleTracer(enabled=True, path=os.path.join(tempfile.mkdtemp(prefix='trace-'),
+                                                                                'on.json'))
+        cycle_tracer.cycle_tracer.begin_cycle(1)
+        with cycle_stage('sheets', symbol='BTCUSDT') as span:
+            assert span is not NULL_SPAN and watchdog.current_stage() == 'trade/sheets'
+        cycle_tracer.cycle_tracer.close()
+        shutil.rmtree(os.path.dirname(cycle_tracer.cycle_tracer.path), ignore_errors=True)
+    finally:
+        watchdog.stop()
+        cycle_tracer.cycle_tracer, cycle_watchdog.cycle_watchdog = saved
+    print("✅ NULL_SPAN sin traza ni vigilante; etiqueta directa con vigilante; span con traza")
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS CYCLE TRACER")
+    print("=" * 50)
+    test_nested_spans_and_attributes()
+    test_disabled_path_and_slow_cycle_filter()
+    test_rotation()
+    test_bot_cycle_trace()
+    test_cycle_stage_fast_path()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST CYCLE WATCHDOG - FASE 1.6
+Script para probar el watchdog del ciclo: overruns atribuidos a su etapa,
+detección de un ciclo colgado con volcado de pilas, reinicio controlado con
+salida forzada tras la gracia, latido del bot en run_trading_cycle, esperas de
+órdenes acotadas fuera del umbral de bloqueo y posiciones abiertas conservadas en un reinicio
+"""
+
+import os
+import time
+import shutil
+import logging
+import tempfile
+
+from binance_rest import BinanceRestClient
+from cycle_watchdog import CycleWatchdog, cycle_stage, WATCHDOG_RESTART_EXIT_CODE
+from mock_exchange import MockExchange
+from order_gateway import OrderGateway
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+STAGES = {'daily_summary', 'bars', 'rebalance', 'rotate', 'signal', 'position_ticks', 'trade', 'telemetry'}
+
+def test_overrun_blames_slowest_stage():
+    """Ciclo fuera de presupuesto: se registra con la etapa que más tardó"""
+    print("\n1️⃣ Test: overruns por etapa...")
+    clock = {'now': 0.0}
+    watchdog = CycleWatchdog(budget_sec=10, stall_sec=60, time_fn=lambda: clock['now'])
+    for cycle, (bars_sec, trade_sec) in enumerate([(1, 2), (2, 12), (9, 3)], start=1):
+        watchdog.begin_cycle(cycle)
+        watchdog.mark('bars')
+        clock['now'] += bars_sec
+        watchdog.mark('trade')
+        clock['now'] += trade_sec
+        watchdog.end_cycle()
+    stats = watchdog.get_stats()
+    assert stats['cycles'] == 3 and stats['overruns'] == 2
+    assert stats['overruns_by_stage'] == {'trade': 1, 'bars': 1}
+    assert [o['cycle'] for o in watchdog.recent_overruns] == [2, 3]
+    assert watchdog.last_duration_sec == 12 and stats['budget_usage_pct'] == 140.0
+    assert watchdog.end_cycle() == 0.0 and watchdog.cycles == 3  # sin ciclo abierto no cuenta
+    print(f"✅ Overruns {stats['overruns_by_stage']}, p95 al {stats['budget_usage_pct']:.0f}% del presupuesto")
+
+def test_stall_dumps_stacks_and_restarts():
+    """Un ciclo colgado en Sheets: pilas volcadas, reinicio pedido y salida forzada tras la gracia"""
+    print("\n2️⃣ Test: bloqueo, pilas y reinicio controlado...")
+    output_dir = tempfile.mkdtemp(prefix='watchdog-')
+    restarts, exits = [], []
+    watchdog = CycleWatchdog(budget_sec=0.05, stall_sec=0.2, restart_on_stall=True, restart_grace_sec=0.3,
+                             check_interval_sec=0.02, output_dir=output_dir,
+                             on_restart=lambda: restarts.append(time.perf_counter()), exit_fn=exits.append)
+
+    def hung_sheets_call():
+        deadline = time.perf_counter() + 5
+        while not exits and time.perf_counter() < deadline:  # colgado hasta la salida forzada
+            time.sleep(0.01)
+
+    try:
+        watchdog.start()
+        started = time.perf_counter()
+        watchdog.begin_cycle(7)
+        watchdog.mark('trade')
+        with watchdog.stage('sheets'):
+            hung_sheets_call()
+        watchdog.end_cycle()
+        watchdog.stop()
+
+        assert watchdog.stalls == 1 and watchdog.stalls_by_stage == {'trade/sheets': 1}
+        assert restarts and restarts[0] - started >= 0.2 and watchdog.restart_requested
+        assert exits == [WATCHDOG_RESTART_EXIT_CODE]
+        with open(watchdog.last_stall_file) as f:
+            dump = f.read()
+        assert 'ciclo 7 bloqueado' in dump and 'trade/sheets' in dump
+        assert 'hung_sheets_call' in dump and 'cycle-watchdog' in dump
+        assert watchdog.get_stats()['overruns_by_stage'] == {'trade': 1}
+    finally:
+        watchdog.stop()
+        shutil.rmtree(output_dir, ignore_errors=True)
+    print(f"✅ Bloqueo en trade/sheets detectado; reinicio a {(restarts[0] - started) * 1000:.0f}ms, "
+          f"salida {exits[0]}")
+
+def test_bot_cycle_heartbeat():
+    """El bot late en cada ciclo (también sin señal) y atribuye sus overruns a etapas conocidas"""
+    print("\n3️⃣ Test: latido del bot en run_trading_cycle...")
+    from minimal_working_bot import ProfessionalTradingBot, shutdown_state
+
+    bot = ProfessionalTradingBot()
+    for sink in ('log_trade', 'log_telemetry'):
+        setattr(bot.sheets_logger, sink, lambda *args, **kwargs: True)
+    bot.local_logger.log_operation = lambda trade_data: True
+    bot.send_telegram_message = lambda message: None
+    watchdog = bot.cycle_watchdog
+    watchdog.budget_sec = 0.0  # todos los ciclos fuera de presupuesto: se ve qué etapa pesa
+
+    with cycle_stage('fuera-de-ciclo'):
+        pass
+    for _ in range(30):
+        bot.run_trading_cycle()
+    stats = watchdog.get_stats()
+    assert stats['cycles'] == 30 and stats['overruns'] == 30 and stats['current_stage'] is None
+    assert set(stats['overruns_by_stage']) <= STAGES, stats['overruns_by_stage']
+    assert stats['stalls'] == 0 and not shutdown_state["stop"]
+
+    bot.request_restart()
+    assert shutdown_state["stop"] and not bot.running
+    shutdown_state["stop"] = False
+    print(f"✅ {stats['cycles']} ciclos, p95 {stats['p95_duration_sec'] * 1000:.1f}ms, "
+          f"etapas {stats['overruns_by_stage']}")
+
+def test_order_wait_extends_stall_threshold():
+    """Entrada esperando fill hasta su cota: no es bloqueo; pasada la cota sí"""
+    print("\n4️⃣ Test: esperas de órdenes acotadas...")
+    clock = {'now': 0.0}
+    output_dir = tempfile.mkdtemp(prefix='watchdog-')
+    watchdog = CycleWatchdog(budget_sec=15, stall_sec=120, output_dir=output_dir, time_fn=lambda: clock['now'])
+    gateway = OrderGateway(BinanceRestClient(base_url='http://mock', api_key='k', api_secret='s',
+                                             session=MockExchange(seed=1).session(), timeout=10.0),
+                           retry_order=2)
+    bound = gateway.max_wait_sec(30.0)
+    assert bound >= 3 * 30.0  # ORDER_FILL_TIMEOUT_SEC * (RETRY_ORDER + 1) y más
+
+    watchdog.begin_cycle(1)
+    watchdog.mark('trade')
+    with watchdog.bounded_wait('order_wait', bound):
+        clock['now'] += 115
+        assert not watchdog.check()
+        clock['now'] += bound - 5  # ciclo más largo que CYCLE_STALL_SEC, dentro de la cota
+        assert not watchdog.check() and watchdog.get_stats()['stall_allowance_sec'] == bound
+    clock['now'] += 4  # después de la espera el margen sigue valiendo en este ciclo
+    assert not watchdog.check()
+    watchdog.mark('telemetry')
+    clock['now'] += 10  # colgado en Sheets tras la entrada
+    assert watchdog.check() and watchdog.stalls_by_stage == {'telemetry': 1}
+    watchdog.end_cycle()
+
+    watchdog.begin_cycle(2)  # el margen es por ciclo
+    clock['now'] += 121
+    assert watchdog.check() and watchdog.stalls == 2
+    shutil.rmtree(output_dir, ignore_errors=True)
+    print(f"✅ Cota de espera {bound:.0f}s sumada al umbral de 120s solo en su ciclo")
+
+def test_restart_keeps_open_positions():
+    """Reinicio del watchdog: posiciones a disco antes de parar; el nuevo proceso las recupera"""
+    print("\n5️⃣ Test: posiciones abiertas a través de un reinicio...")
+    from minimal_working_bot import ProfessionalTradingBot, shutdown_state
+
+    data_dir = tempfile.mkdtemp(prefix='restart-')
+    try:
+        bot = ProfessionalTradingBot()
+        bot.local_logger.data_dir = data_dir
+        long_pos = bot.position_book.open_position('SOLUSDT', 'BUY', 100.0, 2.0, tp_price=102.0, sl_price=99.0,
+                                                   trailing_activation=101.0, trailing_step=0.5,
+                                                   context={'symbol': 'SOLUSDT', 'size': 200.0})
+        bot.position_book.on_tick('SOLUSDT', 101.5)  # trailing activo: stop arrastrado a 101.0
+        assert long_pos['trailing_active'] and long_pos['sl_price'] == 101.0
+        bot.position_book.open_position('ETHUSDT', 'SELL', 2800.0, 0.1, tp_price=2750.0, sl_price=2830.0)
+
+        bot.request_restart()
+        assert shutdown_state["stop"] and os.path.exists(bot.positions_file())
+        shutdown_state["stop"] = False
+
+        # Proceso nuevo (simulado): recupera ambas con sus triggers
+        restarted = ProfessionalTradingBot()
+        restarted.local_logger.data_dir = data_dir
+        kept = restarted.restore_open_positions()
+        assert sorted(p['symbol'] for p in kept) == ['ETHUSDT', 'SOLUSDT']
+        assert not os.path.exists(restarted.positions_file())
+        sol = restarted.position_book.get_positions('SOLUSDT')[0]
+        assert sol['sl_price'] == 101.0 and sol['trailing_active'] and sol['context']['size'] == 200.0
+        assert restarted.position_book.on_tick('SOLUSDT', 100.9)[0]['exit_reason'] == 'TRAILING_STOP'
+        assert restarted.position_book.on_tick('ETHUSDT', 2745.0)[0]['exit_reason'] == 'TP'
+
+        # En real se reconcilia con el saldo: la salida de SOL se llenó durante el reinicio
+        restarted.position_book.save(restarted.positions_file())
+        live = ProfessionalTradingBot()
+        live.local_logger.data_dir = data_dir
+        live.account_state.load_snapshot({'balances': [{'asset': 'USDT', 'free': '1000', 'locked': '0'},
+                                                       {'asset': 'SOL', 'free': '0.01', 'locked': '0'}]})
+        live.order_gateway = OrderGateway(BinanceRestClient(base_url='http://mock', api_key='k', api_secret='s',
+                                                            session=MockExchange(seed=1).session()))
+        kept = live.restore_open_positions()
+        assert [p['symbol'] for p in kept] == ['ETHUSDT'] and live.position_book.open_symbols() == ['ETHUSDT']
+    finally:
+        shutdown_state["stop"] = False
+        shutil.rmtree(data_dir, ignore_errors=True)
+    print("✅ 2 posiciones guardadas y recuperadas; SOL descartada al no quedar saldo en real")
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS CYCLE WATCHDOG")
+    print("=" * 50)
+    test_overrun_blames_slowest_stage()
+    test_stall_dumps_stacks_and_restarts()
+    test_bot_cycle_heartbeat()
+    test_order_wait_extends_stall_threshold()
+    test_restart_keeps_open_positions()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST DRAWDOWN TRACKER - FASE 1.6
+Script para probar el tracker de drawdown multi-horizonte: deques monótonos,
+límites de calendario en TIMEZONE y bloqueo por drawdown semanal
+"""
+
+import logging
+from datetime import datetime
+
+from drawdown_tracker import DrawdownTracker, period_bounds, resolve_timezone
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+MADRID = resolve_timezone('Europe/Madrid')
+
+def at(*args) -> float:
+    return datetime(*args, tzinfo=MADRID).timestamp()
+
+def test_calendar_boundaries_in_timezone():
+    """Día y semana empiezan a medianoche local, también en cambio de horario"""
+    print("\n1️⃣ Test: límites de calendario...")
+    start, end = period_bounds(at(2024, 3, 31, 12, 0), 'day', MADRID)  # día de 23h (DST)
+    assert start == at(2024, 3, 31) and end - start == 23 * 3600
+    start, end = period_bounds(at(2024, 4, 4, 9, 30), 'week', MADRID)
+    assert start == at(2024, 4, 1) and end == at(2024, 4, 8)
+    print("✅ Día DST de 23h y semana lunes-lunes")
+
+def test_rolling_peaks_and_resets():
+    """Pico/valle por horizonte; el diario se reinicia y el semanal conserva su pico"""
+    print("\n2️⃣ Test: picos por horizonte...")
+    clock = {'now': at(2024, 4, 1, 10, 0)}
+    tracker = DrawdownTracker(100.0, horizons={'daily': ('day', None), 'weekly': ('week', None),
+                                               'session': (None, None), 'rolling_1h': (None, 3600)},
+                              time_fn=lambda: clock['now'])
+    for equity in (104.0, 101.0, 102.0):
+        clock['now'] += 600
+        tracker.update(equity)
+    assert tracker.drawdown('daily') == (104.0 - 102.0) / 104.0 * 100
+    assert tracker.windows['daily'].trough == 100.0
+
+    clock['now'] += 3 * 3600
+    tracker.update(99.0)
+    assert tracker.windows['rolling_1h'].peak == 99.0    # picos fuera de la ventana móvil
+
+    clock['now'] = at(2024, 4, 2, 0, 5)
+    assert tracker.update(98.0) == ['daily']
+    assert tracker.open_equity('daily') == 98.0 and tracker.drawdown('daily') == 0.0
+    assert tracker.windows['weekly'].peak == 104.0
+    assert abs(tracker.loss_from_open('daily')) < 1e-12
+    print(f"✅ DD semanal {tracker.drawdown('weekly'):.2f}% tras reinicio diario")
+
+def test_safety_manager_enforces_weekly_limit():
+    """SafetyManager bloquea al superar WEEKLY_MAX_DRAWDOWN_PCT"""
+    print("\n3️⃣ Test: límite semanal en SafetyManager...")
+    from minimal_working_bot import SafetyManager
+
+    safety = SafetyManager(initial_capital=100.0)
+    safety.daily_loss_limit = 1.0  # aislar el límite semanal
+    safety.weekly_drawdown_limit = 1.5
+    assert safety.check_safety_conditions(101.0)['can_trade']
+    status = safety.check_safety_conditions(99.4)
+    assert not status['can_trade'] and 'semanal' in status['reason']
+    print(f"✅ {status['reason']}")
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS DRAWDOWN TRACKER")
+    print("=" * 50)
+    test_calendar_boundaries_in_timezone()
+    test_rolling_peaks_and_resets()
+    test_safety_manager_enforces_weekly_limit()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
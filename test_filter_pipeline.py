@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST FILTER PIPELINE - FASE 1.6
+Script para probar el pipeline de filtros: cortocircuito, reordenación
+por coste/selectividad y evaluación por lotes con carga perezosa
+"""
+
+import logging
+
+from filter_pipeline import FilterContext, FilterStage, FilterPipeline
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+class FakeClock:
+    """Reloj controlado: cada etapa avanza el coste que declara"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_reorders_cheap_selective_stages_first():
+    """Una etapa barata y muy selectiva acaba delante de una cara"""
+    print("\n1️⃣ Test: reordenación por coste/selectividad...")
+    clock = FakeClock()
+
+    def expensive(ctx):
+        clock.now += 0.010
+        return None
+
+    def cheap_selective(ctx):
+        clock.now += 0.0001
+        return 'BLOCKED' if ctx.get('blocked') else None
+
+    pipeline = FilterPipeline([FilterStage('expensive', expensive), FilterStage('cheap', cheap_selective)],
+                              reorder_every=8, clock=clock)
+    for i in range(64):
+        pipeline.evaluate(FilterContext('BTCUSDT', values={'blocked': i % 4 != 0}))
+
+    stats = pipeline.get_stats()
+    assert stats['order'] == ['cheap', 'expensive']
+    assert stats['stages']['expensive']['evaluations'] < 64
+    print(f"✅ Orden final: {' → '.join(stats['order'])}")
+
+def test_batch_loads_expensive_data_only_for_survivors():
+    """En lote, los datos caros solo se cargan para los pares que siguen vivos"""
+    print("\n2️⃣ Test: evaluación por lotes...")
+    loads = []
+
+    def load_depth(ctx):
+        loads.append(ctx.symbol)
+        return {'spread_bps': 1.0}
+
+    pipeline = FilterPipeline([
+        FilterStage('volume', lambda ctx: None if ctx.get('volume') > 100 else 'LOW_VOLUME'),
+        FilterStage('spread', lambda ctx: None if ctx.get('depth')['spread_bps'] < 2 else 'HIGH_SPREAD')
+    ], adaptive=False)
+
+    loaders = {'depth': load_depth}
+    contexts = {symbol: FilterContext(symbol, values={'volume': volume}, loaders=loaders)
+                for symbol, volume in (('BTCUSDT', 500), ('ETHUSDT', 50), ('SOLUSDT', 300))}
+    results = pipeline.evaluate_batch(contexts)
+
+    assert results['ETHUSDT']['reason'] == 'LOW_VOLUME' and results['ETHUSDT']['group'] == 'volume'
+    assert results['BTCUSDT']['passed'] and results['SOLUSDT']['passed']
+    assert sorted(loads) == ['BTCUSDT', 'SOLUSDT']
+    print(f"✅ Datos caros cargados solo para: {', '.join(sorted(loads))}")
+
+def test_safety_manager_pre_trade_filters_unchanged():
+    """La API pre_trade_filters mantiene su formato de resultado"""
+    print("\n3️⃣ Test: compatibilidad pre_trade_filters...")
+    from minimal_working_bot import SafetyManager
+
+    safety = SafetyManager()
+    market_data = {'price': 100.0, 'high': 100.5, 'low': 99.5, 'close': 100.0, 'best_ask': 100.005,
+                   'best_bid': 99.995, 'volume_usd': 10_000_000, 'ws_latency_ms': 100, 'rest_latency_ms': 5000}
+    result = safety.pre_trade_filters(market_data)
+
+    assert not result['passed'] and result['reason'] == 'HIGH_REST_LAT'
+    assert result['details']['range_bps'] == 100.0
+    print(f"✅ Rechazo {result['reason']} con detalles {sorted(result['details'])}")
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS FILTER PIPELINE")
+    print("=" * 50)
+    test_reorders_cheap_selective_stages_first()
+    test_batch_loads_expensive_data_only_for_survivors()
+    test_safety_manager_pre_trade_filters_unchanged()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
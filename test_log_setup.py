@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST LOG SETUP - FASE 1.6
+Script para probar el logging no bloqueante: limitación por punto de llamada,
+salida JSON a través de la cola y rotación con gzip
+"""
+
+import os
+import gzip
+import json
+import logging
+import tempfile
+
+from log_setup import CallSiteRateLimiter, setup_logging, stop_logging
+
+def make_record(lineno: int, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord('bot', level, '/bot.py', lineno, 'ciclo %d', (lineno,), None)
+
+def test_rate_limiter_per_call_site():
+    """Cada línea tiene su propio cupo; los avisos nunca se descartan"""
+    print("\n1️⃣ Test: limitación por punto de llamada...")
+    clock = {'now': 0.0}
+    limiter = CallSiteRateLimiter(burst=3, interval_sec=60, sample_every=5, time_fn=lambda: clock['now'])
+
+    passed = [limiter.filter(make_record(10)) for _ in range(12)]
+    assert passed.count(True) == 4          # 3 de cupo + 1 muestreado (5º fuera de cupo)
+    assert limiter.filter(make_record(20))  # otra línea, otro cupo
+    assert all(limiter.filter(make_record(10, logging.WARNING)) for _ in range(20))
+
+    clock['now'] = 61.0
+    record = make_record(10)
+    assert limiter.filter(record) and record.suppressed == 4
+    print(f"✅ Suprimidos: {limiter.get_stats()['suppressed']}")
+
+def test_json_queue_and_gzip_rotation():
+    """El listener escribe JSON y los ficheros rotados quedan comprimidos"""
+    print("\n2️⃣ Test: JSON por cola + rotación gzip...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bot.log')
+        setup_logging(level='INFO', log_file=path, json_format=True, max_bytes=2000, backup_count=2,
+                      console=False, rate_limit_burst=0)
+        logger = logging.getLogger('test_log_setup')
+        for i in range(60):
+            logger.info("📊 Señal %d: %s", i, 'BUY')
+        stop_logging()
+
+        rotated = sorted(name for name in os.listdir(tmp) if name.endswith('.gz'))
+        assert rotated == ['bot.log.1.gz', 'bot.log.2.gz']
+        with gzip.open(os.path.join(tmp, rotated[0]), 'rt', encoding='utf-8') as f:
+            first = json.loads(f.readline())
+        with open(path, encoding='utf-8') as f:
+            last = json.loads(f.read().splitlines()[-1])
+
+    assert first['level'] == 'INFO' and first['site'].startswith('test_log_setup:')
+    assert last['msg'] == '📊 Señal 59: BUY'
+    print(f"✅ Rotados: {', '.join(rotated)} | último: {last['msg']}")
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS LOG SETUP")
+    print("=" * 50)
+    test_rate_limiter_per_call_site()
+    test_json_queue_and_gzip_rotation()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST MARKET DATA BUS - FASE 1.6
+Script para probar el bus de mercado en memoria compartida: anillos y cursores,
+lecturas sin roturas con un escritor en otro proceso, feed sintético hacia
+selector y MarketFilter, feed REST contra el exchange mock y rondas opcionales
+de aggTrades con intervalo y prioridad de cribado
+"""
+
+import uuid
+import logging
+import multiprocessing
+import numpy as np
+
+from config_fase_1_6 import config
+from binance_rest import BinanceRestClient
+from mock_exchange import MockExchange
+from request_budget import PRIORITY_SCAN
+from pair_selector import AutoPairSelector
+from minimal_working_bot import MarketFilter
+from synthetic_market import SyntheticMarket
+from market_data_bus import (MarketDataBus, MarketDataConsumer, FeedHandler, RestFeedSource,
+                             SyntheticFeedSource)
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+START = 1_767_225_600  # 2026-01-01 00:00 UTC
+
+def bus_name() -> str:
+    return f"md-test-{uuid.uuid4().hex[:8]}"
+
+def test_rings_and_cursors():
+    """Anillos circulares: cursores por lector, sobrescritura y descarte de velas repetidas"""
+    print("\n1️⃣ Test: anillos, cursores y libro...")
+    bus = MarketDataBus.create(['BTCUSDT', 'ETHUSDT'], name=bus_name(), trade_capacity=8, bar_capacity=5)
+    try:
+        reader = MarketDataBus.attach(bus.name)
+        assert reader.symbols == ['BTCUSDT', 'ETHUSDT'] and reader.bar_capacity == 5
+        assert reader.read_book('BTCUSDT') is None
+
+        bus.write_book('BTCUSDT', START, 100.0, 100.1, 2.0, 3.0)
+        assert reader.read_book('BTCUSDT') == (START, 100.0, 100.1, 2.0, 3.0)
+
+        bars = [(START + i * 60, 1.0, 2.0, 0.5, 1.5, 10.0 + i) for i in range(4)]
+        assert bus.append_bars('ETHUSDT', bars) == 4
+        assert bus.append_bars('ETHUSDT', bars[2:]) == 0  # ya publicadas
+        rows, cursor = reader.read_bars('ETHUSDT')
+        assert cursor == 4 and rows[:, 0].tolist() == [bar[0] for bar in bars]
+
+        more = [(START + i * 60, 1.0, 2.0, 0.5, 1.5, 10.0 + i) for i in range(4, 10)]
+        bus.append_bars('ETHUSDT', more)
+        rows, cursor = reader.read_bars('ETHUSDT', cursor)
+        assert cursor == 10 and rows[:, 0].tolist() == [START + i * 60 for i in range(5, 10)]  # 4 perdida
+        assert reader.last_bar_time('ETHUSDT') == START + 9 * 60
+
+        bus.append_trades('BTCUSDT', [(START + i, 100.0 + i, 0.1, i % 2) for i in range(3)])
+        rows, cursor = reader.read_trades('BTCUSDT', 0, limit=2)
+        assert cursor == 3 and rows[:, 1].tolist() == [101.0, 102.0]
+        reader.close()
+    finally:
+        bus.close()
+    try:
+        MarketDataBus.attach(bus.name)
+        raise AssertionError("el segmento debería haberse destruido")
+    except FileNotFoundError:
+        pass
+    print("✅ Cursores, sobrescritura y cierre correctos")
+
+def writer_process(name, ready, stop, counts):
+    """Feed en otro proceso: libro y velas con invariantes comprobables por el lector"""
+    bus = MarketDataBus.create(['BTCUSDT'], name=name, trade_capacity=64, bar_capacity=64)
+    try:
+        ready.set()
+        i = 0
+        while not stop.is_set():
+            i += 1
+            bus.write_book('BTCUSDT', i, i, i + 1.0, 2.0 * i, 3.0 * i)
+            bus.append_bars('BTCUSDT', [(i * 60, i, i, i, i, i)])
+        counts.put(i)
+    finally:
+        bus.close()
+
+def test_cross_process_reads_never_torn():
+    """Un escritor a máxima velocidad en otro proceso: el lector nunca ve registros mezclados"""
+    print("\n2️⃣ Test: lecturas consistentes entre procesos (seqlock)...")
+    name = bus_name()
+    context = multiprocessing.get_context('spawn')
+    ready, stop, counts = context.Event(), context.Event(), context.Queue()
+    writer = context.Process(target=writer_process, args=(name, ready, stop, counts))
+    writer.start()
+    try:
+        assert ready.wait(60)
+        reader = MarketDataBus.attach(name)
+        books = bars = 0
+        cursor = 0
+        last_bar = 0
+        while books < 20000:
+            book = reader.read_book('BTCUSDT')
+            if book is not None:
+                ts, bid, ask, bid_qty, ask_qty = book
+                assert ask == bid + 1.0 and bid_qty == 2.0 * bid and ask_qty == 3.0 * bid and ts == bid
+                books += 1
+            rows, cursor = reader.read_bars('BTCUSDT', cursor)
+            for open_time, o, h, l, c, v in rows.tolist():
+                assert open_time == o * 60 == h * 60 == c * 60 == v * 60 and open_time > last_bar
+                last_bar = open_time
+                bars += 1
+        stats = (reader.read_retries, reader.torn_reads)
+        reader.close()
+    finally:
+        stop.set()
+    written = counts.get(timeout=60)
+    writer.join(30)
+    assert writer.exitcode == 0
+    print(f"✅ {books} libros y {bars} velas leídos sin roturas ({written} escrituras, reintentos {stats[0]})")
+
+def test_synthetic_feed_to_consumers():
+    """Feed sintético → consumidor: selector (1h) y MarketFilter (1m) leen del resampler local"""
+    print("\n3️⃣ Test: feed sintético hacia selector y filtro...")
+    clock = {'now': START + 30 * 3600 + 15}
+    bus = MarketDataBus.create(['BTCUSDT', 'ETHUSDT'], name=bus_name(), bar_capacity=1560)
+    try:
+        market = SyntheticMarket(seed=3, bar_seconds=60)
+        handler = FeedHandler(bus, SyntheticFeedSource(market, time_fn=lambda: clock['now']),
+                              time_fn=lambda: clock['now'])
+        assert handler.step() > 2 * 1560
+
+        consumer = MarketDataConsumer.attach(bus.name, base_minutes=1560, time_fn=lambda: clock['now'])
+        assert consumer.poll() == 2 * 1560
+        clock['now'] += 120
+        handler.step()
+        assert consumer.poll() == 4 and consumer.poll() == 0
+
+        selector = AutoPairSelector(config)
+        selector.set_bar_source(consumer.resampler)
+        df = selector.get_market_data('ETHUSDT', '1h', 24)
+        assert len(df) == 24
+        minute = {bar[0]: bar for bar in consumer.resampler.get_bars('ETHUSDT', '1m')}
+        assert df['close'].iloc[-1] == minute[START + 30 * 3600 - 60][4]  # la 1h cierra con su último 1m
+
+        market_filter = MarketFilter()
+        market_filter.bar_source = consumer.resampler
+        atr_pct, ema = market_filter.indicators_from_bars('BTCUSDT')
+        book = consumer.book('BTCUSDT', max_age_sec=5)
+        assert book['bid'] < book['ask'] and abs(ema / book['bid'] - 1) < 0.05 and atr_pct > 0
+        clock['now'] += 10
+        assert consumer.book('BTCUSDT', max_age_sec=5) is None  # feed parado
+
+        trades = consumer.new_trades('ETHUSDT')
+        assert len(trades) == bus.trade_capacity and np.all(np.diff(trades[:, 0]) > 0)
+        assert len(consumer.new_trades('ETHUSDT')) == 0
+        consumer.close()
+    finally:
+        bus.close()
+    print(f"✅ ATR 1m {atr_pct:.3f}%, libro {book['bid']:.2f}/{book['ask']:.2f}")
+
+def test_rest_feed_against_mock():
+    """Feed REST: bookTicker bulk + klines incrementales; sin aggTrades solo libro y velas"""
+    print("\n4️⃣ Test: feed REST contra el exchange mock...")
+    clock = {'now': START + 2 * 3600 + 30}
+    exchange = MockExchange(seed=4, time_fn=lambda: clock['now'])
+    rest = BinanceRestClient(base_url='http://mock', api_key='k', api_secret='s', session=exchange.session())
+    bus = MarketDataBus.create(['BTCUSDT', 'ETHUSDT'], name=bus_name(), bar_capacity=120)
+    try:
+        source = RestFeedSource(rest, base_minutes=120, time_fn=lambda: clock['now'])
+        handler = FeedHandler(bus, source, time_fn=lambda: clock['now'])
+        handler.step()
+        assert not source.trades_enabled
+        rows, cursor = bus.read_bars('BTCUSDT')
+        assert cursor == 120 and rows[-1, 0] == START + 2 * 3600 - 60
+        book = bus.read_book('ETHUSDT')
+        assert book[0] == clock['now'] and book[1] < book[2]
+
+        clock['now'] += 180
+        handler.step()
+        rows, cursor = bus.read_bars('BTCUSDT', cursor)
+        assert cursor == 123 and len(rows) == 3 and handler.errors == 0
+    finally:
+        bus.close()
+    print(f"✅ {handler.steps} pasos, {handler.updates} actualizaciones publicadas")
+
+def test_rest_trades_opt_in():
+    """aggTrades REST: desactivados por defecto; con intervalo, una ronda por intervalo y cortada si se aplaza"""
+    print("\n5️⃣ Test: rondas opcionales de aggTrades...")
+    clock = {'now': START + 2 * 3600 + 30}
+    exchange = MockExchange(seed=4, time_fn=lambda: clock['now'])
+
+    class TradeRest:
+        def __init__(self, rest):
+            self.rest = rest
+            self.calls = []
+            self.defer = False
+
+        def request(self, method, path, params=None, **kwargs):
+            if path != '/api/v3/aggTrades':
+                return self.rest.request(method, path, params, **kwargs)
+            self.calls.append((params['symbol'], kwargs.get('priority')))
+            if self.defer:
+                return {'ok': False, 'status': 0, 'data': None, 'deferred': True}
+            trade = {'a': len(self.calls), 'T': clock['now'] * 1000, 'p': '100.0', 'q': '0.1', 'm': False}
+            return {'ok': True, 'status': 200, 'data': [trade], 'deferred': False}
+
+    rest = TradeRest(BinanceRestClient(base_url='http://mock', api_key='k', api_secret='s', session=exchange.session()))
+    bus = MarketDataBus.create(['BTCUSDT', 'ETHUSDT'], name=bus_name(), bar_capacity=120)
+    try:
+        default = FeedHandler(bus, RestFeedSource(rest, base_minutes=120, time_fn=lambda: clock['now']),
+                              time_fn=lambda: clock['now'])
+        default.step()
+        assert not default.source.trades_enabled and rest.calls == []
+
+        source = RestFeedSource(rest, base_minutes=120, trades_interval_sec=60, time_fn=lambda: clock['now'])
+        handler = FeedHandler(bus, source, time_fn=lambda: clock['now'])
+        for _ in range(5):  # pasos de 1s: una sola ronda de trades
+            handler.step()
+            clock['now'] += 1
+        assert rest.calls == [('BTCUSDT', PRIORITY_SCAN), ('ETHUSDT', PRIORITY_SCAN)]
+        assert bus.read_trades('ETHUSDT')[1] == 1
+
+        rest.defer = True
+        clock['now'] += 60
+        handler.step()
+        assert len(rest.calls) == 3 and source.trades_deferred == 1  # sin peso: la ronda se corta
+    finally:
+        bus.close()
+    print(f"✅ {len(rest.calls)} peticiones de aggTrades en {handler.steps} pasos; aplazadas {source.trades_deferred}")
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS MARKET DATA BUS")
+    print("=" * 50)
+    test_rings_and_cursors()
+    test_cross_process_reads_never_torn()
+    test_synthetic_feed_to_consumers()
+    test_rest_feed_against_mock()
+    test_rest_trades_opt_in()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST MOCK EXCHANGE - FASE 1.6
+Script para probar el exchange local, la cola maker, los rate limits
+y los filtros de latencia sin depender de Binance testnet
+"""
+
+import logging
+
+from binance_rest import BinanceRestClient
+from order_gateway import OrderGateway, UserDataStream
+from mock_exchange import MockExchange, MockExchangeServer, LatencyModel
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def build_gateway(exchange):
+    stream = UserDataStream()
+    rest = BinanceRestClient(base_url='http://mock', api_key='k', api_secret='s', session=exchange.session())
+    gateway = OrderGateway(rest, maker_only=True, retry_order=1)
+    stream.subscribe(gateway.on_user_data)
+    stream.start(source=exchange)
+    return gateway
+
+def test_maker_queue_position_fill():
+    """La orden maker solo se llena cuando se consume la cola por delante"""
+    print("\n1️⃣ Test: posición en cola maker...")
+    exchange = MockExchange(seed=1, level_qty=5.0)
+    gateway = build_gateway(exchange)
+    bid = exchange.books['BTCUSDT']['bid']
+
+    order = gateway.submit_order('BTCUSDT', 'BUY', 1.0, bid, intent_key='q-1')
+    assert order['status'] == 'NEW'
+
+    exchange.trade('BTCUSDT', bid, 3.0, aggressor_side='SELL')
+    assert order['executed_qty'] == 0.0, "Aún hay 2.0 por delante en la cola"
+
+    exchange.trade('BTCUSDT', bid, 2.5, aggressor_side='SELL')
+    assert order['status'] == 'PARTIALLY_FILLED'
+
+    exchange.trade('BTCUSDT', bid, 1.0, aggressor_side='SELL')
+    assert order['status'] == 'FILLED'
+    assert abs(order['avg_price'] - bid) < 1e-9
+    print(f"✅ Fill tras consumir la cola: {order['executed_qty']} @ {order['avg_price']:.2f}")
+
+def test_post_only_rejected_when_crossing():
+    """LIMIT_MAKER que cruza el spread se rechaza"""
+    print("\n2️⃣ Test: rechazo post-only...")
+    exchange = MockExchange(seed=2)
+    gateway = build_gateway(exchange)
+    ask = exchange.books['ETHUSDT']['ask']
+
+    order = gateway.submit_order('ETHUSDT', 'BUY', 0.1, ask, intent_key='x-1')
+
+    assert order['status'] == 'REJECTED'
+    assert order['reject_reason'] == 'WOULD_TAKE'
+    print("✅ Orden que tomaría liquidez rechazada")
+
+def test_rate_limit_and_ban():
+    """Exceder el peso por minuto devuelve 429 y después 418"""
+    print("\n3️⃣ Test: rate limits...")
+    clock = {'now': 1_000_020.0}
+    exchange = MockExchange(seed=3, weight_limit_1m=10, ban_after_429=2, time_fn=lambda: clock['now'])
+    rest = BinanceRestClient(base_url='http://mock', session=exchange.session())
+
+    statuses = [rest.request('GET', '/api/v3/ticker/bookTicker', {'symbol': 'BTCUSDT'})['status'] for _ in range(8)]
+
+    assert statuses[:5] == [200] * 5
+    assert statuses[5:7] == [429, 429]
+    assert statuses[7] == 418
+    clock['now'] += 180
+    assert rest.request('GET', '/api/v3/ping')['status'] == 200
+    print(f"✅ Secuencia de estados: {statuses}")
+
+def test_latency_filters_deterministic():
+    """Los filtros de latencia producen el mismo resultado con la misma semilla"""
+    print("\n4️⃣ Test: carga determinista de filtros de latencia...")
+    from minimal_working_bot import SafetyManager
+
+    def run(seed):
+        exchange = MockExchange(seed=seed, spread_bps=0.5,
+                                rest_latency=LatencyModel('lognormal', median_ms=300, sigma=0.8, seed=seed),
+                                ws_latency=LatencyModel('lognormal', median_ms=400, sigma=0.9, seed=seed + 1))
+        safety = SafetyManager()
+        safety.logger.disabled = True
+        reasons = {}
+        for _ in range(2000):
+            result = safety.pre_trade_filters(exchange.market_snapshot('BTCUSDT'))
+            reasons[result['reason']] = reasons.get(result['reason'], 0) + 1
+        return reasons
+
+    first = run(7)
+    second = run(7)
+
+    assert first == second
+    assert first.get('HIGH_REST_LAT', 0) > 0 and first.get('HIGH_WS_LAT', 0) > 0
+    print(f"✅ Rechazos reproducibles: {first}")
+
+def test_localhost_server_signed_order():
+    """El servidor localhost acepta órdenes firmadas por el cliente REST"""
+    print("\n5️⃣ Test: servidor localhost...")
+    exchange = MockExchange(seed=4, api_secret='secret')
+    server = MockExchangeServer(exchange).start()
+    try:
+        rest = BinanceRestClient(base_url=server.base_url, api_key='key', api_secret='secret')
+        ticker = rest.request('GET', '/api/v3/ticker/bookTicker', {'symbol': 'SOLUSDT'})
+        assert ticker['ok'] and ticker['data']['symbol'] == 'SOLUSDT'
+
+        bid = float(ticker['data']['bidPrice'])
+        placed = rest.request('POST', '/api/v3/order', {'symbol': 'SOLUSDT', 'side': 'BUY', 'type': 'LIMIT_MAKER',
+                                                        'quantity': '1', 'price': f"{bid:.8f}"}, signed=True)
+        assert placed['ok'], placed
+        assert 'X-MBX-USED-WEIGHT-1M' in placed['headers']
+
+        bad = BinanceRestClient(base_url=server.base_url, api_key='key', api_secret='wrong')
+        rejected = bad.request('POST', '/api/v3/order', {'symbol': 'SOLUSDT', 'side': 'BUY', 'type': 'LIMIT_MAKER',
+                                                         'quantity': '1', 'price': f"{bid:.8f}"}, signed=True)
+        assert rejected['code'] == -1022
+        print(f"✅ Orden firmada aceptada en {server.base_url}")
+    finally:
+        server.stop()
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS MOCK EXCHANGE")
+    print("=" * 50)
+    test_maker_queue_position_fill()
+    test_post_only_rejected_when_crossing()
+    test_rate_limit_and_ban()
+    test_latency_filters_deterministic()
+    test_localhost_server_signed_order()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
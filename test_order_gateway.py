@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST ORDER GATEWAY - FASE 1.6
+Script para probar el gateway de órdenes maker-only sin conexión a Binance
+y los filtros de una entrada real alimentados solo con datos del exchange
+"""
+
+import logging
+import threading
+
+from bar_resampler import BarResampler
+from binance_rest import BinanceRestClient
+from config_fase_1_6 import config
+from filter_pipeline import FilterContext
+from mock_exchange import MockExchange
+from order_gateway import OrderGateway, UserDataStream
+from symbol_registry import SymbolRegistry, SymbolSpec
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+class FakeResponse:
+    """Respuesta HTTP mínima"""
+
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self.headers = {}
+        self._data = data
+
+    def json(self):
+        return self._data
+
+class FakeExchangeSession:
+    """Sesión falsa que acepta órdenes y publica fills por el stream"""
+
+    def __init__(self, stream, fill=True):
+        self.stream = stream
+        self.fill = fill
+        self.posts = []
+        self.next_id = 1
+
+    def request(self, method, url, params=None, headers=None, timeout=None):
+        params = params or {}
+        if method == 'POST' and url.endswith('/api/v3/order'):
+            self.posts.append(params)
+            order_id = self.next_id
+            self.next_id += 1
+            if self.fill:
+                threading.Timer(0.01, self._emit_fill, args=(params, order_id)).start()
+            return FakeResponse(200, {'symbol': params['symbol'], 'orderId': order_id,
+                                      'clientOrderId': params['newClientOrderId']})
+        if method == 'DELETE':
+            return FakeResponse(200, {'status': 'CANCELED', 'executedQty': '0', 'cummulativeQuoteQty': '0'})
+        return FakeResponse(404, {'code': -1, 'msg': 'not found'})
+
+    def _emit_fill(self, params, order_id):
+        qty = float(params['quantity'])
+        price = float(params['price'])
+        self.stream.dispatch({
+            'e': 'executionReport', 's': params['symbol'], 'c': params['newClientOrderId'],
+            'i': order_id, 'X': 'FILLED', 'l': str(qty), 'z': str(qty), 'Z': str(qty * price), 'r': 'NONE'
+        })
+
+def build_gateway(fill=True):
+    stream = UserDataStream()
+    session = FakeExchangeSession(stream, fill=fill)
+    rest = BinanceRestClient(base_url='http://mock', api_key='k', api_secret='s', session=session)
+    gateway = OrderGateway(rest, maker_only=True, retry_order=1)
+    stream.subscribe(gateway.on_user_data)
+    return gateway, session
+
+def test_maker_order_fill_latency():
+    """Orden LIMIT_MAKER llega a FILLED y registra latencias y slippage"""
+    print("\n1️⃣ Test: fill de orden maker...")
+    gateway, session = build_gateway()
+
+    result = gateway.execute_maker_order('BTCUSDT', 'BUY', 0.001, 45000.0, intent_key='sig-1',
+                                         reference_price=45010.0, fill_timeout=2.0)
+
+    assert result['filled'], result
+    assert session.posts[0]['type'] == 'LIMIT_MAKER'
+    execution = result['order']['execution']
+    assert execution['submit_to_fill_ms'] >= execution['submit_to_ack_ms'] >= 0
+    # Comprar por debajo de la referencia es slippage favorable (negativo)
+    assert execution['slippage_bps'] < 0
+    print(f"✅ Fill en {execution['submit_to_fill_ms']:.1f}ms, slippage {execution['slippage_bps']:.2f} bps")
+
+def test_idempotent_client_order_id():
+    """Reenviar el mismo intento no crea una segunda orden"""
+    print("\n2️⃣ Test: idempotencia de client order id...")
+    gateway, session = build_gateway(fill=False)
+
+    first = gateway.submit_order('ETHUSDT', 'SELL', 0.01, 2800.0, intent_key='sig-2')
+    second = gateway.submit_order('ETHUSDT', 'SELL', 0.01, 2800.0, intent_key='sig-2')
+
+    assert first is second
+    assert len(session.posts) == 1
+    print(f"✅ Un solo envío para {first['client_order_id']}")
+
+def test_unfilled_order_is_cancelled():
+    """Orden sin fill se cancela tras el timeout"""
+    print("\n3️⃣ Test: cancelación por timeout...")
+    gateway, session = build_gateway(fill=False)
+
+    result = gateway.execute_maker_order('SOLUSDT', 'BUY', 1.0, 100.0, intent_key='sig-3', fill_timeout=0.05)
+
+    assert not result['filled']
+    assert result['executed_qty'] == 0
+    assert result['order']['status'] == 'CANCELED'
+    print(f"✅ Orden cancelada tras {result['attempts']} intento(s)")
+
+def test_bot_entry_priced_from_real_book():
+    """Entrada real al bid del bookTicker del exchange; sin libro real no sale ninguna orden"""
+    print("\n4️⃣ Test: entrada del bot con libro real...")
+    from minimal_working_bot import ProfessionalTradingBot
+
+    exchange = MockExchange(seed=4, api_secret='s', balances={'USDT': 1000.0})
+    exchange.set_book('SOLUSDT', 87.31, 87.33)  # lejos de la cinta sintética (~100)
+    bot = ProfessionalTradingBot()
+    rest = BinanceRestClient(base_url='http://mock', api_key='k', api_secret='s', session=exchange.session())
+    bot.order_gateway = OrderGateway(rest, maker_only=True, retry_order=0)
+    stream = UserDataStream()
+    stream.subscribe(bot.order_gateway.on_user_data)
+    stream.start(source=exchange)
+
+    ctx = bot.build_entry_context('SOLUSDT', {})
+    market_data = bot.load_market_data(ctx)
+    assert market_data['book_source'] == 'rest' and market_data['best_bid'] == 87.31
+    signal = {'symbol': 'SOLUSDT', 'signal': 'BUY', 'price': ctx.get('price'), 'timestamp': 'entry-1'}
+    saved_timeout, config.ORDER_FILL_TIMEOUT_SEC = config.ORDER_FILL_TIMEOUT_SEC, 0.05
+    try:
+        execution = bot.execute_entry_order(signal, 20.0, market_data, bot.symbol_registry.get('SOLUSDT'))
+    finally:
+        config.ORDER_FILL_TIMEOUT_SEC = saved_timeout
+    orders = list(exchange.orders.values())
+    assert len(orders) == 1 and orders[0]['type'] == 'LIMIT_MAKER' and orders[0]['price'] == 87.31
+    assert abs(execution['reference_price'] - 87.32) < 1e-9
+
+    # Símbolo sin libro en el exchange: sin bid/ask, la etapa de spread rechaza y no sale la orden
+    ctx = bot.build_entry_context('XRPUSDT', {})
+    market_data = bot.load_market_data(ctx)
+    assert market_data['best_bid'] is None and market_data['book_source'] is None
+    spread_ctx = FilterContext('XRPUSDT', values={'market_data': market_data})
+    assert bot.safety_manager.check_spread(spread_ctx) == 'NO_BOOK'
+    execution = bot.execute_entry_order({'symbol': 'XRPUSDT', 'signal': 'BUY', 'price': ctx.get('price'),
+                                         'timestamp': 'entry-2'}, 20.0, market_data)
+    assert execution['reason'] == 'NO_BOOK' and len(exchange.orders) == 1
+    stream.stop()
+    print(f"✅ Orden al bid real {orders[0]['price']}; sin libro → {execution['reason']}")
+
+def test_order_text_from_integer_ticks_and_steps():
+    """Precio/cantidad enviados como múltiplos exactos de tick/step aunque el float quede junto al límite"""
+    print("\n5️⃣ Test: formato entero de precio y cantidad...")
+    stream = UserDataStream()
+    session = FakeExchangeSession(stream, fill=False)
+    rest = BinanceRestClient(base_url='http://mock', api_key='k', api_secret='s', session=session)
+    registry = SymbolRegistry()
+    registry.specs = {'BTCUSDT': SymbolSpec('BTCUSDT', '0.01000000', '0.00001000', '0.00001000', '5.00000000')}
+    gateway = OrderGateway(rest, maker_only=True, retry_order=0, symbol_registry=registry)
+
+    buy = gateway.submit_order('BTCUSDT', 'BUY', 0.000129, 45000.1299999, intent_key='fmt-1')
+    sell = gateway.submit_order('BTCUSDT', 'SELL', 0.1 + 0.2, 45000.1200001, intent_key='fmt-2')
+    assert [(p['quantity'], p['price']) for p in session.posts] == [('0.00012', '45000.12'), ('0.30000', '45000.13')]
+    assert buy['quantity'] == 0.00012 and sell['price'] == 45000.13
+
+    # Por debajo de un step no se envía: el exchange la rechazaría por LOT_SIZE
+    dust = gateway.submit_order('BTCUSDT', 'BUY', 0.000009, 45000.0, intent_key='fmt-3')
+    assert dust['status'] == 'REJECTED' and dust['reject_reason'] == 'LOT_SIZE' and len(session.posts) == 2
+    print(f"✅ Enviado {session.posts[0]['quantity']} @ {session.posts[0]['price']}; polvo rechazado en local")
+
+def test_live_filters_use_exchange_data():
+    """Con gateway: rango de velas reales, volumen 24h del ticker y latencias medidas; sin velas no se opera"""
+    print("\n6️⃣ Test: filtros de entrada real con datos del exchange...")
+    from minimal_working_bot import ProfessionalTradingBot
+
+    exchange = MockExchange(seed=6, api_secret='s', balances={'USDT': 1000.0})
+    bot = ProfessionalTradingBot()
+    rest = BinanceRestClient(base_url='http://mock', api_key='k', api_secret='s', session=exchange.session())
+    bot.order_gateway = OrderGateway(rest, maker_only=True, retry_order=0)
+
+    # Sin velas reales: ni precio de la cinta sintética ni filtros simulados
+    ctx = bot.build_entry_context('SOLUSDT', {})
+    assert ctx.get('price') is None
+    result = bot.entry_pipeline.evaluate(ctx)
+    assert not result['passed'] and result['reason'] == 'no_bars'
+    market_data = bot.load_market_data(ctx)
+    assert market_data['missing'] == ['klines'] and bot.safety_manager.check_live_data(
+        FilterContext('SOLUSDT', values={'market_data': market_data})) == 'NO_LIVE_DATA'
+
+    resampler = BarResampler(base_minutes=config.BAR_BASE_MINUTES)
+    resampler.sync(rest, ['SOLUSDT'])
+    bot.market_filter.bar_source = resampler
+    bars = resampler.get_bars('SOLUSDT', '1m', 15)
+    ctx = bot.build_entry_context('SOLUSDT', {})
+    assert ctx.get('price') == bars[-1][4]
+    snapshots = [bot.load_market_data(ctx) for _ in range(3)]
+    for snapshot in snapshots:
+        snapshot.pop('rest_latency_ms')  # medida en cada bookTicker
+    assert all(snapshot == snapshots[0] for snapshot in snapshots[1:])  # nada aleatorio
+    market_data = bot.load_market_data(ctx)
+    assert not market_data['missing'] and market_data['book_source'] == 'rest'
+    assert market_data['high'] == max(bar[2] for bar in bars) and market_data['low'] == min(bar[3] for bar in bars)
+    assert market_data['volume_usd'] == float(exchange.ticker_24h('SOLUSDT')['quoteVolume'])
+    assert market_data['rest_latency_ms'] == rest.last_get_latency_ms > 0
+    assert market_data['ws_latency_ms'] == 0.0  # sin eventos user-data todavía
+    conditions = bot.load_market_conditions(ctx)
+    assert 'atr' in conditions and conditions['spread'] is None
+    print(f"✅ Rango {market_data['low']:.2f}-{market_data['high']:.2f}, volumen 24h "
+          f"${market_data['volume_usd']:,.0f}, REST {market_data['rest_latency_ms']:.2f}ms")
+
+def test_finished_orders_are_pruned():
+    """Las órdenes terminadas no se acumulan: solo quedan las últimas; las abiertas nunca se retiran"""
+    print("\n7️⃣ Test: órdenes terminadas acotadas...")
+    stream = UserDataStream()
+    session = FakeExchangeSession(stream, fill=False)
+    rest = BinanceRestClient(base_url='http://mock', api_key='k', api_secret='s', session=session)
+    gateway = OrderGateway(rest, maker_only=True, retry_order=0, finished_capacity=3)
+    stream.subscribe(gateway.on_user_data)
+
+    resting = gateway.submit_order('ETHUSDT', 'SELL', 0.01, 2800.0, intent_key='resting')
+    for index in range(50):
+        order = gateway.submit_order('BTCUSDT', 'BUY', 0.001, 45000.0, intent_key=f"fill-{index}")
+        session._emit_fill(session.posts[-1], index)
+        assert order['status'] == 'FILLED'
+
+    stats = gateway.get_execution_stats()
+    assert stats['orders_tracked'] == 4 and stats['orders_pruned'] == 47
+    assert resting['client_order_id'] in gateway.orders and not resting['done'].is_set()
+    # Las terminadas recientes siguen siendo idempotentes
+    again = gateway.submit_order('BTCUSDT', 'BUY', 0.001, 45000.0, intent_key='fill-49')
+    assert again['status'] == 'FILLED' and len(session.posts) == 51
+    print(f"✅ {stats['orders_tracked']} órdenes en memoria tras 51 envíos ({stats['orders_pruned']} retiradas)")
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS ORDER GATEWAY")
+    print("=" * 50)
+    test_maker_order_fill_latency()
+    test_idempotent_client_order_id()
+    test_unfilled_order_is_cancelled()
+    test_bot_entry_priced_from_real_book()
+    test_order_text_from_integer_ticks_and_steps()
+    test_live_filters_use_exchange_data()
+    test_finished_orders_are_pruned()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
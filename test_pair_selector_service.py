@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST PAIR SELECTOR SERVICE - FASE 1.6
+Script para probar el Auto Pair Selector en un proceso aparte: publicación de
+pares y métricas por Pipe, lectura sin bloqueo, reinicio, swap atómico en el bot
+y cribado desde el bus de mercado sin cliente REST en el proceso hijo
+"""
+
+import os
+import time
+import uuid
+import logging
+
+from pair_selector_service import PairSelectorService
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def wait_snapshot(service: PairSelectorService, timeout: float = 60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        snapshot = service.poll()
+        if snapshot is not None:
+            return snapshot
+        time.sleep(0.05)
+    raise AssertionError("el servicio no publicó a tiempo")
+
+def test_service_publishes_without_blocking():
+    """El hijo selecciona y publica; poll() vuelve al instante tenga o no publicaciones"""
+    print("\n1️⃣ Test: publicación por Pipe y poll sin bloqueo...")
+    service = PairSelectorService(poll_sec=0.2)
+    service.start()
+    try:
+        polls = []
+        started = time.perf_counter()
+        deadline = time.time() + 60
+        snapshot = None
+        while snapshot is None and time.time() < deadline:
+            t0 = time.perf_counter()
+            snapshot = service.poll()
+            polls.append(time.perf_counter() - t0)
+            time.sleep(0.01)
+        assert snapshot is not None
+        assert max(polls[:-1] or [0]) < 0.05  # mientras el hijo importa y puntúa, el trader no espera
+        assert snapshot['seq'] == 1 and snapshot['active_pairs']
+        assert set(snapshot['scores']) == set(snapshot['candidates'])
+        assert snapshot['universe']['active_pairs'] == snapshot['active_pairs']
+
+        service.send_positions(['BTCUSDT'])
+        service.send_positions(['BTCUSDT'])  # sin cambios: no se reenvía
+        service.send_performance({'BTCUSDT': {'trades': 3, 'net_pnl': 0.01}})
+        assert service.is_alive() and service.get_stats()['snapshots'] == 1
+    finally:
+        service.stop()
+    assert not service.is_alive() and service.process is None
+    print(f"✅ Primera publicación en {time.perf_counter() - started:.2f}s con {len(polls)} polls sin bloqueo: "
+          f"{', '.join(snapshot['active_pairs'])}")
+
+def test_restart_after_crash():
+    """Si el proceso del selector muere, poll() lo relanza y vuelve a publicar"""
+    print("\n2️⃣ Test: reinicio tras caída del proceso...")
+    service = PairSelectorService(poll_sec=30, max_restarts=1)
+    service.start()
+    try:
+        wait_snapshot(service)
+        first_pid = service.process.pid
+        service.process.kill()
+        service.process.join(5)
+        service.poll()  # detecta la caída y relanza
+        assert service.restarts == 1 and service.process.pid != first_pid
+        snapshot = wait_snapshot(service)
+        assert snapshot['seq'] == 1  # proceso nuevo, numeración nueva
+    finally:
+        service.stop()
+    print(f"✅ Reinicio {service.restarts}/{service.max_restarts} con nueva publicación")
+
+def test_bot_swaps_pairs_from_snapshot():
+    """El ciclo adopta la publicación en una única asignación y envía posiciones y rendimiento"""
+    print("\n3️⃣ Test: swap atómico de pares en el bot...")
+    from minimal_working_bot import ProfessionalTradingBot
+
+    class FakeService:
+        def __init__(self):
+            self.pending = None
+            self.positions = None
+            self.performance = None
+
+        def send_positions(self, symbols):
+            self.positions = symbols
+
+        def send_performance(self, stats):
+            self.performance = stats
+
+        def poll(self):
+            snapshot, self.pending = self.pending, None
+            return snapshot
+
+    bot = ProfessionalTradingBot()
+    service = FakeService()
+    bot.auto_pair_selector = True
+    bot.pair_selector = None
+    bot.pair_selector_service = service
+    bot.active_pairs = ['BTCUSDT', 'ETHUSDT']
+    before = bot.active_pairs
+
+    assert not bot.apply_selector_snapshot()  # sin publicación: nada cambia
+    assert bot.active_pairs is before and service.positions == [] and service.performance == {}
+
+    service.pending = {'seq': 2, 'active_pairs': ['SOLUSDT', 'BNBUSDT'], 'candidates': ['SOLUSDT', 'BNBUSDT', 'XRPUSDT'],
+                       'duration_ms': 12.0}
+    assert bot.apply_selector_snapshot()
+    assert bot.active_pairs == ['SOLUSDT', 'BNBUSDT'] and before == ['BTCUSDT', 'ETHUSDT']
+    assert bot.get_candidate_symbols() == ['SOLUSDT', 'BNBUSDT']
+    assert bot.selector_snapshot['candidates'][-1] == 'XRPUSDT'
+    print(f"✅ {', '.join(before)} → {', '.join(bot.active_pairs)}")
+
+def test_service_reads_market_bus():
+    """Con MARKET_BUS_NAME el hijo criba y puntúa desde el bus: cero peticiones REST propias"""
+    print("\n4️⃣ Test: selector en proceso leyendo el bus de mercado...")
+    from config_fase_1_6 import config
+    from market_data_bus import MarketDataBus, MarketDataConsumer, FeedHandler, SyntheticFeedSource
+    from synthetic_market import SyntheticMarket
+
+    symbols = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
+    bus = MarketDataBus.create(symbols, name=f"md-test-{uuid.uuid4().hex[:8]}", bar_capacity=config.BAR_BASE_MINUTES)
+    try:
+        FeedHandler(bus, SyntheticFeedSource(SyntheticMarket(seed=5, bar_seconds=60))).step()
+        consumer = MarketDataConsumer.attach(bus.name, base_minutes=config.BAR_BASE_MINUTES)
+        consumer.poll()
+        tickers, books = consumer.bulk_snapshot()
+        assert [t['symbol'] for t in tickers] == symbols and float(tickers[0]['quoteVolume']) > 0
+        assert all(float(b['bidPrice']) < float(b['askPrice']) for b in books)
+        consumer.close()
+
+        service = PairSelectorService(poll_sec=30, market_bus=bus.name)
+        service.start()
+        try:
+            snapshot = wait_snapshot(service)
+        finally:
+            service.stop()
+    finally:
+        bus.close()
+    screening = snapshot['universe']['screening']
+    assert screening['requests'] == 0 and screening['universe'] == len(symbols)  # solo lo que publica el bus
+    assert set(snapshot['candidates']) <= set(symbols)
+    print(f"✅ Cribado de {screening['universe']} pares del bus sin REST: {', '.join(snapshot['active_pairs'])}")
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS PAIR SELECTOR SERVICE")
+    print("=" * 50)
+    test_service_publishes_without_blocking()
+    test_restart_after_crash()
+    test_bot_swaps_pairs_from_snapshot()
+    test_service_reads_market_bus()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST POSITION BOOK - FASE 1.6
+Script para probar el índice de triggers TP/SL/trailing por símbolo y la
+gestión por ciclo de todas las posiciones abiertas del bot con el libro real,
+una sola posición viva por símbolo y entradas contadas al abrir
+"""
+
+import time
+import logging
+
+from binance_rest import BinanceRestClient
+from config_fase_1_6 import config
+from mock_exchange import MockExchange
+from order_gateway import OrderGateway, UserDataStream
+from position_book import PositionBook
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def test_long_and_short_triggers():
+    """Largos y cortos disparan TP/SL en el lado correcto"""
+    print("\n1️⃣ Test: triggers largos y cortos...")
+    book = PositionBook()
+    long_pos = book.open_position('BTCUSDT', 'BUY', 100.0, 1.0, tp_price=101.0, sl_price=99.0)
+    short_pos = book.open_position('BTCUSDT', 'SELL', 100.0, 1.0, tp_price=99.5, sl_price=100.5)
+
+    assert book.on_tick('BTCUSDT', 100.2) == []
+    assert book.on_tick('ETHUSDT', 50.0) == []
+
+    triggered = book.on_tick('BTCUSDT', 100.6)
+    assert [p['id'] for p in triggered] == [short_pos['id']]
+    assert triggered[0]['exit_reason'] == 'SL'
+    book.close_position(short_pos['id'], 100.6)
+
+    triggered = book.on_tick('BTCUSDT', 101.2)
+    assert [p['id'] for p in triggered] == [long_pos['id']]
+    assert triggered[0]['exit_reason'] == 'TP'
+    book.close_position(long_pos['id'], 101.2)
+
+    assert not book.has_open_position('BTCUSDT')
+    assert book.get_stats()['indexed_triggers'] == 0
+    print("✅ Cada posición se dispara una sola vez y en su lado")
+
+def test_step_trailing_stop():
+    """El trailing escalonado sube el stop y cierra como TRAILING_STOP"""
+    print("\n2️⃣ Test: trailing escalonado...")
+    book = PositionBook()
+    position = book.open_position('ETHUSDT', 'BUY', 100.0, 1.0, tp_price=110.0, sl_price=98.0,
+                                  trailing_activation=101.0, trailing_step=0.5)
+
+    for price in (101.0, 101.6, 102.2, 102.8):
+        assert book.on_tick('ETHUSDT', price) == []
+    assert abs(position['sl_price'] - 102.3) < 1e-9
+
+    triggered = book.on_tick('ETHUSDT', 102.2)
+    assert triggered and triggered[0]['exit_reason'] == 'TRAILING_STOP'
+    print(f"✅ Stop arrastrado hasta {position['sl_price']:.2f}")
+
+def test_rearm_after_failed_exit():
+    """Si la salida no se ejecuta, la posición vuelve a quedar armada"""
+    print("\n3️⃣ Test: rearme tras salida fallida...")
+    book = PositionBook()
+    position = book.open_position('SOLUSDT', 'SELL', 100.0, 2.0, tp_price=98.0, sl_price=101.0)
+
+    assert book.on_tick('SOLUSDT', 97.9)
+    assert book.on_tick('SOLUSDT', 97.8) == []
+
+    assert book.rearm(position['id'])
+    triggered = book.on_tick('SOLUSDT', 97.8)
+    assert [p['id'] for p in triggered] == [position['id']]
+    print("✅ Trigger rearmado y disparado de nuevo")
+
+def live_trade_context(bot, symbol: str, price: float) -> dict:
+    """Contexto de una entrada ejecutada (TP/SL al 1%) como el que deja simulate_trade"""
+    targets = bot.safety_manager.compute_trade_targets(price)
+    targets.update(tp_pct=0.01, sl_pct=0.01)
+    return {
+        'signal': {'confidence': 0.7}, 'symbol': symbol, 'direction': 'BUY', 'entry_price': price,
+        'executed_price': price, 'size': 20.0, 'atr_value': price * 0.002, 'targets': targets,
+        'filter_result': {'details': {}}, 'slippage_bps': 0.0, 'fill_latency_ms': 0.0,
+        'safety_status': bot.safety_manager.check_safety_conditions(bot.current_capital)
+    }
+
+def test_bot_manages_every_open_position():
+    """Cada ciclo se revisan todas las posiciones con el libro real; la salida maker no bloquea el ciclo"""
+    print("\n4️⃣ Test: gestión de todas las posiciones del bot...")
+    from minimal_working_bot import ProfessionalTradingBot
+
+    exchange = MockExchange(seed=5, api_secret='s', balances={'USDT': 1000.0})
+    bot = ProfessionalTradingBot()
+    for sink in ('log_trade', 'log_telemetry'):
+        setattr(bot.sheets_logger, sink, lambda *args, **kwargs: True)
+    bot.local_logger.log_operation = lambda trade_data: True
+    bot.send_telegram_message = lambda message: None
+    rest = BinanceRestClient(base_url='http://mock', api_key='k', api_secret='s', session=exchange.session())
+    bot.order_gateway = OrderGateway(rest, maker_only=True, retry_order=1)
+    stream = UserDataStream()
+    stream.subscribe(bot.order_gateway.on_user_data)
+    stream.start(source=exchange)
+
+    sol = bot.open_live_position(live_trade_context(bot, 'SOLUSDT', 100.0))
+    eth = bot.open_live_position(live_trade_context(bot, 'ETHUSDT', 2800.0))
+    assert bot.manage_open_positions() == [] and not bot.pending_exits
+
+    # TP de SOL: salida maker al ask real, el ciclo no espera el fill
+    exchange.set_mid('SOLUSDT', 101.5)
+    started = time.perf_counter()
+    assert bot.manage_open_positions() == []
+    assert time.perf_counter() - started < 1.0
+    exit_order = bot.pending_exits[sol['id']]['order']
+    sol_spec = bot.symbol_registry.get('SOLUSDT')
+    assert exit_order['side'] == 'SELL'
+    assert exit_order['price'] == sol_spec.round_price(exchange.books['SOLUSDT']['ask'], 'SELL')
+    exchange.set_mid('SOLUSDT', 102.0)  # el bid atraviesa la orden: fill maker
+    results = bot.manage_open_positions()
+    assert [r['trade_data']['exit_reason'] for r in results] == ['TP']
+    assert abs(results[0]['trade_data']['exit_price'] - exit_order['price']) < 1e-9
+    assert bot.position_book.open_symbols() == ['ETHUSDT']
+
+    # SL de ETH en ciclos sin señal: cancelación al vencer, reintento al libro actual y rearme
+    eth_spec = bot.symbol_registry.get('ETHUSDT')
+    bot.simulate_trading_signal = lambda: None
+    saved_timeout, config.ORDER_FILL_TIMEOUT_SEC = config.ORDER_FILL_TIMEOUT_SEC, 0.0
+    try:
+        exchange.set_mid('ETHUSDT', 2760.0)
+        bot.run_trading_cycle()
+        first = bot.pending_exits[eth['id']]['order']
+        exchange.set_mid('ETHUSDT', 2750.0)
+        bot.run_trading_cycle()
+        second = bot.pending_exits[eth['id']]['order']
+        bot.run_trading_cycle()
+        third = bot.pending_exits[eth['id']]
+    finally:
+        config.ORDER_FILL_TIMEOUT_SEC = saved_timeout
+        stream.stop()
+    assert first['status'] == 'CANCELED' and second['status'] == 'CANCELED'
+    assert second['price'] == eth_spec.round_price(exchange.books['ETHUSDT']['ask'], 'SELL') < first['price']
+    # Reintentos agotados: triggers rearmados y el SL, aún cruzado, vuelve a disparar
+    assert third['attempt'] == 0 and third['order'] is not second
+    assert bot.position_book.has_open_position('ETHUSDT')
+    print(f"✅ TP de SOL a {exit_order['price']} sin bloquear; SL de ETH recolocado "
+          f"{first['price']} → {second['price']}")
+
+def live_signal(bot, symbol: str, price: float) -> dict:
+    """Señal aprobada por el pipeline de entrada sobre un libro real ±1 bp"""
+    targets = bot.safety_manager.compute_trade_targets(price)
+    return {
+        'signal': 'BUY', 'direction': 'BUY', 'price': price, 'confidence': 0.7, 'symbol': symbol,
+        'timestamp': '2026-01-01T00:00:00', 'market_data': {'atr': price * 0.002},
+        'safety_status': bot.safety_manager.check_safety_conditions(bot.current_capital),
+        'pre_trade_data': {'best_bid': price * 0.9999, 'best_ask': price * 1.0001, 'book_source': 'rest'},
+        'filter_result': {'passed': True, 'reason': 'OK', 'details': {'edge_bps': 10.0}, 'warnings': []},
+        'targets': targets
+    }
+
+def test_live_entry_counted_on_open():
+    """En real: una posición por símbolo y la entrada cuenta (límites y cooldown) al abrir, no al cerrar"""
+    print("\n5️⃣ Test: entrada real contada al abrir...")
+    from minimal_working_bot import ProfessionalTradingBot
+
+    exchange = MockExchange(seed=5, api_secret='s', balances={'USDT': 1000.0})
+    bot = ProfessionalTradingBot()
+    for sink in ('log_trade', 'log_telemetry'):
+        setattr(bot.sheets_logger, sink, lambda *args, **kwargs: True)
+    bot.local_logger.log_operation = lambda trade_data: True
+    bot.send_telegram_message = lambda message: None
+    rest = BinanceRestClient(base_url='http://mock', api_key='k', api_secret='s', session=exchange.session())
+    bot.order_gateway = OrderGateway(rest, maker_only=True, retry_order=0)
+    fills = []
+
+    def filled_entry(signal, notional, market_data, symbol_spec=None):
+        fills.append(signal['symbol'])
+        return {'filled': True, 'executed_qty': notional / 100.2, 'avg_price': 100.2, 'slippage_bps': 2.0,
+                'attempts': 1, 'order': {}, 'reason': 'FILLED', 'reference_price': 100.0}
+
+    bot.execute_entry_order = filled_entry
+    safety = bot.safety_manager
+    opened = bot.simulate_trade(live_signal(bot, 'SOLUSDT', 100.0))
+    assert opened['position_open'] and opened['fill_price'] == 100.2  # precio real del fill, no el de la señal
+    assert safety.daily_trades == 1 and safety.hourly_trades == 1 and safety.last_trade_time is not None
+    assert not safety.check_safety_conditions(bot.current_capital)['can_trade']  # cooldown desde la apertura
+
+    # Segunda entrada en el mismo símbolo con la posición viva: rechazada sin orden
+    second = bot.simulate_trade(live_signal(bot, 'SOLUSDT', 100.0))
+    assert not second['executed'] and 'Posición abierta' in second['reason'] and fills == ['SOLUSDT']
+    assert len(bot.position_book.get_positions('SOLUSDT')) == 1
+
+    # El cierre no vuelve a contar la entrada
+    position = bot.position_book.get_positions('SOLUSDT')[0]
+    bot.position_book.close_position(position['id'], 101.0)
+    assert bot.finalize_trade(position['context'], 101.0, True, 'TP')['executed']
+    assert safety.daily_trades == 1 and safety.hourly_trades == 1
+    print(f"✅ 1 entrada en SOLUSDT, la segunda rechazada; trades del día {safety.daily_trades}")
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS POSITION BOOK")
+    print("=" * 50)
+    test_long_and_short_triggers()
+    test_step_trailing_stop()
+    test_rearm_after_failed_exit()
+    test_bot_manages_every_open_position()
+    test_live_entry_counted_on_open()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST PROFILER TRIGGER - FASE 1.6
+Script para probar el perfilado bajo demanda por señal (SIGUSR1) y el volcado
+de pilas de todos los hilos (SIGUSR2)
+"""
+
+import os
+import time
+import signal
+import logging
+import tempfile
+import threading
+
+from profiler_trigger import ProfilerTrigger, SIGNALS_AVAILABLE
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def busy_trading_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(i * i for i in range(2000))
+
+def wait_idle(trigger: ProfilerTrigger, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while trigger.active and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+def test_sampling_session_via_signal():
+    """SIGUSR1 lanza una sesión de muestreo acotada y deja perfil + top-N en disco"""
+    print("\n1️⃣ Test: sesión de muestreo por SIGUSR1...")
+    if not SIGNALS_AVAILABLE:
+        print("⚠️ Plataforma sin SIGUSR1, test omitido")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        trigger = ProfilerTrigger(output_dir=tmp, duration_sec=0.3, interval_ms=2, top_n=5)
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_trading_loop, args=(stop,), daemon=True)
+        worker.start()
+        try:
+            assert trigger.install()
+            os.kill(os.getpid(), signal.SIGUSR1)
+            time.sleep(0.05)
+            assert trigger.active
+            assert not trigger.start_session()  # una sesión a la vez
+            wait_idle(trigger)
+        finally:
+            stop.set()
+            trigger.uninstall()
+
+        assert not trigger.active and trigger.sessions == 1
+        with open(trigger.last_outputs['summary'], encoding='utf-8') as f:
+            summary = f.read()
+        assert 'busy_trading_loop' in summary and 'TOP 5 (propio)' in summary
+        with open(trigger.last_outputs['profile'], encoding='utf-8') as f:
+            folded = f.read().splitlines()
+        assert folded and all(line.rsplit(' ', 1)[1].isdigit() for line in folded)
+        print(f"✅ {len(folded)} pilas distintas, resumen en {os.path.basename(trigger.last_outputs['summary'])}")
+
+def test_cprofile_session():
+    """Modo cprofile: perfila el hilo principal y SIGALRM cierra la sesión"""
+    print("\n2️⃣ Test: sesión cProfile acotada...")
+    if not hasattr(signal, 'setitimer'):
+        print("⚠️ Plataforma sin setitimer, test omitido")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        trigger = ProfilerTrigger(output_dir=tmp, duration_sec=0.2, mode='cprofile', top_n=5)
+        previous = signal.getsignal(signal.SIGALRM)
+        try:
+            assert trigger.start_session()
+            deadline = time.monotonic() + 5.0
+            while trigger.active and time.monotonic() < deadline:
+                sum(i * i for i in range(2000))
+        finally:
+            signal.signal(signal.SIGALRM, previous)
+
+        assert not trigger.active
+        assert os.path.getsize(trigger.last_outputs['profile']) > 0
+        with open(trigger.last_outputs['summary'], encoding='utf-8') as f:
+            assert '<genexpr>' in f.read()  # el bucle perfilado en el hilo principal
+        print("✅ .prof y resumen pstats escritos")
+
+def test_stack_dump():
+    """SIGUSR2 vuelca las pilas de todos los hilos en thread_stacks.log"""
+    print("\n3️⃣ Test: volcado de pilas por SIGUSR2...")
+    if not SIGNALS_AVAILABLE:
+        print("⚠️ Plataforma sin SIGUSR2, test omitido")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        trigger = ProfilerTrigger(output_dir=tmp)
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_trading_loop, args=(stop,), daemon=True)
+        worker.start()
+        try:
+            trigger.install()
+            os.kill(os.getpid(), signal.SIGUSR2)
+            time.sleep(0.05)
+        finally:
+            stop.set()
+            trigger.uninstall()
+        with open(os.path.join(tmp, 'thread_stacks.log'), encoding='utf-8') as f:
+            dump = f.read()
+        assert 'busy_trading_loop' in dump and 'test_stack_dump' in dump
+        print(f"✅ Volcado de {dump.count('Thread 0x')} hilos")
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS PROFILER TRIGGER")
+    print("=" * 50)
+    test_sampling_session_via_signal()
+    test_cprofile_session()
+    test_stack_dump()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST REBALANCE DRIFT - FASE 1.6
+Script para probar el mantenimiento incremental de scores por barra cerrada y
+el rebalance del Auto Pair Selector disparado por deriva del top-K con histéresis
+"""
+
+import logging
+
+import pair_selector as pair_selector_module
+from config_fase_1_6 import config
+from pair_selector import AutoPairSelector
+from soak_runner import VirtualClock
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+START = 1_767_225_600.0  # 2026-01-01 00:00 UTC, inicio de barra horaria
+
+def build_selector(clock: VirtualClock) -> AutoPairSelector:
+    pair_selector_module.datetime = clock.datetime
+    selector = AutoPairSelector(config)
+    selector.screener.time_fn = clock.time  # snapshot simulado del cribado de la misma hora virtual
+    selector.auto_pair_selector = True
+    selector.rebalance_trigger = 'drift'
+    selector.cand_max_correlation = 1.01  # la correlación no interfiere con la pertenencia
+    return selector
+
+def test_hysteresis():
+    """Un aspirante solo desplaza al titular más débil si lo supera por el margen"""
+    print("\n1️⃣ Test: histéresis del top-K...")
+    selector = AutoPairSelector(config)
+    selector.rebalance_hysteresis = 0.10
+    selector.active_pairs = ['AAAUSDT', 'BBBUSDT']
+    selector.pair_scores = {'AAAUSDT': 0.50, 'BBBUSDT': 0.40, 'CCCUSDT': 0.43, 'DDDUSDT': 0.0}
+    assert selector.score_drift()['swaps'] == 0
+
+    selector.pair_scores['CCCUSDT'] = 0.45
+    assert selector.score_drift()['pairs'] == [('BBBUSDT', 'CCCUSDT')]
+
+    selector.pair_scores.update({'AAAUSDT': 0.0, 'DDDUSDT': 0.01})  # titular que deja de pasar filtros
+    assert selector.score_drift()['pairs'] == [('AAAUSDT', 'CCCUSDT')]  # DDD no alcanza a BBB
+    print("✅ Margen del 10% respetado; titulares con score 0 se sustituyen")
+
+def test_incremental_bar_updates():
+    """Solo las barras cerradas nuevas se incorporan; la ventana mantiene su longitud"""
+    print("\n2️⃣ Test: scores incrementales por barra cerrada...")
+    original = pair_selector_module.datetime
+    clock = VirtualClock(START + 600)
+    try:
+        selector = build_selector(clock)
+        assert selector.refresh_universe()
+        symbols = list(selector.pair_data)
+        lengths = {symbol: len(df) for symbol, df in selector.pair_data.items()}
+        assert selector.update_scores() == 0  # misma barra en curso
+
+        clock.advance(3 * 3600)
+        assert selector.update_scores() == 3 * len(symbols)
+        assert selector.update_scores() == 0
+        assert all(len(selector.pair_data[symbol]) == lengths[symbol] for symbol in symbols)
+        last_ts = selector.pair_data[symbols[0]]['timestamp'].iloc[-1].timestamp()
+        assert last_ts == START + 2 * 3600  # última barra cerrada: 02:00-03:00
+        assert selector.drift_stats == {'full_refreshes': 1, 'incremental_rebalances': 0,
+                                        'bars_processed': 3 * len(symbols)}
+    finally:
+        pair_selector_module.datetime = original
+    print(f"✅ {3 * len(symbols)} barras procesadas sin recalcular el universo")
+
+def test_drift_triggered_rebalance():
+    """Sin deriva no hay rebalance; con deriva se re-selecciona sin cribado ni klines"""
+    print("\n3️⃣ Test: rebalance disparado por deriva...")
+    original = pair_selector_module.datetime
+    clock = VirtualClock(START)
+    try:
+        selector = build_selector(clock)
+        selector.universe_refresh_minutes = 24 * 60
+        first = selector.select_active_pairs()
+        assert not selector.should_rebalance()  # dentro de MIN_HOURS_BETWEEN_SWITCHES
+
+        clock.advance(selector.min_hours_between_switches * 3600 + 60)
+        selector.update_scores()
+        ranked = sorted(selector.pair_scores, key=selector.pair_scores.get, reverse=True)
+        selector.active_pairs = ranked[:selector.max_active_pairs]
+        assert not selector.should_rebalance()
+
+        challenger = next(symbol for symbol in selector.pair_scores if symbol not in selector.active_pairs)
+        selector.pair_scores[challenger] = 2 * max(selector.pair_scores.values()) + 1
+        assert selector.should_rebalance() and not selector.needs_full_refresh()
+
+        fetches = []
+        selector.get_market_data = lambda *args: fetches.append(args)
+        incumbents = list(selector.active_pairs)
+        weakest = min(incumbents, key=selector.pair_scores.get)
+        selected = selector.select_active_pairs(refresh=selector.needs_full_refresh())
+        assert selected == [challenger if symbol == weakest else symbol for symbol in incumbents] and not fetches
+        assert selector.drift_stats['incremental_rebalances'] == 1
+        assert selector.drift_stats['full_refreshes'] == 1
+
+        clock.advance(24 * 3600)
+        assert selector.needs_full_refresh()  # universo caducado: cribado completo
+    finally:
+        pair_selector_module.datetime = original
+    print(f"✅ {', '.join(first)} → {', '.join(selected)} sin nuevas peticiones")
+
+def test_incremental_rebalance_keeps_incumbents():
+    """refresh=False no re-ordena desde cero: un aspirante dentro del margen no entra"""
+    print("\n4️⃣ Test: titulares conservados en el rebalance incremental...")
+    selector = AutoPairSelector(config)
+    selector.auto_pair_selector = True
+    selector.rebalance_hysteresis = 0.10
+    selector.cand_max_correlation = 1.01
+    selector.max_active_pairs = 2
+    symbols = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
+    selector.pair_data = {symbol: selector._simulate_market_data(symbol, '1h', 24) for symbol in symbols}
+    selector.active_pairs = ['BTCUSDT', 'ETHUSDT']
+
+    # Un re-ranking completo elegiría SOL (0.43) sobre ETH (0.40), pero no lo supera en un 10%
+    selector.pair_scores = {'BTCUSDT': 0.50, 'ETHUSDT': 0.40, 'SOLUSDT': 0.43}
+    assert selector.select_active_pairs(refresh=False) == ['BTCUSDT', 'ETHUSDT']
+    assert selector.last_drift['swaps'] == 0
+
+    # Con ETH en posición abierta tampoco se sustituye aunque SOL lo supere
+    selector.pair_scores['SOLUSDT'] = 0.60
+    assert selector.select_active_pairs(['ETHUSDT'], refresh=False) == ['BTCUSDT', 'ETHUSDT']
+    assert selector.select_active_pairs(refresh=False) == ['BTCUSDT', 'SOLUSDT']
+    assert selector.last_drift['pairs'] == [('ETHUSDT', 'SOLUSDT')]
+    print("✅ Solo entra el aspirante que supera el margen, en el hueco del titular desplazado")
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS REBALANCE DRIFT")
+    print("=" * 50)
+    test_hysteresis()
+    test_incremental_bar_updates()
+    test_drift_triggered_rebalance()
+    test_incremental_rebalance_keeps_incumbents()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST REJECTION STATS - FASE 1.6
+Script para probar los contadores de rechazo por par/filtro/motivo
+con ventanas deslizantes 1m/1h/24h
+"""
+
+import logging
+
+from rejection_stats import RejectionStats, RollingCounter
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def test_rolling_counter_expires_buckets():
+    """Los buckets fuera de la ventana dejan de contar"""
+    print("\n1️⃣ Test: expiración de buckets...")
+    counter = RollingCounter(bucket_sec=10, size=6)  # ventana de 60s
+
+    for now in (0, 5, 15, 25):
+        counter.add(now)
+    assert counter.value(25) == 4
+    assert counter.value(65) == 2     # buckets 0-9 expirados
+    assert counter.value(85) == 0
+    counter.add(1000)
+    assert counter.value(1000) == 1   # salto mayor que la ventana: reinicio
+    print("✅ Ventana deslizante correcta")
+
+def test_rates_per_symbol_and_filter():
+    """Tasas por par y filtro a partir de los agregados"""
+    print("\n2️⃣ Test: tasas por par y filtro...")
+    clock = {'now': 10_000.0}
+    stats = RejectionStats(time_fn=lambda: clock['now'])
+
+    for _ in range(10):
+        stats.record_signal('BTCUSDT')
+    for _ in range(10):
+        stats.record_signal('ETHUSDT')
+    for _ in range(4):
+        stats.record_rejection('BTCUSDT', 'pre_trade', 'HIGH_SPREAD')
+    stats.record_rejection('BTCUSDT', 'market_filter', 'low_vol')
+    stats.record_rejection('ETHUSDT', 'pre_trade', 'HIGH_REST_LAT')
+
+    assert stats.rate('1h', symbol='BTCUSDT') == 50.0
+    assert stats.rate('1h', symbol='BTCUSDT', filter_name='pre_trade') == 40.0
+    assert stats.rate('1h', filter_name='pre_trade') == 25.0
+    assert stats.rate('1h') == 30.0
+
+    top = stats.top_rejections('1h', limit=1)[0]
+    assert (top['symbol'], top['filter'], top['reason'], top['count']) == ('BTCUSDT', 'pre_trade', 'HIGH_SPREAD', 4)
+
+    clock['now'] += 120
+    assert stats.count('1m') == 0
+    assert stats.count('1h') == 6
+    clock['now'] += 3600
+    assert stats.count('1h') == 0 and stats.count('24h') == 6
+    print(f"✅ Top rechazo: {top['symbol']} {top['filter']}:{top['reason']}")
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS REJECTION STATS")
+    print("=" * 50)
+    test_rolling_counter_expires_buckets()
+    test_rates_per_symbol_and_filter()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST REQUEST BUDGET - FASE 1.6
+Script para probar el presupuesto global de peso REST: reservas por prioridad,
+corrección con las cabeceras del exchange, pausa por Retry-After, un cliente
+REST contra el mock con límite bajo que nunca llega a recibir un 429 y un único
+bucket compartido entre procesos con reparto fijo para el feed-handler
+"""
+
+import logging
+import multiprocessing
+
+from binance_rest import BinanceRestClient
+from mock_exchange import MockExchange
+from config_fase_1_6 import config
+from request_budget import (RequestBudget, request_weight, classify_request, PRIORITY_ORDER,
+                            PRIORITY_ACCOUNT, PRIORITY_MARKET, PRIORITY_SCAN)
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+START = 1_767_225_600.0  # 2026-01-01 00:00 UTC
+
+def test_priorities_and_reserves():
+    """El cribado se aplaza primero; las órdenes pueden gastar hasta el último punto de peso"""
+    print("\n1️⃣ Test: prioridades y reservas...")
+    clock = {'now': START}
+    budget = RequestBudget(weight_limit_1m=600, order_limit_10s=5, market_reserve_pct=15, scan_reserve_pct=40,
+                           time_fn=lambda: clock['now'], sleep_fn=lambda s: None)
+    scans = sum(budget.acquire(10, PRIORITY_SCAN) for _ in range(100))
+    assert scans == 36  # hasta dejar 240 libres (40%)
+    markets = sum(budget.acquire(10, PRIORITY_MARKET) for _ in range(100))
+    assert markets == 15  # hasta dejar 90 libres
+    assert budget.acquire(60, PRIORITY_ACCOUNT) and not budget.acquire(10, PRIORITY_ACCOUNT)
+    assert budget.acquire(30, PRIORITY_ORDER, is_order=True)
+    assert budget.headroom() == 0.0
+
+    clock['now'] += 6  # 60 de peso recuperado: solo órdenes y cuenta caben
+    assert not budget.acquire(10, PRIORITY_SCAN) and not budget.acquire(10, PRIORITY_MARKET)
+    assert budget.acquire(20, PRIORITY_ACCOUNT)
+    orders = sum(budget.acquire(1, PRIORITY_ORDER, is_order=True) for _ in range(10))
+    assert orders == 5  # límite de 5 órdenes por 10s
+    stats = budget.get_stats()
+    assert stats['deferred']['scan'] == 65 and stats['granted']['order'] == 6
+    print(f"✅ Concedidas scan={scans} market={markets}; aplazadas {stats['deferred']}")
+
+def test_headers_and_retry_after():
+    """El peso usado por otros procesos de la IP reduce el bucket; un 429 pausa todo"""
+    print("\n2️⃣ Test: cabeceras del exchange y Retry-After...")
+    clock = {'now': START}
+
+    def sleep(seconds):
+        clock['now'] += seconds
+
+    budget = RequestBudget(weight_limit_1m=1200, time_fn=lambda: clock['now'], sleep_fn=sleep)
+    budget.record_response(200, {'x-mbx-used-weight-1m': '1000', 'x-mbx-order-count-10s': '3'})
+    assert budget.server_used_weight == 1000 and abs(budget.headroom() - 200 / 1200) < 1e-9
+    assert not budget.acquire(2, PRIORITY_SCAN) and budget.acquire(2, PRIORITY_MARKET)  # reservas 480 y 180
+    budget.record_response(200, {'X-MBX-USED-WEIGHT-1M': '10'})
+    assert abs(budget.headroom() - 198 / 1200) < 1e-9  # el bucket local nunca sube por cabecera
+
+    budget.record_response(429, {'Retry-After': '7'})
+    assert budget.get_stats()['rate_limited'] == 1 and budget.headroom() == 0.0
+    assert not budget.acquire(1, PRIORITY_ACCOUNT)
+    assert not budget.acquire(1, PRIORITY_ORDER, is_order=True) and clock['now'] == START  # 7s: no espera
+    clock['now'] += 5.5
+    assert budget.acquire(1, PRIORITY_ORDER, is_order=True)  # espera los 1.5s restantes
+    assert clock['now'] == START + 7
+    print(f"✅ Pausa respetada; {budget.get_stats()['deferred']}")
+
+def test_order_waits_briefly():
+    """Una orden sin cupo de 10s espera lo justo (≤ max_order_wait_sec) en lugar de fallar"""
+    print("\n3️⃣ Test: espera corta de órdenes...")
+    clock = {'now': START}
+
+    def sleep(seconds):
+        clock['now'] += seconds
+
+    budget = RequestBudget(weight_limit_1m=6000, order_limit_10s=10, time_fn=lambda: clock['now'], sleep_fn=sleep)
+    assert all(budget.acquire(1, PRIORITY_ORDER, is_order=True) for _ in range(10)) and clock['now'] == START
+    assert budget.acquire(1, PRIORITY_ORDER, is_order=True)  # 1 orden/s de recarga: espera 1s
+    waited = clock['now'] - START
+    assert abs(waited - 1.0) < 1e-9
+
+    slow = RequestBudget(weight_limit_1m=6000, order_limit_10s=2, time_fn=lambda: clock['now'], sleep_fn=sleep)
+    assert slow.acquire(1, PRIORITY_ORDER, is_order=True) and slow.acquire(1, PRIORITY_ORDER, is_order=True)
+    assert not slow.acquire(1, PRIORITY_ORDER, is_order=True)  # 5s > max_order_wait_sec: no se espera
+    assert clock['now'] - START == waited
+    print(f"✅ La orden 11 esperó {waited:.1f}s; con 5s de espera se aplaza")
+
+def test_rest_client_never_hits_429():
+    """Cliente REST con presupuesto contra el mock: el cribado cede y no hay ningún 429"""
+    print("\n4️⃣ Test: cliente REST con presupuesto contra el mock...")
+    clock = {'now': START + 5}
+    exchange = MockExchange(seed=1, weight_limit_1m=300, time_fn=lambda: clock['now'])
+    budget = RequestBudget(weight_limit_1m=300, time_fn=lambda: clock['now'], sleep_fn=lambda s: None)
+    rest = BinanceRestClient(base_url='http://mock', api_key='k', api_secret='s',
+                             session=exchange.session(), budget=budget)
+
+    assert request_weight('GET', '/api/v3/ticker/24hr') == 80
+    assert request_weight('GET', '/api/v3/aggTrades', {'symbol': 'BTCUSDT'}) == 4
+    assert classify_request('GET', '/api/v3/ticker/24hr') == PRIORITY_SCAN
+    assert classify_request('GET', '/api/v3/klines', {'symbol': 'BTCUSDT'}) == PRIORITY_MARKET
+    assert classify_request('DELETE', '/api/v3/order') == PRIORITY_ORDER
+
+    scans = [rest.request('GET', '/api/v3/ticker/24hr') for _ in range(3)]
+    assert [r['ok'] for r in scans] == [True, True, False] and scans[2]['deferred']  # 80 cada uno, reserva 120
+    klines = [rest.request('GET', '/api/v3/klines', {'symbol': 'BTCUSDT', 'interval': '1m', 'limit': 5})
+              for _ in range(200)]
+    order = rest.request('POST', '/api/v3/order', {'symbol': 'BTCUSDT', 'side': 'BUY', 'type': 'LIMIT_MAKER',
+                                                   'quantity': '0.001', 'price': '40000'}, signed=True)
+    assert order['ok'], order  # las velas dejaron su reserva libre para la orden
+    responses = scans + klines + [order]
+    assert not any(r['status'] in (429, 418) for r in responses)
+    assert sum(r['ok'] for r in klines) == 47 and budget.get_stats()['rate_limited'] == 0
+    assert rest.deferred_count == budget.get_stats()['deferred']['scan'] + budget.get_stats()['deferred']['market']
+    print(f"✅ Peso usado {budget.server_used_weight}/300, aplazadas {rest.deferred_count}, sin 429")
+
+def spend_worker(handle, attempts, go, results):
+    budget = RequestBudget.attach(handle)
+    try:
+        go.wait(60)  # todos empiezan a la vez
+        results.put(sum(budget.acquire(1000, PRIORITY_MARKET) for _ in range(attempts)))
+    finally:
+        budget.close()
+
+def test_shared_bucket_across_processes():
+    """3 procesos (shards) gastan de un solo bucket; el feed-handler tiene su parte fija de la IP"""
+    print("\n5️⃣ Test: bucket compartido entre procesos y reparto con el feed...")
+    budget = RequestBudget(weight_limit_1m=60_000, market_reserve_pct=0, shared=True)  # 60 de 1000 de peso
+    try:
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        go = context.Event()
+        workers = [context.Process(target=spend_worker, args=(budget.handle(), 50, go, results)) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        go.set()
+        granted = [results.get(timeout=60) for _ in workers]
+        for worker in workers:
+            worker.join(30)
+        assert 60 <= sum(granted) <= 61  # el bucket de un proceso habría concedido 60 a cada uno
+        assert budget.headroom() < 0.05 and budget.get_stats()['shared']
+    finally:
+        budget.close()
+
+    saved = config.MARKET_BUS_NAME
+    try:
+        config.MARKET_BUS_NAME = ''
+        assert RequestBudget.from_config(config).weight_limit == config.REQUEST_WEIGHT_LIMIT_1M
+        config.MARKET_BUS_NAME = 'md-test'
+        trader = RequestBudget.from_config(config)
+        feed = RequestBudget.from_config(config, feed=True)
+        assert trader.weight_limit + feed.weight_limit == config.REQUEST_WEIGHT_LIMIT_1M
+    finally:
+        config.MARKET_BUS_NAME = saved
+    trader.record_response(200, {'X-MBX-USED-WEIGHT-1M': str(int(feed.weight_limit))})
+    assert trader.weight_tokens == trader.weight_limit  # el peso del feed no recorta la parte del trader
+    print(f"✅ Concedidas por proceso: {granted}; reparto trader/feed {trader.weight_limit:.0f}/{feed.weight_limit:.0f}")
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS REQUEST BUDGET")
+    print("=" * 50)
+    test_priorities_and_reserves()
+    test_headers_and_retry_after()
+    test_order_waits_briefly()
+    test_rest_client_never_hits_429()
+    test_shared_bucket_across_processes()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
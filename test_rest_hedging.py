@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST REST HEDGING - FASE 1.6
+Script para probar los GET de datos de mercado con hedging y deadline: cola de
+latencia (p99) frente a un cliente sin hedge, deadline total, órdenes y cuenta
+sin cortar, duplicados limitados por el presupuesto de peso, y cribado/backfill
+sin hedge y con deadline propio
+"""
+
+import time
+import logging
+
+from binance_rest import BinanceRestClient
+from mock_exchange import MockExchange, LatencyModel
+from request_budget import RequestBudget
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+KLINES = {'symbol': 'BTCUSDT', 'interval': '1m', 'limit': 5}
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+def slow_exchange(latency: LatencyModel) -> MockExchange:
+    return MockExchange(seed=1, rest_latency=latency, apply_rest_latency=True)
+
+def client(exchange: MockExchange, **kwargs) -> BinanceRestClient:
+    return BinanceRestClient(base_url='http://mock', api_key='k', api_secret='s', session=exchange.session(), **kwargs)
+
+def test_hedging_cuts_tail_latency():
+    """Picos del 2% a +150ms: el hedge tras el p95 recorta el p99 con pocos duplicados"""
+    print("\n1️⃣ Test: p99 con y sin hedging...")
+    results = {}
+    for name, hedge in (('plain', False), ('hedged', True)):
+        latency = LatencyModel('lognormal', median_ms=4.0, sigma=0.2, spike_prob=0.02, spike_ms=150.0, seed=7)
+        rest = client(slow_exchange(latency), hedge_gets=hedge, hedge_min_ms=5.0)
+        for _ in range(30):  # calentamiento: muestras para el p95
+            rest.request('GET', '/api/v3/klines', KLINES)
+        latencies = []
+        for _ in range(200):
+            response = rest.request('GET', '/api/v3/klines', KLINES)
+            assert response['ok']
+            latencies.append(response['latency_ms'])
+        results[name] = (percentile(latencies, 99), sum(latencies) / len(latencies), rest)
+        rest.close()
+
+    plain_p99, plain_mean, _ = results['plain']
+    hedged_p99, hedged_mean, hedged = results['hedged']
+    stats = hedged.get_stats()
+    assert plain_p99 > 100 and hedged_p99 < plain_p99 / 3, (plain_p99, hedged_p99)
+    assert 0 < stats['hedges_sent'] <= 0.1 * stats['bounded'] and stats['hedges_won'] > 0
+    assert hedged_mean < plain_mean
+    print(f"✅ p99 {plain_p99:.0f}ms → {hedged_p99:.0f}ms; duplicados {stats['hedges_sent']}/"
+          f"{stats['bounded']} (ganados {stats['hedges_won']})")
+
+def test_deadline_and_non_idempotent():
+    """El GET de mercado se corta en su deadline; órdenes y cuenta nunca se abandonan"""
+    print("\n2️⃣ Test: deadline total y peticiones no acotadas...")
+    rest = client(slow_exchange(LatencyModel('fixed', median_ms=250.0)), deadline_ms=100.0)
+    started = time.perf_counter()
+    response = rest.request('GET', '/api/v3/klines', KLINES)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    assert response['timed_out'] and not response['ok'] and elapsed_ms < 200
+    assert rest.get_stats()['deadline_exceeded'] == 1
+
+    account = rest.request('GET', '/api/v3/account', signed=True)
+    order = rest.request('POST', '/api/v3/order', {'symbol': 'BTCUSDT', 'side': 'BUY', 'type': 'LIMIT_MAKER',
+                                                   'quantity': '0.001', 'price': '40000'}, signed=True)
+    assert account['ok'] and order['ok'] and order['latency_ms'] >= 250
+    assert rest.request('GET', '/api/v3/klines', KLINES, deadline_ms=400.0)['ok']  # por llamada
+    rest.close()
+    print(f"✅ Corte a {elapsed_ms:.0f}ms; cuenta y orden completas ({order['latency_ms']:.0f}ms)")
+
+def test_hedges_respect_weight_budget():
+    """Sin holgura de cribado en el presupuesto no se duplica (ni se gasta peso extra)"""
+    print("\n3️⃣ Test: duplicados dentro del presupuesto de peso...")
+    budget = RequestBudget(weight_limit_1m=1000, sleep_fn=lambda s: None)
+    rest = client(slow_exchange(LatencyModel('fixed', median_ms=60.0)), budget=budget, hedge_gets=True,
+                  hedge_default_ms=10.0, max_hedge_ratio=1.0)
+    assert rest.request('GET', '/api/v3/klines', KLINES)['ok']
+    assert rest.hedges_sent == 1  # con holgura: duplicado tras 10ms
+
+    budget.record_response(200, {'X-MBX-USED-WEIGHT-1M': '700'})  # 300 libres < 400 de reserva de cribado
+    assert rest.request('GET', '/api/v3/klines', KLINES)['ok']
+    assert rest.hedges_sent == 1 and budget.get_stats()['deferred']['scan'] == 1
+    rest.close()
+    print(f"✅ Duplicados {rest.hedges_sent}; aplazados por presupuesto {budget.get_stats()['deferred']['scan']}")
+
+def test_scan_and_backfill_are_not_hedged():
+    """Cribado y backfill: sin duplicado y con deadline propio; la latencia de cotización solo la fija quote=True"""
+    print("\n4️⃣ Test: cribado y backfill sin hedge ni deadline de mercado...")
+    rest = client(slow_exchange(LatencyModel('fixed', median_ms=150.0)), hedge_gets=True, deadline_ms=100.0,
+                  scan_deadline_ms=2000.0, hedge_default_ms=10.0, max_hedge_ratio=1.0)
+    assert rest.request('GET', '/api/v3/ticker/24hr')['ok']  # SCAN: 80 de peso, nunca duplicado
+    backfill = rest.request('GET', '/api/v3/klines', {'symbol': 'BTCUSDT', 'interval': '1m', 'limit': 1000},
+                            backfill=True)
+    assert backfill['ok'] and backfill['latency_ms'] >= 150
+    assert rest.hedges_sent == 0 and rest.deadline_exceeded == 0
+    assert rest.last_get_latency_ms == 0.0  # ni cribado ni velas cuentan como latencia de cotización
+
+    assert not rest.request('GET', '/api/v3/klines', KLINES)['ok'] and rest.hedges_sent == 1  # mercado: 100ms + hedge
+    quote = rest.request('GET', '/api/v3/ticker/bookTicker', {'symbol': 'BTCUSDT'}, deadline_ms=1000.0, quote=True)
+    assert quote['ok'] and rest.last_get_latency_ms == quote['latency_ms'] >= 150
+    rest.close()
+    print(f"✅ Backfill completo en {backfill['latency_ms']:.0f}ms; cotización {rest.last_get_latency_ms:.0f}ms")
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS REST HEDGING")
+    print("=" * 50)
+    test_hedging_cuts_tail_latency()
+    test_deadline_and_non_idempotent()
+    test_hedges_respect_weight_budget()
+    test_scan_and_backfill_are_not_hedged()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST RISK COORDINATOR - FASE 1.6
+Script para probar los límites de riesgo globales en memoria compartida entre
+shards: cupo diario exacto con procesos concurrentes, racha/cooldown y bloqueos
+por pérdida, reparto de pares entre workers del bot, devolución del cupo si la
+orden falla y un único selector del supervisor para todos los shards
+"""
+
+import logging
+import multiprocessing
+
+from risk_coordinator import RiskCoordinator, shard_of
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+START = 1_767_254_400.0  # 2026-01-01 08:00 UTC (jueves)
+
+def build(clock=None, **overrides) -> RiskCoordinator:
+    params = dict(initial_capital=100.0, max_trades_per_day=8, daily_loss_pct=0.5, weekly_drawdown_pct=1.5,
+                  max_consecutive_losses=2, cooldown_seconds=600, timezone='UTC')
+    params.update(overrides)
+    if clock is not None:
+        params['time_fn'] = lambda: clock['now']
+    return RiskCoordinator(**params)
+
+def acquire_worker(handle, attempts, go, results):
+    risk = RiskCoordinator.attach(handle)
+    try:
+        go.wait(60)  # todos empiezan a la vez
+        results.put(sum(risk.try_acquire_trade() for _ in range(attempts)))
+    finally:
+        risk.close()
+
+def test_exact_daily_cap_across_processes():
+    """4 procesos compiten por el cupo: se concede exactamente el límite"""
+    print("\n1️⃣ Test: cupo diario exacto entre procesos...")
+    risk = build(max_trades_per_day=3000)
+    try:
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        go = context.Event()
+        workers = [context.Process(target=acquire_worker, args=(risk.handle(), 2000, go, results)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        go.set()
+        granted = [results.get(timeout=60) for _ in workers]
+        for worker in workers:
+            worker.join(30)
+        snapshot = risk.get_snapshot()
+        assert sum(granted) == 3000 == snapshot['trades_today']
+        assert snapshot['rejected'] == 5000
+        assert snapshot['blocked_reason'].startswith('Límite diario global')
+    finally:
+        risk.close()
+    print(f"✅ Concedidos por proceso: {granted} (total 3000/8000)")
+
+def test_streak_cooldown_and_loss_halts():
+    """Racha global → cooldown; pérdida diaria → bloqueo hasta fin de día; el día nuevo reabre"""
+    print("\n2️⃣ Test: racha, cooldown y bloqueos por pérdida...")
+    clock = {'now': START}
+    risk = build(clock)
+    other = RiskCoordinator.attach(risk.handle(), time_fn=lambda: clock['now'])  # segundo shard
+    try:
+        assert risk.try_acquire_trade() and other.try_acquire_trade()
+        risk.record_result(-0.05)
+        assert other.blocked_reason() is None
+        other.record_result(-0.05)  # segunda pérdida seguida, en otro shard
+        assert other.blocked_reason().startswith('Cooldown racha global')
+        assert not risk.try_acquire_trade()
+        clock['now'] += 601
+        assert risk.blocked_reason() is None
+
+        risk.release_trade()
+        assert risk.get_snapshot()['trades_today'] == 1
+
+        assert risk.try_acquire_trade()
+        risk.record_result(-0.45)  # 0.55% acumulado desde la apertura del día
+        assert risk.blocked_reason().startswith('Pérdida diaria global')
+        assert not other.try_acquire_trade()
+
+        clock['now'] = START + 86400  # día siguiente: cupo y pérdida diaria se reabren
+        assert other.try_acquire_trade()
+        assert risk.get_snapshot()['trades_today'] == 1
+        other.record_result(-0.5)  # 1.05% desde el pico semanal: sin bloqueo semanal aún
+        assert risk.blocked_reason().startswith('Pérdida diaria global')
+        clock['now'] = START + 2 * 86400
+        other.record_result(-0.5)
+        assert risk.blocked_reason().startswith('Drawdown semanal global')
+        assert abs(risk.get_snapshot()['equity'] - 98.45) < 1e-9
+    finally:
+        other.close()
+        risk.close()
+    print("✅ Cooldown compartido, bloqueo diario y semanal globales")
+
+def test_bot_shards_split_pairs_and_share_limits():
+    """Dos bots shard: pares disjuntos y cupo diario global exacto"""
+    print("\n3️⃣ Test: shards del bot con cupo compartido...")
+    from minimal_working_bot import ProfessionalTradingBot
+
+    risk = build(max_trades_per_day=3, daily_loss_pct=50, weekly_drawdown_pct=50,
+                 max_consecutive_losses=100)
+    bots = []
+    try:
+        for index in range(2):
+            bot = ProfessionalTradingBot()
+            for sink in ('log_trade', 'log_telemetry'):
+                setattr(bot.sheets_logger, sink, lambda *args, **kwargs: True)
+            bot.local_logger.log_operation = lambda trade_data: True
+            bot.send_telegram_message = lambda message: None
+            bot.active_pairs = ['BTCUSDT', 'ETHUSDT', 'BNBUSDT', 'SOLUSDT', 'XRPUSDT', 'ADAUSDT']
+            bot.attach_shard(index, 2, risk)
+            bots.append(bot)
+
+        owned = [set(bot.get_candidate_symbols()) for bot in bots]
+        assert not owned[0] & owned[1] and owned[0] | owned[1] == set(bots[0].active_pairs)
+        assert all(shard_of(symbol, 2) == index for index, symbols in enumerate(owned) for symbol in symbols)
+
+        executed = 0
+        for _ in range(200):
+            for bot in bots:
+                bot.safety_manager.last_trade_time = None
+                bot.safety_manager.daily_trades = 0  # solo cuenta el límite global
+                signal = bot.simulate_trading_signal()
+                if signal and signal['signal'] not in ('REJECTED', 'ERROR'):
+                    executed += bool(bot.simulate_trade(signal)['executed'])
+        assert executed == 3 == risk.get_snapshot()['trades_today']
+        status = bots[1].safety_manager.check_safety_conditions(bots[1].current_capital)
+        assert not status['can_trade'] and 'global' in status['reason']
+    finally:
+        risk.close()
+    print(f"✅ Shard 0: {', '.join(sorted(owned[0]))} | shard 1: {', '.join(sorted(owned[1]))}; {executed} trades")
+
+def build_shard_bot():
+    from minimal_working_bot import ProfessionalTradingBot
+    bot = ProfessionalTradingBot()
+    for sink in ('log_trade', 'log_telemetry'):
+        setattr(bot.sheets_logger, sink, lambda *args, **kwargs: True)
+    bot.local_logger.log_operation = lambda trade_data: True
+    bot.send_telegram_message = lambda message: None
+    return bot
+
+def test_failed_order_releases_reservation_and_single_selector():
+    """Una orden que lanza devuelve el cupo; los shards reciben los pares del único selector"""
+    print("\n4️⃣ Test: cupo devuelto si la orden falla y selector único del supervisor...")
+    from config_fase_1_6 import config
+    from pair_selector_service import SelectorRelay, ShardSelectorLink
+
+    risk = build(max_trades_per_day=3, daily_loss_pct=50, weekly_drawdown_pct=50, max_consecutive_losses=100)
+    try:
+        bot = build_shard_bot()
+        bot.attach_shard(0, 1, risk)
+        signal = None
+        while signal is None or signal['signal'] in ('REJECTED', 'ERROR'):
+            bot.safety_manager.last_trade_time = None
+            signal = bot.simulate_trading_signal()
+
+        def broken_order(*args, **kwargs):
+            raise ConnectionError("socket cerrado")
+        bot.order_gateway = object()  # ejecución real: la orden lanza tras la reserva
+        bot.execute_entry_order = broken_order
+        result = bot.simulate_trade(signal)
+        assert not result['executed'] and 'socket' in result['reason']
+        assert risk.get_snapshot()['trades_today'] == 0
+    finally:
+        risk.close()
+
+    class FakeService:
+        def __init__(self):
+            self.pending = {'seq': 1, 'active_pairs': ['SOLUSDT', 'XRPUSDT'], 'candidates': ['SOLUSDT', 'XRPUSDT'],
+                            'duration_ms': 5.0, 'published_at': 0.0}
+            self.positions = None
+            self.performance = None
+            self.stopped = False
+
+        def send_positions(self, symbols):
+            self.positions = symbols
+
+        def send_performance(self, stats):
+            self.performance = stats
+
+        def poll(self):
+            snapshot, self.pending = self.pending, None
+            return snapshot
+
+        def stop(self):
+            self.stopped = True
+
+    saved = (config.AUTO_PAIR_SELECTOR, config.PAIR_SELECTOR_MODE)
+    service = FakeService()
+    relay = SelectorRelay(service, 2)
+    try:
+        config.AUTO_PAIR_SELECTOR, config.PAIR_SELECTOR_MODE = True, 'shard'
+        bots = [build_shard_bot() for _ in range(2)]
+        assert all(bot.pair_selector is None and bot.pair_selector_service is None for bot in bots)
+        for index, bot in enumerate(bots):
+            bot.attach_shard(index, 2, None, ShardSelectorLink(relay.shard_conn(index)))
+        bots[0].position_book.open_symbols = lambda: ['ETHUSDT']
+        bots[1].position_book.open_symbols = lambda: ['BTCUSDT']
+        assert not any(bot.apply_selector_snapshot() for bot in bots)  # aún sin publicación
+        assert relay.step()
+        assert service.positions == ['BTCUSDT', 'ETHUSDT']  # posiciones de todos los shards
+        assert all(bot.apply_selector_snapshot() for bot in bots)
+        assert all(bot.active_pairs == ['SOLUSDT', 'XRPUSDT'] for bot in bots)
+        assert sorted(sum((bot.get_candidate_symbols() for bot in bots), [])) == ['SOLUSDT', 'XRPUSDT']
+    finally:
+        config.AUTO_PAIR_SELECTOR, config.PAIR_SELECTOR_MODE = saved
+        relay.close()
+    assert service.stopped and relay.forwarded == 2
+    print(f"✅ Cupo devuelto tras '{result['reason']}'; pares reenviados a 2 shards: {', '.join(bots[0].active_pairs)}")
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS RISK COORDINATOR")
+    print("=" * 50)
+    test_exact_daily_cap_across_processes()
+    test_streak_cooldown_and_loss_halts()
+    test_bot_shards_split_pairs_and_share_limits()
+    test_failed_order_releases_reservation_and_single_selector()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
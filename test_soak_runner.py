@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST SOAK RUNNER - FASE 1.6
+Script para probar el modo soak: reloj virtual, detección de estructuras
+que crecen sin límite, resumen diario tras la hora configurada y ejecución
+siempre simulada (nunca se usa el gateway de órdenes real)
+"""
+
+import os
+import logging
+import tempfile
+from datetime import datetime
+
+import minimal_working_bot
+from soak_runner import VirtualClock, growing_structures, run_soak
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def test_virtual_clock_drives_datetime():
+    """datetime.now() del reloj virtual solo avanza con advance()"""
+    print("\n1️⃣ Test: reloj virtual...")
+    clock = VirtualClock(start=1_700_000_000.0)
+    first = clock.datetime.now()
+    clock.advance(3600)
+    assert (clock.datetime.now() - first).total_seconds() == 3600
+    assert clock.datetime.now().timestamp() == clock.time() == 1_700_003_600.0
+    print(f"✅ Hora virtual: {clock.datetime.now().isoformat()}")
+
+def test_growing_structures_only_flags_monotonic_growth():
+    """Solo se marcan contenedores que crecen en todos los últimos muestreos"""
+    print("\n2️⃣ Test: detección de crecimiento...")
+    flagged = growing_structures({
+        'bot.daily_trades': [0, 8, 16, 24, 32],
+        'bot.metrics_tracker.operations_history': [0, 50, 50, 50, 50],
+        'bot.sawtooth': [0, 8, 0, 8, 0]
+    })
+    assert [row['path'] for row in flagged] == ['bot.daily_trades']
+    print(f"✅ Marcado: {flagged[0]['path']}")
+
+def test_daily_summary_fires_after_configured_minute():
+    """Un ciclo a las 22:07 envía el resumen pendiente y vacía daily_trades"""
+    print("\n3️⃣ Test: resumen diario tras 22:05...")
+    original = minimal_working_bot.datetime
+    workdir = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            bot = minimal_working_bot.ProfessionalTradingBot()
+            clock = VirtualClock(datetime(2024, 5, 6, 22, 7, tzinfo=bot.daily_summary_tz).timestamp())
+            minimal_working_bot.datetime = clock.datetime
+            bot.send_telegram_message = lambda message: None
+            bot.daily_trades = [{'result': 'GANANCIA', 'net_pnl': 0.01, 'capital': 50.01}]
+
+            bot.check_daily_summary_time()
+            assert bot.daily_trades == []
+            bot.daily_trades = [{'result': 'PÉRDIDA', 'net_pnl': -0.01, 'capital': 50.0}]
+            clock.advance(600)
+            bot.check_daily_summary_time()
+            assert len(bot.daily_trades) == 1   # una sola vez por día
+        finally:
+            minimal_working_bot.datetime = original
+            os.chdir(workdir)
+    print("✅ Resumen enviado una vez por día")
+
+def test_short_soak_has_no_unbounded_structures():
+    """Unos días virtuales: se opera cada día y nada crece sin límite"""
+    print("\n4️⃣ Test: soak corto...")
+    workdir = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            report = run_soak(cycles=2400, samples=8, use_tracemalloc=False, log_level=logging.ERROR)
+        finally:
+            os.chdir(workdir)
+            logging.getLogger().setLevel(logging.INFO)
+
+    assert minimal_working_bot.datetime is datetime
+    assert report['virtual_days'] == 5.0 and len(report['timeline']) == 9
+    assert report['trades'] > 8   # los contadores diario/horario se reinician
+    assert report['growing_structures'] == []
+    print(f"✅ {report['cycles_per_sec']:.0f} ciclos/s, {report['trades']} trades en {report['virtual_days']:.0f} días")
+
+def test_soak_never_touches_gateway_with_live_config():
+    """Con LIVE_TRADING=true y SHADOW_MODE=false el soak sigue simulado y no usa el gateway real"""
+    print("\n5️⃣ Test: soak forzado a simulación...")
+    import order_gateway
+
+    config = minimal_working_bot.config
+    saved = (config.LIVE_TRADING, config.SHADOW_MODE)
+    touched = []
+    original_init, original_submit = minimal_working_bot.init_order_gateway, order_gateway.OrderGateway.submit_order
+    minimal_working_bot.init_order_gateway = lambda *args, **kwargs: touched.append('init_order_gateway')
+    order_gateway.OrderGateway.submit_order = lambda *args, **kwargs: touched.append('submit_order')
+    config.LIVE_TRADING, config.SHADOW_MODE = True, False
+    workdir = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            report = run_soak(cycles=600, samples=2, use_tracemalloc=False, log_level=logging.ERROR)
+            modes_after = (config.LIVE_TRADING, config.SHADOW_MODE)
+        finally:
+            os.chdir(workdir)
+            logging.getLogger().setLevel(logging.INFO)
+            config.LIVE_TRADING, config.SHADOW_MODE = saved
+            minimal_working_bot.init_order_gateway = original_init
+            order_gateway.OrderGateway.submit_order = original_submit
+
+    assert touched == [] and report['gateway_calls'] == 0
+    assert report['trades'] > 0   # se opera, pero solo en simulación
+    assert modes_after == (True, False)   # la configuración del proceso se restaura
+    print(f"✅ {report['trades']} trades simulados, 0 llamadas al gateway")
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS SOAK RUNNER")
+    print("=" * 50)
+    test_virtual_clock_drives_datetime()
+    test_growing_structures_only_flags_monotonic_growth()
+    test_daily_summary_fires_after_configured_minute()
+    test_short_soak_has_no_unbounded_structures()
+    test_soak_never_touches_gateway_with_live_config()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
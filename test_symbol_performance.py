@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST SYMBOL PERFORMANCE - FASE 1.6
+Script para probar los agregados de rendimiento por símbolo de MetricsTracker
+y su uso como factor en el Auto Pair Selector
+"""
+
+import logging
+
+from minimal_working_bot import MetricsTracker, config
+from pair_selector import AutoPairSelector
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def make_operation(symbol: str, net: float, notional: float = 10.0) -> dict:
+    return {'symbol': symbol, 'net_pnl': net, 'gross_pnl': net + 0.01, 'fees_cost': 0.01,
+            'notional': notional, 'result': 'GANANCIA' if net > 0 else 'PÉRDIDA'}
+
+def test_symbol_aggregates_survive_history_window():
+    """Los agregados cubren toda la sesión aunque el historial se recorte"""
+    print("\n1️⃣ Test: agregados por símbolo...")
+    tracker = MetricsTracker(max_operations=3, initial_capital=50.0)
+    for net in (0.10, -0.05, -0.08, 0.02, 0.20):
+        tracker.add_operation(make_operation('BTCUSDT', net))
+    tracker.add_operation(make_operation('ETHUSDT', -0.03))
+
+    btc = tracker.get_symbol_stats('BTCUSDT')
+    assert len(tracker.operations_history) == 3
+    assert (btc['trades'], btc['wins'], btc['losses']) == (5, 3, 2)
+    assert abs(btc['net_pnl'] - 0.19) < 1e-9 and abs(btc['fees'] - 0.05) < 1e-9
+    assert abs(btc['max_adverse_run'] - 0.13) < 1e-9 and btc['max_loss_streak'] == 2
+    assert abs(btc['profit_factor'] - 0.32 / 0.13) < 1e-9
+    assert tracker.get_symbol_stats('SOLUSDT') is None
+    assert list(tracker.get_symbol_breakdown()) == ['BTCUSDT', 'ETHUSDT']
+    print(f"✅ BTCUSDT: {btc['trades']} trades, neto ${btc['net_pnl']:.2f}, MAR ${btc['max_adverse_run']:.2f}")
+
+def test_selector_performance_factor():
+    """El selector escala el score según la expectativa realizada del par"""
+    print("\n2️⃣ Test: factor de rendimiento en el selector...")
+    tracker = MetricsTracker(initial_capital=50.0)
+    for _ in range(5):
+        tracker.add_operation(make_operation('BTCUSDT', 0.05))    # +50 bps por trade
+        tracker.add_operation(make_operation('ETHUSDT', -0.05))
+    tracker.add_operation(make_operation('SOLUSDT', 0.05))        # pocos trades: neutro
+
+    selector = AutoPairSelector(config)
+    assert selector.calculate_performance_factor('BTCUSDT') == 1.0   # sin fuente
+    selector.set_performance_source(tracker.get_symbol_stats)
+
+    assert selector.calculate_performance_factor('BTCUSDT') > 1.2
+    assert selector.calculate_performance_factor('ETHUSDT') < 0.8
+    assert selector.calculate_performance_factor('SOLUSDT') == 1.0
+    print(f"✅ Factores: BTC={selector.calculate_performance_factor('BTCUSDT'):.3f}, "
+          f"ETH={selector.calculate_performance_factor('ETHUSDT'):.3f}")
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS SYMBOL PERFORMANCE")
+    print("=" * 50)
+    test_symbol_aggregates_survive_history_window()
+    test_selector_performance_factor()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
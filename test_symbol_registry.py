@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST SYMBOL REGISTRY - FASE 1.6
+Script para probar la carga de exchangeInfo, la caché con TTL, el redondeo
+entero de precio/cantidad/min notional y la recarga desde el ciclo del bot
+"""
+
+import os
+import logging
+import tempfile
+
+from binance_rest import BinanceRestClient
+from mock_exchange import MockExchange
+from symbol_registry import SymbolRegistry, SymbolSpec
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def test_integer_rounding_and_min_notional():
+    """Redondeo al tick/step y chequeo de min notional con enteros"""
+    print("\n1️⃣ Test: redondeo entero...")
+    spec = SymbolSpec('BTCUSDT', '0.01000000', '0.00001000', '0.00001000', '5.00000000')
+
+    assert spec.price_to_ticks(45000.128, 'BUY') == 4500012
+    assert spec.price_to_ticks(45000.121, 'SELL') == 4500013
+    assert spec.format_price(spec.price_to_ticks(45000.1, 'BUY')) == '45000.10'
+    assert spec.qty_to_steps(0.000129) == 12
+    assert spec.format_qty(12) == '0.00012'
+
+    ticks = spec.price_to_ticks(45000.0)
+    assert not spec.meets_min_notional(ticks, 11)   # 4.95 USD
+    assert spec.meets_min_notional(ticks, 12)       # 5.40 USD
+    assert spec.min_steps_at(ticks) == 12
+
+    order = spec.quantize_order(45000.0, 2.0, 'BUY')
+    assert order['bumped_to_min'] and order['quantity_str'] == '0.00012'
+    print(f"✅ Orden ajustada: {order['quantity_str']} @ {order['price_str']} (${order['notional']:.2f})")
+
+def test_min_notional_floor_from_config():
+    """El mínimo configurado se aplica si supera al del exchange"""
+    print("\n2️⃣ Test: min notional configurado...")
+    spec = SymbolSpec('DOGEUSDT', '0.00001000', '1.00000000', '1.00000000', '1.00000000', min_notional_floor=5.0)
+
+    assert abs(spec.min_notional - 5.0) < 1e-12
+    ticks = spec.price_to_ticks(0.08)
+    assert spec.min_steps_at(ticks) == 63
+    print("✅ Floor de $5 aplicado sobre el mínimo de $1 del exchange")
+
+def test_registry_cache_ttl():
+    """exchangeInfo del mock se cachea en disco y expira por TTL"""
+    print("\n3️⃣ Test: caché con TTL...")
+    clock = {'now': 1_000_000.0}
+    exchange = MockExchange(seed=5, time_fn=lambda: clock['now'])
+    rest = BinanceRestClient(base_url='http://mock', session=exchange.session())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, 'exchange_info_cache.json')
+        registry = SymbolRegistry(rest_client=rest, cache_path=cache_path, ttl_sec=3600,
+                                  time_fn=lambda: clock['now'])
+        assert registry.load() and registry.source == 'rest'
+        assert set(registry.symbols()) == set(exchange.books)
+        assert registry.get('ETHUSDT').tick_size == 0.01
+
+        reloaded = SymbolRegistry(rest_client=rest, cache_path=cache_path, ttl_sec=3600,
+                                  time_fn=lambda: clock['now'])
+        assert reloaded.load() and reloaded.source == 'cache'
+
+        clock['now'] += 7200
+        assert reloaded.load() and reloaded.source == 'rest'
+
+        offline = SymbolRegistry(cache_path=os.path.join(tmp, 'missing.json'))
+        assert offline.load() and offline.source == 'fixture'
+        assert offline.get('TRXUSDT') is not None
+    print("✅ REST → caché → REST tras expirar; fixture sin conexión")
+
+def test_trading_cycle_refreshes_stale_registry():
+    """El ciclo del bot recarga exchangeInfo al vencer el TTL (y solo entonces)"""
+    print("\n4️⃣ Test: recarga del registro desde el ciclo...")
+    from minimal_working_bot import ProfessionalTradingBot
+
+    clock = {'now': 1_000_000.0}
+    exchange = MockExchange(seed=6, time_fn=lambda: clock['now'])
+    rest = BinanceRestClient(base_url='http://mock', session=exchange.session())
+    bot = ProfessionalTradingBot()
+    for sink in ('log_trade', 'log_telemetry'):
+        setattr(bot.sheets_logger, sink, lambda *args, **kwargs: True)
+    bot.local_logger.log_operation = lambda trade_data: True
+    bot.send_telegram_message = lambda message: None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = SymbolRegistry(rest_client=rest, cache_path=os.path.join(tmp, 'cache.json'), ttl_sec=3600,
+                                  time_fn=lambda: clock['now'])
+        assert registry.load()
+        bot.symbol_registry = registry
+        bot.run_trading_cycle()
+        assert registry.loaded_at == 1_000_000.0  # vigente: sin recarga
+
+        clock['now'] += 3601
+        bot.run_trading_cycle()
+        assert registry.loaded_at == clock['now'] and registry.source == 'rest'
+    print(f"✅ Recargado en el ciclo {bot.cycle_count} tras vencer el TTL")
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS SYMBOL REGISTRY")
+    print("=" * 50)
+    test_integer_rounding_and_min_notional()
+    test_min_notional_floor_from_config()
+    test_registry_cache_ttl()
+    test_trading_cycle_refreshes_stale_registry()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
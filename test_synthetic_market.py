@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST SYNTHETIC MARKET - FASE 1.6
+Script para probar el generador de mercado sintético: determinismo entre procesos
+y subconjuntos de símbolos, correlación y regímenes, RNG global intacto y velocidad
+"""
+
+import sys
+import time
+import random
+import logging
+import subprocess
+import numpy as np
+
+from config_fase_1_6 import config
+from pair_selector import AutoPairSelector
+from synthetic_market import SyntheticMarket, SyntheticTape, stable_seed
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+START = 1_767_225_600  # 2026-01-01 00:00 UTC
+
+def test_deterministic_across_processes_and_subsets():
+    """La serie de un símbolo no depende del proceso, del orden ni del resto de símbolos"""
+    print("\n1️⃣ Test: determinismo por símbolo...")
+    market = SyntheticMarket(seed=7, bar_seconds=60)
+    both = market.generate(['BTCUSDT', 'ETHUSDT'], 500, first_index=100)
+    alone = SyntheticMarket(seed=7, bar_seconds=60).generate(['ETHUSDT'], 500, first_index=100)
+    assert np.array_equal(both['close'][1], alone['close'][0])
+    assert np.array_equal(both['volume'][1], alone['volume'][0])
+
+    code = ("from synthetic_market import SyntheticMarket;"
+            "print(repr(float(SyntheticMarket(seed=7, bar_seconds=60).generate(['ETHUSDT'], 500, 100)['close'][0, -1])))")
+    other = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert float(other.stdout.strip()) == float(alone['close'][0, -1])  # hash() cambiaría entre procesos
+    assert stable_seed('BTCUSDT') == stable_seed('BTCUSDT') != stable_seed('ETHUSDT')
+
+    other_seed = SyntheticMarket(seed=8, bar_seconds=60).generate(['ETHUSDT'], 500, first_index=100)
+    assert not np.array_equal(other_seed['close'], alone['close'])
+    print("✅ Misma serie en otro proceso y con otros símbolos; otra semilla, otra serie")
+
+def test_windows_share_returns():
+    """Ventanas solapadas (y la vela suelta del modo drift) comparten retornos"""
+    print("\n2️⃣ Test: ventanas solapadas y continuidad...")
+    market = SyntheticMarket(bar_seconds=3600, chunk_bars=256)
+    wide = market.generate(['SOLUSDT'], 600, first_index=1000)  # cruza bloques de aleatoriedad
+    narrow = market.generate(['SOLUSDT'], 100, first_index=1300)
+    assert np.allclose(np.diff(np.log(wide['close'][0, 300:400])), np.diff(np.log(narrow['close'][0])))
+
+    bar = market.bar('SOLUSDT', 1400, last_close=float(wide['close'][0, 399]))
+    assert abs(bar['close'] / wide['close'][0, 400] - 1) < 1e-12
+
+    blocks = list(market.iter_blocks(['SOLUSDT'], 600, block_bars=128, first_index=1000))
+    chained = np.concatenate([block['close'][0] for block in blocks])
+    assert np.allclose(chained, wide['close'][0], rtol=1e-10)
+
+    df = market.bars('SOLUSDT', 24, end_time=START + 1800)
+    assert list(df.columns) == ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+    assert df['timestamp'].iloc[-1].timestamp() == START - 3600  # última vela cerrada
+    assert (df['high'] >= df[['open', 'close']].max(axis=1)).all()
+    assert (df['low'] <= df[['open', 'close']].min(axis=1)).all()
+    print(f"✅ {len(blocks)} bloques encadenados reproducen la serie completa")
+
+def test_correlation_and_regimes():
+    """Retornos correlados vía factor de mercado; el régimen volátil mueve más precio y volumen"""
+    print("\n3️⃣ Test: correlación y regímenes...")
+    market = SyntheticMarket(bar_seconds=60, correlation=0.5)
+    symbols = [f"SYM{i}USDT" for i in range(20)]
+    data = market.generate(symbols, 20_000)
+    returns = np.diff(np.log(data['close']), axis=1)
+    corr = np.corrcoef(returns)[np.triu_indices(len(symbols), 1)].mean()
+    assert 0.35 < corr < 0.65
+
+    regimes = data['regime'][1:]
+    assert set(np.unique(regimes)) == {0, 1, 2}
+    moves = [np.abs(returns[:, regimes == r]).mean() for r in range(3)]
+    volumes = [data['volume'][:, 1:][:, regimes == r].mean() for r in range(3)]
+    assert moves[0] < moves[1] < moves[2] and volumes[0] < volumes[1] < volumes[2]
+    assert (data['spread_bps'] > 0).all()
+    print(f"✅ Correlación media {corr:.2f}; |retorno| por régimen {', '.join(f'{m * 1e4:.1f}' for m in moves)} bps")
+
+def test_global_rng_untouched():
+    """Ni el generador ni el selector simulado tocan el RNG global de NumPy o de random"""
+    print("\n4️⃣ Test: RNG global intacto...")
+    np.random.seed(123)
+    random.seed(123)
+    expected_np, expected_py = np.random.random(), random.random()
+
+    np.random.seed(123)
+    random.seed(123)
+    selector = AutoPairSelector(config)
+    df = selector.get_market_data('BTCUSDT', '1h', 24)
+    SyntheticMarket().generate(['ETHUSDT'], 100)
+    assert np.random.random() == expected_np and random.random() == expected_py
+    assert len(df) == 24 and df.equals(selector.get_market_data('BTCUSDT', '1h', 24))
+    print("✅ Estado global de NumPy y random sin cambios")
+
+def test_tape_and_throughput():
+    """La cinta avanza con el reloj; millones de velas en pocos segundos"""
+    print("\n5️⃣ Test: cinta de precios y velocidad...")
+    clock = {'now': START + 30.0}
+    tape = SyntheticTape(SyntheticMarket(bar_seconds=60), time_fn=lambda: clock['now'])
+    first = tape.quote('BTCUSDT')
+    assert tape.quote('BTCUSDT') == first
+    clock['now'] += 600
+    price, volume = tape.quote('BTCUSDT')
+    assert price != first[0] and volume > 0 and tape.state['BTCUSDT'][0] == (START + 630) // 60 - 1
+
+    market = SyntheticMarket(bar_seconds=60)
+    symbols = [f"SYN{i}USDT" for i in range(200)]
+    started = time.perf_counter()
+    total = sum(block['close'].size for block in market.iter_blocks(symbols, 10_000, block_bars=5_000))
+    elapsed = time.perf_counter() - started
+    assert total == 2_000_000 and elapsed < 10
+    print(f"✅ {total:,} velas en {elapsed:.2f}s ({total / elapsed / 1e6:.1f} M velas/s)")
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS SYNTHETIC MARKET")
+    print("=" * 50)
+    test_deterministic_across_processes_and_subsets()
+    test_windows_share_returns()
+    test_correlation_and_regimes()
+    test_global_rng_untouched()
+    test_tape_and_throughput()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+🧪 TEST UNIVERSE SCREENER - FASE 1.6
+Script para probar el cribado bulk del universo (ticker 24h + bookTicker) y la
+selección en dos etapas del Auto Pair Selector contra el mock exchange
+"""
+
+import os
+import logging
+
+from config_fase_1_6 import config
+from binance_rest import BinanceRestClient
+from mock_exchange import MockExchange
+from pair_selector import AutoPairSelector
+from symbol_registry import SymbolRegistry, SymbolSpec
+from universe_screener import screen_tickers, UniverseScreener
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def ticker(symbol: str, quote_volume: float, last: float = 10.0) -> dict:
+    return {'symbol': symbol, 'lastPrice': str(last), 'priceChangePercent': '1.5', 'quoteVolume': str(quote_volume)}
+
+def book(symbol: str, bid: float, ask: float) -> dict:
+    return {'symbol': symbol, 'bidPrice': str(bid), 'askPrice': str(ask)}
+
+def test_vectorized_screen():
+    """Universo USDT, spread real, rank de volumen y prefiltro volumen/spread"""
+    print("\n1️⃣ Test: cribado vectorizado...")
+    tickers = [ticker('AAAUSDT', 5e8), ticker('BBBUSDT', 2e8), ticker('CCCUSDT', 5e6),
+               ticker('DDDUSDT', 9e8), ticker('EEEUSDT', 3e8), ticker('AAABTC', 9e9),
+               ticker('BTCUPUSDT', 9e9)]
+    books = [book('AAAUSDT', 9.999, 10.001), book('BBBUSDT', 9.99, 10.01), book('CCCUSDT', 9.999, 10.001),
+             book('DDDUSDT', 0.0, 0.0), book('EEEUSDT', 9.9995, 10.0005), book('AAABTC', 1.0, 1.0)]
+
+    df = screen_tickers(tickers, books, 'USDT', min_volume_usd=1e8, max_spread_bps=5.0)
+    assert list(df.index) == ['DDDUSDT', 'AAAUSDT', 'EEEUSDT', 'BBBUSDT', 'CCCUSDT']  # sin BTC ni apalancados
+    assert abs(df.loc['AAAUSDT', 'spread_bps'] - 2.0) < 1e-6
+    assert abs(df.loc['BBBUSDT', 'spread_bps'] - 20.0) < 1e-6
+    assert df.loc['DDDUSDT', 'volume_rank'] == 1.0 and df.loc['CCCUSDT', 'volume_rank'] == 0.2
+    assert list(df.index[df['passed']]) == ['AAAUSDT', 'EEEUSDT']  # libro vacío, spread ancho y bajo volumen fuera
+    assert len(screen_tickers([], books)) == 0
+    print(f"✅ {int(df['passed'].sum())}/{len(df)} pares superan el cribado")
+
+def test_two_stage_selection_against_mock():
+    """Dos peticiones bulk para todo el exchange y klines solo de los supervivientes"""
+    print("\n2️⃣ Test: selección en dos etapas contra el mock exchange...")
+    mids = {'BTCUSDT': 45000.0, 'ETHUSDT': 2800.0, 'BNBUSDT': 600.0, 'SOLUSDT': 100.0,
+            'XRPUSDT': 0.5, 'ADAUSDT': 0.4, 'ETHBTC': 0.06}
+    exchange = MockExchange(mid_prices=mids, seed=3, spread_bps=1.0)
+    exchange.set_book('XRPUSDT', 0.499, 0.501)  # 40 bps: no supera CAND_MAX_SPREAD_BPS
+    rest = BinanceRestClient(base_url='http://mock', api_key='k', api_secret='s', session=exchange.session())
+
+    overrides = {'CAND_MIN_24H_VOLUME_USD': '1000', 'CAND_MAX_SPREAD_BPS': '2.0', 'SCREEN_MAX_CANDIDATES': '4'}
+    saved = {key: os.environ.get(key) for key in overrides}
+    os.environ.update(overrides)
+    try:
+        selector = AutoPairSelector(config, rest_client=rest)
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+    selector.auto_pair_selector = True
+
+    selected = selector.select_active_pairs()
+    paths = [path for _, path, _ in exchange.request_log]
+    klines_symbols = {symbol for symbol in selector.pair_metrics}
+
+    assert paths.count('/api/v3/ticker/24hr') == 1 and paths.count('/api/v3/ticker/bookTicker') == 1
+    assert paths.count('/api/v3/klines') == 4 == len(klines_symbols)
+    assert 'XRPUSDT' not in klines_symbols and 'ETHBTC' not in klines_symbols
+    assert exchange.used_weight == 80 + 4 + 4 * 2
+    for symbol in klines_symbols:
+        metrics = selector.pair_metrics[symbol]
+        assert metrics['spread_bps'] < 1.5 and 0 < metrics['volume_rank'] <= 1
+    assert selector.get_universe_data()['screening']['survivors'] == 5
+    print(f"✅ {len(paths)} peticiones para {len(selector.screen_data)} pares; seleccionados: {', '.join(selected)}")
+
+def test_screen_failure_falls_back_to_candidates():
+    """Sin snapshot bulk el selector sigue con PAIRS_CANDIDATES"""
+    print("\n3️⃣ Test: fallback si el snapshot bulk falla...")
+
+    class FailingRest:
+        def request(self, method, path, params=None, signed=False, timeout=None):
+            return {'ok': False, 'status': 503, 'data': None}
+
+    screener = UniverseScreener(rest_client=FailingRest())
+    assert screener.screen(['BTCUSDT']) is None and screener.failures == 1
+
+    selector = AutoPairSelector(config)
+    selector.auto_pair_selector = True
+    selector.screener.rest_client = FailingRest()
+    selected = selector.select_active_pairs()
+    assert selected and selector.screen_data is None
+    assert set(selector.pair_metrics) == set(selector.pairs_candidates)
+    print(f"✅ Fallback a {len(selector.pairs_candidates)} candidatos estáticos")
+
+def spec(symbol: str, base: str, quote: str = 'USDT', permissions: tuple = ('SPOT',)) -> SymbolSpec:
+    return SymbolSpec.from_exchange_info({
+        'symbol': symbol, 'baseAsset': base, 'quoteAsset': quote, 'permissionSets': [list(permissions)],
+        'filters': [{'filterType': 'PRICE_FILTER', 'tickSize': '0.00010000'},
+                    {'filterType': 'LOT_SIZE', 'stepSize': '0.10000000', 'minQty': '0.10000000'}]
+    })
+
+def test_base_asset_exclusions():
+    """Activo base de exchangeInfo: JUP/SYRUP entran; apalancados, stablecoins y pares sin spec no"""
+    print("\n4️⃣ Test: exclusión por activo base...")
+    names = ['BTCUSDT', 'ETHUSDT', 'JUPUSDT', 'SYRUPUSDT', 'USDCUSDT', 'FDUSDUSDT', 'BTCUPUSDT',
+             'ETHDOWNUSDT', 'NEWUSDT', 'ETHBTC']
+    tickers = [ticker(symbol, 5e8) for symbol in names]
+    books = [book(symbol, 9.999, 10.001) for symbol in names]
+    specs = {symbol: spec(symbol, symbol[:-4]) for symbol in names[:8]}
+    specs['BTCUPUSDT'] = spec('BTCUPUSDT', 'BTCUP', permissions=('SPOT', 'LEVERAGED'))
+    specs['ETHBTC'] = spec('ETHBTC', 'ETH', quote='BTC')
+
+    df = screen_tickers(tickers, books, 'USDT', symbol_specs=specs)
+    assert sorted(df.index) == ['BTCUSDT', 'ETHUSDT', 'JUPUSDT', 'SYRUPUSDT']
+    assert specs['BTCUPUSDT'].permissions == ('LEVERAGED', 'SPOT')
+
+    # Sin specs (nombre del símbolo): mismas exclusiones salvo NEWUSDT, que no puede descartarse
+    df = screen_tickers(tickers, books, 'USDT')
+    assert sorted(df.index) == ['BTCUSDT', 'ETHUSDT', 'JUPUSDT', 'NEWUSDT', 'SYRUPUSDT']
+
+    # El cribado usa el registro: solo pares con spec, y el selector puede ampliar al universo
+    registry = SymbolRegistry()
+    registry.specs = specs
+    screener = UniverseScreener(symbol_registry=registry)
+    df = screener.screen(names)
+    assert screener.spec_filtered and 'NEWUSDT' not in df.index
+    print(f"✅ Universo: {', '.join(sorted(df.index))}")
+
+def main():
+    """Función principal"""
+    print("🚀 INICIANDO TESTS UNIVERSE SCREENER")
+    print("=" * 50)
+    test_vectorized_screen()
+    test_two_stage_selection_against_mock()
+    test_screen_failure_falls_back_to_candidates()
+    test_base_asset_exclusions()
+    print("\n🎉 ¡TODOS LOS TESTS PASARON EXITOSAMENTE!")
+
+if __name__ == "__main__":
+    main()
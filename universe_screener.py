@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+🔭 UNIVERSE SCREENER - FASE 1.6
+Primera etapa del Auto Pair Selector: una sola petición bulk de ticker 24h y otra
+de bookTicker para todo el exchange. Volumen en quote, spread y rank de volumen
+se calculan vectorizados (pandas) para todos los pares del quote asset y se
+prefiltran por CAND_MIN_24H_VOLUME_USD / CAND_MAX_SPREAD_BPS. Solo los
+supervivientes pasan a la segunda etapa (klines por símbolo).
+"""
+
+import time
+import hashlib
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+from symbol_registry import reference_price, get_symbol_registry
+
+# Tokens apalancados (BTCUP, ETHDOWN...): permiso LEVERAGED en exchangeInfo o activo base
+# formado por otro activo base del universo + sufijo (JUP o SYRUP no lo son: J/SYR no cotizan)
+LEVERAGED_PERMISSION = 'LEVERAGED'
+LEVERAGED_BASE_SUFFIXES = ('UP', 'DOWN', 'BULL', 'BEAR')
+
+# Stablecoins y fiat tokenizado como activo base: sin tendencia que operar
+STABLECOIN_BASES = frozenset({'USDC', 'FDUSD', 'TUSD', 'BUSD', 'USDP', 'DAI', 'PYUSD', 'USDE', 'USD1',
+                              'EUR', 'EURI', 'AEUR'})
+
+SCREEN_COLUMNS = ['quote_volume', 'last_price', 'price_change_pct', 'bid', 'ask', 'spread_bps',
+                  'volume_rank', 'passed']
+
+def base_assets(symbols: pd.Series, quote_asset: str,
+                symbol_specs: Dict[str, Any] = None) -> Tuple[pd.Series, pd.Series]:
+    """
+    Activo base de cada símbolo del quote asset (NaN si no es del universo) y marca de
+    permiso apalancado. Con specs sale de exchangeInfo y los símbolos sin spec quedan
+    fuera; sin specs se deduce del nombre.
+    """
+    if symbol_specs is None:
+        in_quote = symbols.str.endswith(quote_asset) & (symbols.str.len() > len(quote_asset))
+        bases = symbols.str[:-len(quote_asset)].where(in_quote)
+        return bases, pd.Series(False, index=symbols.index)
+
+    rows = []
+    for symbol in symbols:
+        spec = symbol_specs.get(symbol)
+        if spec is None:
+            rows.append((None, False))
+            continue
+        quote = spec.quote_asset or (quote_asset if symbol.endswith(quote_asset) else None)
+        base = spec.base_asset or symbol[:-len(quote_asset)]
+        rows.append((base if quote == quote_asset else None, LEVERAGED_PERMISSION in spec.permissions))
+    bases = pd.Series([row[0] for row in rows], index=symbols.index, dtype=object)
+    leveraged = pd.Series([row[1] for row in rows], index=symbols.index, dtype=bool)
+    return bases, leveraged
+
+def excluded_bases(bases: pd.Series, leveraged: pd.Series) -> pd.Series:
+    """Tokens apalancados (por permiso o por nombre sobre un base conocido) y stablecoins"""
+    known = set(bases.dropna())
+    excluded = leveraged | bases.isin(STABLECOIN_BASES)
+    named = bases.fillna('')
+    for suffix in LEVERAGED_BASE_SUFFIXES:
+        excluded |= named.str.endswith(suffix) & named.str[:-len(suffix)].isin(known)
+    return excluded
+
+def screen_tickers(tickers_24h: List[Dict[str, Any]], book_tickers: List[Dict[str, Any]],
+                   quote_asset: str = 'USDT', min_volume_usd: float = 0.0,
+                   max_spread_bps: float = float('inf'), symbol_specs: Dict[str, Any] = None) -> pd.DataFrame:
+    """
+    Cribado vectorizado de los snapshots bulk (formato Binance, valores en texto).
+    Devuelve un DataFrame indexado por símbolo con SCREEN_COLUMNS; volume_rank es el
+    percentil (0-1] del volumen en quote dentro del universo del quote asset.
+    Con symbol_specs (SymbolRegistry) solo entran símbolos con spec y el activo base
+    de exchangeInfo; se excluyen tokens apalancados y stablecoins como base.
+    """
+    if not tickers_24h or not book_tickers:
+        return pd.DataFrame(columns=SCREEN_COLUMNS)
+
+    tickers = pd.DataFrame(tickers_24h, columns=['symbol', 'lastPrice', 'priceChangePercent', 'quoteVolume'])
+    books = pd.DataFrame(book_tickers, columns=['symbol', 'bidPrice', 'askPrice'])
+
+    symbols = tickers['symbol'].astype(str)
+    bases, leveraged = base_assets(symbols, quote_asset, symbol_specs)
+    in_universe = bases.notna() & ~excluded_bases(bases, leveraged)
+    df = tickers[in_universe].merge(books, on='symbol', how='inner').set_index('symbol')
+
+    df = pd.DataFrame({
+        'quote_volume': pd.to_numeric(df['quoteVolume'], errors='coerce'),
+        'last_price': pd.to_numeric(df['lastPrice'], errors='coerce'),
+        'price_change_pct': pd.to_numeric(df['priceChangePercent'], errors='coerce'),
+        'bid': pd.to_numeric(df['bidPrice'], errors='coerce'),
+        'ask': pd.to_numeric(df['askPrice'], errors='coerce')
+    }, index=df.index)
+
+    # Libros vacíos (bid/ask = 0) o cruzados: sin spread válido, no pasan el cribado
+    quoted = (df['bid'] > 0) & (df['ask'] >= df['bid'])
+    mid = (df['bid'] + df['ask']) / 2
+    df['spread_bps'] = np.where(quoted, (df['ask'] - df['bid']) / mid.where(quoted, 1.0) * 10_000, np.inf)
+    df['quote_volume'] = df['quote_volume'].fillna(0.0)
+    df['volume_rank'] = df['quote_volume'].rank(pct=True, method='average')
+    df['passed'] = quoted & (df['quote_volume'] >= min_volume_usd) & (df['spread_bps'] <= max_spread_bps)
+
+    return df.sort_values('quote_volume', ascending=False)
+
+def simulate_bulk_snapshot(symbols: List[str], bucket: int = 0) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    """Snapshots bulk simulados (deterministas por símbolo y bucket horario) para modo sin REST"""
+    tickers, books = [], []
+    for symbol in symbols:
+        seed = int(hashlib.sha1(f"{symbol}|{bucket}".encode()).hexdigest()[:12], 16)
+        rng = np.random.default_rng(seed)
+        price = reference_price(symbol) * (1 + rng.normal(0, 0.01))
+        half_spread = price * rng.uniform(0.25, 1.5) / 10_000
+        tickers.append({
+            'symbol': symbol,
+            'lastPrice': f"{price:.8f}",
+            'priceChangePercent': f"{rng.normal(0, 3):.3f}",
+            'quoteVolume': f"{float(np.exp(rng.uniform(np.log(3e7), np.log(3e9)))):.2f}"
+        })
+        books.append({
+            'symbol': symbol,
+            'bidPrice': f"{price - half_spread:.8f}",
+            'askPrice': f"{price + half_spread:.8f}"
+        })
+    return tickers, books
+
+class UniverseScreener:
+    """Cribado del universo a partir de dos peticiones bulk por rebalance"""
+
+    def __init__(self, rest_client: Any = None, quote_asset: str = 'USDT', min_volume_usd: float = 0.0,
+                 max_spread_bps: float = float('inf'), max_candidates: int = 50,
+                 symbol_registry: Any = None, time_fn: Callable[[], float] = time.time):
+        self.logger = logging.getLogger(__name__)
+        self.rest_client = rest_client
+        self.symbol_registry = symbol_registry  # None → registro global si está cargado
+        self.quote_asset = quote_asset
+        self.min_volume_usd = min_volume_usd
+        self.max_spread_bps = max_spread_bps
+        self.max_candidates = max_candidates
+        self.time_fn = time_fn
+        self.snapshot_source: Optional[Callable[[], Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]] = None
+
+        self.last_screen: Optional[pd.DataFrame] = None
+        self.last_screen_time = None
+        self.spec_filtered = False  # último cribado limitado a símbolos con spec de exchangeInfo
+        self.requests = 0
+        self.failures = 0
+
+    def fetch_snapshot(self) -> Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        """Ticker 24h y bookTicker de todo el exchange (2 peticiones)"""
+        tickers = self.rest_client.request('GET', '/api/v3/ticker/24hr')
+        books = self.rest_client.request('GET', '/api/v3/ticker/bookTicker')
+        self.requests += 2
+        if not (tickers['ok'] and books['ok']) or not isinstance(tickers['data'], list) \
+                or not isinstance(books['data'], list):
+            self.failures += 1
+            self.logger.warning("⚠️ Snapshot bulk no disponible (24hr=%s, bookTicker=%s)",
+                                tickers['status'], books['status'])
+            return None
+        return tickers['data'], books['data']
+
+    def screen(self, candidates: List[str] = None) -> Optional[pd.DataFrame]:
+        """
+        Cribar el universo. Con snapshot_source (bus de mercado) o cliente REST se usan
+        datos reales; sin ellos, un snapshot simulado de `candidates`. Con registro de
+        símbolos solo entran pares con spec. Devuelve el DataFrame completo (columna passed) o None.
+        """
+        if self.snapshot_source is not None:
+            tickers, books = self.snapshot_source()
+        elif self.rest_client is not None:
+            snapshot = self.fetch_snapshot()
+            if snapshot is None:
+                return None
+            tickers, books = snapshot
+        else:
+            tickers, books = simulate_bulk_snapshot(candidates or [], bucket=int(self.time_fn() // 3600))
+
+        registry = self.symbol_registry or get_symbol_registry()
+        specs = registry.specs if registry is not None and registry.specs else None
+        df = screen_tickers(tickers, books, self.quote_asset, self.min_volume_usd, self.max_spread_bps,
+                            symbol_specs=specs)
+        self.spec_filtered = specs is not None
+        self.last_screen = df
+        self.last_screen_time = self.time_fn()
+        self.logger.info("🔭 Cribado: %d pares %s, %d superan volumen/spread",
+                         len(df), self.quote_asset, int(df['passed'].sum()))
+        return df
+
+    def survivors(self, df: pd.DataFrame) -> List[str]:
+        """Supervivientes ordenados por volumen, limitados a max_candidates"""
+        return list(df.index[df['passed'].to_numpy()][:self.max_candidates])
+
+    def get_stats(self) -> Dict[str, Any]:
+        df = self.last_screen
+        return {
+            'universe': 0 if df is None else len(df),
+            'survivors': 0 if df is None else int(df['passed'].sum()),
+            'requests': self.requests,
+            'failures': self.failures,
+            'spec_filtered': self.spec_filtered,
+            'last_screen_time': self.last_screen_time
+        }